@@ -2,8 +2,8 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import auto, Enum
-from functools import reduce
-from typing import Dict, Final, List, Optional, Set
+from types import MappingProxyType
+from typing import Callable, Dict, Final, Iterator, List, Mapping, Optional, Set, Tuple
 import pandas as pd
 from .mp_utils import PoseLandmark
 import numpy as np
@@ -84,81 +84,12 @@ class MecanimBone(Enum):
         return required_bones
     
     @property
-    def parent(self):
-        match self:
-            case MecanimBone.Hips:
-                return None
-            case MecanimBone.Spine:
-                return MecanimBone.Hips
-            case MecanimBone.Chest:
-                return MecanimBone.Spine
-            case MecanimBone.LeftUpperArm:
-                return MecanimBone.Chest
-            case MecanimBone.LeftLowerArm:
-                return MecanimBone.LeftUpperArm
-            case MecanimBone.LeftHand:
-                return MecanimBone.LeftLowerArm
-            case MecanimBone.RightUpperArm:
-                return MecanimBone.Chest
-            case MecanimBone.RightLowerArm:
-                return MecanimBone.RightUpperArm
-            case MecanimBone.RightHand:
-                return MecanimBone.RightLowerArm
-            case MecanimBone.LeftUpperLeg:
-                return MecanimBone.Hips
-            case MecanimBone.LeftLowerLeg:
-                return MecanimBone.LeftUpperLeg
-            case MecanimBone.LeftFootAnkle:
-                return MecanimBone.LeftLowerLeg
-            case MecanimBone.LeftToes:
-                return MecanimBone.LeftFootAnkle
-            case MecanimBone.RightUpperLeg:
-                return MecanimBone.Hips
-            case MecanimBone.RightLowerLeg:
-                return MecanimBone.RightUpperLeg
-            case MecanimBone.RightFootAnkle:
-                return MecanimBone.RightLowerLeg
-            case MecanimBone.RightToes:
-                return MecanimBone.RightFootAnkle
-            case MecanimBone.Head:
-                return MecanimBone.Chest
-            case MecanimBone.LeftHandPinkyRoot:
-                return MecanimBone.LeftHand
-            case MecanimBone.LeftHandIndexRoot:
-                return MecanimBone.LeftHand
-            case MecanimBone.LeftHandThumbRoot:
-                return MecanimBone.LeftHand
-            case MecanimBone.RightHandPinkyRoot:
-                return MecanimBone.RightHand
-            case MecanimBone.RightHandIndexRoot:
-                return MecanimBone.RightHand
-            case MecanimBone.RightHandThumbRoot:
-                return MecanimBone.RightHand
-            case MecanimBone.LeftHeel:
-                return MecanimBone.LeftFootAnkle
-            case MecanimBone.RightHeel:
-                return MecanimBone.RightFootAnkle
-            case MecanimBone.LeftEye:
-                return MecanimBone.Nose
-            case MecanimBone.RightEye:
-                return MecanimBone.Nose
-            case MecanimBone.Nose:
-                return MecanimBone.Head
-
-            case MecanimBone.LeftEar:
-                return MecanimBone.Head
-            case MecanimBone.RightEar:
-                return MecanimBone.Head
-            
-            case MecanimBone.ChestRightward:
-                return MecanimBone.Spine
-
-            case _:
-                raise ValueError(f'{self} is not a valid MecanimBone')
+    def parent(self) -> Optional[MecanimBone]:
+        return MECANIM_TOPOLOGY.parents[self]
 
     @property
-    def children(self):
-        return [b for b in MecanimBone if b.parent is not None and b.parent.value == self.value]
+    def children(self) -> Tuple[MecanimBone, ...]:
+        return MECANIM_TOPOLOGY.children[self]
 
     @staticmethod
     def position_from_mp_pose(bone: Self, poseRow: pd.Series):
@@ -168,154 +99,224 @@ class MecanimBone(Enum):
                 lm = lm.name
             return np.array([poseRow[f'{lm}_x'], poseRow[f'{lm}_y'], poseRow[f'{lm}_z']])
 
-        match bone:
-            case MecanimBone.Hips:
-                # Return average of right and left hips
-                leftHip = get_pose_bone_position(PoseLandmark.LEFT_HIP)
-                rightHip = get_pose_bone_position(PoseLandmark.RIGHT_HIP)
-                return (leftHip + rightHip) / 2
-
-            
-            case MecanimBone.Spine:
-                # Find centerpoint of shoulders and centerpoint of hip, then return the midpoint of those two
-                leftShoulder = get_pose_bone_position(PoseLandmark.LEFT_SHOULDER)
-                rightShoulder = get_pose_bone_position(PoseLandmark.RIGHT_SHOULDER)
-                leftHip = get_pose_bone_position(PoseLandmark.LEFT_HIP)
-                rightHip = get_pose_bone_position(PoseLandmark.RIGHT_HIP)
-                return (leftShoulder + rightShoulder + leftHip + rightHip) / 4
-
-            case MecanimBone.Chest:
-                # Find centerpoint of shoulders
-                leftShoulder = get_pose_bone_position(PoseLandmark.LEFT_SHOULDER)
-                rightShoulder = get_pose_bone_position(PoseLandmark.RIGHT_SHOULDER)
-                return (leftShoulder + rightShoulder) / 2
-                
-            case MecanimBone.LeftUpperArm:
-                # Return left shoulder
-                return get_pose_bone_position(PoseLandmark.LEFT_SHOULDER)
-            
-            case MecanimBone.LeftLowerArm:
-                # Return left elbow
-                return get_pose_bone_position(PoseLandmark.LEFT_ELBOW)
-            
-            case MecanimBone.LeftHand:
-                # Return left wrist
-                return get_pose_bone_position(PoseLandmark.LEFT_WRIST)
-            
-            case MecanimBone.RightUpperArm:
-                # Return right shoulder
-                return get_pose_bone_position(PoseLandmark.RIGHT_SHOULDER)
-            
-            case MecanimBone.RightLowerArm:
-                # Return right elbow
-                return get_pose_bone_position(PoseLandmark.RIGHT_ELBOW)
-            
-            case MecanimBone.RightHand:
-                # Return right wrist
-                return get_pose_bone_position(PoseLandmark.RIGHT_WRIST)
-            
-            case MecanimBone.LeftUpperLeg:
-                # Return left hip
-                return get_pose_bone_position(PoseLandmark.LEFT_HIP)
+        return _bone_position_from_landmarks(bone, get_pose_bone_position)
+
+_BONE_PARENTS: Final[Dict[MecanimBone, Optional[MecanimBone]]] = {
+    MecanimBone.Hips: None,
+    MecanimBone.Spine: MecanimBone.Hips,
+    MecanimBone.Chest: MecanimBone.Spine,
+    MecanimBone.LeftUpperArm: MecanimBone.Chest,
+    MecanimBone.LeftLowerArm: MecanimBone.LeftUpperArm,
+    MecanimBone.LeftHand: MecanimBone.LeftLowerArm,
+    MecanimBone.RightUpperArm: MecanimBone.Chest,
+    MecanimBone.RightLowerArm: MecanimBone.RightUpperArm,
+    MecanimBone.RightHand: MecanimBone.RightLowerArm,
+    MecanimBone.LeftUpperLeg: MecanimBone.Hips,
+    MecanimBone.LeftLowerLeg: MecanimBone.LeftUpperLeg,
+    MecanimBone.LeftFootAnkle: MecanimBone.LeftLowerLeg,
+    MecanimBone.LeftToes: MecanimBone.LeftFootAnkle,
+    MecanimBone.RightUpperLeg: MecanimBone.Hips,
+    MecanimBone.RightLowerLeg: MecanimBone.RightUpperLeg,
+    MecanimBone.RightFootAnkle: MecanimBone.RightLowerLeg,
+    MecanimBone.RightToes: MecanimBone.RightFootAnkle,
+    MecanimBone.Head: MecanimBone.Chest,
+    MecanimBone.LeftHandPinkyRoot: MecanimBone.LeftHand,
+    MecanimBone.LeftHandIndexRoot: MecanimBone.LeftHand,
+    MecanimBone.LeftHandThumbRoot: MecanimBone.LeftHand,
+    MecanimBone.RightHandPinkyRoot: MecanimBone.RightHand,
+    MecanimBone.RightHandIndexRoot: MecanimBone.RightHand,
+    MecanimBone.RightHandThumbRoot: MecanimBone.RightHand,
+    MecanimBone.LeftHeel: MecanimBone.LeftFootAnkle,
+    MecanimBone.RightHeel: MecanimBone.RightFootAnkle,
+    MecanimBone.LeftEye: MecanimBone.Nose,
+    MecanimBone.RightEye: MecanimBone.Nose,
+    MecanimBone.Nose: MecanimBone.Head,
+    MecanimBone.LeftEar: MecanimBone.Head,
+    MecanimBone.RightEar: MecanimBone.Head,
+    MecanimBone.ChestRightward: MecanimBone.Spine,
+}
+
+@dataclass(frozen=True)
+class SkeletonTopology:
+    """
+    Immutable parent/child structure of the `MecanimBone` hierarchy, computed once at import.
+
+    `bones` is in `MecanimBone` order, which is also the bone axis of `HumanoidPositionClip` arrays;
+    `parent_index` holds each bone's parent position in `bones` (-1 for the root).
+    `depth_first_order` visits every bone after its parent, with children in `MecanimBone` order
+    (the order `children` used to return them in).
+    """
+    bones: Tuple[MecanimBone, ...]
+    bone_index: Mapping[MecanimBone, int]
+    parents: Mapping[MecanimBone, Optional[MecanimBone]]
+    children: Mapping[MecanimBone, Tuple[MecanimBone, ...]]
+    parent_index: np.ndarray
+    depth_first_order: Tuple[MecanimBone, ...]
 
-            case MecanimBone.LeftLowerLeg:
-                # Return left knee
-                return get_pose_bone_position(PoseLandmark.LEFT_KNEE)
+    @staticmethod
+    def from_parents(parents: Mapping[MecanimBone, Optional[MecanimBone]], root: MecanimBone) -> SkeletonTopology:
+        bones = tuple(MecanimBone)
+        missing = set(bones) - set(parents)
+        if missing:
+            raise ValueError(f'No parent defined for {sorted(b.name for b in missing)}')
+        bone_index = {bone: i for i, bone in enumerate(bones)}
+        children = {
+            bone: tuple(b for b in bones if parents[b] is bone)
+            for bone in bones
+        }
+
+        depth_first_order: List[MecanimBone] = []
+        stack = [root]
+        while stack:
+            bone = stack.pop()
+            depth_first_order.append(bone)
+            stack.extend(reversed(children[bone]))
+        if len(depth_first_order) != len(bones):
+            raise ValueError(f'Bones not reachable from {root.name}: {set(bones) - set(depth_first_order)}')
+
+        parent_index = np.array([
+            bone_index[parents[bone]] if parents[bone] is not None else -1
+            for bone in bones
+        ])
+        parent_index.setflags(write=False)
+
+        return SkeletonTopology(
+            bones=bones,
+            bone_index=MappingProxyType(bone_index),
+            parents=MappingProxyType(dict(parents)),
+            children=MappingProxyType(children),
+            parent_index=parent_index,
+            depth_first_order=tuple(depth_first_order),
+        )
 
-            case MecanimBone.LeftFootAnkle:
-                # Return left ankle
-                return get_pose_bone_position(PoseLandmark.LEFT_ANKLE)
-            
-            case MecanimBone.LeftToes:
-                # Return left toe
-                return get_pose_bone_position(PoseLandmark.LEFT_FOOT_INDEX)
-            
-            case MecanimBone.RightUpperLeg:
-                # Return right hip
-                return get_pose_bone_position(PoseLandmark.RIGHT_HIP)
+MECANIM_TOPOLOGY: Final[SkeletonTopology] = SkeletonTopology.from_parents(_BONE_PARENTS, MecanimBone.root_bone())
+
+# Bones placed directly on a single MediaPipe pose landmark.
+_BONE_LANDMARKS: Final[Dict[MecanimBone, PoseLandmark]] = {
+    MecanimBone.LeftUpperArm: PoseLandmark.LEFT_SHOULDER,
+    MecanimBone.LeftLowerArm: PoseLandmark.LEFT_ELBOW,
+    MecanimBone.LeftHand: PoseLandmark.LEFT_WRIST,
+    MecanimBone.RightUpperArm: PoseLandmark.RIGHT_SHOULDER,
+    MecanimBone.RightLowerArm: PoseLandmark.RIGHT_ELBOW,
+    MecanimBone.RightHand: PoseLandmark.RIGHT_WRIST,
+    MecanimBone.LeftUpperLeg: PoseLandmark.LEFT_HIP,
+    MecanimBone.LeftLowerLeg: PoseLandmark.LEFT_KNEE,
+    MecanimBone.LeftFootAnkle: PoseLandmark.LEFT_ANKLE,
+    MecanimBone.LeftToes: PoseLandmark.LEFT_FOOT_INDEX,
+    MecanimBone.RightUpperLeg: PoseLandmark.RIGHT_HIP,
+    MecanimBone.RightLowerLeg: PoseLandmark.RIGHT_KNEE,
+    MecanimBone.RightFootAnkle: PoseLandmark.RIGHT_ANKLE,
+    MecanimBone.RightToes: PoseLandmark.RIGHT_FOOT_INDEX,
+    MecanimBone.LeftHandPinkyRoot: PoseLandmark.LEFT_PINKY,
+    MecanimBone.LeftHandIndexRoot: PoseLandmark.LEFT_INDEX,
+    MecanimBone.LeftHandThumbRoot: PoseLandmark.LEFT_THUMB,
+    MecanimBone.RightHandPinkyRoot: PoseLandmark.RIGHT_PINKY,
+    MecanimBone.RightHandIndexRoot: PoseLandmark.RIGHT_INDEX,
+    MecanimBone.RightHandThumbRoot: PoseLandmark.RIGHT_THUMB,
+    MecanimBone.LeftHeel: PoseLandmark.LEFT_HEEL,
+    MecanimBone.RightHeel: PoseLandmark.RIGHT_HEEL,
+    MecanimBone.LeftEye: PoseLandmark.LEFT_EYE,
+    MecanimBone.RightEye: PoseLandmark.RIGHT_EYE,
+    MecanimBone.Nose: PoseLandmark.NOSE,
+    MecanimBone.LeftEar: PoseLandmark.LEFT_EAR,
+    MecanimBone.RightEar: PoseLandmark.RIGHT_EAR,
+}
+
+def _bone_position_from_landmarks(
+    bone: MecanimBone,
+    get_pose_bone_position: Callable[[PoseLandmark], np.ndarray],
+) -> np.ndarray:
+    """
+    World position of `bone` given a landmark position lookup. Works the same whether the lookup
+    returns one frame (shape `(3,)`) or a whole clip (shape `(frames, 3)`).
+    """
+    landmark = _BONE_LANDMARKS.get(bone)
+    if landmark is not None:
+        return get_pose_bone_position(landmark)
+
+    match bone:
+        case MecanimBone.Hips:
+            # Return average of right and left hips
+            leftHip = get_pose_bone_position(PoseLandmark.LEFT_HIP)
+            rightHip = get_pose_bone_position(PoseLandmark.RIGHT_HIP)
+            return (leftHip + rightHip) / 2
+
+        case MecanimBone.Spine:
+            # Find centerpoint of shoulders and centerpoint of hip, then return the midpoint of those two
+            leftShoulder = get_pose_bone_position(PoseLandmark.LEFT_SHOULDER)
+            rightShoulder = get_pose_bone_position(PoseLandmark.RIGHT_SHOULDER)
+            leftHip = get_pose_bone_position(PoseLandmark.LEFT_HIP)
+            rightHip = get_pose_bone_position(PoseLandmark.RIGHT_HIP)
+            return (leftShoulder + rightShoulder + leftHip + rightHip) / 4
+
+        case MecanimBone.Chest | MecanimBone.ChestRightward:
+            # Find centerpoint of shoulders
+            leftShoulder = get_pose_bone_position(PoseLandmark.LEFT_SHOULDER)
+            rightShoulder = get_pose_bone_position(PoseLandmark.RIGHT_SHOULDER)
+            return (leftShoulder + rightShoulder) / 2
+
+        case MecanimBone.Head:
+            # Find centerpoint of ears
+            leftEar = get_pose_bone_position(PoseLandmark.LEFT_EAR)
+            rightEar = get_pose_bone_position(PoseLandmark.RIGHT_EAR)
+            earCtr = (leftEar + rightEar) / 2
+            # the ears seem to be consistently placed too far forward. We'll 
+            # adjust by moving 75% of the nose distance further back.
+            nose = get_pose_bone_position(PoseLandmark.NOSE)
+            nose_to_earctr = earCtr - nose
+            return earCtr + nose_to_earctr * 0.75
+
+        case _:
+            raise Exception(f'Unknown PoseBone {bone}')
+
+# Batched counterparts of the pytransform3d helpers used to build bone frames. Each works on
+# `(..., 3)` stacks of vectors and mirrors the single-vector version's edge cases.
+def _norm_vectors(v: np.ndarray) -> np.ndarray:
+    """`pr.norm_vector` for each row; zero vectors are returned unchanged."""
+    norm = np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.divide(v, norm, out=np.array(v, dtype=np.float64), where=norm != 0)
+
+def _vector_projections(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """`pr.vector_projection` of each row of `a` onto the matching row of `b`."""
+    b_norm_squared = np.einsum('...i,...i->...', b, b)[..., np.newaxis]
+    a_dot_b = np.einsum('...i,...i->...', a, b)[..., np.newaxis]
+    safe_b_norm_squared = np.where(b_norm_squared == 0.0, 1.0, b_norm_squared)
+    return np.where(b_norm_squared == 0.0, 0.0, a_dot_b * b / safe_b_norm_squared)
+
+def _matrices_from_two_vectors(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `pr.matrix_from_two_vectors` for each row. Returns the `(..., 3, 3)` rotations and a mask of
+    rows where the single-vector version would have raised (zero or parallel inputs).
+    """
+    c = np.cross(a, b)
+    valid = (
+        (np.linalg.norm(a, axis=-1) != 0)
+        & (np.linalg.norm(b, axis=-1) != 0)
+        & (np.linalg.norm(c, axis=-1) != 0)
+    )
+    a = _norm_vectors(a)
+    b = _norm_vectors(b - _vector_projections(b, a))
+    c = _norm_vectors(c)
+    return np.stack((a, b, c), axis=-1), valid
+
+def _matrices_from_two_vectors_xz(v1: np.ndarray, v2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Batched `matrix_from_two_vectors_xz`."""
+    return _matrices_from_two_vectors(v1, np.cross(v1, v2))
+
+def _row_norms(v: np.ndarray) -> np.ndarray:
+    """
+    `np.linalg.norm` of each row of a `(frames, 3)` array, computed one row at a time.
+    `np.linalg.norm(v, axis=-1)` sums the squares differently and can differ in the last bit, which
+    would change the .bvh OFFSET values derived from these lengths.
+    """
+    return np.fromiter((np.linalg.norm(row) for row in v), dtype=np.float64, count=len(v))
+
+def _are_rotation_matrices(R: np.ndarray, tolerance: float = 1e-6) -> np.ndarray:
+    """Batched version of the check `TransformManager.add_transform` applies (`pr.check_matrix`)."""
+    RRT = R @ np.swapaxes(R, -1, -2)
+    orthonormal = np.all(np.abs(RRT - np.eye(3)) <= tolerance + 1e-5 * np.eye(3), axis=(-2, -1))
+    return orthonormal & (np.linalg.det(np.where(np.isfinite(R), R, 0.0)) >= 0.0)
 
-            case MecanimBone.RightLowerLeg:
-                # Return right knee
-                return get_pose_bone_position(PoseLandmark.RIGHT_KNEE)
-            
-            case MecanimBone.RightFootAnkle:
-                # Return right ankle
-                return get_pose_bone_position(PoseLandmark.RIGHT_ANKLE)
-            
-            case MecanimBone.RightToes:
-                # Return right toe
-                return get_pose_bone_position(PoseLandmark.RIGHT_FOOT_INDEX)
-            
-            case MecanimBone.Head:
-                # Find centerpoint of ears
-                leftEar = get_pose_bone_position(PoseLandmark.LEFT_EAR)
-                rightEar = get_pose_bone_position(PoseLandmark.RIGHT_EAR)
-                earCtr = (leftEar + rightEar) / 2
-                # the ears seem to be consistently placed too far forward. We'll 
-                # adjust by moving 75% of the nose distance further back.
-                nose = get_pose_bone_position(PoseLandmark.NOSE)
-                nose_to_earctr = earCtr - nose
-                return earCtr + nose_to_earctr * 0.75
-
-            case MecanimBone.LeftHandPinkyRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_PINKY)
-            case MecanimBone.LeftHandIndexRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_INDEX)
-            case MecanimBone.LeftHandThumbRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_THUMB)
-            case MecanimBone.RightHandPinkyRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_PINKY)
-            case MecanimBone.RightHandIndexRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_INDEX)
-            case MecanimBone.RightHandThumbRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_THUMB)
-
-            case MecanimBone.LeftHeel:
-                return get_pose_bone_position(PoseLandmark.LEFT_HEEL)
-            case MecanimBone.RightHeel:
-                return get_pose_bone_position(PoseLandmark.RIGHT_HEEL)
-
-            case MecanimBone.LeftEye:
-                return get_pose_bone_position(PoseLandmark.LEFT_EYE)
-            case MecanimBone.RightEye:
-                return get_pose_bone_position(PoseLandmark.RIGHT_EYE)
-            case MecanimBone.Nose:
-                return get_pose_bone_position(PoseLandmark.NOSE)
-            case MecanimBone.LeftEar:
-                return get_pose_bone_position(PoseLandmark.LEFT_EAR)
-            case MecanimBone.RightEar:
-                return get_pose_bone_position(PoseLandmark.RIGHT_EAR)
-            
-            case MecanimBone.ChestRightward:
-                return MecanimBone.position_from_mp_pose(MecanimBone.Chest, poseRow)
-
-            case MecanimBone.LeftHandPinkyRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_PINKY)
-            case MecanimBone.LeftHandIndexRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_INDEX)
-            case MecanimBone.LeftHandThumbRoot:
-                return get_pose_bone_position(PoseLandmark.LEFT_THUMB)
-            case MecanimBone.RightHandPinkyRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_PINKY)
-            case MecanimBone.RightHandIndexRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_INDEX)
-            case MecanimBone.RightHandThumbRoot:
-                return get_pose_bone_position(PoseLandmark.RIGHT_THUMB)
-
-            case MecanimBone.LeftHeel:
-                return get_pose_bone_position(PoseLandmark.LEFT_HEEL)
-            case MecanimBone.RightHeel:
-                return get_pose_bone_position(PoseLandmark.RIGHT_HEEL)
-
-            case MecanimBone.LeftEye:
-                return get_pose_bone_position(PoseLandmark.LEFT_EYE)
-            case MecanimBone.RightEye:
-                return get_pose_bone_position(PoseLandmark.RIGHT_EYE)
-            case MecanimBone.Nose:
-                return get_pose_bone_position(PoseLandmark.NOSE)
-
-            case _:
-                raise Exception(f'Unknown PoseBone {bone}')
 @dataclass
 class HumanoidPositionSkeleton:
     bones: Dict[MecanimBone, np.ndarray] = field(default_factory=dict)
@@ -325,15 +326,17 @@ class HumanoidPositionSkeleton:
         return self.bones[MecanimBone.Hips]
 
     def world_position(self, bone: MecanimBone):
-        if bone.parent is None:
+        parent = bone.parent
+        if parent is None:
             return self.bones[bone]
         
-        return reduce(np.add, [self.bones[bone], self.world_position(bone.parent)])
+        return self.bones[bone] + self.world_position(parent)
 
     def bone_length_to_parent(self, bone: MecanimBone):
-        if bone.parent is None:
+        parent = bone.parent
+        if parent is None:
             return 0
-        return np.linalg.norm(self.world_position(bone) - self.world_position(bone.parent))
+        return np.linalg.norm(self.world_position(bone) - self.world_position(parent))
 
     def get_measurement(self, measurement: MecanimMeasurement):
         match measurement:
@@ -388,13 +391,12 @@ class HumanoidPositionSkeleton:
                     draw_line(child)
             draw_line(MecanimBone.Hips)
 
-        def make_position_relative(skel: HumanoidPositionSkeleton, bone: MecanimBone, relativeTo: np.ndarray):
-            ogPos = skel.bones[bone]
-            skel.bones[bone] = skel.bones[bone] - relativeTo
-            for child in bone.children:
-                make_position_relative(skel, child, ogPos)
-
-        make_position_relative(skeleton, MecanimBone.Hips, np.zeros(3))
+        # Make each bone relative to its parent's original (world) position.
+        world_bones = dict(skeleton.bones)
+        for bone in MECANIM_TOPOLOGY.depth_first_order:
+            parent = bone.parent
+            relative_to = world_bones[parent] if parent is not None else np.zeros(3)
+            skeleton.bones[bone] = world_bones[bone] - relative_to
 
         if enable_plotting:
             fig2 = plt.figure("Relative Visualization")
@@ -464,138 +466,17 @@ class HumanoidPositionSkeleton:
         )
 
     def get_transforms(self, plot=False) -> TransformManager:
-        tm = TransformManager()
-
-        # Getting a matrix from two vectors:
-        # https://dfki-ric.github.io/pytransform3d/_auto_examples/plots/plot_matrix_from_two_vectors.html#sphx-glr-auto-examples-plots-plot-matrix-from-two-vectors-py
-
-        # # Create transform for hips - pointing laterally, with y pointing up, located at hip root
-        hips_lateral = self.world_position(MecanimBone.LeftUpperLeg) - self.world_position(MecanimBone.RightUpperLeg)
-        hips_rot_matrix: np.ndarray = pr.matrix_from_two_vectors(hips_lateral, self.bones[MecanimBone.Spine])
-        hips_tf = pt.transform_from(hips_rot_matrix, self.world_position(MecanimBone.Hips))
-        tm.add_transform(MecanimBone.Hips.name, 'world', hips_tf)
-
-        shoulder_leftward = self.world_position(MecanimBone.LeftUpperArm) - self.world_position(MecanimBone.RightUpperArm)
-        chest_rot_matrix: np.ndarray = pr.matrix_from_two_vectors(shoulder_leftward, self.bones[MecanimBone.Spine])
-        chest_tf = pt.transform_from(chest_rot_matrix, self.world_position(MecanimBone.Chest))
-        tm.add_transform(MecanimBone.Chest.name, 'world', chest_tf)
-
-        shoulder_rightward = self.world_position(MecanimBone.RightUpperArm) - self.world_position(MecanimBone.LeftUpperArm)
-        chestreversed_rot_matrix: np.ndarray = pr.matrix_from_two_vectors(shoulder_rightward, self.bones[MecanimBone.Spine])
-        chestreversed_tf = pt.transform_from(chestreversed_rot_matrix, self.world_position(MecanimBone.Chest))
-        tm.add_transform(MecanimBone.ChestRightward.name, 'world', chestreversed_tf)
-
-        spine_leftward = 0.5 * (pr.norm_vector(hips_lateral) + pr.norm_vector(shoulder_leftward))
-        spine_rot_matrix = pr.matrix_from_two_vectors(spine_leftward, self.bones[MecanimBone.Spine])
-        spine_tf = pt.transform_from(spine_rot_matrix, self.world_position(MecanimBone.Spine))
-        tm.add_transform(MecanimBone.Spine.name, 'world', spine_tf)
-
-        # Create transform for head - pointing laterally from left eye to right eye, with y pointing up
-        head_leftward = self.world_position(MecanimBone.LeftEar) - self.world_position(MecanimBone.RightEar)
-        head_up = self.bones[MecanimBone.Head]
-        head_rot_matrix = pr.matrix_from_two_vectors(head_leftward, head_up)
-        head_tf = pt.transform_from(head_rot_matrix, self.world_position(MecanimBone.Head))
-        tm.add_transform(MecanimBone.Head.name, 'world', head_tf)
-
-        # Create transform for left shoulder - pointing to elbow, with twist axis pointing to wrist.
-        # left_elbow_bisection = self.bones[MecanimBone.LeftHand] - self.bones[MecanimBone.LeftLowerArm]
-        # left_elbow_bisection /= np.linalg.norm(left_elbow_bisection)
-        # left_shoulder_rot_matrix = matrix_from_two_vectors_xz(self.bones[MecanimBone.LeftLowerArm], left_elbow_bisection)
-        left_shoulder_rot_matrix = matrix_from_two_vectors_xz(self.bones[MecanimBone.LeftLowerArm], self.bones[MecanimBone.LeftHand])
-        left_shoulder_tf = pt.transform_from(left_shoulder_rot_matrix, self.world_position(MecanimBone.LeftUpperArm))
-        tm.add_transform(MecanimBone.LeftUpperArm.name, 'world', left_shoulder_tf)
-
-        # Create transform for right shoulder - pointing to elbow, with twist axis pointing to wrist.
-        right_shoulder_rot_matrix = matrix_from_two_vectors_xz(self.bones[MecanimBone.RightLowerArm], self.bones[MecanimBone.RightHand])
-        right_shoulder_tf = pt.transform_from(right_shoulder_rot_matrix, self.world_position(MecanimBone.RightUpperArm))
-        tm.add_transform(MecanimBone.RightUpperArm.name, 'world', right_shoulder_tf)
-
-        # Create tpose transform for left shoulder - use to reference the "Standard" rotation
-        # x: point to elbow in tpose (follow shoulder-line)
-        # y: twist-axis (forward)
-        # right_to_left_shoulder_vector = self.world_position(MecanimBone.LeftUpperArm) - self.world_position(MecanimBone.RightUpperArm)
-        # spine_up = self.bones[MecanimBone.Spine]
-        # forward = np.cross(right_to_left_shoulder_vector, spine_up)
-        # rot_matrix_shoulder_default = pr.matrix_from_two_vectors(right_to_left_shoulder_vector, forward)
-        # tpose_offset = np.array([0.0, 0.0, 0.1])
-        # shoulder_tpose_transform = pt.transform_from(rot_matrix_shoulder_default, self.world_position(MecanimBone.LeftUpperArm) + tpose_offset)
-        # tm.add_transform(MecanimBone.LeftUpperArm.name + '-tpose', 'world', shoulder_tpose_transform)
-
-        # Create transform for left elbow - pointing towards the hand, on the plane formed by the hand (for the twist axis).
-        left_hand_lateral = self.world_position(MecanimBone.LeftHandPinkyRoot) - self.world_position(MecanimBone.LeftHandThumbRoot)
-        left_elbow_rot_matrix = pr.matrix_from_two_vectors(
-            self.bones[MecanimBone.LeftHand], 
-            left_hand_lateral
+        bones = MECANIM_TOPOLOGY.bones
+        transforms = ClipTransforms.from_positions(
+            relative_positions=np.stack([self.bones[bone] for bone in bones])[np.newaxis],
+            world_positions=np.stack([self.world_position(bone) for bone in bones])[np.newaxis],
         )
-        left_elbow_tf = pt.transform_from(left_elbow_rot_matrix, self.world_position(MecanimBone.LeftLowerArm))
-        tm.add_transform(MecanimBone.LeftLowerArm.name, 'world', left_elbow_tf)
-
-        # Create transform for right elbow - pointing towards the hand, on the plane formed by the hand (for the twist axis).
-        right_hand_lateral = self.world_position(MecanimBone.RightHandPinkyRoot) - self.world_position(MecanimBone.RightHandThumbRoot)
-        right_elbow_rot_matrix = pr.matrix_from_two_vectors(
-            self.bones[MecanimBone.RightHand],
-            right_hand_lateral
-        )
-        right_elbow_tf = pt.transform_from(right_elbow_rot_matrix, self.world_position(MecanimBone.RightLowerArm))
-        tm.add_transform(MecanimBone.RightLowerArm.name, 'world', right_elbow_tf)
-
-        # Create transform for left wrist - pointing towards midpoint of index & pinky, with perpendicular twist axis.
-        left_hand_knuckle_midpoint = (self.bones[MecanimBone.LeftHandIndexRoot] + self.bones[MecanimBone.LeftHandPinkyRoot]) / 2
-        left_hand_lateral = self.bones[MecanimBone.LeftHandPinkyRoot] - self.bones[MecanimBone.LeftHandIndexRoot]
-        left_wrist_rot_matrix = pr.matrix_from_two_vectors(
-            left_hand_knuckle_midpoint,
-            left_hand_lateral,
-        )
-        left_wrist_tf = pt.transform_from(left_wrist_rot_matrix, self.world_position(MecanimBone.LeftHand))
-        tm.add_transform(MecanimBone.LeftHand.name, 'world', left_wrist_tf)
-
-        # Create transform for right wrist - pointing towards midpoint of index & pinky, with perpendicular twist axis.
-        right_hand_knuckle_midpoint = (self.bones[MecanimBone.RightHandIndexRoot] + self.bones[MecanimBone.RightHandPinkyRoot]) / 2
-        right_hand_lateral = self.bones[MecanimBone.RightHandPinkyRoot] - self.bones[MecanimBone.RightHandIndexRoot]
-        right_wrist_rot_matrix = pr.matrix_from_two_vectors(
-            left_hand_knuckle_midpoint,
-            left_hand_lateral,
-        )
-        right_wrist_tf = pt.transform_from(right_wrist_rot_matrix, self.world_position(MecanimBone.RightHand))
-        tm.add_transform(MecanimBone.RightHand.name, 'world', right_wrist_tf)
-
-        # Create transform for left thigh - pointing to knee, with twist axis pointing to ankle.
-        left_thigh_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.LeftLowerLeg], self.bones[MecanimBone.LeftFootAnkle])
-        left_thigh_tf = pt.transform_from(left_thigh_rot_matrix, self.world_position(MecanimBone.LeftUpperLeg))
-        tm.add_transform(MecanimBone.LeftUpperLeg.name, 'world', left_thigh_tf)
-
-        # Create transform for right thigh - pointing to knee, with twist axis in line with ankle.
-        right_thigh_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.RightLowerLeg], self.bones[MecanimBone.RightFootAnkle])
-        right_thigh_tf = pt.transform_from(right_thigh_rot_matrix, self.world_position(MecanimBone.RightUpperLeg))
-        tm.add_transform(MecanimBone.RightUpperLeg.name, 'world', right_thigh_tf)
-
-        # Create transform for left knee - pointing to ankle, twist towards toes
-        left_knee_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.LeftFootAnkle], self.bones[MecanimBone.LeftToes])
-        left_knee_tf = pt.transform_from(left_knee_rot_matrix, self.world_position(MecanimBone.LeftLowerLeg))
-        tm.add_transform(MecanimBone.LeftLowerLeg.name, 'world', left_knee_tf)
+        if not transforms.valid[0]:
+            raise ValueError('Cannot build bone frames for this skeleton: landmarks are missing or degenerate.')
 
-        # Create transform for right knee - pointing to ankle, twist towards toes
-        right_knee_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.RightFootAnkle], self.bones[MecanimBone.RightToes])
-        right_knee_tf = pt.transform_from(right_knee_rot_matrix, self.world_position(MecanimBone.RightLowerLeg))
-        tm.add_transform(MecanimBone.RightLowerLeg.name, 'world', right_knee_tf)
-
-        # Create transform for left ankle - pointing to toes, with y axis up from heel
-        left_heel_to_ankle = -self.bones[MecanimBone.LeftHeel]
-        left_foot_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.LeftToes], -left_heel_to_ankle)
-        left_foot_tf = pt.transform_from(left_foot_rot_matrix, self.world_position(MecanimBone.LeftFootAnkle))
-        tm.add_transform(MecanimBone.LeftFootAnkle.name, 'world', left_foot_tf)
-
-        # Create transform for right ankle - pointing to toes, with y axis up from heel
-        right_heel_to_ankle = -self.bones[MecanimBone.RightHeel]
-        right_foot_rot_matrix = pr.matrix_from_two_vectors(self.bones[MecanimBone.RightToes], -right_heel_to_ankle)
-        right_foot_tf = pt.transform_from(right_foot_rot_matrix, self.world_position(MecanimBone.RightFootAnkle))
-        tm.add_transform(MecanimBone.RightFootAnkle.name, 'world', right_foot_tf)
-
-
-
-        if plot:
-            ax = tm.plot_frames_in('world', s=0.1)
-            self.plt_skeleton(ax, color='#0f0f0f50', dotcolor="#f00ff050")
+        tm = TransformManager()
+        for frame_name, bone_to_world in zip(transforms.frame_names, transforms.bone_to_world[0]):
+            tm.add_transform(frame_name, 'world', bone_to_world)
 
         if plot:
             ax = tm.plot_frames_in('world', s=0.1)
@@ -657,6 +538,306 @@ class HumanoidPositionSkeleton:
         for child in bone.children:
             self.print_subtree(child, indent + 2, print_world_position)
 
+@dataclass
+class HumanoidPositionClip:
+    """
+    Bone positions for every frame of a clip, as `(frames, bones, 3)` arrays with the bone axis in
+    `MecanimBone` order. `relative_positions` matches `HumanoidPositionSkeleton.bones` (each bone
+    relative to its parent) and `world_positions` matches `HumanoidPositionSkeleton.world_position`.
+    """
+    index: pd.Index
+    relative_positions: np.ndarray
+    world_positions: np.ndarray
+
+    @staticmethod
+    def from_mp_pose_dataframe(holistic_data: pd.DataFrame) -> HumanoidPositionClip:
+        """Equivalent to `HumanoidPositionSkeleton.from_mp_pose` on every row, computed for all rows at once."""
+        landmarks = list(PoseLandmark)
+        landmark_columns = [f'{lm.name}_{axis}' for lm in landmarks for axis in 'xyz']
+        landmark_positions = holistic_data[landmark_columns].to_numpy(dtype=np.float64) \
+            .reshape(len(holistic_data), len(landmarks), 3)
+        landmark_index = {lm: i for i, lm in enumerate(landmarks)}
+
+        def get_pose_bone_position(lm: PoseLandmark) -> np.ndarray:
+            return landmark_positions[:, landmark_index[lm], :]
+
+        topology = MECANIM_TOPOLOGY
+        absolute_positions = np.stack(
+            [_bone_position_from_landmarks(bone, get_pose_bone_position) for bone in topology.bones],
+            axis=1,
+        )
+
+        # Rebase each bone onto its parent's absolute position (as `make_position_relative` does),
+        # then accumulate back down the tree in the same order `world_position` adds offsets.
+        relative_positions = absolute_positions.copy()
+        has_parent = topology.parent_index >= 0
+        relative_positions[:, has_parent] -= absolute_positions[:, topology.parent_index[has_parent]]
+
+        world_positions = np.empty_like(relative_positions)
+        for bone in topology.depth_first_order:
+            bone_i = topology.bone_index[bone]
+            parent_i = topology.parent_index[bone_i]
+            if parent_i < 0:
+                world_positions[:, bone_i] = relative_positions[:, bone_i]
+            else:
+                world_positions[:, bone_i] = relative_positions[:, bone_i] + world_positions[:, parent_i]
+
+        return HumanoidPositionClip(
+            index=holistic_data.index,
+            relative_positions=relative_positions,
+            world_positions=world_positions,
+        )
+
+    def __len__(self) -> int:
+        return self.relative_positions.shape[0]
+
+    def __iter__(self) -> Iterator[HumanoidPositionSkeleton]:
+        return (self.skeleton(i) for i in range(len(self)))
+
+    def skeleton(self, frame_i: int) -> HumanoidPositionSkeleton:
+        """Per-frame skeleton whose bone positions are views into this clip's arrays."""
+        frame_positions = self.relative_positions[frame_i]
+        return HumanoidPositionSkeleton(
+            bones={bone: frame_positions[i] for i, bone in enumerate(MECANIM_TOPOLOGY.bones)}
+        )
+
+    def world_position(self, bone: MecanimBone) -> np.ndarray:
+        return self.world_positions[:, MECANIM_TOPOLOGY.bone_index[bone]]
+
+    def get_transforms(self) -> ClipTransforms:
+        """`HumanoidPositionSkeleton.get_transforms` for every frame at once."""
+        return ClipTransforms.from_positions(self.relative_positions, self.world_positions)
+
+    def get_offsets_and_measurements(self) -> pd.DataFrame:
+        """`HumanoidPositionSkeleton.get_offsets_and_measurements` for every frame, one row per frame."""
+        world_positions = self.world_positions
+        offsets = {}
+        for bone_i, bone in enumerate(MECANIM_TOPOLOGY.bones):
+            parent_i = MECANIM_TOPOLOGY.parent_index[bone_i]
+            if parent_i < 0:
+                offsets[bone.name] = np.zeros(len(self))
+            else:
+                offsets[bone.name] = _row_norms(world_positions[:, bone_i] - world_positions[:, parent_i])
+
+        left_upper_arm = self.world_position(MecanimBone.LeftUpperArm)
+        right_upper_arm = self.world_position(MecanimBone.RightUpperArm)
+        for meas in MecanimMeasurement:
+            match meas:
+                case MecanimMeasurement.ShoulderWidth:
+                    offsets[meas.name] = _row_norms(left_upper_arm - right_upper_arm)
+                case MecanimMeasurement.SpineLength:
+                    arm_ctr = (left_upper_arm + right_upper_arm) / 2.0
+                    offsets[meas.name] = _row_norms(arm_ctr - self.world_position(MecanimBone.Spine))
+                case _:
+                    raise NotImplementedError(f'Unknown measurement {meas}')
+
+        return pd.DataFrame(offsets)
+
+@dataclass
+class ClipTransforms:
+    """
+    Bone frames for every frame of a clip, as computed by `HumanoidPositionSkeleton.get_transforms`.
+
+    `bone_to_world` is a `(frames, len(frame_names), 4, 4)` array of transforms from each bone frame to
+    'world'. `valid` marks the frames where `get_transforms` would have succeeded; the others hold
+    identity transforms. `get_transform` answers the same queries as `TransformManager.get_transform`
+    for the whole clip at once, with a direct lookup instead of a graph search.
+    """
+    frame_names: Tuple[str, ...]
+    bone_to_world: np.ndarray
+    valid: np.ndarray
+
+    def __post_init__(self):
+        self._frame_index = {name: i for i, name in enumerate(self.frame_names)}
+        self._world_to_bone: Optional[np.ndarray] = None
+
+    @staticmethod
+    def from_positions(relative_positions: np.ndarray, world_positions: np.ndarray) -> ClipTransforms:
+        """
+        Builds bone frames from `(frames, bones, 3)` positions with the bone axis in `MecanimBone`
+        order, i.e. `HumanoidPositionClip.relative_positions` and `.world_positions`.
+        """
+        bone_index = MECANIM_TOPOLOGY.bone_index
+
+        def rel(bone: MecanimBone) -> np.ndarray:
+            return relative_positions[:, bone_index[bone]]
+
+        def world(bone: MecanimBone) -> np.ndarray:
+            return world_positions[:, bone_index[bone]]
+
+        rotations: Dict[MecanimBone, np.ndarray] = {}
+        origins: Dict[MecanimBone, np.ndarray] = {}
+        valid = np.ones(relative_positions.shape[0], dtype=bool)
+
+        def add_frame(bone: MecanimBone, rotation_and_valid: Tuple[np.ndarray, np.ndarray], origin: np.ndarray):
+            nonlocal valid
+            rotation, rotation_valid = rotation_and_valid
+            rotations[bone] = rotation
+            origins[bone] = origin
+            valid &= rotation_valid & _are_rotation_matrices(rotation)
+
+        # Hips - pointing laterally, with y pointing up, located at hip root
+        hips_lateral = world(MecanimBone.LeftUpperLeg) - world(MecanimBone.RightUpperLeg)
+        add_frame(MecanimBone.Hips, _matrices_from_two_vectors(hips_lateral, rel(MecanimBone.Spine)), world(MecanimBone.Hips))
+
+        shoulder_leftward = world(MecanimBone.LeftUpperArm) - world(MecanimBone.RightUpperArm)
+        add_frame(MecanimBone.Chest, _matrices_from_two_vectors(shoulder_leftward, rel(MecanimBone.Spine)), world(MecanimBone.Chest))
+
+        shoulder_rightward = world(MecanimBone.RightUpperArm) - world(MecanimBone.LeftUpperArm)
+        add_frame(MecanimBone.ChestRightward, _matrices_from_two_vectors(shoulder_rightward, rel(MecanimBone.Spine)), world(MecanimBone.Chest))
+
+        spine_leftward = 0.5 * (_norm_vectors(hips_lateral) + _norm_vectors(shoulder_leftward))
+        add_frame(MecanimBone.Spine, _matrices_from_two_vectors(spine_leftward, rel(MecanimBone.Spine)), world(MecanimBone.Spine))
+
+        # Head - pointing laterally from left ear to right ear, with y pointing up
+        head_leftward = world(MecanimBone.LeftEar) - world(MecanimBone.RightEar)
+        add_frame(MecanimBone.Head, _matrices_from_two_vectors(head_leftward, rel(MecanimBone.Head)), world(MecanimBone.Head))
+
+        # Shoulders - pointing to elbow, with twist axis pointing to wrist.
+        add_frame(
+            MecanimBone.LeftUpperArm,
+            _matrices_from_two_vectors_xz(rel(MecanimBone.LeftLowerArm), rel(MecanimBone.LeftHand)),
+            world(MecanimBone.LeftUpperArm),
+        )
+        add_frame(
+            MecanimBone.RightUpperArm,
+            _matrices_from_two_vectors_xz(rel(MecanimBone.RightLowerArm), rel(MecanimBone.RightHand)),
+            world(MecanimBone.RightUpperArm),
+        )
+
+        # Elbows - pointing towards the hand, on the plane formed by the hand (for the twist axis).
+        left_hand_lateral = world(MecanimBone.LeftHandPinkyRoot) - world(MecanimBone.LeftHandThumbRoot)
+        add_frame(
+            MecanimBone.LeftLowerArm,
+            _matrices_from_two_vectors(rel(MecanimBone.LeftHand), left_hand_lateral),
+            world(MecanimBone.LeftLowerArm),
+        )
+        right_hand_lateral = world(MecanimBone.RightHandPinkyRoot) - world(MecanimBone.RightHandThumbRoot)
+        add_frame(
+            MecanimBone.RightLowerArm,
+            _matrices_from_two_vectors(rel(MecanimBone.RightHand), right_hand_lateral),
+            world(MecanimBone.RightLowerArm),
+        )
+
+        # Wrists - pointing towards midpoint of index & pinky, with perpendicular twist axis.
+        # Note: the right wrist has always been oriented from the *left* hand's knuckles; kept as-is
+        # so that existing outputs don't change.
+        left_hand_knuckle_midpoint = (rel(MecanimBone.LeftHandIndexRoot) + rel(MecanimBone.LeftHandPinkyRoot)) / 2
+        left_knuckle_lateral = rel(MecanimBone.LeftHandPinkyRoot) - rel(MecanimBone.LeftHandIndexRoot)
+        left_wrist_rotation = _matrices_from_two_vectors(left_hand_knuckle_midpoint, left_knuckle_lateral)
+        add_frame(MecanimBone.LeftHand, left_wrist_rotation, world(MecanimBone.LeftHand))
+        add_frame(MecanimBone.RightHand, left_wrist_rotation, world(MecanimBone.RightHand))
+
+        # Thighs - pointing to knee, with twist axis pointing to ankle.
+        add_frame(
+            MecanimBone.LeftUpperLeg,
+            _matrices_from_two_vectors(rel(MecanimBone.LeftLowerLeg), rel(MecanimBone.LeftFootAnkle)),
+            world(MecanimBone.LeftUpperLeg),
+        )
+        add_frame(
+            MecanimBone.RightUpperLeg,
+            _matrices_from_two_vectors(rel(MecanimBone.RightLowerLeg), rel(MecanimBone.RightFootAnkle)),
+            world(MecanimBone.RightUpperLeg),
+        )
+
+        # Knees - pointing to ankle, twist towards toes
+        add_frame(
+            MecanimBone.LeftLowerLeg,
+            _matrices_from_two_vectors(rel(MecanimBone.LeftFootAnkle), rel(MecanimBone.LeftToes)),
+            world(MecanimBone.LeftLowerLeg),
+        )
+        add_frame(
+            MecanimBone.RightLowerLeg,
+            _matrices_from_two_vectors(rel(MecanimBone.RightFootAnkle), rel(MecanimBone.RightToes)),
+            world(MecanimBone.RightLowerLeg),
+        )
+
+        # Ankles - pointing to toes, with y axis up from heel
+        add_frame(
+            MecanimBone.LeftFootAnkle,
+            _matrices_from_two_vectors(rel(MecanimBone.LeftToes), rel(MecanimBone.LeftHeel)),
+            world(MecanimBone.LeftFootAnkle),
+        )
+        add_frame(
+            MecanimBone.RightFootAnkle,
+            _matrices_from_two_vectors(rel(MecanimBone.RightToes), rel(MecanimBone.RightHeel)),
+            world(MecanimBone.RightFootAnkle),
+        )
+
+        frame_count = relative_positions.shape[0]
+        bone_to_world = np.zeros((frame_count, len(rotations), 4, 4))
+        bone_to_world[..., 3, 3] = 1.
+        for i, bone in enumerate(rotations):
+            bone_to_world[:, i, :3, :3] = rotations[bone]
+            bone_to_world[:, i, :3, 3] = origins[bone]
+        bone_to_world[~valid] = np.eye(4)
+
+        return ClipTransforms(
+            frame_names=tuple(bone.name for bone in rotations),
+            bone_to_world=bone_to_world,
+            valid=valid,
+        )
+
+    def __len__(self) -> int:
+        return self.bone_to_world.shape[0]
+
+    def _frame_to_world(self, frame_name: str) -> Optional[np.ndarray]:
+        if frame_name == 'world':
+            return None
+        if frame_name not in self._frame_index:
+            raise KeyError(f"Unknown frame '{frame_name}'")
+        return self.bone_to_world[:, self._frame_index[frame_name]]
+
+    def _world_to_frame(self, frame_name: str) -> Optional[np.ndarray]:
+        if frame_name == 'world':
+            return None
+        if frame_name not in self._frame_index:
+            raise KeyError(f"Unknown frame '{frame_name}'")
+        if self._world_to_bone is None:
+            self._world_to_bone = np.linalg.inv(self.bone_to_world)
+        return self._world_to_bone[:, self._frame_index[frame_name]]
+
+    def get_transform(self, from_frame: str, to_frame: str) -> np.ndarray:
+        """`(frames, 4, 4)` transforms from `from_frame` to `to_frame` (bone names or 'world')."""
+        from_to_world = self._frame_to_world(from_frame)
+        world_to_to = self._world_to_frame(to_frame)
+        if from_frame == to_frame:
+            return np.broadcast_to(np.eye(4), (len(self), 4, 4))
+        if world_to_to is None:
+            return from_to_world
+        if from_to_world is None:
+            return world_to_to
+        return world_to_to @ from_to_world
+
+    def frame(self, frame_i: int) -> Optional[FrameTransforms]:
+        """Per-frame lookup with the `get_transform` interface of `TransformManager`, or `None` for
+        frames where `get_transforms` would have failed."""
+        if not self.valid[frame_i]:
+            return None
+        return FrameTransforms(self, frame_i)
+
+    def __iter__(self) -> Iterator[Optional[FrameTransforms]]:
+        return (self.frame(i) for i in range(len(self)))
+
+
+@dataclass(frozen=True)
+class FrameTransforms:
+    """One frame of a `ClipTransforms`, usable wherever a per-frame `TransformManager` was."""
+    clip_transforms: ClipTransforms
+    frame_i: int
+
+    def get_transform(self, from_frame: str, to_frame: str) -> np.ndarray:
+        clip = self.clip_transforms
+        from_to_world = clip._frame_to_world(from_frame)
+        world_to_to = clip._world_to_frame(to_frame)
+        if from_frame == to_frame:
+            return np.eye(4)
+        if world_to_to is None:
+            return from_to_world[self.frame_i]
+        if from_to_world is None:
+            return world_to_to[self.frame_i]
+        return world_to_to[self.frame_i] @ from_to_world[self.frame_i]
+
 if __name__ == "__main__":
     import argparse
     from pathlib import Path
@@ -665,9 +846,8 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    holistic_data = None
-    with args.skeleton_file as worldpose_file:
-        holistic_data = pd.read_csv(worldpose_file, index_col='frame')
+    from .holistic_cache import read_holistic_data
+    holistic_data = read_holistic_data(args.skeleton_file, index_col='frame')
 
     frame_i = 0 # len(holistic_data) // 2
     middle_row = holistic_data.iloc[frame_i]
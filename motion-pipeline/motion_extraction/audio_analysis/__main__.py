@@ -13,6 +13,10 @@ if __name__ == '__main__':
     parser.add_argument('--database_csv_path', type=Path, default=None)
     parser.add_argument('--include_mem_usage', action='store_true', help='Whether to include memory usage in the output.', default=False)
     parser.add_argument('--skip_existing', action='store_true', help='Whether to skip existing analysis files.', default=False)
+    parser.add_argument('--feature_cache_dir', type=Path, help='The directory to cache onset and tempogram features in.', default=None)
+    parser.add_argument('--skip_plots', action='store_true', help='Whether to skip the tempo and cross-similarity plots.', default=False)
+    parser.add_argument('--audio_cache_format', choices=['wav', 'mp3'], help='Format to cache audio extracted from videos in.', default='wav')
+    parser.add_argument('--workers', type=int, help='Number of processes extracting and analyzing audio.', default=1)
     parser.add_argument('--artifact_archive_root', type=Path, default=None)
     parser.add_argument('--artifact_output_dir', type=Path, default=None)
     args = parser.parse_args()
@@ -26,6 +30,10 @@ if __name__ == '__main__':
         database_csv_path=args.database_csv_path,
         include_mem_usage=args.include_mem_usage,
         skip_existing=args.skip_existing,
+        write_plots=not args.skip_plots,
+        workers=args.workers,
+        feature_cache_dir=args.feature_cache_dir,
+        audio_cache_suffix=f'.{args.audio_cache_format}',
         artifact_archive_root=args.artifact_archive_root,
         artifact_output_dir=args.artifact_output_dir,
     )
@@ -4,8 +4,9 @@ import typing as t
 import numpy as np
 from pathlib import Path
 from .audio_tools import calculate_8beat_segments_with_midpoints, load_audio, MusicPhrase
-from .tempo_analysis import TempoInfo, calculate_tempo_info
+from .tempo_analysis import TempoInfo, TempoPlotData, analyze_tempo
 from .similarity_analysis import calculate_cross_similarity, compute_segment_groupings
+from .feature_cache import load_or_compute_audio_features
 
 @dc.dataclass
 class AudioAnalysisResult(dcj.DataClassJsonMixin):
@@ -20,6 +21,7 @@ def analyze_audio_file(
     filepath: Path,
     output_plot_folder: t.Optional[Path] = None,
     display_title: t.Optional[str] = None,
+    feature_cache_dir: t.Optional[Path] = None,
 ) -> AudioAnalysisResult:
     # Load the audio file
     audio_array, sample_rate = load_audio(filepath, as_mono=True)
@@ -29,6 +31,7 @@ def analyze_audio_file(
         audio_name=filepath.stem,
         display_title=display_title,
         output_plot_folder=output_plot_folder,
+        feature_cache_dir=feature_cache_dir,
     )
 
 def analyze_audio(
@@ -37,16 +40,29 @@ def analyze_audio(
     audio_name: t.Optional[str] = None,
     display_title: t.Optional[str] = None,
     output_plot_folder: t.Optional[Path] = None,
+    feature_cache_dir: t.Optional[Path] = None,
 ) -> AudioAnalysisResult:
-    
+    analysis_result, tempo_plot_data = analyze_audio_with_plot_data(audio_array, sample_rate, feature_cache_dir)
+    if output_plot_folder is not None:
+        tempo_plot_data.plot(
+            output_plot_folder / f'{audio_name}.tempo_analysis.pdf',
+            audio_name=display_title if display_title is not None else audio_name,
+        )
+    return analysis_result
+
+def analyze_audio_with_plot_data(
+    audio_array: np.ndarray,
+    sample_rate: int,
+    feature_cache_dir: t.Optional[Path] = None,
+) -> t.Tuple[AudioAnalysisResult, TempoPlotData]:
+    """
+    Analyzes the audio without plotting; the returned `TempoPlotData` can be plotted later.
+    Onset and tempogram features are read from (or saved to) `feature_cache_dir` when given.
+    """
+    features = load_or_compute_audio_features(audio_array, sample_rate, feature_cache_dir)
+
     # Calculate the tempo information.
-    tempo_plot_path = None if output_plot_folder is None else output_plot_folder / f'{audio_name}.tempo_analysis.pdf'
-    tempo_info: TempoInfo = calculate_tempo_info(
-        audio_array,
-        sample_rate,
-        audio_name=display_title if display_title is not None else audio_name,
-        figure_output_filepath=tempo_plot_path,
-    )
+    tempo_info, tempo_plot_data = analyze_tempo(audio_array, sample_rate, features=features)
 
     duration = len(audio_array) / sample_rate
 
@@ -58,10 +74,10 @@ def analyze_audio(
     ]
 
     # Compute similarity of 8-bar segments, then group them into larger components.
-    cross_similarity  = calculate_cross_similarity(audio_array, sample_rate, eight_beat_segments_noendpoints)
+    cross_similarity  = calculate_cross_similarity(audio_array, sample_rate, eight_beat_segments_noendpoints, features)
     segment_groupings = compute_segment_groupings(cross_similarity)
     
-    return AudioAnalysisResult(
+    analysis_result = AudioAnalysisResult(
         duration=duration,
         sample_rate=sample_rate,
         tempo_info=tempo_info,
@@ -69,3 +85,4 @@ def analyze_audio(
         phrase_groupings=segment_groupings,
         cross_similarity=cross_similarity.tolist()
     )
+    return analysis_result, tempo_plot_data
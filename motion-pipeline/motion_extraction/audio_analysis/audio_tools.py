@@ -4,7 +4,8 @@ import typing as t
 from pathlib import Path
 import dataclasses as dc
 import dataclasses_json as dcj
-from pydub import AudioSegment
+import os
+import subprocess
 from pydub.utils import mediainfo
 
 @dc.dataclass
@@ -102,24 +103,96 @@ def calculate_8beat_segments_with_midpoints(bpm: float, beat_offset: float, dura
 
     yield MusicPhrase(segment_start, mid_points, duration)
 
-def save_audio_from_video(video_path: Path, output_audio_path: Path, as_mono: bool = False):
+def _run_ffmpeg_tool(args: t.List[str]) -> bytes:
+    """Run ffmpeg or ffprobe (`args[0]`) and return its stdout, raising with its error output on failure."""
+    try:
+        process = subprocess.run(args, stdin=subprocess.DEVNULL, capture_output=True, check=False)
+    except FileNotFoundError:
+        raise RuntimeError(f"{args[0]} was not found. Install ffmpeg and make sure it is on the PATH.")
+    if process.returncode != 0:
+        raise Exception(f"{args[0]} failed on {args[-1]}: {process.stderr.decode(errors='replace').strip()}")
+    return process.stdout
+
+def probe_audio_stream(video_path: Path) -> t.Tuple[float, int]:
+    """
+    Read the sample rate and channel count of the first audio track of a video from its header.
+
+    Returns:
+    tuple: The sample rate and the number of channels.
+    """
+    output = _run_ffmpeg_tool([
+        'ffprobe', '-v', 'error', '-select_streams', 'a:0',
+        '-show_entries', 'stream=sample_rate,channels', '-of', 'csv=p=0',
+        str(video_path),
+    ]).decode().strip()
+    if not output:
+        raise Exception('No audio found in video file.')
+    sample_rate, channels = output.splitlines()[0].split(',')[:2]
+    return float(sample_rate), int(channels)
+
+def extract_audio_pcm(video_path: Path, sample_rate: t.Optional[float] = None, as_mono: bool = True) -> t.Tuple[np.ndarray, float]:
+    """
+    Decode the first audio track of a video straight to float32 samples with a single ffmpeg process.
+    ffmpeg downmixes (and resamples, if `sample_rate` is given) while decoding, so no intermediate
+    audio file is written and the samples are never re-encoded.
+
+    Parameters:
+    video_path (Path): The path to the video file.
+    sample_rate (float): The sample rate to decode at (default: the track's own sample rate).
+    as_mono (bool): Whether to downmix to mono (default: True). Otherwise the array is (samples, channels).
+
+    Returns:
+    tuple: A tuple containing the audio array and sampling rate.
+    """
+    channels = 1
+    if sample_rate is None or not as_mono:
+        native_sample_rate, native_channels = probe_audio_stream(video_path)
+        sample_rate = native_sample_rate if sample_rate is None else sample_rate
+        channels = 1 if as_mono else native_channels
+
+    output = _run_ffmpeg_tool([
+        'ffmpeg', '-nostdin', '-v', 'error', '-i', str(video_path),
+        '-map', '0:a:0', '-vn', '-ac', str(channels), '-ar', str(int(sample_rate)),
+        '-f', 'f32le', '-c:a', 'pcm_f32le', 'pipe:1',
+    ])
+    audio_array = np.frombuffer(output, dtype='<f4').astype(np.float32)
+    if len(audio_array) == 0:
+        raise Exception('No audio found in video file.')
+    if channels > 1:
+        audio_array = audio_array.reshape((-1, channels))
+    return audio_array, float(sample_rate)
+
+def save_audio_from_video(video_path: Path, output_audio_path: Path, as_mono: bool = False, sample_rate: t.Optional[float] = None):
     """
     Extract the audio track from a video file and save it as a separate audio file.
 
+    A single ffmpeg process reads the audio track and writes the output, encoded by its suffix. A
+    `.wav` output holds 32-bit float PCM, which `load_audio` reads back without decoding and without
+    the loss of a compressed format.
+
     Parameters:
     video_path (Path): The path to the video file.
     output_audio_path (Path): The path to save the audio file.
     as_mono (bool): Whether to convert the audio to mono (default: False).
+    sample_rate (float): The sample rate to save at (default: the track's own sample rate).
     """
     # Create the output directory if it doesn't exist
     output_audio_path.parent.mkdir(parents=True, exist_ok=True)
 
-    audio_segment = AudioSegment.from_file(video_path)
-
+    args = ['ffmpeg', '-nostdin', '-v', 'error', '-y', '-i', str(video_path), '-map', '0:a:0', '-vn']
     if as_mono:
-        audio_segment = audio_segment.set_channels(1)
-
-    audio_segment.export(output_audio_path, format=output_audio_path.suffix.lstrip('.'))
+        args += ['-ac', '1']
+    if sample_rate is not None:
+        args += ['-ar', str(int(sample_rate))]
+    if output_audio_path.suffix.lower() == '.wav':
+        args += ['-c:a', 'pcm_f32le']
+    # Write next to the output and move it into place, so an interrupted extraction never looks cached.
+    temp_path = output_audio_path.with_name(f"{output_audio_path.stem}.{os.getpid()}.tmp{output_audio_path.suffix}")
+    try:
+        _run_ffmpeg_tool(args + [str(temp_path)])
+        os.replace(temp_path, output_audio_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 def load_audio(path: Path, as_mono: bool = False) -> t.Tuple[np.ndarray, float]:
     """
@@ -134,23 +207,7 @@ def load_audio(path: Path, as_mono: bool = False) -> t.Tuple[np.ndarray, float]:
     # Check if the file is a video file
     audio_array, sample_rate = None, None # type: ignore
     if path.suffix in ('.mp4', '.avi', '.mov'):
-        audio_segment = AudioSegment.from_file(path)
-
-        if len(audio_segment) == 0:
-            raise Exception('No audio found in video file.')
-
-        if as_mono:
-            audio_segment = audio_segment.set_channels(1)
-
-        samples = np.array(audio_segment.get_array_of_samples())
-        if audio_segment.channels > 1:
-            samples = samples.reshape((-1, audio_segment.channels))
-            if as_mono:
-                samples = samples.mean(axis=1)
-
-        scale = float(1 << (8 * audio_segment.sample_width - 1))
-        audio_array = samples.astype(np.float32) / scale
-        sample_rate = float(audio_segment.frame_rate)
+        audio_array, sample_rate = extract_audio_pcm(path, as_mono=as_mono)
 
     # Otherwise, assume it's an audio file
     else:
@@ -0,0 +1,124 @@
+"""Whole-track audio features shared by tempo and similarity analysis.
+
+The onset strength envelope and the features derived from it are computed once per track: the
+predominant local pulse and time-averaged autocorrelation that tempo analysis and beat tracking
+start from, and the tempogram (the time-lag representation the cross-similarity matrix compares).
+Each 8-beat segment's time-lag representation is a slice of the tempogram's frames.
+
+With a cache directory, features are stored as `<key>.features.npz`, where the key hashes the
+decoded samples, the sample rate and the feature parameters. Reanalyzing the same audio (e.g. after
+changing grouping thresholds) then skips the spectral work entirely.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import dataclasses as dc
+import hashlib
+import os
+import typing as t
+import zipfile
+
+import librosa
+import numpy as np
+
+FEATURE_CACHE_SUFFIX = ".features.npz"
+HOP_LENGTH = 512
+# Autocorrelation window of `librosa.feature.tempo` (and so of `librosa.beat.beat_track`).
+TEMPO_AC_SIZE_SECS = 8.0
+
+_FEATURE_CACHE_VERSION = 1
+
+
+@dc.dataclass
+class AudioFeatures:
+    sample_rate: float
+    onset_env: np.ndarray
+    plp_pulse: np.ndarray
+    # Tempogram over TEMPO_AC_SIZE_SECS windows, averaged over time: (lags, 1). Pass as `tg` to
+    # `librosa.feature.tempo` to get the tempo `beat_track` would estimate.
+    tempo_autocorrelation: np.ndarray
+    # (lags, frames), as float32: the cache stores it that way, so fresh and cached results match.
+    tempogram: np.ndarray
+    hop_length: int = HOP_LENGTH
+
+    @classmethod
+    def compute(cls, audio_array: np.ndarray, sample_rate: float) -> AudioFeatures:
+        onset_env = librosa.onset.onset_strength(y=audio_array, sr=sample_rate, hop_length=HOP_LENGTH)
+        tempo_tempogram = librosa.feature.tempogram(
+            onset_envelope=onset_env,
+            sr=sample_rate,
+            hop_length=HOP_LENGTH,
+            win_length=librosa.time_to_frames(TEMPO_AC_SIZE_SECS, sr=sample_rate, hop_length=HOP_LENGTH).item(),
+        )
+        tempogram = librosa.feature.tempogram(onset_envelope=onset_env, sr=sample_rate, hop_length=HOP_LENGTH)
+        return cls(
+            sample_rate=sample_rate,
+            onset_env=onset_env,
+            plp_pulse=librosa.beat.plp(onset_envelope=onset_env, sr=sample_rate, hop_length=HOP_LENGTH),
+            tempo_autocorrelation=np.mean(tempo_tempogram, axis=-1, keepdims=True),
+            tempogram=tempogram.astype(np.float32),
+        )
+
+    def segment_frames(self, start_time: float, end_time: float) -> slice:
+        start_frame, end_frame = librosa.time_to_frames(
+            [start_time, end_time], sr=self.sample_rate, hop_length=self.hop_length
+        )
+        return slice(max(int(start_frame), 0), max(int(end_frame), 0))
+
+
+def audio_features_key(audio_array: np.ndarray, sample_rate: float) -> str:
+    digest = hashlib.sha256()
+    digest.update(
+        f"v{_FEATURE_CACHE_VERSION}:{librosa.__version__}:{float(sample_rate)!r}:{HOP_LENGTH}:{TEMPO_AC_SIZE_SECS}:".encode()
+    )
+    digest.update(np.ascontiguousarray(audio_array, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+def _load_features(path: Path, sample_rate: float) -> t.Optional[AudioFeatures]:
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            return AudioFeatures(
+                sample_rate=sample_rate,
+                onset_env=stored["onset_env"],
+                plp_pulse=stored["plp_pulse"],
+                tempo_autocorrelation=stored["tempo_autocorrelation"],
+                tempogram=stored["tempogram"],
+                hop_length=int(stored["hop_length"]),
+            )
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        # Truncated or foreign file: recompute.
+        return None
+
+
+def _store_features(path: Path, features: AudioFeatures):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("wb") as f:
+        np.savez(
+            f,
+            onset_env=features.onset_env,
+            plp_pulse=features.plp_pulse,
+            tempo_autocorrelation=features.tempo_autocorrelation,
+            tempogram=features.tempogram,
+            hop_length=np.array(features.hop_length),
+        )
+    os.replace(temp_path, path)
+
+
+def load_or_compute_audio_features(
+    audio_array: np.ndarray,
+    sample_rate: float,
+    cache_dir: t.Optional[Path] = None,
+) -> AudioFeatures:
+    if cache_dir is None:
+        return AudioFeatures.compute(audio_array, sample_rate)
+
+    cache_path = cache_dir / f"{audio_features_key(audio_array, sample_rate)}{FEATURE_CACHE_SUFFIX}"
+    if cache_path.exists():
+        features = _load_features(cache_path, sample_rate)
+        if features is not None:
+            return features
+    features = AudioFeatures.compute(audio_array, sample_rate)
+    _store_features(cache_path, features)
+    return features
@@ -1,4 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import dataclasses as dc
 import typing as t
 import time
 import json
@@ -18,14 +20,17 @@ from ..artifacts import (
     resolve_artifact_clip_title,
     resolve_artifact_output_dir,
 )
-from .audio_analysis import AudioAnalysisResult, analyze_audio_file
+from .audio_analysis import AudioAnalysisResult, analyze_audio_with_plot_data
 from .audio_dance_tree import  create_dance_tree_from_audioanalysis
-from .audio_tools import save_audio_from_video
+from .audio_tools import load_audio, save_audio_from_video
 from .similarity_analysis import plot_cross_similarity
+from .tempo_analysis import TempoPlotData
 
 ACCEPT_AUDIO_FILES = ['.mp3', '.wav', '.m4a', '.flac']
 ACCEPT_VIDEO_FILES = ['.mp4', '.mov', '.avi', '.mkv']
 ACCEPT_AUDIOVIDEO_FILES = ACCEPT_AUDIO_FILES + ACCEPT_VIDEO_FILES
+# Formats audio extracted from videos can be cached in: float PCM for analysis, MP3 for bundling.
+ACCEPT_AUDIO_CACHE_SUFFIXES = ['.wav', '.mp3']
 
 def find_cached_audiofile(video_filepath: Path, input_dir_root: Path, cache_dir_root: Path, allowed_suffixes = ['.mp3', '.wav']) -> t.Union[Path, None]:
     relative_path = video_filepath.relative_to(input_dir_root)
@@ -61,6 +66,69 @@ def get_audio_analysis_filepath(
 ):
     return analysis_dir / relative_stem.with_suffix('.json')
 
+@dc.dataclass
+class _AudioAnalysisJob:
+    audio_filepath: Path
+    tree_name: str
+    clip_relative_stem: str
+    analysis_output_filepath: Path
+    dance_tree_filepath: Path
+    feature_cache_dir: t.Optional[Path]
+    # Whether to return the tempo plot data, which is only sent back when plots will be drawn.
+    keep_plot_data: bool
+
+@dc.dataclass
+class _AudioPlotJob:
+    display_title: str
+    tempo_plot_data: t.Optional[TempoPlotData]
+    tempo_plot_path: Path
+    cross_similarity: t.List[t.List[float]]
+    cross_similarity_figpath: Path
+
+def _map_in_processes(function: t.Callable[[t.Any], t.Any], jobs: t.Sequence[t.Any], workers: int) -> t.Iterator[t.Any]:
+    """Yields `function(job)` for each job, in order. Jobs run in a process pool when `workers` > 1."""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield function(job)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        futures = [executor.submit(function, job) for job in jobs]
+        for future in futures:
+            yield future.result()
+
+def _extract_audio(paths: t.Tuple[Path, Path]) -> Path:
+    video_filepath, cached_audio_filepath = paths
+    save_audio_from_video(video_filepath, cached_audio_filepath, as_mono=True)
+    return cached_audio_filepath
+
+def _save_dance_tree(tree_name: str, clip_relative_stem: str, analysis_result: AudioAnalysisResult, dance_tree_filepath: Path):
+    dance_tree = create_dance_tree_from_audioanalysis(
+        tree_name=tree_name,
+        clip_relativepath=clip_relative_stem,
+        analysis=analysis_result
+    )
+    dance_tree_filepath.parent.mkdir(parents=True, exist_ok=True)
+    dance_tree_filepath.write_text(json.dumps(dance_tree.to_dict(), indent=4))
+
+def _analyze_audio_job(job: _AudioAnalysisJob) -> t.Tuple[AudioAnalysisResult, t.Optional[TempoPlotData]]:
+    """Analyzes one input and saves its analysis JSON and dance tree. Plotting is left to the caller."""
+    audio_array, sample_rate = load_audio(job.audio_filepath, as_mono=True)
+    analysis_result, tempo_plot_data = analyze_audio_with_plot_data(audio_array, sample_rate, job.feature_cache_dir)
+    job.analysis_output_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(job.analysis_output_filepath, 'w') as f:
+        json.dump(analysis_result.to_dict(), f, indent=4)
+    _save_dance_tree(job.tree_name, job.clip_relative_stem, analysis_result, job.dance_tree_filepath)
+    return analysis_result, tempo_plot_data if job.keep_plot_data else None
+
+def _plot_audio_analysis(job: _AudioPlotJob):
+    if job.tempo_plot_data is not None:
+        job.tempo_plot_data.plot(job.tempo_plot_path, audio_name=job.display_title)
+    fig, ax = plot_cross_similarity(job.cross_similarity)
+    ax.set_title(job.display_title)
+    job.cross_similarity_figpath.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(job.cross_similarity_figpath)
+    plt.close(fig)
+
 def perform_audio_analysis(
         videosrcdir: t.Optional[Path],
         audiosrcdir: t.Optional[Path],
@@ -70,10 +138,36 @@ def perform_audio_analysis(
         database_csv_path: t.Optional[Path] = None,
         include_mem_usage: bool = False,
         skip_existing: bool = False,
+        reanalyze_clips: t.Optional[t.Collection[str]] = None,
+        write_plots: bool = True,
+        workers: int = 1,
+        feature_cache_dir: t.Optional[Path] = None,
+        audio_cache_suffix: str = '.wav',
         print_prefix: t.Callable[[], str] = lambda: '',
         artifact_archive_root: t.Optional[Path] = None,
         artifact_output_dir: t.Optional[Path] = None,
 ):
+    """
+    Analyze the audio of every input and write analysis JSON, cross-similarity plots, dance trees and
+    a summary CSV under `audio_analysis_destdir`.
+
+    With `skip_existing`, inputs whose analysis JSON already exists reuse it. `reanalyze_clips`, when
+    given, makes that choice per input instead: inputs whose relative stem (path relative to its
+    source dir, without suffix) is listed are re-extracted and reanalyzed, all others are reused.
+
+    With `workers` > 1, audio extraction, analysis and plotting each run in a process pool. Plots
+    (tempo analysis and cross-similarity PDFs) are made after every analysis, dance tree and the
+    summary CSV have been saved, and are skipped entirely without `write_plots`. Summary rows are
+    sorted by relative stem, whatever order the inputs were found or finished in.
+
+    With `feature_cache_dir`, each track's onset envelope and tempogram are kept there (keyed by the
+    decoded audio), so reanalyzing unchanged audio skips the spectral work.
+
+    Audio from videos is extracted by one ffmpeg process per video into `audiocachedir`, in the
+    format of `audio_cache_suffix`: `.wav` (mono float PCM, read back without decoding) or `.mp3`
+    (for when the cached audio is also shipped, e.g. in a bundle). A `.wav` cache also reuses audio
+    already cached as `.mp3` (the only format before `.wav`), rather than extracting it again.
+    """
     def print_with_prefix(s: str="", **kwargs):
         print(f"{print_prefix()}{s}", **kwargs)
 
@@ -89,19 +183,28 @@ def perform_audio_analysis(
     if artifact_similarity_dir is not None:
         artifact_similarity_dir.mkdir(parents=True, exist_ok=True)
 
+    if audio_cache_suffix not in ACCEPT_AUDIO_CACHE_SUFFIXES:
+        raise ValueError(f"audio_cache_suffix must be one of {ACCEPT_AUDIO_CACHE_SUFFIXES}, got {audio_cache_suffix!r}")
+
+    reusable_cache_suffixes = ACCEPT_AUDIO_CACHE_SUFFIXES if audio_cache_suffix == '.wav' else [audio_cache_suffix]
+
     print_with_prefix(f"Running audio analysis...")
-    force_redo_analysis = not skip_existing
+    reanalyze_clips = set(reanalyze_clips) if reanalyze_clips is not None else None
+
+    def should_reuse_existing(relative_filepath: Path) -> bool:
+        if reanalyze_clips is None:
+            return skip_existing
+        return relative_filepath.with_suffix("").as_posix() not in reanalyze_clips
 
     # Get the paths of the audio or video files (search recursively)
     input_video_filepaths = []
-    input_video_cached_audio_filepaths = []
     input_audio_filepaths = []
     if videosrcdir:
-        for filepath in videosrcdir.rglob('*'):
+        for filepath in sorted(videosrcdir.rglob('*')):
             if filepath.suffix.lower() in ACCEPT_VIDEO_FILES:
                 input_video_filepaths.append(filepath)
     if audiosrcdir:
-        for filepath in audiosrcdir.rglob('*'):
+        for filepath in sorted(audiosrcdir.rglob('*')):
             if filepath.suffix.lower() in ACCEPT_AUDIO_FILES:
                 input_audio_filepaths.append(filepath)
 
@@ -112,42 +215,35 @@ def perform_audio_analysis(
         mem_usage_str = f'\t{get_memory_usage()}\t' if include_mem_usage else ' '
         print_with_prefix(f"{time.time() - start_time:.2f}s:{mem_usage_str}{s}", **kwargs)
 
-    analysis_summary = []
-
     # Find or cache audio from each video file
+    input_video_cached_audio_filepaths = []
     if videosrcdir:
         print_with_time('Caching audio from video files...')
-        for i, filepath in enumerate(input_video_filepaths):
+        extraction_jobs = []
+        for filepath in input_video_filepaths:
             relative_filepath = filepath.relative_to(videosrcdir)
-            # print_with_time(f"Extracting cached audio {i+1}/{len(input_video_filepaths)}: {relative_filepath}")
-            # print_with_time(f"\t{i+1}/{len(input_video_filepaths)} ", end='')
 
             # Check if the audio file has already been cached
-            cached_audio_filepath = find_cached_audiofile(filepath, videosrcdir, audiocachedir)
-            if cached_audio_filepath is None:
-                print_with_time(f"\t{i+1}/{len(input_video_filepaths)} Extracting audio from video --> ", end='')
-                # Extract the audio from the video file
-                cached_audio_filepath = audiocachedir / filepath.relative_to(videosrcdir).with_suffix('.mp3')
-                save_audio_from_video(filepath, cached_audio_filepath, as_mono=True)
-                print(f'{cached_audio_filepath.relative_to(audiocachedir)})')
-
+            cached_audio_filepath = find_cached_audiofile(filepath, videosrcdir, audiocachedir, allowed_suffixes=reusable_cache_suffixes)
+            if cached_audio_filepath is None or not should_reuse_existing(relative_filepath):
+                cached_audio_filepath = audiocachedir / relative_filepath.with_suffix(audio_cache_suffix)
+                extraction_jobs.append((filepath, cached_audio_filepath))
             input_video_cached_audio_filepaths.append(cached_audio_filepath)
 
+        for i, cached_audio_filepath in enumerate(_map_in_processes(_extract_audio, extraction_jobs, workers)):
+            print_with_time(f"\t{i+1}/{len(extraction_jobs)} Extracted audio from video --> {cached_audio_filepath.relative_to(audiocachedir)}")
+
     all_input_filepaths = input_audio_filepaths + input_video_filepaths
     all_input_audiopaths = input_audio_filepaths + input_video_cached_audio_filepaths
     input_types: t.List[t.Literal["audio", "video"]] = ["audio"] * len(input_audio_filepaths) + ["video"] * len(input_video_filepaths) # type: ignore
     src_dirs = [audiosrcdir] * len(input_audio_filepaths) + [videosrcdir] * len(input_video_filepaths)
 
     print_with_time('Analyzing audio...')
+    analysis_results: t.List[t.Optional[AudioAnalysisResult]] = [None] * len(all_input_filepaths)
+    analysis_jobs: t.Dict[int, _AudioAnalysisJob] = {}
+    reanalyzed_indices: t.Set[int] = set()
     for i, (filepath, audio_filepath, input_type, src_dir) in enumerate(zip(all_input_filepaths, all_input_audiopaths, input_types, src_dirs)):
-
         relative_filepath = filepath.relative_to(src_dir)
-        clip_relative_stem = relative_filepath.with_suffix("").as_posix()
-        figure_display_title = resolve_artifact_clip_title(
-            clip_relative_stem,
-            database_csv_path=database_csv_path,
-            fallback_title=filepath.stem,
-        )
 
         # Save the analysis information (with same relative path as input file)
         analysis_destdir = get_audio_result_subdirectory(
@@ -156,81 +252,56 @@ def perform_audio_analysis(
             result_type='analysis'
         )
         analysis_output_filepath: Path = get_audio_analysis_filepath(analysis_dir=analysis_destdir, relative_stem=relative_filepath)
-        analysis_destdir / relative_filepath.with_suffix('.json')
-        plots_folder: Path = analysis_destdir / 'plots'
-        
-        analysis_result = None
-        should_reanalyze_audio = True
-        if skip_existing and analysis_output_filepath.exists():
+        dance_tree_dir = get_audio_result_subdirectory(
+            results_dir=audio_analysis_destdir, 
+            input_type=input_type, 
+            result_type='dancetrees'
+        )
+        dance_tree_filepath: Path = dance_tree_dir / relative_filepath.with_suffix('.dancetree.json')
+
+        if should_reuse_existing(relative_filepath) and analysis_output_filepath.exists():
             print_with_time(f"    {i+1}/{len(all_input_filepaths)} [{input_type} src] Exists: {analysis_output_filepath.relative_to(audio_analysis_destdir)}")
             # Try-catch is necessary because sometimes we update the format of the AudioAnalysisResult,
             # and the json files can be out of date, causing the AudioAnalysisResult.from_dict() to fail.
             # In this case, we'll reanalyze the audio.
             try:
                 preexisting_analysis_filetext = analysis_output_filepath.read_text()
-                analysis_result = AudioAnalysisResult.from_dict(json.loads(preexisting_analysis_filetext))
-                should_reanalyze_audio = False
+                analysis_results[i] = AudioAnalysisResult.from_dict(json.loads(preexisting_analysis_filetext))
             except Exception as e:
                 print_with_time(f"    {i+1}/{len(all_input_filepaths)} [{input_type} src] Error loading: {analysis_output_filepath.relative_to(audio_analysis_destdir)}: {e}. ")
-                
-        if should_reanalyze_audio:
-            is_reanalyzing = analysis_output_filepath.exists()
-            print_verb = "Re-Analyzing" if is_reanalyzing else "Analyzing   "
-            print_with_time(f"    {i+1}/{len(all_input_filepaths)} [{input_type} src] {print_verb}: {relative_filepath}")
-            analysis_result = analyze_audio_file(
-                audio_filepath,
-                output_plot_folder=plots_folder,
-                display_title=figure_display_title,
+
+        if analysis_results[i] is None:
+            if analysis_output_filepath.exists():
+                reanalyzed_indices.add(i)
+            analysis_jobs[i] = _AudioAnalysisJob(
+                audio_filepath=audio_filepath,
+                tree_name=filepath.stem + " audio tree",
+                clip_relative_stem=relative_filepath.with_suffix("").as_posix(),
+                analysis_output_filepath=analysis_output_filepath,
+                dance_tree_filepath=dance_tree_filepath,
+                feature_cache_dir=feature_cache_dir,
+                keep_plot_data=write_plots,
             )
-            analysis_output_filepath.parent.mkdir(parents=True, exist_ok=True)
-            with open(analysis_output_filepath, 'w') as f:
-                json.dump(analysis_result.to_dict(), f, indent=4)
-
-        if artifact_plots_dir is not None:
-            tempo_plot_path = plots_folder / f"{audio_filepath.stem}.tempo_analysis.pdf"
-            if tempo_plot_path.exists():
-                artifact_plot_path = artifact_plots_dir / relative_filepath.with_suffix(".tempo_analysis.pdf")
-                artifact_plot_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(tempo_plot_path, artifact_plot_path)
-            
-        # Plot cross similarity matrix (if it doesn't already exist)
-        similarity_dir = get_audio_result_subdirectory(
-            results_dir=audio_analysis_destdir, 
-            input_type=input_type, 
-            result_type='segmentsimilarity'
-        )
-        cross_similarity_figpath = similarity_dir / relative_filepath.with_suffix('.pdf')
-        if force_redo_analysis or not cross_similarity_figpath.exists():
-            fig, ax = plot_cross_similarity(analysis_result.cross_similarity)
-            ax.set_title(figure_display_title)
-            cross_similarity_figpath.parent.mkdir(parents=True, exist_ok=True)
-            fig.savefig(cross_similarity_figpath)
-            plt.close(fig)
-        if artifact_similarity_dir is not None and cross_similarity_figpath.exists():
-            artifact_similarity_path = artifact_similarity_dir / relative_filepath.with_suffix(".pdf")
-            artifact_similarity_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(cross_similarity_figpath, artifact_similarity_path)
+        elif not dance_tree_filepath.exists():
+            _save_dance_tree(filepath.stem + " audio tree", relative_filepath.with_suffix("").as_posix(), analysis_results[i], dance_tree_filepath)
 
-        # Create / save dance tree files
-        dance_tree_dir = get_audio_result_subdirectory(
-            results_dir=audio_analysis_destdir, 
-            input_type=input_type, 
-            result_type='dancetrees'
+    tempo_plot_data: t.Dict[int, TempoPlotData] = {}
+    for completed_count, (i, (analysis_result, plot_data)) in enumerate(zip(
+        analysis_jobs,
+        _map_in_processes(_analyze_audio_job, list(analysis_jobs.values()), workers),
+    )):
+        analysis_results[i] = analysis_result
+        if plot_data is not None:
+            tempo_plot_data[i] = plot_data
+        print_verb = "Re-Analyzed" if i in reanalyzed_indices else "Analyzed   "
+        print_with_time(
+            f"    {completed_count+1}/{len(analysis_jobs)} [{input_types[i]} src] {print_verb}: "
+            f"{all_input_filepaths[i].relative_to(src_dirs[i])}"
         )
 
-        clip_relativepath = clip_relative_stem
-        dance_tree_filepath: Path = dance_tree_dir / relative_filepath.with_suffix('.dancetree.json')
-        if force_redo_analysis or not dance_tree_filepath.exists():
-            dance_tree = create_dance_tree_from_audioanalysis(
-                tree_name=filepath.stem + " audio tree",
-                clip_relativepath=clip_relativepath,
-                analysis=analysis_result
-            )
-            dance_tree_filepath.parent.mkdir(parents=True, exist_ok=True)
-            dance_tree_filepath.write_text(json.dumps(dance_tree.to_dict(), indent=4))
-            
-        # Append summary data (for the CSV file)
-        analysis_summary.append(pd.Series({
+    # Save the analysis summary
+    analysis_summary = [
+        pd.Series({
             'bpm': analysis_result.tempo_info.bpm,
             'raw_bpm': analysis_result.tempo_info.raw_bpm,
             'plp_bpm': analysis_result.tempo_info.plp_bpm,
@@ -238,15 +309,61 @@ def perform_audio_analysis(
             'beat_offset': analysis_result.tempo_info.beat_offset,
             'first_actual_beat': analysis_result.tempo_info.starting_beat_timestamp,
             'type': input_type,
-        }, name=clip_relativepath)) # type: ignore
-
-    # Save the analysis summary
+        }, name=filepath.relative_to(src_dir).with_suffix("").as_posix()) # type: ignore
+        for filepath, analysis_result, input_type, src_dir in zip(all_input_filepaths, analysis_results, input_types, src_dirs)
+    ]
     analysis_summary_out.parent.mkdir(parents=True, exist_ok=True)
     summary_df = pd.concat(analysis_summary, axis=1).T
     summary_df.index.name = 'filename'
-    summary_df.sort_index(inplace=True)
+    # Stable, so audio and video inputs with the same stem keep their (audio first) order.
+    summary_df.sort_index(inplace=True, kind='stable')
     summary_df.to_csv(str(analysis_summary_out))
 
+    # Plots come last, so the analysis outputs above don't wait on them.
+    plot_jobs = []
+    clip_plot_paths = []
+    for i, (filepath, audio_filepath, input_type, src_dir) in enumerate(zip(all_input_filepaths, all_input_audiopaths, input_types, src_dirs)):
+        relative_filepath = filepath.relative_to(src_dir)
+        plots_folder = get_audio_result_subdirectory(audio_analysis_destdir, input_type=input_type, result_type='analysis') / 'plots'
+        tempo_plot_path = plots_folder / f"{audio_filepath.stem}.tempo_analysis.pdf"
+        similarity_dir = get_audio_result_subdirectory(
+            results_dir=audio_analysis_destdir, 
+            input_type=input_type, 
+            result_type='segmentsimilarity'
+        )
+        cross_similarity_figpath = similarity_dir / relative_filepath.with_suffix('.pdf')
+        clip_plot_paths.append((relative_filepath, tempo_plot_path, cross_similarity_figpath))
+        if not write_plots:
+            continue
+
+        # Plot cross similarity matrix (if it doesn't already exist)
+        if i in analysis_jobs or not cross_similarity_figpath.exists():
+            plot_jobs.append(_AudioPlotJob(
+                display_title=resolve_artifact_clip_title(
+                    relative_filepath.with_suffix("").as_posix(),
+                    database_csv_path=database_csv_path,
+                    fallback_title=filepath.stem,
+                ),
+                tempo_plot_data=tempo_plot_data.get(i),
+                tempo_plot_path=tempo_plot_path,
+                cross_similarity=analysis_results[i].cross_similarity,
+                cross_similarity_figpath=cross_similarity_figpath,
+            ))
+    if plot_jobs:
+        print_with_time(f'Plotting {len(plot_jobs)} analyses...')
+        for _ in _map_in_processes(_plot_audio_analysis, plot_jobs, workers):
+            pass
+
+    for relative_filepath, tempo_plot_path, cross_similarity_figpath in clip_plot_paths:
+        if artifact_plots_dir is not None and tempo_plot_path.exists():
+            artifact_plot_path = artifact_plots_dir / relative_filepath.with_suffix(".tempo_analysis.pdf")
+            artifact_plot_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(tempo_plot_path, artifact_plot_path)
+        if artifact_similarity_dir is not None and cross_similarity_figpath.exists():
+            artifact_similarity_path = artifact_similarity_dir / relative_filepath.with_suffix(".pdf")
+            artifact_similarity_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(cross_similarity_figpath, artifact_similarity_path)
+
     if artifact_dir is not None:
         artifact_summary_path = artifact_dir / "analysis_summary.csv"
         shutil.copy2(analysis_summary_out, artifact_summary_path)
@@ -264,12 +381,16 @@ def perform_audio_analysis(
                 f"Video source dir: `{videosrcdir}`" if videosrcdir else "Video source dir: none",
                 f"Audio source dir: `{audiosrcdir}`" if audiosrcdir else "Audio source dir: none",
                 f"Analysis output dir: `{audio_analysis_destdir}`",
-                f"Audio cache dir: `{audiocachedir}`",
+                f"Audio cache dir: `{audiocachedir}` (`{audio_cache_suffix}`)",
+                f"Feature cache dir: `{feature_cache_dir}`" if feature_cache_dir else "Feature cache dir: none",
                 f"Summary CSV: `{analysis_summary_out}`",
                 f"Copied artifact summary: `{artifact_summary_path.name}`",
                 f"Input video count: `{len(input_video_filepaths)}`",
                 f"Input audio count: `{len(input_audio_filepaths)}`",
                 f"Skip existing: `{skip_existing}`",
+                f"Workers: `{workers}`",
+                f"Plots written: `{write_plots}`",
+                f"Clips marked for reanalysis: `{len(reanalyze_clips)}`" if reanalyze_clips is not None else "Clips marked for reanalysis: not set",
             ]
         )
         report.add_heading("Analysis Summary")
@@ -3,7 +3,68 @@ import numpy as np
 import typing as t
 import matplotlib.pyplot as plt
 
-def calculate_cross_similarity(y: np.ndarray, sr: float, segment_times: t.List[t.Tuple[float, float]]) -> np.ndarray:
+from .feature_cache import AudioFeatures
+
+def segment_gram_matrix(features: AudioFeatures, segment_times: t.List[t.Tuple[float, float]]) -> np.ndarray:
+    """
+    Dot products between the time-lag representations of the segments (their slices of the whole
+    track's tempogram), as if each were zero-padded to the longest segment and flattened.
+
+    The padded representations are never built: for each frame offset into the segments, the frame
+    at that offset of every segment is gathered into one preallocated (segments, lags) matrix, and
+    its products with itself are accumulated. Memory stays at a few (segments, lags) and (segments,
+    segments) matrices, however long the track.
+    """
+    segment_slices = [features.segment_frames(start_time, end_time) for start_time, end_time in segment_times]
+    n_lags, n_frames = features.tempogram.shape
+    segment_starts = np.array([frames.indices(n_frames)[0] for frames in segment_slices], dtype=int)
+    segment_lengths = np.array([len(range(*frames.indices(n_frames))) for frames in segment_slices], dtype=int)
+
+    gram = np.zeros((len(segment_slices), len(segment_slices)))
+    frames_at_offset = np.zeros((len(segment_slices), n_lags))
+    for offset in range(segment_lengths.max(initial=0)):
+        # Segments shorter than the offset contribute their zero padding.
+        frames_at_offset[segment_lengths <= offset] = 0.0
+        has_frame = segment_lengths > offset
+        frames_at_offset[has_frame] = features.tempogram[:, segment_starts[has_frame] + offset].T
+        gram += frames_at_offset @ frames_at_offset.T
+    return gram
+
+def segment_affinity(gram: np.ndarray) -> np.ndarray:
+    """
+    Affinity between every pair of segments, from the dot products between their representations:
+    exp(-distance / bandwidth), where distance is euclidean and the bandwidth is the median over
+    segments of the distance to the segment's k-th nearest neighbor, k = 2 * ceil(sqrt(segments)).
+    This is what `librosa.segment.cross_similarity` computes in 'affinity' mode with `full=True`,
+    without its neighbor search.
+
+    As in librosa, pairs at distance zero (identical segments) are not linked: their affinity is 0.
+    Unlike librosa, a segment is never its own neighbor, and a matrix without links is not an error.
+    """
+    n_segments = len(gram)
+    squared_norms = np.diag(gram)
+    distances = np.sqrt(np.maximum(squared_norms[:, np.newaxis] + squared_norms[np.newaxis, :] - 2 * gram, 0))
+    np.fill_diagonal(distances, 0)
+    links = distances > 0
+    link_counts = links.sum(axis=1)
+    if not link_counts.any():
+        return np.zeros_like(distances)
+
+    # Distance to each segment's k-th nearest linked segment (or its farthest, if it has fewer links).
+    bandwidth_k = int(min(n_segments, 2 * np.ceil(np.sqrt(n_segments))))
+    sorted_link_distances = np.sort(np.where(links, distances, np.inf), axis=1)
+    has_links = link_counts > 0
+    distances_to_k = sorted_link_distances[has_links, np.minimum(link_counts[has_links], bandwidth_k) - 1]
+    bandwidth = float(np.median(distances_to_k))
+
+    return np.where(links, np.exp(distances / -bandwidth), 0.0)
+
+def calculate_cross_similarity(
+    y: np.ndarray,
+    sr: float,
+    segment_times: t.List[t.Tuple[float, float]],
+    features: t.Optional[AudioFeatures] = None,
+) -> np.ndarray:
     """
     Calculate the cross-similarity matrix between the time-lag representations of the audio segments.
 
@@ -11,49 +72,15 @@ def calculate_cross_similarity(y: np.ndarray, sr: float, segment_times: t.List[t
     y (np.ndarray): The audio signal as a numpy array.
     sr (int): The sample rate of the audio signal.
     segment_times (List[Tuple[float, float]]): A list of tuples representing the starting and ending times of each audio segment.
+    features (AudioFeatures): Precomputed features of `y` (default: None, computed here).
 
     Returns:
     A 2D numpy array representing the cross-similarity matrix between the audio segments.
     """
-    # Calculate the time-lag representations of the audio segments
-
-    segments = []
-    max_length = 0
-    for start_time, end_time in segment_times:
-        segment = y[int(start_time * sr):int(end_time * sr)]
-        segments.append(segment)
-        max_length = max(max_length, len(segment))
-
-    # Pad all segments to the maximum length with zeros
-    segments = [np.pad(segment, (0, max_length - len(segment)), mode='constant') for segment in segments]
-
-    time_lag_reps = []
-    for segment in segments:
-
-        # Normalize the segment to have zero mean and unit variance
-        segment = librosa.util.normalize(segment)
-
-        # Apply a pre-emphasis filter to the segment
-        segment = librosa.effects.preemphasis(segment)
-
-        # Apply a window function to the segment
-        # segment *= np.hanning(len(segment))
-
-        time_lag_rep = librosa.feature.tempogram(y=segment, sr=sr)
-        time_lag_reps.append(time_lag_rep)
-    time_lag_reps = np.array(time_lag_reps)
-
-    # Transpose the time-lag representations to have shape (n_frames, n_lags, n_segments)
-    time_lag_reps = np.transpose(time_lag_reps, (1, 2, 0))
-
-    # Calculate the cross-similarity matrix between the time-lag representations
-    cross_similarity = librosa.segment.cross_similarity(
-        time_lag_reps, 
-        time_lag_reps,
-        mode='affinity',
-        full=True
-    )
+    if features is None:
+        features = AudioFeatures.compute(y, sr)
 
+    cross_similarity = segment_affinity(segment_gram_matrix(features, segment_times))
     np.fill_diagonal(cross_similarity, 1.0)
 
     return cross_similarity
@@ -78,29 +105,27 @@ def compute_segment_groupings(similarity_matrix: t.List[t.List[float]]) -> t.Lis
     # groupings == [[0, 1], [2, 3]]
     """
 
-    similarity_matrix = np.array(similarity_matrix)
+    similarity_matrix = np.array(similarity_matrix, dtype=float)
     
     GROUPING_THRESHOLD = 0.60
     if len(similarity_matrix) == 0:
-        return 0
-    
-    groupings = []
-    current_group = [0]
+        return []
 
+    # Groups are contiguous, so a segment's mean similarity to the current group (the segments from
+    # `group_start` up to it) is a difference of running sums along its row.
+    running_similarity_sums = np.concatenate(
+        [np.zeros((len(similarity_matrix), 1)), np.cumsum(similarity_matrix, axis=1)], axis=1
+    )
+    group_starts = [0]
     for segment_index in range(1, len(similarity_matrix)):
-        segment_crosssimilarities = similarity_matrix[segment_index]
-        similarities_to_current_group = segment_crosssimilarities[current_group]
-        mean_current_group_similarity = np.mean(similarities_to_current_group)
-        if mean_current_group_similarity > GROUPING_THRESHOLD:
-            current_group.append(segment_index)
-            continue
-        else:
-            groupings.append(current_group)
-            current_group = [segment_index]
-            continue
-            
-    groupings.append(current_group)
-    return groupings
+        group_start = group_starts[-1]
+        similarity_to_current_group = running_similarity_sums[segment_index, segment_index] - running_similarity_sums[segment_index, group_start]
+        mean_current_group_similarity = similarity_to_current_group / (segment_index - group_start)
+        if not mean_current_group_similarity > GROUPING_THRESHOLD:
+            group_starts.append(segment_index)
+
+    group_ends = group_starts[1:] + [len(similarity_matrix)]
+    return [list(range(start, end)) for start, end in zip(group_starts, group_ends)]
 
 def plot_cross_similarity(
     cross_similarity: t.Union[np.ndarray, t.Sequence[t.Sequence[float]]], 
@@ -6,6 +6,7 @@ import typing as t
 import dataclasses as dc
 import dataclasses_json as dcj
 from . import audio_tools
+from .feature_cache import AudioFeatures
 
 @dc.dataclass
 class TempoInfo(dcj.DataClassJsonMixin):
@@ -18,6 +19,27 @@ class TempoInfo(dcj.DataClassJsonMixin):
     audible_beats: t.List[float] = dc.field(default_factory=list)
     all_beats: t.List[float] = dc.field(default_factory=list)
 
+@dc.dataclass
+class TempoPlotData:
+    """The intermediate signals `plot_tempo_analysis` draws, so plots can be made after analysis."""
+    times: np.ndarray
+    onset_env: np.ndarray
+    plp_pulse: np.ndarray
+    plp_beats: np.ndarray
+    plp_bpm: float
+    plp_raw_bpm: float
+    beat_track_bpm: float
+    beat_times_observed_bpm: float
+    beat_times: np.ndarray
+    all_beats: np.ndarray
+
+    def plot(self, figure_output_filepath: Path, audio_name: t.Optional[str] = None):
+        plot_tempo_analysis(
+            **{field.name: getattr(self, field.name) for field in dc.fields(self)},
+            figure_output_filepath=figure_output_filepath,
+            audio_name=audio_name,
+        )
+
 # https://stackoverflow.com/questions/11686720/is-there-a-numpy-builtin-to-reject-outliers-from-a-list
 def reject_outliers(data, m = 2.):
     """Reject outliers from a list of data
@@ -139,7 +161,7 @@ def plot_tempo_analysis(
     fig.tight_layout()
     if figure_output_filepath is not None:
         figure_output_filepath.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(str(figure_output_filepath))
+        fig.savefig(str(figure_output_filepath))
         plt.close(fig)
 
 def fill_in_missing_beat_times(
@@ -167,56 +189,44 @@ def fill_in_missing_beat_times(
     song_duration (float): The duration of the song (in seconds).
 
     Returns:
-    np.ndarray: The beat times array, with the gaps filled in.
+    np.ndarray: The beat times array, with the gaps filled in. Contains every observed beat.
     """
-    
     # Special case: if there are no beats, return an empty array
     if len(beat_times) == 0:
         return np.array([])
-    
+
+    beat_times = np.asarray(beat_times, dtype=float)
     target_beat_duration = 60 / bpm
-    out_beats = []
 
     # First, extrapolate any beats prior to the first observed beat
-    starting_beats = []
-    extrapolated_first_beat = beat_times[0] - target_beat_duration
-    while extrapolated_first_beat > 0:
-        starting_beats.append(extrapolated_first_beat)
-        extrapolated_first_beat -= target_beat_duration
-    starting_beats.reverse()
-    out_beats.extend(starting_beats)
+    starting_beats = beat_times[0] - target_beat_duration * np.arange(np.ceil(beat_times[0] / target_beat_duration), 0, -1)
+    starting_beats = starting_beats[starting_beats > 0]
 
     # Now, fill in the gaps between observed beats.
-    for i in range(len(beat_times) - 1): # stop at the second-to-last beat
-        current_audible_beat = beat_times[i]
-        next_audible_beat = beat_times[i+1]
-
-        out_beats.append(current_audible_beat)
-        current_beat = current_audible_beat
-
-        audible_beat_interval = (next_audible_beat - current_audible_beat)
-        audible_beat_interval_remainder = audible_beat_interval % target_beat_duration
-        audible_beat_interval_tempo_accuracy_percentage = audible_beat_interval_remainder / target_beat_duration
-        if audible_beat_interval_tempo_accuracy_percentage > BPM_TOLERANCE_PERCENT and \
-           audible_beat_interval_tempo_accuracy_percentage < (1 - BPM_TOLERANCE_PERCENT):
-            if audible_beat_interval < 1.5 * target_beat_duration:
-                continue
-            else:
-                raise ValueError(f"Cannot interpolate beat time - beat times are not evenly spaced. Current beat: {current_audible_beat:.3f}, next beat: {next_audible_beat}, interval: {audible_beat_interval:.3f}, target interval: {target_beat_duration:.3f}, percentage: {audible_beat_interval_tempo_accuracy_percentage:.2f}")
-
-
-        while (next_audible_beat - current_beat) > (target_beat_duration * (1 + BPM_TOLERANCE_PERCENT)):
-            # Add a beat to fill-in the gap.
-            current_beat += target_beat_duration
-            out_beats.append(current_audible_beat)
+    audible_beat_intervals = np.diff(beat_times)
+    audible_beat_interval_tempo_accuracy_percentages = (audible_beat_intervals % target_beat_duration) / target_beat_duration
+    off_tempo = (audible_beat_interval_tempo_accuracy_percentages > BPM_TOLERANCE_PERCENT) & \
+                (audible_beat_interval_tempo_accuracy_percentages < (1 - BPM_TOLERANCE_PERCENT))
+    # A short off-tempo interval (e.g. a slightly early beat) is kept as is; a longer one can't be filled.
+    unfillable = np.flatnonzero(off_tempo & (audible_beat_intervals >= 1.5 * target_beat_duration))
+    if len(unfillable) > 0:
+        i = unfillable[0]
+        raise ValueError(f"Cannot interpolate beat time - beat times are not evenly spaced. Current beat: {beat_times[i]:.3f}, next beat: {beat_times[i+1]}, interval: {audible_beat_intervals[i]:.3f}, target interval: {target_beat_duration:.3f}, percentage: {audible_beat_interval_tempo_accuracy_percentages[i]:.2f}")
+
+    # Each gap gets as many beats as it takes to bring the remaining interval within tolerance.
+    missing_beat_counts = np.ceil((audible_beat_intervals - target_beat_duration * (1 + BPM_TOLERANCE_PERCENT)) / target_beat_duration)
+    missing_beat_counts = np.where(off_tempo, 0, np.maximum(missing_beat_counts, 0)).astype(int)
+    # Every observed beat but the last, each followed by the beats filling the gap after it.
+    gap_lengths = missing_beat_counts + 1
+    gap_starts = np.repeat(beat_times[:-1], gap_lengths)
+    beats_into_gap = np.arange(len(gap_starts)) - np.repeat(np.cumsum(gap_lengths) - gap_lengths, gap_lengths)
+    gap_beats = gap_starts + beats_into_gap * target_beat_duration
 
     # Finally, extrapolate any beats after the last observed beat
-    extrapolated_last_beat = beat_times[-1] + target_beat_duration
-    while extrapolated_last_beat < song_duration:
-        out_beats.append(extrapolated_last_beat)
-        extrapolated_last_beat += target_beat_duration
+    ending_beats = beat_times[-1] + target_beat_duration * np.arange(1, np.floor((song_duration - beat_times[-1]) / target_beat_duration) + 2)
+    ending_beats = ending_beats[ending_beats < song_duration]
 
-    return np.array(out_beats)
+    return np.concatenate([starting_beats, gap_beats, beat_times[-1:], ending_beats])
 
 
 def calculate_tempo_info(
@@ -234,26 +244,51 @@ def calculate_tempo_info(
     sample_rate (int): The sampling rate of the audio.
     standardize_bpm (bool): Whether to standardize the BPM to be within the default range (default: True).
     audio_name (str): A name for the audio, used for plotting (default: None).
+    figure_output_filepath (Path): Where to save the tempo plot; no plot is made if None (default: None).
 
     Returns:
     TempoInfo: A dataclass containing the tempo information.
     """
-
-    onset_env = librosa.onset.onset_strength(y=audio_array, sr=sample_rate)
-    times = librosa.times_like(onset_env, sr=sample_rate)
+    tempo_info, plot_data = analyze_tempo(audio_array, sample_rate, standardize_bpm=standardize_bpm)
+    if figure_output_filepath is not None:
+        plot_data.plot(figure_output_filepath, audio_name=audio_name)
+    return tempo_info
+
+def analyze_tempo(
+    audio_array: np.ndarray,
+    sample_rate: float,
+    standardize_bpm: bool = True,
+    features: t.Optional[AudioFeatures] = None,
+) -> t.Tuple[TempoInfo, TempoPlotData]:
+    """
+    Like `calculate_tempo_info`, but returns the data for the tempo plot instead of drawing it.
+    `features` are the audio's onset features, if already computed.
+    """
+    if features is None:
+        features = AudioFeatures.compute(audio_array, sample_rate)
+    onset_env = features.onset_env
+    times = librosa.times_like(onset_env, sr=sample_rate, hop_length=features.hop_length)
     song_duration = len(audio_array) / sample_rate
 
-    pulse__plp = librosa.beat.plp(onset_envelope=onset_env, sr=sample_rate)
+    pulse__plp = features.plp_pulse
     beats_plp = np.flatnonzero(librosa.util.localmax(pulse__plp))
     beat_times_plp = times[beats_plp]
     plp_interval_time_secs = find_typical_beat_interval(beat_times_plp)
     plp_raw_bpm = 60 / plp_interval_time_secs
     plp_bpm = audio_tools.standardize_bpm_range(plp_raw_bpm) if standardize_bpm else plp_raw_bpm
 
+    # The tempo beat_track would estimate from start_bpm, from the precomputed autocorrelation.
+    estimated_bpm = librosa.feature.tempo(
+        tg=features.tempo_autocorrelation,
+        sr=sample_rate,
+        hop_length=features.hop_length,
+        start_bpm=plp_bpm,
+    )
     bpm__raw_beat_track, beats__beat_track = librosa.beat.beat_track(
         onset_envelope=onset_env, 
         sr=sample_rate,
-        start_bpm=plp_bpm,
+        hop_length=features.hop_length,
+        bpm=estimated_bpm,
         trim=False,
         tightness=50, # default is 100.  
         units='frames',
@@ -271,8 +306,8 @@ def calculate_tempo_info(
     beat_offset = starting_beat_timestamp % secs_between_beats
     all_beats = fill_in_missing_beat_times(beat_times, bpm_beat_track, song_duration)
 
-    plot_tempo_analysis(
-        times=times, 
+    plot_data = TempoPlotData(
+        times=times,
         onset_env=onset_env,
         plp_pulse=pulse__plp,
         plp_beats=beats_plp,
@@ -282,11 +317,9 @@ def calculate_tempo_info(
         beat_times_observed_bpm=beat_times_observed_bpm,
         beat_times=beat_times,
         all_beats=all_beats,
-        figure_output_filepath=figure_output_filepath,
-        audio_name=audio_name,
     )
 
-    return TempoInfo(
+    tempo_info = TempoInfo(
         bpm=bpm_beat_track, 
         raw_bpm=bpm__raw_beat_track,
         plp_bpm=plp_bpm,
@@ -295,4 +328,5 @@ def calculate_tempo_info(
         starting_beat_timestamp=starting_beat_timestamp, 
         audible_beats=beat_times.tolist(),
         all_beats=all_beats.tolist(),
-    )
\ No newline at end of file
+    )
+    return tempo_info, plot_data
\ No newline at end of file
@@ -0,0 +1,142 @@
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from motion_extraction.audio_analysis import audio_tools
+from motion_extraction.audio_analysis.audio_tools import extract_audio_pcm, probe_audio_stream, save_audio_from_video
+
+
+def completed(args, stdout: bytes = b"", returncode: int = 0, stderr: bytes = b"") -> subprocess.CompletedProcess:
+    return subprocess.CompletedProcess(args, returncode, stdout=stdout, stderr=stderr)
+
+
+class FfmpegCommandTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.video_path = self.root / "clip.mp4"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_ffmpeg(self, *responses):
+        """Patches subprocess.run to answer ffmpeg and ffprobe with `responses` in turn; returns their argument lists."""
+        real_run = subprocess.run
+        ffmpeg_calls = []
+
+        def fake_run(args, **kwargs):
+            if args[0] not in ("ffmpeg", "ffprobe"):
+                # Other libraries (e.g. CPU detection) may use subprocess as well.
+                return real_run(args, **kwargs)
+            ffmpeg_calls.append(args)
+            return responses[len(ffmpeg_calls) - 1](args)
+
+        patcher = mock.patch.object(audio_tools.subprocess, "run", side_effect=fake_run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ffmpeg_calls
+
+    def test_save_wav_writes_float_pcm_through_a_temp_file(self):
+        def write_output(args):
+            Path(args[-1]).write_bytes(b"RIFF")
+            return completed(args)
+        calls = self.run_ffmpeg(write_output)
+        output_path = self.root / "cache" / "clip.wav"
+
+        save_audio_from_video(self.video_path, output_path, as_mono=True)
+
+        args = calls[-1]
+        self.assertEqual(args[:-1], [
+            "ffmpeg", "-nostdin", "-v", "error", "-y", "-i", str(self.video_path), "-map", "0:a:0", "-vn",
+            "-ac", "1", "-c:a", "pcm_f32le",
+        ])
+        self.assertNotEqual(Path(args[-1]), output_path)
+        self.assertEqual(Path(args[-1]).suffix, ".wav")
+        self.assertEqual(output_path.read_bytes(), b"RIFF")
+        self.assertEqual(list(output_path.parent.iterdir()), [output_path])
+
+    def test_save_mp3_is_encoded_by_suffix(self):
+        def write_output(args):
+            Path(args[-1]).write_bytes(b"ID3")
+            return completed(args)
+        calls = self.run_ffmpeg(write_output)
+
+        save_audio_from_video(self.video_path, self.root / "clip.mp3", sample_rate=22050)
+
+        args = calls[-1]
+        self.assertEqual(args[:-1], [
+            "ffmpeg", "-nostdin", "-v", "error", "-y", "-i", str(self.video_path), "-map", "0:a:0", "-vn",
+            "-ar", "22050",
+        ])
+        self.assertEqual(Path(args[-1]).suffix, ".mp3")
+
+    def test_failed_extraction_leaves_no_files(self):
+        def fail_after_partial_write(args):
+            Path(args[-1]).write_bytes(b"partial")
+            return completed(args, returncode=1, stderr=b"Stream map '0:a:0' matches no streams.")
+        self.run_ffmpeg(fail_after_partial_write)
+        output_path = self.root / "clip.wav"
+
+        with self.assertRaisesRegex(Exception, "matches no streams"):
+            save_audio_from_video(self.video_path, output_path, as_mono=True)
+        self.assertEqual([path.name for path in self.root.iterdir()], [])
+
+    def test_missing_ffmpeg_is_reported(self):
+        def not_installed(args):
+            raise FileNotFoundError(args[0])
+        self.run_ffmpeg(not_installed)
+        with self.assertRaisesRegex(RuntimeError, "ffmpeg was not found"):
+            save_audio_from_video(self.video_path, self.root / "clip.wav")
+
+    def test_probe_parses_sample_rate_and_channels(self):
+        calls = self.run_ffmpeg(lambda args: completed(args, stdout=b"48000,2\n44100,1\n"))
+        self.assertEqual(probe_audio_stream(self.video_path), (48000.0, 2))
+        self.assertEqual(calls[0][0], "ffprobe")
+        self.assertEqual(calls[0][-1], str(self.video_path))
+
+    def test_probe_without_audio_track(self):
+        self.run_ffmpeg(lambda args: completed(args, stdout=b"\n"))
+        with self.assertRaisesRegex(Exception, "No audio"):
+            probe_audio_stream(self.video_path)
+
+    def test_mono_pcm_at_a_given_rate_needs_no_probe(self):
+        samples = np.linspace(-1, 1, 8, dtype=np.float32)
+        calls = self.run_ffmpeg(lambda args: completed(args, stdout=samples.astype("<f4").tobytes()))
+
+        audio, sample_rate = extract_audio_pcm(self.video_path, sample_rate=22050)
+
+        self.assertEqual(len(calls), 1)
+        args = calls[-1]
+        self.assertEqual(args[args.index("-ac") + 1], "1")
+        self.assertEqual(args[args.index("-ar") + 1], "22050")
+        self.assertEqual(args[-3:], ["-c:a", "pcm_f32le", "pipe:1"])
+        np.testing.assert_array_equal(audio, samples)
+        self.assertEqual(sample_rate, 22050.0)
+
+    def test_multichannel_pcm_is_reshaped_to_samples_by_channels(self):
+        frames = np.arange(12, dtype=np.float32).reshape(6, 2)  # interleaved L/R
+        calls = self.run_ffmpeg(
+            lambda args: completed(args, stdout=b"44100,2\n"),
+            lambda args: completed(args, stdout=frames.astype("<f4").tobytes()),
+        )
+
+        audio, sample_rate = extract_audio_pcm(self.video_path, as_mono=False)
+
+        args = calls[-1]
+        self.assertEqual(args[args.index("-ac") + 1], "2")
+        self.assertEqual(args[args.index("-ar") + 1], "44100")
+        np.testing.assert_array_equal(audio, frames)
+        self.assertEqual(sample_rate, 44100.0)
+
+    def test_empty_pcm_output(self):
+        self.run_ffmpeg(lambda args: completed(args, stdout=b""))
+        with self.assertRaisesRegex(Exception, "No audio"):
+            extract_audio_pcm(self.video_path, sample_rate=22050)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from motion_extraction.audio_analysis.feature_cache import (
+    FEATURE_CACHE_SUFFIX,
+    AudioFeatures,
+    load_or_compute_audio_features,
+)
+from motion_extraction.audio_analysis.similarity_analysis import calculate_cross_similarity
+
+
+def make_clicks(seconds: float = 10.0, sr: int = 22050, period: float = 0.5) -> np.ndarray:
+    times = np.arange(int(sr * seconds)) / sr
+    rng = np.random.default_rng(0)
+    return (0.8 * rng.normal(size=times.size) * (np.mod(times, period) < 0.03)).astype(np.float32)
+
+
+class FeatureCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def assert_features_equal(self, actual: AudioFeatures, expected: AudioFeatures):
+        for name in ("onset_env", "plp_pulse", "tempo_autocorrelation", "tempogram"):
+            np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name), err_msg=name)
+        self.assertEqual(actual.hop_length, expected.hop_length)
+
+    def test_cached_features_equal_computed_ones(self):
+        audio = make_clicks()
+        computed = load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        self.assertEqual(len(list(self.cache_dir.glob(f"*{FEATURE_CACHE_SUFFIX}"))), 1)
+
+        cached = load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        self.assert_features_equal(cached, computed)
+        self.assert_features_equal(cached, AudioFeatures.compute(audio, 22050))
+
+    def test_other_audio_or_sample_rate_gets_its_own_entry(self):
+        audio = make_clicks()
+        load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        load_or_compute_audio_features(audio, 44100, self.cache_dir)
+        load_or_compute_audio_features(make_clicks(period=0.4), 22050, self.cache_dir)
+        self.assertEqual(len(list(self.cache_dir.glob(f"*{FEATURE_CACHE_SUFFIX}"))), 3)
+
+    def test_unreadable_entry_is_recomputed(self):
+        audio = make_clicks()
+        load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        (cache_path,) = self.cache_dir.glob(f"*{FEATURE_CACHE_SUFFIX}")
+        cache_path.write_bytes(b"truncated")
+
+        features = load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        self.assert_features_equal(features, AudioFeatures.compute(audio, 22050))
+
+        cache_path.write_bytes(cache_path.read_bytes()[:200])
+        features = load_or_compute_audio_features(audio, 22050, self.cache_dir)
+        self.assert_features_equal(features, AudioFeatures.compute(audio, 22050))
+
+    def test_cross_similarity_compares_tempogram_slices(self):
+        audio = make_clicks()
+        features = AudioFeatures.compute(audio, 22050)
+        segment_times = [(0.0, 2.0), (2.0, 4.0), (4.0, 5.5)]
+
+        cross_similarity = calculate_cross_similarity(audio, 22050, segment_times, features)
+        self.assertEqual(cross_similarity.shape, (3, 3))
+        np.testing.assert_array_equal(np.diag(cross_similarity), 1.0)
+        np.testing.assert_array_equal(
+            cross_similarity, calculate_cross_similarity(audio, 22050, segment_times)
+        )
+        frames = features.segment_frames(2.0, 4.0)
+        self.assertEqual(frames.stop - frames.start, features.segment_frames(0.0, 2.0).stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
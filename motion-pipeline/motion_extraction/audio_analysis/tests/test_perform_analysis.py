@@ -0,0 +1,153 @@
+import io
+import multiprocessing
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from motion_extraction.audio_analysis import perform_analysis
+from motion_extraction.audio_analysis.audio_analysis import AudioAnalysisResult
+from motion_extraction.audio_analysis.audio_tools import calculate_8beat_segments_with_midpoints
+from motion_extraction.audio_analysis.perform_analysis import _AudioAnalysisJob, _analyze_audio_job, perform_audio_analysis
+from motion_extraction.audio_analysis.tempo_analysis import TempoInfo
+
+SAMPLE_RATE = 1000
+
+
+def fake_analysis(audio_array: np.ndarray, sample_rate: int, feature_cache_dir=None):
+    """A cheap stand-in for `analyze_audio_with_plot_data`, determined by the audio's length."""
+    duration = len(audio_array) / sample_rate
+    bpm = 90.0 + duration
+    phrases = list(calculate_8beat_segments_with_midpoints(bpm, 0.0, duration))
+    result = AudioAnalysisResult(
+        duration=duration,
+        sample_rate=sample_rate,
+        tempo_info=TempoInfo(bpm=bpm, raw_bpm=bpm, plp_bpm=bpm, raw_plp_bpm=bpm, starting_beat_timestamp=0.0),
+        musical_phrases=phrases,
+        phrase_groupings=[[i] for i in range(len(phrases))],
+        cross_similarity=np.eye(len(phrases)).tolist(),
+    )
+    return result, None
+
+
+def fake_load_audio(path: Path, as_mono: bool = False):
+    """Audio whose length is set by the file's contents (a number of seconds)."""
+    return np.zeros(int(float(Path(path).read_text()) * SAMPLE_RATE), dtype=np.float32), SAMPLE_RATE
+
+
+class PerformAudioAnalysisTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.videos_dir = self.root / "videos"
+        self.cache_dir = self.root / "audio_cache"
+        for relative_path, seconds in (("a.mp4", 20), ("study/b.mp4", 31)):
+            (self.videos_dir / relative_path).parent.mkdir(parents=True, exist_ok=True)
+            (self.videos_dir / relative_path).write_text(str(seconds))
+
+        for target, replacement in (
+            ("analyze_audio_with_plot_data", fake_analysis),
+            ("load_audio", fake_load_audio),
+        ):
+            patcher = mock.patch.object(perform_analysis, target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def analyze(self, destdir: Path, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return perform_audio_analysis(
+                videosrcdir=self.videos_dir,
+                audiosrcdir=None,
+                audio_analysis_destdir=destdir,
+                audiocachedir=self.cache_dir,
+                analysis_summary_out=destdir / "summary.csv",
+                write_plots=False,
+                **kwargs,
+            )
+
+    def test_existing_mp3_cache_is_reused_for_wav(self):
+        for relative_path in ("a.mp3", "study/b.mp3"):
+            (self.cache_dir / relative_path).parent.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / relative_path).write_text((self.videos_dir / relative_path).with_suffix(".mp4").read_text())
+
+        with mock.patch.object(perform_analysis, "save_audio_from_video", side_effect=AssertionError("extracted")):
+            summary = self.analyze(self.root / "results", skip_existing=True)
+        self.assertEqual(list(summary.index), ["a", "study/b"])
+        self.assertEqual(list(summary["bpm"]), [110.0, 121.0])
+
+    def test_bundle_cache_only_reuses_its_own_format(self):
+        (self.cache_dir / "a.wav").parent.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "a.wav").write_text("20")
+
+        def extract(video_path: Path, output_path: Path, as_mono: bool = False):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(video_path.read_text())
+
+        with mock.patch.object(perform_analysis, "save_audio_from_video", side_effect=extract) as save_audio:
+            self.analyze(self.root / "results", skip_existing=True, audio_cache_suffix=".mp3")
+        self.assertEqual(
+            sorted(call.args[1].relative_to(self.cache_dir).as_posix() for call in save_audio.call_args_list),
+            ["a.mp3", "study/b.mp3"],
+        )
+
+    # Worker processes see the patched analysis only when forked from this one.
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "needs forked worker processes")
+    def test_output_does_not_depend_on_worker_count(self):
+        audio_dir = self.root / "audio"
+        for relative_path, seconds in (("a.mp3", 25), ("z.wav", 12), ("study/c.mp3", 40)):
+            (audio_dir / relative_path).parent.mkdir(parents=True, exist_ok=True)
+            (audio_dir / relative_path).write_text(str(seconds))
+
+        def extract(video_path: Path, output_path: Path, as_mono: bool = False):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(video_path.read_text())
+
+        outputs = {}
+        for workers in (1, 2):
+            destdir = self.root / f"results{workers}"
+            with mock.patch.object(perform_analysis, "save_audio_from_video", side_effect=extract):
+                with redirect_stdout(io.StringIO()):
+                    perform_audio_analysis(
+                        videosrcdir=self.videos_dir,
+                        audiosrcdir=audio_dir,
+                        audio_analysis_destdir=destdir,
+                        audiocachedir=self.root / f"audio_cache{workers}",
+                        analysis_summary_out=destdir / "summary.csv",
+                        workers=workers,
+                    )
+            outputs[workers] = {
+                path.relative_to(destdir).as_posix(): path.read_bytes() if path.suffix != ".pdf" else b""
+                for path in sorted(destdir.rglob("*")) if path.is_file()
+            }
+
+        self.assertEqual(outputs[2], outputs[1])
+        self.assertIn("segmentsimilarity/video/study/b.pdf", outputs[1])
+        summary_rows = [line.split(",")[0] for line in outputs[1]["summary.csv"].decode().splitlines()[1:]]
+        self.assertEqual(summary_rows, ["a", "a", "study/b", "study/c", "z"])
+
+    def test_tempo_plot_data_is_only_returned_for_plotting(self):
+        analysis = fake_analysis(np.zeros(20 * SAMPLE_RATE), SAMPLE_RATE)[0]
+        audio_path = self.root / "clip.mp3"
+        audio_path.write_text("20")
+        for keep_plot_data, expected in ((True, "plot data"), (False, None)):
+            job = _AudioAnalysisJob(
+                audio_filepath=audio_path,
+                tree_name="clip audio tree",
+                clip_relative_stem="clip",
+                analysis_output_filepath=self.root / "clip.json",
+                dance_tree_filepath=self.root / "clip.dancetree.json",
+                feature_cache_dir=None,
+                keep_plot_data=keep_plot_data,
+            )
+            with mock.patch.object(perform_analysis, "analyze_audio_with_plot_data", return_value=(analysis, "plot data")):
+                self.assertEqual(_analyze_audio_job(job), (analysis, expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from motion_extraction.audio_analysis.feature_cache import AudioFeatures
+from motion_extraction.audio_analysis.similarity_analysis import (
+    compute_segment_groupings,
+    segment_affinity,
+    segment_gram_matrix,
+)
+
+
+def features_with_tempogram(tempogram: np.ndarray) -> AudioFeatures:
+    n_frames = tempogram.shape[1]
+    return AudioFeatures(
+        sample_rate=22050,
+        onset_env=np.zeros(n_frames),
+        plp_pulse=np.zeros(n_frames),
+        tempo_autocorrelation=np.zeros((tempogram.shape[0], 1)),
+        tempogram=tempogram,
+    )
+
+
+class SegmentSimilarityTests(unittest.TestCase):
+    def test_gram_matrix_matches_zero_padded_segments(self):
+        tempogram = np.random.default_rng(0).random((16, 200)).astype(np.float32)
+        features = features_with_tempogram(tempogram)
+        segment_times = [(0.0, 0.5), (0.5, 1.0), (1.0, 1.2), (1.2, 2.3)]
+
+        slices = [features.segment_frames(start, end) for start, end in segment_times]
+        longest = max(frames.stop - frames.start for frames in slices)
+        padded = np.zeros((len(slices), 16, longest))
+        for i, frames in enumerate(slices):
+            padded[i, :, :frames.stop - frames.start] = tempogram[:, frames]
+        flattened = padded.reshape(len(slices), -1)
+
+        np.testing.assert_allclose(segment_gram_matrix(features, segment_times), flattened @ flattened.T, rtol=1e-10)
+
+    def test_affinity_uses_median_distance_to_kth_neighbor(self):
+        descriptors = np.random.default_rng(1).random((12, 30))
+        distances = cdist(descriptors, descriptors)
+        k = 2 * int(np.ceil(np.sqrt(12)))
+        # Column 0 of each sorted row is the segment itself.
+        bandwidth = np.median(np.sort(distances, axis=1)[:, k])
+        expected = np.exp(-distances / bandwidth)
+        np.fill_diagonal(expected, 0)
+
+        np.testing.assert_allclose(segment_affinity(descriptors @ descriptors.T), expected, atol=1e-12)
+
+    def test_identical_segments_are_not_linked(self):
+        descriptors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+        affinity = segment_affinity(descriptors @ descriptors.T)
+        self.assertEqual(affinity[0, 1], 0.0)
+        self.assertGreater(affinity[0, 2], 0.0)
+
+    def test_single_segment_has_no_links(self):
+        np.testing.assert_array_equal(segment_affinity(np.array([[4.0]])), [[0.0]])
+
+
+class SegmentGroupingTests(unittest.TestCase):
+    def test_contiguous_similar_segments_are_grouped(self):
+        groupings = compute_segment_groupings([
+            [1.00, 0.90, 0.50, 0.40],
+            [0.90, 1.00, 0.60, 0.35],
+            [0.50, 0.60, 1.00, 0.85],
+            [0.40, 0.35, 0.85, 1.00],
+        ])
+        self.assertEqual(groupings, [[0, 1], [2, 3]])
+
+    def test_segment_joins_on_mean_similarity_to_the_whole_group(self):
+        # Segment 2 is similar to segment 1 but not to the group [0, 1] on average.
+        groupings = compute_segment_groupings([
+            [1.0, 0.7, 0.3],
+            [0.7, 1.0, 0.8],
+            [0.3, 0.8, 1.0],
+        ])
+        self.assertEqual(groupings, [[0, 1], [2]])
+
+    def test_no_segments(self):
+        self.assertEqual(compute_segment_groupings([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from motion_extraction.audio_analysis.tempo_analysis import fill_in_missing_beat_times
+
+
+def beat_grid(first_beat: float, bpm: float, song_duration: float) -> np.ndarray:
+    return np.arange(first_beat, song_duration, 60 / bpm)
+
+
+class FillInMissingBeatTimesTests(unittest.TestCase):
+    def test_complete_beat_track_is_extended_to_the_whole_song(self):
+        grid = beat_grid(0.25, bpm=120, song_duration=30)
+        observed = grid[(grid > 3) & (grid < 25)]
+
+        np.testing.assert_allclose(fill_in_missing_beat_times(observed, 120, 30), grid)
+
+    def test_gaps_are_filled_with_evenly_spaced_beats(self):
+        grid = beat_grid(0.1, bpm=100, song_duration=40)
+        # Silent stretches of one, three and ten beats.
+        observed = np.delete(grid, [5, 12, 13, 14] + list(range(30, 40)))
+
+        np.testing.assert_allclose(fill_in_missing_beat_times(observed, 100, 40), grid)
+
+    def test_filled_beats_follow_the_observed_beat_before_each_gap(self):
+        # Human timing drifts, so each gap is filled from the beat that starts it.
+        observed = np.array([1.0, 1.5, 3.02, 3.52])
+        np.testing.assert_allclose(
+            fill_in_missing_beat_times(observed, 120, 4),
+            [0.5, 1.0, 1.5, 2.0, 2.5, 3.02, 3.52],
+        )
+
+    def test_every_observed_beat_is_kept(self):
+        observed = np.array([0.7, 1.2, 1.7, 2.2])
+        filled = fill_in_missing_beat_times(observed, 120, 2.5)
+
+        self.assertTrue(np.isin(observed, filled).all())
+        np.testing.assert_allclose(filled, [0.2, 0.7, 1.2, 1.7, 2.2])
+
+    def test_short_off_tempo_interval_is_kept_without_filling(self):
+        # 0.7 s is 1.4 beats at 120 bpm: off tempo, but shorter than 1.5 beats.
+        observed = np.array([1.0, 1.7, 2.2])
+        np.testing.assert_allclose(fill_in_missing_beat_times(observed, 120, 2.3), [0.5, 1.0, 1.7, 2.2])
+
+    def test_long_off_tempo_interval_cannot_be_filled(self):
+        with self.assertRaises(ValueError):
+            fill_in_missing_beat_times(np.array([1.0, 1.5, 2.75]), 120, 5)
+
+    def test_no_beats(self):
+        self.assertEqual(len(fill_in_missing_beat_times(np.array([]), 120, 10)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
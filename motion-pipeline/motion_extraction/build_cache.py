@@ -0,0 +1,160 @@
+"""Content-hash bookkeeping for incremental pipeline runs.
+
+A `BuildCache` is a JSON manifest that records, for each stage of a pipeline, the key every item
+(usually a clip) was last built from. A key is a hash over everything the item's output depends on:
+the contents of its input files, the parameters of the stage and the source code of the modules that
+produce it (see `build_key` and `BuildCache.source_hash`). An item is rebuilt when its key changes or
+its outputs are missing; otherwise the stage reuses what is on disk.
+
+File hashes are memoized in the manifest by size and modification time, so large inputs such as
+videos are only reread after they change. A `BuildCache` may be shared by stages running on different
+threads.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import importlib.util
+import hashlib
+import json
+import os
+import threading
+import typing as t
+
+from .holistic_cache import file_content_hash
+
+_MANIFEST_VERSION = 1
+
+
+def build_key(*parts: t.Any) -> str:
+    """SHA-256 over `parts`, which must be JSON-serializable (paths and enums are stringified)."""
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StageCacheStats:
+    hits: int = 0
+    misses: int = 0
+    removed: int = 0
+
+
+class BuildCache:
+    """
+    Per-stage, per-item input keys persisted in `manifest_path`.
+
+    Typical use for one stage: compute a key for each item, ask `stale` which items need rebuilding,
+    rebuild those, then `record` the keys and `save`. Recording replaces the stage's previous entries,
+    so items that disappeared from the inputs are forgotten.
+    """
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        manifest = self._load()
+        self._files: t.Dict[str, t.Dict[str, t.Any]] = manifest.get("files", {})
+        self._stages: t.Dict[str, t.Dict[str, str]] = manifest.get("stages", {})
+        self.stats: t.Dict[str, StageCacheStats] = {}
+        self._lock = threading.RLock()
+
+    def _load(self) -> t.Dict[str, t.Any]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with self.manifest_path.open("r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            # Unreadable manifest: start over, which rebuilds everything once.
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def file_hash(self, path: Path) -> t.Optional[str]:
+        """SHA-256 of the file's contents, or `None` if it does not exist."""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        memo_key = path.resolve().as_posix()
+        with self._lock:
+            entry = self._files.get(memo_key)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["sha256"]
+        sha256 = file_content_hash(path)
+        with self._lock:
+            self._files[memo_key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+        return sha256
+
+    def source_hash(self, *module_names: str) -> str:
+        """Hash of the source files of the named modules (every `.py` file, for packages)."""
+        source_files: t.List[Path] = []
+        for module_name in module_names:
+            spec = importlib.util.find_spec(module_name)
+            if spec is None or spec.origin is None:
+                raise ModuleNotFoundError(f"No module named {module_name!r}")
+            if spec.submodule_search_locations is not None:
+                for location in spec.submodule_search_locations:
+                    source_files.extend(sorted(Path(location).rglob("*.py")))
+            else:
+                source_files.append(Path(spec.origin))
+        return build_key([self.file_hash(source_file) for source_file in source_files])
+
+    def stale(
+        self,
+        stage: str,
+        keys: t.Mapping[str, str],
+        outputs_exist: t.Callable[[str], bool] = lambda item: True,
+    ) -> t.Set[str]:
+        """Items of `keys` whose key differs from the recorded one, or whose outputs are missing."""
+        with self._lock:
+            recorded = dict(self._stages.get(stage, {}))
+        stale_items = {
+            item
+            for item, key in keys.items()
+            if recorded.get(item) != key or not outputs_exist(item)
+        }
+        with self._lock:
+            self.stats[stage] = StageCacheStats(
+                hits=len(keys) - len(stale_items),
+                misses=len(stale_items),
+                removed=len(self.removed(stage, keys)),
+            )
+        return stale_items
+
+    def removed(self, stage: str, keys: t.Mapping[str, str]) -> t.Set[str]:
+        """Items recorded for `stage` that are no longer among `keys`."""
+        with self._lock:
+            return set(self._stages.get(stage, {})) - set(keys)
+
+    def record(self, stage: str, keys: t.Mapping[str, str]):
+        with self._lock:
+            self._stages[stage] = dict(keys)
+
+    def invalidate(self, stage: str):
+        with self._lock:
+            self._stages.pop(stage, None)
+
+    def save(self):
+        with self._lock:
+            # Forget memoized hashes of files that no longer exist, so the manifest doesn't grow forever.
+            self._files = {path: entry for path, entry in self._files.items() if os.path.exists(path)}
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+            with temp_path.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": _MANIFEST_VERSION, "files": self._files, "stages": self._stages},
+                    f,
+                    indent=2,
+                    sort_keys=True,
+                )
+            os.replace(temp_path, self.manifest_path)
+
+    def summary_lines(self) -> t.List[str]:
+        with self._lock:
+            stage_stats = dict(self.stats)
+        return [
+            f"{stage}: {stats.hits} cached, {stats.misses} rebuilt"
+            + (f", {stats.removed} removed" if stats.removed else "")
+            for stage, stats in sorted(stage_stats.items())
+        ]
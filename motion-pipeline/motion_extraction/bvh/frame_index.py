@@ -0,0 +1,182 @@
+"""Random access to the MOTION frames of a BVH file.
+
+`IndexedBvhReader` parses only the header of a BVH file and memory-maps the rest. On first open it
+records the byte range of every frame line and saves that index next to the file
+(`<name>.bvh.index.npz`), so later opens skip the scan. Frame ranges are then parsed on demand, which
+keeps memory bounded by the window being read rather than the length of the recording.
+
+The index records the size and modification time of the BVH file it was built from, and is rebuilt
+when they no longer match.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import io
+import mmap
+import os
+import typing as t
+import zipfile
+
+import numpy as np
+
+from .parser import Bvh, _FRAME_TIME_PATTERN
+
+FRAME_INDEX_SUFFIX = ".index.npz"
+
+_SCAN_CHUNK_BYTES = 1 << 26
+_NEWLINE = ord("\n")
+_CARRIAGE_RETURN = ord("\r")
+
+
+def frame_index_path(bvh_path: Path) -> Path:
+    bvh_path = Path(bvh_path)
+    return bvh_path.with_name(bvh_path.name + FRAME_INDEX_SUFFIX)
+
+
+def _read_header(f: t.BinaryIO) -> t.Tuple[str, int]:
+    """Reads up to and including the 'Frame Time:' line. Returns the header and the offset after it."""
+    header_lines = []
+    for line in iter(f.readline, b""):
+        text = line.decode("utf-8")
+        header_lines.append(text)
+        if _FRAME_TIME_PATTERN.match(text.rstrip("\r\n")):
+            return "".join(header_lines), f.tell()
+    raise ValueError(f"{getattr(f, 'name', 'BVH file')} has no MOTION block ('Frame Time:' line not found)")
+
+
+def _scan_frame_lines(motion: mmap.mmap, motion_start: int) -> t.Tuple[np.ndarray, np.ndarray]:
+    """Start and end byte offsets of the non-empty lines after `motion_start`, scanning in chunks."""
+    newlines = []
+    for chunk_start in range(motion_start, len(motion), _SCAN_CHUNK_BYTES):
+        chunk_size = min(_SCAN_CHUNK_BYTES, len(motion) - chunk_start)
+        chunk = np.frombuffer(motion, dtype=np.uint8, count=chunk_size, offset=chunk_start)
+        newlines.append(np.flatnonzero(chunk == _NEWLINE) + chunk_start)
+        del chunk  # the mmap can't be closed while a view of it exists
+    newlines = np.concatenate(newlines) if newlines else np.empty(0, dtype=np.int64)
+
+    starts = np.concatenate(([motion_start], newlines + 1)).astype(np.int64)
+    ends = np.concatenate((newlines, [len(motion)])).astype(np.int64)
+    # Drop the '\r' of CRLF line endings, then blank lines (such as the one write_bvh ends with).
+    crlf = ends > starts
+    crlf[crlf] = np.frombuffer(motion, dtype=np.uint8)[ends[crlf] - 1] == _CARRIAGE_RETURN
+    ends = ends - crlf
+    non_empty = ends > starts
+    return starts[non_empty], ends[non_empty]
+
+
+class IndexedBvhReader:
+    """
+    A BVH file whose frames are read on demand. `bvh` holds the hierarchy (a `Bvh` without frames),
+    so the usual joint and channel queries work on it; `read_frames` parses a range of frames into a
+    `(frames, channels)` array.
+
+    Use as a context manager, or call `close`, to release the memory map.
+    """
+
+    def __init__(self, bvh_path: Path, dtype=np.float32, write_index: bool = True):
+        self.bvh_path = Path(bvh_path)
+        self.dtype = dtype
+
+        self._file = self.bvh_path.open("rb")
+        try:
+            header, self._motion_start = _read_header(self._file)
+        except ValueError:
+            self._file.close()
+            raise
+        self.bvh = Bvh(header, dtype=dtype)
+        self.channel_count = self.bvh.frames.shape[1]
+        self._motion = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._motion_start < os.fstat(self._file.fileno()).st_size
+            else None
+        )
+
+        index = self._load_index()
+        if index is None:
+            index = self._build_index()
+            if write_index:
+                self._write_index(*index)
+        self._line_starts, self._line_ends = index
+
+    def __enter__(self) -> IndexedBvhReader:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._motion is not None:
+            self._motion.close()
+            self._motion = None
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._line_starts)
+
+    @property
+    def frame_time(self) -> float:
+        return self.bvh.frame_time
+
+    def _build_index(self) -> t.Tuple[np.ndarray, np.ndarray]:
+        if self._motion is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return _scan_frame_lines(self._motion, self._motion_start)
+
+    def _load_index(self) -> t.Optional[t.Tuple[np.ndarray, np.ndarray]]:
+        index_path = frame_index_path(self.bvh_path)
+        if not index_path.exists():
+            return None
+        bvh_stat = self.bvh_path.stat()
+        try:
+            with np.load(index_path, allow_pickle=False) as index:
+                if (
+                    int(index["source_size"]) != bvh_stat.st_size
+                    or int(index["source_mtime_ns"]) != bvh_stat.st_mtime_ns
+                    or int(index["motion_start"]) != self._motion_start
+                ):
+                    return None
+                return index["line_starts"], index["line_ends"]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # Truncated or foreign file: rebuild the index.
+            return None
+
+    def _write_index(self, line_starts: np.ndarray, line_ends: np.ndarray):
+        index_path = frame_index_path(self.bvh_path)
+        temp_path = index_path.with_name(index_path.name + ".tmp")
+        bvh_stat = self.bvh_path.stat()
+        try:
+            with temp_path.open("wb") as f:
+                np.savez(
+                    f,
+                    line_starts=line_starts,
+                    line_ends=line_ends,
+                    motion_start=np.array(self._motion_start, dtype=np.int64),
+                    source_size=np.array(bvh_stat.st_size, dtype=np.int64),
+                    source_mtime_ns=np.array(bvh_stat.st_mtime_ns, dtype=np.int64),
+                )
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            # A read-only dataset can still be viewed; it just gets scanned on every open.
+            print(f"WARNING: could not save BVH frame index {index_path}: {e}")
+
+    def read_frames(self, start: int = 0, stop: t.Optional[int] = None) -> np.ndarray:
+        """Frames `start` to `stop` (exclusive, clipped to the file) as a `(frames, channels)` array."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if stop <= start:
+            return np.empty((0, self.channel_count), dtype=self.dtype)
+        text = self._motion[self._line_starts[start]:self._line_ends[stop - 1]].decode("utf-8")
+        frames = np.loadtxt(io.StringIO(text), dtype=np.float64, ndmin=2)
+        return frames.astype(self.dtype, copy=False)
+
+    def iter_windows(
+        self,
+        window_size: int,
+        start: int = 0,
+        stop: t.Optional[int] = None,
+    ) -> t.Iterator[t.Tuple[int, np.ndarray]]:
+        """Yields `(first_frame, frames)` for consecutive windows of at most `window_size` frames."""
+        if window_size < 1:
+            raise ValueError(f"window_size must be positive, got {window_size}")
+        start, stop, _ = slice(start, stop).indices(len(self))
+        for window_start in range(start, stop, window_size):
+            yield window_start, self.read_frames(window_start, min(window_start + window_size, stop))
@@ -2,9 +2,21 @@
 
 Copied from https://github.com/TemugeB/Python_BVH_viewer
 """
+import io
 import re
 
-# Copied from 
+import numpy as np
+
+# The line that ends the header; frame values follow it.
+_FRAME_TIME_PATTERN = re.compile(r'^[ \t]*frame[ \t]+time:.*$', re.IGNORECASE | re.MULTILINE)
+
+
+def _parse_motion(motion, channel_count, dtype):
+    """Parses the frame lines of a MOTION block into a `(frames, channel_count)` array."""
+    if not motion.strip():
+        return np.empty((0, channel_count), dtype=dtype)
+    # Parse at double precision and then convert, as converting each value string would.
+    return np.loadtxt(io.StringIO(motion), dtype=np.float64, ndmin=2).astype(dtype, copy=False)
 
 class BvhNode:
 
@@ -47,29 +59,29 @@ class BvhNode:
 
 
 class Bvh:
+    """
+    A parsed BVH file. The hierarchy is read once into a tree of `BvhNode`s plus a joint table (index,
+    parent, channels and the column offset of each joint's channels), so joint and channel queries are
+    dictionary lookups. `frames` is the MOTION block as a `(frames, channels)` array of `dtype`.
+    """
 
-    def __init__(self, data):
+    def __init__(self, data, dtype=np.float64):
         self.data = data
         self.root = BvhNode()
-        self.frames = []
-        self.tokenize()
-
-    def tokenize(self):
-        first_round = []
-        accumulator = ''
-        for char in self.data:
-            if char not in ('\n', '\r'):
-                accumulator += char
-            elif accumulator:
-                    first_round.append(re.split('\\s+', accumulator.strip()))
-                    accumulator = ''
+        self.frames = np.empty((0, 0), dtype=dtype)
+        self.tokenize(dtype)
+
+    def tokenize(self, dtype=np.float64):
+        # Only the header is tokenized line by line; the MOTION block starts after 'Frame Time:'.
+        frame_time = _FRAME_TIME_PATTERN.search(self.data)
+        header_end = frame_time.end() if frame_time else len(self.data)
+
         node_stack = [self.root]
-        frame_time_found = False
         node = None
-        for item in first_round:
-            if frame_time_found:
-                self.frames.append(item)
+        for line in self.data[:header_end].splitlines():
+            if not line.strip():
                 continue
+            item = re.split('\\s+', line.strip())
             key = item[0]
             if key == '{':
                 node_stack.append(node)
@@ -78,8 +90,37 @@ class Bvh:
             else:
                 node = BvhNode(item)
                 node_stack[-1].add_child(node)
-            if item[0].lower() == 'frame' and item[1].lower() == 'time:':
-                frame_time_found = True
+
+        self._index_joints()
+        if frame_time is not None:
+            self.frames = _parse_motion(self.data[header_end:], self._channel_count, dtype)
+
+    def _index_joints(self):
+        self._joints = []
+        roots = list(self.root.filter('ROOT'))
+
+        def iterate_joints(joint):
+            self._joints.append(joint)
+            for child in joint.filter('JOINT'):
+                iterate_joints(child)
+        if roots:
+            iterate_joints(roots[0])
+
+        self._joint_by_name = {}
+        for joint in self._joints:
+            self._joint_by_name.setdefault(joint.name, joint)
+        self._joint_index = {id(joint): i for i, joint in enumerate(self._joints)}
+
+        self._channels_index = {}
+        self._channel_index = {}
+        self._channel_count = 0
+        for joint in self._joints:
+            channels = joint['CHANNELS']
+            self._channels_index.setdefault(joint.name, self._channel_count)
+            self._channel_index.setdefault(
+                joint.name, {channel: i for i, channel in reversed(list(enumerate(channels[1:])))}
+            )
+            self._channel_count += int(channels[0])
 
     def search(self, *items):
         found_nodes = []
@@ -99,39 +140,23 @@ class Bvh:
         return found_nodes
 
     def get_joints(self):
-        joints = []
-
-        def iterate_joints(joint):
-            joints.append(joint)
-            for child in joint.filter('JOINT'):
-                iterate_joints(child)
-        iterate_joints(next(self.root.filter('ROOT')))
-        return joints
+        return list(self._joints)
 
     def get_joints_names(self):
-        joints = []
-
-        def iterate_joints(joint):
-            joints.append(joint.value[1])
-            for child in joint.filter('JOINT'):
-                iterate_joints(child)
-        iterate_joints(next(self.root.filter('ROOT')))
-        return joints
+        return [joint.value[1] for joint in self._joints]
 
     def joint_direct_children(self, name):
         joint = self.get_joint(name)
         return [child for child in joint.filter('JOINT')]
 
     def get_joint_index(self, name):
-        return self.get_joints().index(self.get_joint(name))
+        return self._joint_index[id(self.get_joint(name))]
 
     def get_joint(self, name):
-        found = self.search('ROOT', name)
-        if not found:
-            found = self.search('JOINT', name)
-        if found:
-            return found[0]
-        raise LookupError('joint not found')
+        try:
+            return self._joint_by_name[name]
+        except KeyError:
+            raise LookupError('joint not found')
 
     def joint_offset(self, name):
         joint = self.get_joint(name)
@@ -143,20 +168,23 @@ class Bvh:
         return joint['CHANNELS'][1:]
 
     def get_joint_channels_index(self, joint_name):
-        index = 0
-        for joint in self.get_joints():
-            if joint.value[1] == joint_name:
-                return index
-            index += int(joint['CHANNELS'][0])
-        raise LookupError('joint not found')
+        try:
+            return self._channels_index[joint_name]
+        except KeyError:
+            raise LookupError('joint not found')
 
     def get_joint_channel_index(self, joint, channel):
-        channels = self.joint_channels(joint)
-        if channel in channels:
-            channel_index = channels.index(channel)
-        else:
-            channel_index = -1
-        return channel_index
+        try:
+            channel_index = self._channel_index[joint]
+        except KeyError:
+            raise LookupError('joint not found')
+        return channel_index.get(channel, -1)
+
+    def _channel_columns(self, joint, channels):
+        """Frame columns of `channels` of `joint`, and a mask of the channels the joint doesn't have."""
+        joint_index = self.get_joint_channels_index(joint)
+        channel_index = np.array([self.get_joint_channel_index(joint, channel) for channel in channels], dtype=np.intp)
+        return joint_index + channel_index, channel_index == -1
 
     def frame_joint_channel(self, frame_index, joint, channel, value=None):
         joint_index = self.get_joint_channels_index(joint)
@@ -166,34 +194,15 @@ class Bvh:
         return float(self.frames[frame_index][joint_index + channel_index])
 
     def frame_joint_channels(self, frame_index, joint, channels, value=None):
-        values = []
-        joint_index = self.get_joint_channels_index(joint)
-        for channel in channels:
-            channel_index = self.get_joint_channel_index(joint, channel)
-            if channel_index == -1 and value is not None:
-                values.append(value)
-            else:
-                values.append(
-                    float(
-                        self.frames[frame_index][joint_index + channel_index]
-                    )
-                )
-        return values
-
-    def frames_joint_channels(self, joint, channels, value=None):
-        all_frames = []
-        joint_index = self.get_joint_channels_index(joint)
-        for frame in self.frames:
-            values = []
-            for channel in channels:
-                channel_index = self.get_joint_channel_index(joint, channel)
-                if channel_index == -1 and value is not None:
-                    values.append(value)
-                else:
-                    values.append(
-                        float(frame[joint_index + channel_index]))
-            all_frames.append(values)
-        return all_frames
+        return self.frames_joint_channels(joint, channels, value, frames=self.frames[frame_index:frame_index + 1])[0]
+
+    def frames_joint_channels(self, joint, channels, value=None, frames=None):
+        frames = self.frames if frames is None else frames
+        columns, missing = self._channel_columns(joint, channels)
+        values = frames[:, columns].astype(np.float64)
+        if value is not None:
+            values[:, missing] = value
+        return values.tolist()
 
     def joint_parent(self, name):
         joint = self.get_joint(name)
@@ -205,7 +214,7 @@ class Bvh:
         joint = self.get_joint(name)
         if joint.parent == self.root:
             return -1
-        return self.get_joints().index(joint.parent)
+        return self._joint_index[id(joint.parent)]
 
     @property
     def nframes(self):
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from motion_extraction.bvh.frame_index import IndexedBvhReader, frame_index_path
+from motion_extraction.bvh.parser import Bvh
+from motion_extraction.bvh.tests.test_parser import BVH_TEXT
+from motion_extraction.bvh.view_bvh import ProcessBVH, ProcessBVHWindows
+
+
+class IndexedBvhReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.bvh_path = Path(self.tmp.name) / "clip.bvh"
+        self.bvh_path.write_text(BVH_TEXT)
+        self.expected_frames = Bvh(BVH_TEXT, dtype=np.float32).frames
+
+    def test_reads_frame_ranges(self):
+        with IndexedBvhReader(self.bvh_path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(reader.bvh.get_joints_names(), ["Hips", "Spine", "Head", "LeftLeg"])
+            self.assertEqual(reader.frame_time, 0.0333333)
+            np.testing.assert_array_equal(reader.read_frames(), self.expected_frames)
+            np.testing.assert_array_equal(reader.read_frames(1, 2), self.expected_frames[1:2])
+            np.testing.assert_array_equal(reader.read_frames(2, 10), self.expected_frames[2:])
+            self.assertEqual(reader.read_frames(3).shape, (0, 15))
+
+            windows = list(reader.iter_windows(2))
+        self.assertEqual([first_frame for first_frame, _ in windows], [0, 2])
+        np.testing.assert_array_equal(np.concatenate([frames for _, frames in windows]), self.expected_frames)
+
+    def test_crlf_line_endings(self):
+        self.bvh_path.write_bytes(BVH_TEXT.replace("\n", "\r\n").encode())
+        with IndexedBvhReader(self.bvh_path) as reader:
+            np.testing.assert_array_equal(reader.read_frames(), self.expected_frames)
+
+    def test_index_is_persisted_until_the_file_changes(self):
+        with IndexedBvhReader(self.bvh_path):
+            pass
+        index_path = frame_index_path(self.bvh_path)
+        self.assertTrue(index_path.exists())
+        with np.load(index_path) as index:
+            self.assertEqual(len(index["line_starts"]), 3)
+
+        # A stale index must not be used: append a frame and bump the mtime.
+        with self.bvh_path.open("a") as f:
+            f.write("0.4 1.5 2.6 13 23 33 0 0 0 0 0 0 0 0 1\n")
+        stat = self.bvh_path.stat()
+        os.utime(self.bvh_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with IndexedBvhReader(self.bvh_path) as reader:
+            self.assertEqual(len(reader), 4)
+            np.testing.assert_array_equal(
+                reader.read_frames(3),
+                np.array([[0.4, 1.5, 2.6, 13, 23, 33, 0, 0, 0, 0, 0, 0, 0, 0, 1]], dtype=np.float32),
+            )
+
+    def test_truncated_index_is_rebuilt(self):
+        with IndexedBvhReader(self.bvh_path):
+            pass
+        index_path = frame_index_path(self.bvh_path)
+        index_path.write_bytes(index_path.read_bytes()[:100])
+        with IndexedBvhReader(self.bvh_path) as reader:
+            np.testing.assert_array_equal(reader.read_frames(), self.expected_frames)
+        with np.load(index_path) as index:
+            self.assertEqual(len(index["line_starts"]), 3)
+
+    def test_viewer_windows_match_whole_file(self):
+        joints, offsets, hierarchy, root_positions, rotations, *_ = ProcessBVH(self.bvh_path)
+        windows = list(ProcessBVHWindows(self.bvh_path, window_size=2, start=1))
+        self.assertEqual([first_frame for first_frame, _ in windows], [1])
+        window_joints, _, window_hierarchy, window_root_positions, window_rotations, *_ = windows[0][1]
+        self.assertEqual(window_joints, joints)
+        self.assertEqual(window_hierarchy, hierarchy)
+        np.testing.assert_array_equal(window_root_positions, root_positions[1:])
+        np.testing.assert_array_equal(window_rotations, rotations[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from motion_extraction.bvh.parser import Bvh
+
+BVH_TEXT = """HIERARCHY
+ROOT Hips
+{
+    OFFSET 0.0 0.0 0.0
+    CHANNELS 6 Xposition Yposition Zposition Zrotation Xrotation Yrotation
+    JOINT Spine
+    {
+        OFFSET 0.0 10.5 0.0
+        CHANNELS 3 Zrotation Xrotation Yrotation
+        JOINT Head
+        {
+            OFFSET 0.0 20.0 1.0
+            CHANNELS 3 Zrotation Xrotation Yrotation
+            End Site
+            {
+                OFFSET 0.0 5.0 0.0
+            }
+        }
+    }
+    JOINT LeftLeg
+    {
+        OFFSET 8.0 0.0 0.0
+        CHANNELS 3 Zrotation Xrotation Yrotation
+    }
+}
+MOTION
+Frames: 3
+Frame Time: 0.0333333
+0.1 1.2 2.3 10 20 30 1 2 3 4 5 6 7 8 9 
+0.2 1.3 2.4 11 21 31 1.5 2.5 3.5 4.5 5.5 6.5 7.5 8.5 9.5
+0.3 1.4 2.5 12 22 32 -1 -2 -3 -4 -5 -6 -7 -8 -123.456789
+
+"""
+
+
+class BvhParserTests(unittest.TestCase):
+    def setUp(self):
+        self.mocap = Bvh(BVH_TEXT)
+
+    def test_frames_are_a_float_matrix(self):
+        self.assertEqual(self.mocap.frames.dtype, np.float64)
+        self.assertEqual(self.mocap.frames.shape, (3, 15))
+        self.assertEqual(self.mocap.nframes, 3)
+        self.assertAlmostEqual(self.mocap.frame_time, 0.0333333)
+        self.assertEqual(self.mocap.frames[2, 14], -123.456789)
+        self.assertEqual(Bvh(BVH_TEXT, dtype=np.float32).frames.dtype, np.float32)
+
+    def test_joint_table(self):
+        mocap = self.mocap
+        self.assertEqual(mocap.get_joints_names(), ["Hips", "Spine", "Head", "LeftLeg"])
+        self.assertEqual([mocap.get_joint_index(name) for name in mocap.get_joints_names()], [0, 1, 2, 3])
+        self.assertEqual([mocap.get_joint_channels_index(name) for name in mocap.get_joints_names()], [0, 6, 9, 12])
+        self.assertEqual([mocap.joint_parent_index(name) for name in mocap.get_joints_names()], [-1, 0, 1, 0])
+        self.assertIsNone(mocap.joint_parent("Hips"))
+        self.assertEqual(mocap.joint_parent("Head").name, "Spine")
+        self.assertEqual([child.name for child in mocap.joint_direct_children("Hips")], ["Spine", "LeftLeg"])
+        self.assertEqual(mocap.joint_offset("Head"), (0.0, 20.0, 1.0))
+        self.assertEqual(mocap.joint_channels("Spine"), ["Zrotation", "Xrotation", "Yrotation"])
+        self.assertEqual(mocap.get_joint_channel_index("Spine", "Xrotation"), 1)
+        self.assertEqual(mocap.get_joint_channel_index("Spine", "Xposition"), -1)
+        with self.assertRaises(LookupError):
+            mocap.get_joint("End")
+
+    def test_channel_queries(self):
+        mocap = self.mocap
+        self.assertEqual(mocap.frame_joint_channel(1, "Head", "Yrotation"), 6.5)
+        self.assertEqual(mocap.frame_joint_channel(1, "Head", "Xposition", value=0.0), 0.0)
+        self.assertEqual(mocap.frame_joint_channels(2, "Hips", ["Xposition", "Yrotation"]), [0.3, 32.0])
+        self.assertEqual(
+            mocap.frames_joint_channels("LeftLeg", ["Yrotation", "Xposition"], value=0.0),
+            [[9.0, 0.0], [9.5, 0.0], [-123.456789, 0.0]],
+        )
+
+    def test_empty_motion(self):
+        mocap = Bvh(BVH_TEXT[:BVH_TEXT.index("0.1 1.2")].replace("Frames: 3", "Frames: 0"))
+        self.assertEqual(mocap.frames.shape, (0, 15))
+        self.assertEqual(mocap.frames_joint_channels("Spine", ["Zrotation"]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
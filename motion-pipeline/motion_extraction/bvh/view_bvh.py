@@ -4,6 +4,7 @@ Copied from https://github.com/TemugeB/Python_BVH_viewer
 """
 import argparse
 from .parser import Bvh
+from .frame_index import IndexedBvhReader
 import numpy as np
 import matplotlib.pyplot as plt
 import sys
@@ -62,13 +63,25 @@ def _separate_positions(frames, joints, joints_saved_channels):
 def ProcessBVH(filename, csv_output_path = None):
 
     with open(filename) as f:
-        mocap = Bvh(f.read())
+        mocap = Bvh(f.read(), dtype=np.float32)
+
+    return _process_frames(mocap, mocap.frames, csv_output_path)
+
+def ProcessBVHWindows(filename, window_size, start = 0, stop = None):
+    """
+    Like `ProcessBVH`, but yields `(first_frame, skeleton_data)` for consecutive windows of at most
+    `window_size` frames, reading each window from the file as it is needed (see `IndexedBvhReader`).
+    """
+    with IndexedBvhReader(filename) as reader:
+        for window_start, frames in reader.iter_windows(window_size, start, stop):
+            yield window_start, _process_frames(reader.bvh, frames)
+
+def _process_frames(mocap, frames, csv_output_path = None):
 
     #get the names of the joints
     joints = mocap.get_joints_names()
 
-    #this contains all of the frames data.
-    frames = np.array(mocap.frames).astype('float32')
+    #frames contains all of the frames data.
 
     #determine the structure of the skeleton and how the data was saved
     joints_offsets = {}
@@ -218,10 +231,16 @@ def _calculate_frame_joint_positions_in_world_space(local_positions, root_positi
     return world_pos
 
 
-def Draw_bvh(joints, joints_offsets, joints_hierarchy, root_positions, joints_rotations, joints_saved_angles, frame_time, repititions):
+def Draw_bvh(joints, joints_offsets, joints_hierarchy, root_positions, joints_rotations, joints_saved_angles, frame_time, repititions, first_frame = 0, ax = None, figure_limit = None):
+    """
+    Animates the frames. `first_frame` is the file frame number of `joints_rotations[0]` (for the
+    title). Pass the returned `(ax, figure_limit)` back in to keep drawing windows of the same clip
+    on the same axes and scale.
+    """
 
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
+    if ax is None:
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
 
     frame_joints_rotations = {en:[] for en in joints}
 
@@ -230,7 +249,7 @@ def Draw_bvh(joints, joints_offsets, joints_hierarchy, root_positions, joints_ro
     """
     frame_skips = 1
 
-    figure_limit = None #used to set figure axis limits
+    #figure_limit is used to set figure axis limits
 
     for _ in range(repititions):
         for i in range(0,len(joints_rotations), frame_skips):
@@ -276,13 +295,13 @@ def Draw_bvh(joints, joints_offsets, joints_hierarchy, root_positions, joints_ro
             ax.set_xlim(-xy_lim, xy_lim)
             ax.set_ylim(-xy_lim, xy_lim)
             ax.set_zlim(-zlim, zlim)
-            plt.title('frame: ' + str(i))
+            plt.title('frame: ' + str(first_frame + i))
             plt.pause(frame_time)
             ax.cla()
             # Frame Loop
         
         pass # Repetitions Loop
-    pass
+    return ax, figure_limit
 
 
 if __name__ == "__main__":
@@ -293,7 +312,30 @@ if __name__ == "__main__":
     parser.add_argument("-joint_angle_output", "--joint_angle_output", dest="joint_angle_output", help="joint angle output csv file", metavar="JOINT_ANGLE_CSV_FILE")
     parser.add_argument("-frame_time", type=float, dest="frame_time", help="time between frames", metavar="FRAME_TIME", required=False, default=None)
     parser.add_argument("-repeat", type=int, dest="repeat", help="number of repetitions", metavar="REPETITIONS", required=False, default=1)
+    parser.add_argument("-start", type=int, dest="start", help="first frame to show", metavar="START_FRAME", required=False, default=0)
+    parser.add_argument("-stop", type=int, dest="stop", help="frame to stop before", metavar="STOP_FRAME", required=False, default=None)
+    parser.add_argument("-window", type=int, dest="window", help="scrub through the file this many frames at a time, reading each window from disk as needed", metavar="WINDOW_FRAMES", required=False, default=None)
     args = parser.parse_args()
+
+    if args.window is not None or args.start != 0 or args.stop is not None:
+        window = args.window if args.window is not None else sys.maxsize
+        ax, figure_limit = None, None
+        for _ in range(args.repeat):
+            for first_frame, skeleton_data in ProcessBVHWindows(args.filename, window, args.start, args.stop):
+                joints, joints_offsets, joints_hierarchy, root_positions, joints_rotations, joints_saved_angles, _, _, frame_time = skeleton_data
+                ax, figure_limit = Draw_bvh(
+                    joints=joints,
+                    joints_offsets=joints_offsets,
+                    joints_hierarchy=joints_hierarchy,
+                    root_positions=root_positions,
+                    joints_rotations=joints_rotations,
+                    joints_saved_angles=joints_saved_angles,
+                    frame_time=args.frame_time if args.frame_time is not None else frame_time,
+                    repititions=1,
+                    first_frame=first_frame,
+                    ax=ax,
+                    figure_limit=figure_limit)
+        sys.exit(0)
     
     skeleton_data = ProcessBVH(args.filename, args.joint_angle_output)
 
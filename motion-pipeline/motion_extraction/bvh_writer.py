@@ -20,6 +20,42 @@ from pytransform3d.transform_manager import TransformManager
 
 #     return R
 
+# Intrinsic zxy Cardan angles are pytransform3d's general Euler extraction with n1 = z, n2 = x and
+# n3 = y, for which its basis change C is the identity and lambda is pi / 2.
+_ZXY_LAMBDA = np.arctan2(1.0, 0.0)
+_ZXY_ROTATION_T = pr.active_matrix_from_angle(0, _ZXY_LAMBDA).T
+
+def intrinsic_euler_zxy_from_active_matrices(R: np.ndarray) -> np.ndarray:
+    """
+    `pr.intrinsic_euler_zxy_from_active_matrix` for a `(..., 3, 3)` stack of rotation matrices,
+    including its gimbal lock handling. Returns `(..., 3)` angles around z, x' and y''. The matrices
+    are not checked for being rotations.
+    """
+    O = np.asarray(R, dtype=np.float64) @ _ZXY_ROTATION_T
+    beta = _ZXY_LAMBDA + np.arctan2(np.hypot(O[..., 0, 2], O[..., 1, 2]), O[..., 2, 2])
+
+    safe1 = np.abs(beta - _ZXY_LAMBDA) >= pr.eps
+    safe2 = np.abs(beta - _ZXY_LAMBDA - np.pi) >= pr.eps
+    no_gimbal_lock = safe1 & safe2
+
+    alpha = np.arctan2(O[..., 0, 2], -O[..., 1, 2])
+    gamma = np.arctan2(O[..., 2, 0], O[..., 2, 1])
+    invalid_beta = ~((-0.5 * np.pi <= beta) & (beta <= 0.5 * np.pi))
+    flip = no_gimbal_lock & invalid_beta
+    alpha = np.where(flip, alpha + np.pi, alpha)
+    beta = np.where(flip, 2.0 * _ZXY_LAMBDA - beta, beta)
+    gamma = np.where(flip, gamma - np.pi, gamma)
+
+    # Gimbal lock: gamma is zero and alpha takes the whole rotation about the locked axis.
+    locked_alpha = np.where(
+        ~safe1,
+        np.arctan2(O[..., 1, 0] - O[..., 0, 1], O[..., 0, 0] + O[..., 1, 1]),
+        np.arctan2(O[..., 1, 0] + O[..., 0, 1], O[..., 0, 0] - O[..., 1, 1]),
+    )
+    alpha = np.where(no_gimbal_lock, alpha, locked_alpha)
+    gamma = np.where(no_gimbal_lock, gamma, 0.0)
+    return pr.norm_angle(np.stack((alpha, beta, gamma), axis=-1))
+
 @dataclass
 class BVHWriteNode:
     name: str
@@ -135,7 +171,32 @@ class BVHWriteNode:
         })
         return data
 
-def write_bvh(file: TextIOBase, root_node: BVHWriteNode, fps: int, frame_count: int, frames: Iterable[Sequence[float]]) -> None:
+    def get_channel_values(self, transforms: np.ndarray, position_multiplier: float = 1.0) -> np.ndarray:
+        """
+        Batched `get_channel_info` for a `(..., 4, 4)` stack of transforms. Returns the values as a
+        `(..., len(self.channels))` array, in `channels` order.
+        """
+        if self.rotation_order.lower() != 'zxy':
+            raise ValueError(f'Unsupported rotation order: {self.rotation_order}')
+
+        rz, rx, ry = np.moveaxis(
+            np.degrees(intrinsic_euler_zxy_from_active_matrices(np.swapaxes(transforms[..., :3, :3], -1, -2))),
+            -1, 0,
+        )
+        rotations = {'X': rx, 'Y': ry, 'Z': rz}
+        values = [rotations[c.upper()] for c in self.rotation_order]
+        if self.has_position_channels:
+            values = list(np.moveaxis(transforms[..., :3, 3] * position_multiplier, -1, 0)) + values
+        return np.stack(values, axis=-1)
+
+def write_bvh(
+    file: TextIOBase,
+    root_node: BVHWriteNode,
+    fps: int,
+    frame_count: int,
+    frames: Union[np.ndarray, Iterable[Sequence[float]]],
+    float_format: str = '%.6f',
+) -> None:
     file.write(f'HIERARCHY\n')
     root_node.write_hierarchy(file)
 
@@ -143,8 +204,9 @@ def write_bvh(file: TextIOBase, root_node: BVHWriteNode, fps: int, frame_count:
     file.write(f'Frames: {frame_count}\n')
     file.write(f'Frame Time: {1. / fps}\n')
 
-    for frame in frames:
-        file.write(" ".join(map(str, frame)) + "\n")        
+    frames = np.asarray(frames, dtype=np.float64)
+    if frames.size > 0:
+        np.savetxt(file, frames, fmt=float_format, delimiter=' ')
     file.write('\n')
 
 
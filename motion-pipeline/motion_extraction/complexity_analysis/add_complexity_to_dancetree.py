@@ -126,7 +126,14 @@ def add_complexities_to_dancetrees(
         get_print_prefix: t.Callable[[], str] = lambda: '',
         artifact_archive_root: t.Optional[Path] = None,
         artifact_output_dir: t.Optional[Path] = None,
+        only_clips: t.Optional[t.Collection[str]] = None,
     ):
+    """
+    Write a copy of every dance tree under `tree_srcdir` to `output_dir`, annotated with complexity.
+
+    When `only_clips` is given, only the trees of those clips (relative stems such as `study2/clip`)
+    are processed; the outputs of the others are left as they are.
+    """
     import json
 
     def print_with_prefix(*args, **kwargs):
@@ -144,13 +151,16 @@ def add_complexities_to_dancetrees(
     missing_complexity_count = 0
     missing_db_count = 0
     processed_count = 0
+    unchanged_count = 0
 
     for i, dance_tree_file in enumerate(dance_tree_files):
         relative_filepath = dance_tree_file.relative_to(tree_srcdir)
+        clip_relative_stem = relative_filepath.parent / relative_filepath.stem.replace('.dancetree', '')
+        if only_clips is not None and clip_relative_stem.as_posix() not in only_clips:
+            unchanged_count += 1
+            continue
 
         print_with_prefix(f'Processing {i+1}/{len(dance_tree_files)}: {relative_filepath.as_posix()}', end='')
-        
-        clip_relative_stem = relative_filepath.parent / relative_filepath.stem.replace('.dancetree', '')
 
         complexity = find_complexity_df(clip_relative_stem, complexity_srcdir, complexity_method)
         if complexity is None:
@@ -184,7 +194,7 @@ def add_complexities_to_dancetrees(
         processed_count += 1
 
         print(' - done!')
-    print_with_prefix(f'Done! Saved {len(dance_tree_files)} trees to {output_dir.as_posix()}')
+    print_with_prefix(f'Done! Saved {processed_count} trees to {output_dir.as_posix()} ({unchanged_count} unchanged)')
 
     if artifact_dir is not None:
         report = build_artifact_report(
@@ -205,6 +215,7 @@ def add_complexities_to_dancetrees(
                 f"Trim zero complexity: `{trim_zero_complexity}`",
                 f"Input tree count: `{len(dance_tree_files)}`",
                 f"Processed tree count: `{processed_count}`",
+                f"Unchanged tree count: `{unchanged_count}`",
                 f"Missing complexity count: `{missing_complexity_count}`",
                 f"Missing database count: `{missing_db_count}`",
             ]
@@ -214,6 +225,7 @@ def add_complexities_to_dancetrees(
     return {
         "input_tree_count": len(dance_tree_files),
         "processed_tree_count": processed_count,
+        "unchanged_tree_count": unchanged_count,
         "missing_complexity_count": missing_complexity_count,
         "missing_database_count": missing_db_count,
     }
@@ -19,10 +19,16 @@ Main outputs:
 """
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from fnmatch import fnmatchcase
 from pathlib import Path
+import hashlib
 import json
+import multiprocessing
+import os
 import time
+import zipfile
 import pandas as pd
 import numpy as np
 import typing as t
@@ -50,7 +56,9 @@ from ..artifacts import (
     resolve_artifact_output_dir,
 )
 from ..update_database import load_db
+from ..holistic_cache import file_content_hash, read_holistic_data
 from ..mp_utils import PoseLandmark
+from . import uist_complexityanalysis
 from .uist_complexityanalysis import get_pose_landmarks_present_in_dataframe, DVAJ, calc_scalar_dvaj
 
 _HOLISTIC_DATA_LEGACY_SUFFIX = ".holisticdata.csv"
@@ -308,16 +316,16 @@ def get_position_relative_to_base(positions: pd.DataFrame):
 
 def trim_df_to_convergence(df: pd.DataFrame):
     """Trims a dataframe to the last frame where the cumulative sum changes."""
-    
-    # Find the first index where the cumulative sum stops changing (searching backwards).
+
+    # A frame "changes" when any column differs from the previous frame (NaN differences don't
+    # count, matching `diff().iloc[i].any()`). If no frame changes, nothing is trimmed.
     last_changing_frame = df.shape[0] - 1
-    diff = df.diff()
-    for i in range(df.shape[0] - 1, -1, -1):
-        if diff.iloc[i].any():
-            # The cumulative sum changed, so i is the last changing frame.
-            # We can throw away every frame after i.
-            last_changing_frame = i
-            break
+    if df.shape[0] > 1:
+        diff = np.diff(df.to_numpy(dtype=np.float64), axis=0)
+        changing_rows = np.flatnonzero(((diff != 0) & ~np.isnan(diff)).any(axis=1))
+        if changing_rows.size > 0:
+            # diff row k compares frames k and k + 1
+            last_changing_frame = int(changing_rows[-1]) + 1
 
     tossed_frame_count = df.shape[0] - last_changing_frame - 1
     return df.iloc[:last_changing_frame + 1], tossed_frame_count
@@ -886,7 +894,7 @@ def generate_dvajs_with_visibility(
                 file=sys.stderr,
             )
             continue
-        data = pd.read_csv(holistic_csv_file, index_col='frame')
+        data = read_holistic_data(holistic_csv_file, index_col='frame')
         relative_position = get_position_relative_to_base(data)
         
         dvaj = calc_scalar_dvaj(relative_position, landmark_names)
@@ -896,6 +904,268 @@ def generate_dvajs_with_visibility(
         visibility = get_visibility(relative_position, landmark_names)
         yield dvaj, visibility
 
+def get_weighted_landmark_names(landmark_weighting: t.Dict[t.Union[str, PoseLandmark], float]) -> t.List[str]:
+    """Names of the landmarks (and base) that carry positive weight, in weighting order."""
+    return [
+        (landmark.name if isinstance(landmark, PoseLandmark) else landmark)  # type: ignore
+        for landmark in landmark_weighting.keys()
+        if landmark_weighting.get(landmark, 0) > 0
+    ]
+
+def _compute_dvaj_with_visibility(holistic_csv_file: Path, landmark_names: t.List[str]):
+    return next(generate_dvajs_with_visibility([holistic_csv_file], landmark_names), None)
+
+# Modules whose code determines the DVAJ of a file; stored DVAJs are keyed by their source.
+_DVAJ_SOURCE_FILES: t.Final[t.Tuple[Path, ...]] = (
+    Path(__file__),
+    Path(uist_complexityanalysis.__file__),
+)
+
+def _dvaj_store_path(
+    store_dir: Path,
+    holistic_csv_file: Path,
+    landmark_names: t.Sequence[str],
+    source_hash: str,
+) -> Path:
+    digest = hashlib.sha256()
+    for part in (file_content_hash(holistic_csv_file), source_hash, *landmark_names):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return store_dir / f"{digest.hexdigest()}.npz"
+
+def _load_stored_dvaj(store_path: Path) -> t.Optional[t.Tuple[pd.DataFrame, pd.DataFrame]]:
+    if not store_path.exists():
+        return None
+    try:
+        with np.load(store_path, allow_pickle=False) as stored:
+            index = pd.Index(stored["frame"], name="frame")
+            dvaj = pd.DataFrame(stored["dvaj"], index=index, columns=[str(c) for c in stored["dvaj_columns"]])
+            visibility = pd.DataFrame(stored["visibility"], index=index, columns=[str(c) for c in stored["visibility_columns"]])
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        # Truncated or foreign file: recompute.
+        return None
+    return dvaj, visibility
+
+def _store_dvaj(store_path: Path, dvaj: pd.DataFrame, visibility: pd.DataFrame) -> None:
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = store_path.with_name(store_path.name + ".tmp")
+    with temp_path.open("wb") as f:
+        np.savez(
+            f,
+            frame=dvaj.index.to_numpy(dtype=np.int64),
+            dvaj=dvaj.to_numpy(dtype=np.float64),
+            dvaj_columns=np.array(dvaj.columns, dtype=str),
+            visibility=visibility.to_numpy(dtype=np.float64),
+            visibility_columns=np.array(visibility.columns, dtype=str),
+        )
+    os.replace(temp_path, store_path)
+
+class DvajCache:
+    """Per-file DVAJ and visibility, computed once and shared across complexity variants.
+
+    DVAJ columns are independent per landmark, so computing the union of landmarks used by every
+    variant and selecting columns afterwards gives the same values as computing each variant alone.
+
+    With `store_dir`, results are also kept on disk under a hash of the holistic CSV's contents, the
+    landmark names and the DVAJ code, so a later run only computes DVAJs for files that changed.
+    With `workers > 1`, DVAJs are computed in a process pool using `mp_context` (pass a 'spawn'
+    context when other threads are running).
+    """
+
+    def __init__(
+        self,
+        filepaths: t.Sequence[Path],
+        landmark_names: t.Sequence[str],
+        workers: int = 1,
+        store_dir: t.Optional[Path] = None,
+        mp_context: t.Optional[multiprocessing.context.BaseContext] = None,
+    ):
+        self.landmark_names = list(dict.fromkeys(landmark_names))
+        results: t.Dict[Path, t.Optional[t.Tuple[pd.DataFrame, pd.DataFrame]]] = {}
+        store_paths: t.Dict[Path, Path] = {}
+        if store_dir is not None:
+            source_hash = "".join(file_content_hash(source_file) for source_file in _DVAJ_SOURCE_FILES)
+            for filepath in filepaths:
+                store_paths[filepath] = _dvaj_store_path(store_dir, filepath, self.landmark_names, source_hash)
+                results[filepath] = _load_stored_dvaj(store_paths[filepath])
+        missing_filepaths = [filepath for filepath in filepaths if results.get(filepath) is None]
+        self.stored_count = len(filepaths) - len(missing_filepaths)
+
+        if workers > 1 and len(missing_filepaths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing_filepaths)), mp_context=mp_context) as executor:
+                computed = list(executor.map(
+                    _compute_dvaj_with_visibility,
+                    missing_filepaths,
+                    itertools.repeat(self.landmark_names),
+                ))
+        else:
+            computed = [
+                _compute_dvaj_with_visibility(filepath, self.landmark_names)
+                for filepath in tqdm(missing_filepaths)
+            ]
+        for filepath, result in zip(missing_filepaths, computed):
+            results[filepath] = result
+            if result is not None and filepath in store_paths:
+                _store_dvaj(store_paths[filepath], *result)
+
+        self._by_file: t.Dict[Path, t.Tuple[pd.DataFrame, pd.DataFrame]] = {
+            filepath: result
+            for filepath, result in ((filepath, results.get(filepath)) for filepath in filepaths)
+            if result is not None
+        }
+
+    def generate(self, filepaths: t.Iterable[Path], landmark_names: t.List[str]):
+        """Same contract as `generate_dvajs_with_visibility`, served from the cache."""
+        missing_landmarks = set(landmark_names) - set(self.landmark_names)
+        if missing_landmarks:
+            raise ValueError(f"DvajCache was not built with landmarks {sorted(missing_landmarks)}.")
+        dvaj_cols = [f"{landmark}_{measure.name}" for landmark in landmark_names for measure in DVAJ]
+        for filepath in filepaths:
+            if filepath not in self._by_file:
+                continue
+            dvaj, visibility = self._by_file[filepath]
+            yield dvaj[dvaj_cols].copy(), visibility[landmark_names].copy()
+
+@dataclass
+class ComplexityResult:
+    """Everything `write_complexity_outputs` needs to persist one creation method."""
+    creation_method: str
+    complexity_csv_output_paths: t.List[Path]
+    scaled_complexities: t.List[pd.Series]
+    summary: pd.DataFrame
+
+COMPLEXITY_MANIFEST_FILENAME = "complexity_manifest.json"
+
+def _complexity_manifest_path(destdir: Path) -> Path:
+    return destdir / COMPLEXITY_MANIFEST_FILENAME
+
+def _complexity_manifest_key(complexity_csv_path: Path, destdir: Path) -> str:
+    return complexity_csv_path.relative_to(destdir / 'byfile').as_posix()
+
+def load_complexity_manifest(destdir: Path) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """Reads the index of creation methods present in each per-file complexity CSV under `destdir`.
+
+    Entries map a CSV path (relative to `destdir/byfile`) to the CSV's size, mtime and column names
+    as of the last time this module wrote it. A missing or unreadable manifest is treated as empty.
+    """
+    manifest_path = _complexity_manifest_path(destdir)
+    if not manifest_path.exists():
+        return {}
+    try:
+        with manifest_path.open("r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+def existing_creation_methods(
+    complexity_csv_path: Path,
+    destdir: Path,
+    manifest: t.Mapping[str, t.Mapping[str, t.Any]],
+) -> t.Set[str]:
+    """Creation methods already stored in `complexity_csv_path`.
+
+    Answered from the manifest while the CSV's size and mtime still match the recorded entry;
+    otherwise (file edited elsewhere, or written by an older version) only the CSV header is read.
+    """
+    if not complexity_csv_path.exists():
+        return set()
+    entry = manifest.get(_complexity_manifest_key(complexity_csv_path, destdir))
+    csv_stat = complexity_csv_path.stat()
+    if (
+        entry is not None
+        and entry.get("size") == csv_stat.st_size
+        and entry.get("mtime_ns") == csv_stat.st_mtime_ns
+    ):
+        return set(entry.get("creation_methods", []))
+    return set(pd.read_csv(complexity_csv_path, nrows=0, index_col=0).columns)
+
+def has_complexity_outputs(
+    creation_method: str,
+    complexity_csv_paths: t.Sequence[Path],
+    destdir: Path,
+    manifest: t.Mapping[str, t.Mapping[str, t.Any]],
+) -> bool:
+    """Whether every CSV in `complexity_csv_paths` already has a column for `creation_method`."""
+    return all(
+        creation_method in existing_creation_methods(complexity_csv_path, destdir, manifest)
+        for complexity_csv_path in complexity_csv_paths
+    )
+
+def _complexity_csv_output_paths(relative_filename_stems: t.Sequence[str], destdir: Path) -> t.List[Path]:
+    return [
+        (destdir / 'byfile' / relative_filename_stem).with_suffix(".complexity.csv")
+        for relative_filename_stem in relative_filename_stems
+    ]
+
+def _write_complexity_manifest(destdir: Path, manifest: t.Mapping[str, t.Any]) -> None:
+    manifest_path = _complexity_manifest_path(destdir)
+    temp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def write_complexity_outputs(results: t.Sequence[ComplexityResult], destdir: Path) -> None:
+    """Upsert creation methods into the per-file CSVs and `dvaj_complexity.csv`.
+
+    All of `results` are merged in memory (later results win, as if upserted one after another),
+    so every affected CSV is read and written at most once. The complexity manifest is updated to
+    match.
+    """
+    if len(results) == 0:
+        return
+
+    # Group the new columns by output file, keeping result order.
+    columns_by_path: t.Dict[Path, t.List[t.Tuple[str, pd.Series]]] = defaultdict(list)
+    for result in results:
+        for complexity_csv_output_path, scaled_complexity in zip(result.complexity_csv_output_paths, result.scaled_complexities):
+            columns_by_path[complexity_csv_output_path].append((result.creation_method, scaled_complexity))
+
+    manifest = load_complexity_manifest(destdir)
+
+    # Save complexity by file
+    for complexity_csv_output_path, new_columns in tqdm(columns_by_path.items()):
+        if complexity_csv_output_path.exists():
+            complexity = pd.read_csv(complexity_csv_output_path, index_col=0)
+            new_columns_to_add = new_columns
+        else:
+            complexity_csv_output_path.parent.mkdir(parents=True, exist_ok=True)
+            first_creation_method, first_series = new_columns[0]
+            complexity = first_series.to_frame(name=first_creation_method)
+            new_columns_to_add = new_columns[1:]
+
+        for creation_method, scaled_complexity in new_columns_to_add:
+            if creation_method in complexity.columns:
+                # Drop to ensure no rows are retained from previous runs
+                complexity.drop(columns=[creation_method], inplace=True)
+            complexity[creation_method] = scaled_complexity
+        complexity.to_csv(str(complexity_csv_output_path))
+
+        csv_stat = complexity_csv_output_path.stat()
+        manifest[_complexity_manifest_key(complexity_csv_output_path, destdir)] = {
+            "size": csv_stat.st_size,
+            "mtime_ns": csv_stat.st_mtime_ns,
+            "creation_methods": [str(column) for column in complexity.columns],
+        }
+
+    destdir.mkdir(parents=True, exist_ok=True)
+    _write_complexity_manifest(destdir, manifest)
+
+    complexity_summary_csv_filepath = destdir / "dvaj_complexity.csv"
+    if complexity_summary_csv_filepath.exists():
+        complexity_summary = pd.read_csv(str(complexity_summary_csv_filepath), index_col=["path", "creation_method"])
+        summaries = [result.summary for result in results]
+    else:
+        complexity_summary = results[0].summary
+        summaries = [result.summary for result in results[1:]]
+
+    # Perform an upsert on the existing complexity summary
+    # (combination of outer join and update)
+    for summary in summaries:
+        complexity_summary = pd_append_replace(complexity_summary, summary)
+
+    complexity_summary.to_csv(complexity_summary_csv_filepath, index=True, header=True)
+
 def calculate_cumulative_complexities(
         srcdir: t.Optional[Path],
         other_files: t.List[Path],
@@ -914,7 +1184,9 @@ def calculate_cumulative_complexities(
         bodyparts_for_artifact_plotting: t.Sequence[str] = DEFAULT_BODYPARTS_FOR_ARTIFACT_PLOTTING,
         print_prefix: t.Callable[[], str] = lambda: "",
         skip_existing: bool = False,
-):
+        dvaj_cache: t.Optional[DvajCache] = None,
+        write_outputs: bool = True,
+) -> t.Optional[ComplexityResult]:
     """Generate cumulative complexity outputs for one batch of pose CSV inputs.
 
     Inputs are collected from `other_files` plus any `*.holisticdata.csv` and
@@ -927,6 +1199,10 @@ def calculate_cumulative_complexities(
     selected weighting configuration. `plot_whitelist`, when provided, filters
     plots by relative input stem while leaving the underlying complexity
     calculation and CSV outputs unchanged.
+
+    `dvaj_cache` supplies precomputed per-file DVAJ/visibility (see `run_complexity_sweep`). With
+    `write_outputs=False` the CSV outputs are left to the caller, who can persist the returned
+    `ComplexityResult` with `write_complexity_outputs`. Returns `None` when skipped.
     """
     artifact_dir = resolve_artifact_output_dir(
         artifact_archive_root=artifact_archive_root,
@@ -1001,18 +1277,16 @@ def calculate_cumulative_complexities(
         )
         if len(plot_file_indices) == 0:
             print(f"{print_prefix()}Artifacts: no files matched the plot whitelist; plot generation will be skipped.")
-    complexity_csv_output_paths = [
-        (destdir / 'byfile' / relative_filename_stem).with_suffix(".complexity.csv")
-        for relative_filename_stem in relative_filename_stems
-    ]
+    complexity_csv_output_paths = _complexity_csv_output_paths(relative_filename_stems, destdir)
     can_skip_complexity_calculation = False
     if skip_existing:
         print(f"{print_prefix()} Checking for existing complexity calculations...")
-        can_skip_complexity_calculation = np.all([
-            complexity_csv_output_path.exists() and
-            complexity_calculation_parameters_string in pd.read_csv((complexity_csv_output_path), nrows=2, index_col=0).columns
-            for complexity_csv_output_path in complexity_csv_output_paths
-        ]) 
+        can_skip_complexity_calculation = has_complexity_outputs(
+            complexity_calculation_parameters_string,
+            complexity_csv_output_paths,
+            destdir,
+            load_complexity_manifest(destdir),
+        )
         if can_skip_complexity_calculation:
             print(f"{print_prefix()} Skipping complexity calculation because an existing complexity calculation using this parameters has been found for all input files.")
             return
@@ -1067,17 +1341,7 @@ def calculate_cumulative_complexities(
 
     skipped_plot_messages: t.List[str] = []
 
-    landmarks = [
-        lm for lm in landmark_weighting_weights.keys()
-        if landmark_weighting_weights.get(lm, 0) > 0
-    ]
-
-    landmark_names = [*landmarks]
-    
-    landmark_names = [
-        (landmark.name if isinstance(landmark, PoseLandmark) else landmark)  # type: ignore
-        for landmark in landmarks
-    ]
+    landmark_names = get_weighted_landmark_names(landmark_weighting_weights)
 
     print(f"{print_prefix()}Using measure weighting: {measure_weighting_choice.name}")
     print(f"{print_prefix()}Using landmark weighting: {landmark_weighting_choice.name}")
@@ -1106,7 +1370,12 @@ def calculate_cumulative_complexities(
     # 4. Trim trailing frames beyond which cumulative sum doesn't change.
     # 5. Calculate normalization denominators for each metric, on a per-frame basis.
     print_with_time("Step 1: Calculating DVAJs...")
-    dvaj_dfs, visibility_dfs = zip(*tqdm(generate_dvajs_with_visibility(input_files, landmark_names, include_base=include_base), total=len(input_files)))
+    dvaj_source = (
+        dvaj_cache.generate(input_files, landmark_names)
+        if dvaj_cache is not None
+        else generate_dvajs_with_visibility(input_files, landmark_names, include_base=include_base)
+    )
+    dvaj_dfs, visibility_dfs = zip(*tqdm(dvaj_source, total=len(input_files)))
     dvaj_dfs = list(dvaj_dfs)
     visibility_dfs = [visibility_df.fillna(0.0) for visibility_df in visibility_dfs]
     metric_visibility_dfs = [
@@ -1695,22 +1964,6 @@ def calculate_cumulative_complexities(
             ),
         )
 
-    # Save complexity by file
-    for i, (complexity_csv_output_path) in enumerate(tqdm(complexity_csv_output_paths)): # type: ignore
-        
-        if (complexity_csv_output_path).exists():
-            existing_complexity = pd.read_csv((complexity_csv_output_path), index_col=0)
-            if complexity_calculation_parameters_string in existing_complexity.columns:
-                # Drop to ensure no rows are retained from previous runs
-                existing_complexity.drop(columns=[complexity_calculation_parameters_string], inplace=True)
-            existing_complexity[complexity_calculation_parameters_string] = scaled_complexities[i]
-            existing_complexity.to_csv(str((complexity_csv_output_path)))
-        else:
-            (complexity_csv_output_path).parent.mkdir(parents=True, exist_ok=True)
-            csv_data = scaled_complexities[i].copy()
-            csv_data.name = complexity_calculation_parameters_string
-            csv_data.to_csv(str((complexity_csv_output_path)))
-
     update_data = pd.DataFrame({
         "stem": filename_stems,
         "frames": nontossed_frame_counts,
@@ -1728,21 +1981,14 @@ def calculate_cumulative_complexities(
     if should_output_diagnostics:
         update_data.to_csv(make_debug_path("complexity_summary.csv"))
 
-    existing_complexity_summary = None
-    complexity_summary_csv_filepath = destdir / "dvaj_complexity.csv"
-    if complexity_summary_csv_filepath.exists():
-        existing_complexity_summary = pd.read_csv(str(complexity_summary_csv_filepath), index_col=["path", "creation_method"])
-
-        # Perform an upsert on the existing complexity summary
-        # (combination of outer join and update)
-        existing_complexity_summary = pd_append_replace(
-            existing_complexity_summary,
-            update_data,
-        )
-    else:
-        existing_complexity_summary = update_data    
-
-    existing_complexity_summary.to_csv(complexity_summary_csv_filepath, index=True, header=True)
+    result = ComplexityResult(
+        creation_method=complexity_calculation_parameters_string,
+        complexity_csv_output_paths=complexity_csv_output_paths,
+        scaled_complexities=scaled_complexities,
+        summary=update_data,
+    )
+    if write_outputs:
+        write_complexity_outputs([result], destdir)
 
     if artifact_dir is not None:
         report = build_artifact_report(
@@ -1786,6 +2032,133 @@ def calculate_cumulative_complexities(
         report.write()
 
     print_with_time("Finished.")
+    return result
+
+class ComplexityVariant(t.NamedTuple):
+    measure_weighting: DvajMeasureWeighting
+    landmark_weighting: PoseLandmarkWeighting
+    include_base: bool
+    visibility_mode: VisibilityMode
+
+    def creation_method(self) -> str:
+        return get_complexity_creationmethod_name(
+            self.measure_weighting,
+            self.landmark_weighting,
+            self.visibility_mode,
+            self.include_base,
+        )
+
+# DvajCache shared with every variant run by a sweep worker (see `_init_sweep_worker`).
+_sweep_worker_dvaj_cache: t.Optional[DvajCache] = None
+
+def _init_sweep_worker(dvaj_cache: DvajCache) -> None:
+    global _sweep_worker_dvaj_cache
+    _sweep_worker_dvaj_cache = dvaj_cache
+
+def _run_sweep_variant(
+    variant: ComplexityVariant,
+    prefix: str,
+    kwargs: t.Dict[str, t.Any],
+) -> t.Optional[ComplexityResult]:
+    return calculate_cumulative_complexities(
+        measure_weighting=variant.measure_weighting,
+        landmark_weighting=variant.landmark_weighting,
+        include_base=variant.include_base,
+        visibility_mode=variant.visibility_mode,
+        print_prefix=lambda: prefix,
+        dvaj_cache=_sweep_worker_dvaj_cache,
+        write_outputs=False,
+        **kwargs,
+    )
+
+def run_complexity_sweep(
+    variants: t.Sequence[ComplexityVariant],
+    srcdir: t.Optional[Path],
+    other_files: t.List[Path],
+    destdir: Path,
+    workers: int = 1,
+    skip_existing: bool = False,
+    **kwargs,
+) -> t.List[t.Optional[ComplexityResult]]:
+    """Run `calculate_cumulative_complexities` for several weighting variants over the same inputs.
+
+    Per-file DVAJ and visibility are computed once (for the union of landmarks any variant uses) and
+    shared by every variant. With `workers > 1`, variants run in a process pool. Either way, outputs
+    are written once at the end by this process, in variant order, so each per-file CSV and
+    `dvaj_complexity.csv` is rewritten once per sweep and ends up the same as for a sequential run.
+    With `skip_existing`, variants whose outputs already exist for every input are dropped (their
+    result is `None`) before any DVAJ is computed. Extra keyword arguments are forwarded to
+    `calculate_cumulative_complexities`.
+    """
+    input_files = list(other_files)
+    relative_filename_stems = [_clip_stem_from_holistic_csv_path(file) for file in other_files]
+    if srcdir is not None:
+        files_from_srcdir = _collect_holistic_data_files(srcdir)
+        input_files.extend(files_from_srcdir)
+        relative_filename_stems.extend(
+            str(file.relative_to(srcdir).parent / _clip_stem_from_holistic_csv_path(file))
+            for file in files_from_srcdir
+        )
+
+    results: t.List[t.Optional[ComplexityResult]] = [None] * len(variants)
+    pending = list(range(len(variants)))
+    if skip_existing:
+        complexity_csv_output_paths = _complexity_csv_output_paths(relative_filename_stems, destdir)
+        complexity_manifest = load_complexity_manifest(destdir)
+        pending = [
+            i for i in pending
+            if not has_complexity_outputs(
+                variants[i].creation_method(), complexity_csv_output_paths, destdir, complexity_manifest
+            )
+        ]
+        if len(pending) < len(variants):
+            print(f"Skipping {len(variants) - len(pending)}/{len(variants)} variants with existing complexity outputs.")
+        if not pending:
+            return results
+
+    landmark_names = [
+        landmark_name
+        for i in pending
+        for landmark_name in get_weighted_landmark_names(
+            variants[i].landmark_weighting.get_weighting(include_base=variants[i].include_base)
+        )
+    ]
+    print(f"Computing DVAJs once for {len(input_files)} files, shared by {len(pending)} variants...")
+    dvaj_cache = DvajCache(input_files, landmark_names, workers=workers)
+
+    def prefix(i: int) -> str:
+        return f"{i+1}/{len(variants)}\t" if len(variants) > 1 else ""
+
+    common_kwargs = dict(srcdir=srcdir, other_files=other_files, destdir=destdir, **kwargs)
+    if workers <= 1 or len(pending) <= 1:
+        for i in pending:
+            variant = variants[i]
+            results[i] = calculate_cumulative_complexities(
+                measure_weighting=variant.measure_weighting,
+                landmark_weighting=variant.landmark_weighting,
+                include_base=variant.include_base,
+                visibility_mode=variant.visibility_mode,
+                print_prefix=lambda i=i: prefix(i),
+                dvaj_cache=dvaj_cache,
+                write_outputs=False,
+                **common_kwargs,
+            )
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            initializer=_init_sweep_worker,
+            initargs=(dvaj_cache,),
+        ) as executor:
+            futures = {
+                i: executor.submit(_run_sweep_variant, variants[i], prefix(i), common_kwargs)
+                for i in pending
+            }
+            for i, future in futures.items():
+                results[i] = future.result()
+
+    print(f"Writing complexity outputs for {sum(result is not None for result in results)} variants...")
+    write_complexity_outputs([result for result in results if result is not None], destdir)
+    return results
 
 
 if __name__ == "__main__":
@@ -1815,6 +2188,7 @@ if __name__ == "__main__":
     parser.add_argument("--include_base", choices=['true', 'false', 'both'], default='true')
     parser.add_argument("--visibility_mode", choices=[e.name for e in VisibilityMode] + ['all'], default=VisibilityMode.weight.name)
     parser.add_argument('--skip_existing', action='store_true', default=False, help='Skip files that already have a complexity summary')
+    parser.add_argument('--workers', type=int, default=1, help='Run weighting variants (and the shared DVAJ precompute) in this many processes')
     parser.add_argument("files", nargs="*", type=Path)
     args = parser.parse_args()
 
@@ -1826,39 +2200,35 @@ if __name__ == "__main__":
     def str2bool(v: str):
         return v.lower() in ("yes", "true", "t", "1")
 
-    run_iterations = list(itertools.product(
-        measure_weighting_choices,
-        landmark_weighting_choices,
-        include_base_choices,
-        visibility_mode_choices,
-    ))
-
     run_iterations = [
-        (measure_weighting, 
-         landmark_weighting, 
-         str2bool(include_base), 
-         visibility_mode) 
-        for measure_weighting, landmark_weighting, include_base, visibility_mode 
-        in run_iterations
-    ]
-        
-    for i, (measure_weighting, landmark_weighting, include_base, visibility_mode) in enumerate(run_iterations):
-        calculate_cumulative_complexities(
-            srcdir=args.srcdir,
-            other_files=args.files,
-            destdir=args.destdir,
+        ComplexityVariant(
             measure_weighting=measure_weighting,
             landmark_weighting=landmark_weighting,
-            database_csv_path=args.database_csv_path,
-            artifact_archive_root=args.artifact_archive_root,
-            artifact_output_dir=args.artifact_output_dir,
-            plot_whitelist=args.plot_whitelist,
+            include_base=str2bool(include_base),
             visibility_mode=visibility_mode,
-            include_base=include_base,
-            visibility_repair_cutoff=args.visibility_repair_cutoff,
-            visibility_plot_alpha_floor=args.visibility_plot_alpha_floor,
-            target_complexity_per_segment=args.target_complexity_per_segment,
-            bodyparts_for_artifact_plotting=args.bodyparts_for_artifact_plotting,
-            print_prefix=lambda: f"{i+1}/{len(run_iterations)}\t" if len(run_iterations) > 1 else "",
-            skip_existing=args.skip_existing,
         )
+        for measure_weighting, landmark_weighting, include_base, visibility_mode
+        in itertools.product(
+            measure_weighting_choices,
+            landmark_weighting_choices,
+            include_base_choices,
+            visibility_mode_choices,
+        )
+    ]
+
+    run_complexity_sweep(
+        run_iterations,
+        srcdir=args.srcdir,
+        other_files=args.files,
+        destdir=args.destdir,
+        workers=args.workers,
+        database_csv_path=args.database_csv_path,
+        artifact_archive_root=args.artifact_archive_root,
+        artifact_output_dir=args.artifact_output_dir,
+        plot_whitelist=args.plot_whitelist,
+        visibility_repair_cutoff=args.visibility_repair_cutoff,
+        visibility_plot_alpha_floor=args.visibility_plot_alpha_floor,
+        target_complexity_per_segment=args.target_complexity_per_segment,
+        bodyparts_for_artifact_plotting=args.bodyparts_for_artifact_plotting,
+        skip_existing=args.skip_existing,
+    )
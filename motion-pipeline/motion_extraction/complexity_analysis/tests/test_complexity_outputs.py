@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.complexity_analysis.calculate_cumulative_complexity import (
+    ComplexityResult,
+    existing_creation_methods,
+    load_complexity_manifest,
+    write_complexity_outputs,
+)
+
+
+def make_result(destdir: Path, creation_method: str, offset: float) -> ComplexityResult:
+    paths = [destdir / "byfile" / "a.complexity.csv", destdir / "byfile" / "sub" / "b.complexity.csv"]
+    complexities = [
+        pd.Series(np.arange(4, dtype=float) + offset, index=pd.Index(range(4), name="frame")),
+        pd.Series(np.arange(3, dtype=float) * 2 + offset, index=pd.Index(range(3), name="frame")),
+    ]
+    summary = pd.DataFrame(
+        {"frames": [4, 3], "complexity": [offset, offset + 1]},
+        index=pd.MultiIndex.from_tuples(
+            [("a", creation_method), ("sub/b", creation_method)],
+            names=["path", "creation_method"],
+        ),
+    )
+    return ComplexityResult(creation_method, paths, complexities, summary)
+
+
+class ComplexityOutputTests(unittest.TestCase):
+    def test_batched_write_matches_one_result_at_a_time(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            batched_dir = Path(tmp) / "batched"
+            sequential_dir = Path(tmp) / "sequential"
+            for destdir in (batched_dir, sequential_dir):
+                write_complexity_outputs([make_result(destdir, "m1", 0.0)], destdir)
+
+            batched = [make_result(batched_dir, name, offset) for name, offset in (("m2", 10.0), ("m1", 20.0))]
+            write_complexity_outputs(batched, batched_dir)
+            for name, offset in (("m2", 10.0), ("m1", 20.0)):
+                write_complexity_outputs([make_result(sequential_dir, name, offset)], sequential_dir)
+
+            for relative_path in ("byfile/a.complexity.csv", "byfile/sub/b.complexity.csv", "dvaj_complexity.csv"):
+                self.assertEqual(
+                    (batched_dir / relative_path).read_text(),
+                    (sequential_dir / relative_path).read_text(),
+                )
+            columns = pd.read_csv(batched_dir / "byfile" / "a.complexity.csv", index_col=0).columns
+            self.assertEqual(list(columns), ["m2", "m1"])
+
+    def test_manifest_answers_skip_checks_until_csv_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            destdir = Path(tmp)
+            write_complexity_outputs(
+                [make_result(destdir, "m1", 0.0), make_result(destdir, "m2", 1.0)],
+                destdir,
+            )
+            manifest = load_complexity_manifest(destdir)
+            self.assertEqual(manifest["sub/b.complexity.csv"]["creation_methods"], ["m1", "m2"])
+
+            csv_path = destdir / "byfile" / "a.complexity.csv"
+            self.assertEqual(existing_creation_methods(csv_path, destdir, manifest), {"m1", "m2"})
+
+            # An edit made outside the writer invalidates the manifest entry; the header is read instead.
+            pd.read_csv(csv_path, index_col=0)[["m1"]].to_csv(csv_path)
+            self.assertEqual(existing_creation_methods(csv_path, destdir, manifest), {"m1"})
+            self.assertEqual(
+                existing_creation_methods(destdir / "byfile" / "missing.complexity.csv", destdir, manifest),
+                set(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
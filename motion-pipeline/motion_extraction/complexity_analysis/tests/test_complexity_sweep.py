@@ -0,0 +1,103 @@
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from motion_extraction.complexity_analysis import calculate_cumulative_complexity as complexity_module
+from motion_extraction.complexity_analysis.calculate_cumulative_complexity import (
+    ComplexityVariant,
+    DvajMeasureWeighting,
+    PoseLandmarkWeighting,
+    VisibilityMode,
+    calculate_cumulative_complexities,
+    run_complexity_sweep,
+)
+from motion_extraction.complexity_analysis.tests.test_dvaj_cache import write_holistic_csv
+
+VARIANTS = [
+    ComplexityVariant(DvajMeasureWeighting.decreasing_by_quarter, PoseLandmarkWeighting.balanced, True, VisibilityMode.weight),
+    ComplexityVariant(DvajMeasureWeighting.equal, PoseLandmarkWeighting.dempster, False, VisibilityMode.none),
+]
+OUTPUT_FILES = ["byfile/a.complexity.csv", "byfile/sub/b.complexity.csv", "dvaj_complexity.csv"]
+
+
+class ComplexitySweepTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.srcdir = self.root / "holistic"
+        write_holistic_csv(self.srcdir / "a.holisticdata.raw.csv", 80)
+        write_holistic_csv(self.srcdir / "sub" / "b.holisticdata.raw.csv", 95)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def sweep(self, destdir: Path, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return run_complexity_sweep(VARIANTS, srcdir=self.srcdir, other_files=[], destdir=destdir, **kwargs)
+
+    def test_sweep_matches_separate_runs(self):
+        separate_dir = self.root / "separate"
+        with redirect_stdout(io.StringIO()):
+            for variant in VARIANTS:
+                calculate_cumulative_complexities(
+                    srcdir=self.srcdir,
+                    other_files=[],
+                    destdir=separate_dir,
+                    measure_weighting=variant.measure_weighting,
+                    landmark_weighting=variant.landmark_weighting,
+                    include_base=variant.include_base,
+                    visibility_mode=variant.visibility_mode,
+                )
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                sweep_dir = self.root / f"sweep{workers}"
+                results = self.sweep(sweep_dir, workers=workers)
+                self.assertEqual([result.creation_method for result in results], [v.creation_method() for v in VARIANTS])
+                for relative_path in OUTPUT_FILES:
+                    # Separate runs reparse the CSVs written by the previous variant, which can move
+                    # the last digit, so compare values rather than text.
+                    pd.testing.assert_frame_equal(
+                        pd.read_csv(sweep_dir / relative_path),
+                        pd.read_csv(separate_dir / relative_path),
+                        check_exact=False,
+                        rtol=1e-12,
+                        atol=1e-15,
+                    )
+
+    def test_skip_existing_does_not_compute_dvajs(self):
+        destdir = self.root / "out"
+        self.sweep(destdir)
+        before = {relative_path: (destdir / relative_path).read_text() for relative_path in OUTPUT_FILES}
+
+        with mock.patch.object(complexity_module, "DvajCache") as dvaj_cache:
+            self.assertEqual(self.sweep(destdir, skip_existing=True), [None, None])
+        dvaj_cache.assert_not_called()
+        for relative_path, text in before.items():
+            self.assertEqual((destdir / relative_path).read_text(), text)
+
+    def test_skip_existing_only_runs_missing_variants(self):
+        destdir = self.root / "out"
+        with redirect_stdout(io.StringIO()):
+            run_complexity_sweep(VARIANTS[:1], srcdir=self.srcdir, other_files=[], destdir=destdir)
+
+        with mock.patch.object(complexity_module, "DvajCache", wraps=complexity_module.DvajCache) as dvaj_cache:
+            results = self.sweep(destdir, skip_existing=True)
+        self.assertIsNone(results[0])
+        self.assertEqual(results[1].creation_method, VARIANTS[1].creation_method())
+        landmark_names = dvaj_cache.call_args.args[1]
+        self.assertEqual(
+            set(landmark_names),
+            set(complexity_module.get_weighted_landmark_names(
+                VARIANTS[1].landmark_weighting.get_weighting(include_base=VARIANTS[1].include_base)
+            )),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import multiprocessing
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from motion_extraction.complexity_analysis.calculate_cumulative_complexity import (
+    DvajCache,
+    PoseLandmarkWeighting,
+    generate_dvajs_with_visibility,
+    get_weighted_landmark_names,
+)
+from motion_extraction.motion_output_provider.tests.synthetic_clip import make_holistic_clip
+
+LANDMARK_NAMES = get_weighted_landmark_names(PoseLandmarkWeighting.balanced.get_weighting(include_base=True))
+
+
+def write_holistic_csv(path: Path, frame_count: int) -> Path:
+    clip = make_holistic_clip(frame_count)
+    clip.insert(0, "frame", range(frame_count))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    clip.to_csv(path, index=False)
+    return path
+
+
+class DvajStoreTests(unittest.TestCase):
+    def test_stored_dvajs_match_computed_ones(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [
+                write_holistic_csv(Path(tmp) / "a.holisticdata.raw.csv", 50),
+                write_holistic_csv(Path(tmp) / "sub" / "b.holisticdata.raw.csv", 60),
+            ]
+            store_dir = Path(tmp) / "dvaj"
+
+            self.assertEqual(DvajCache(files, LANDMARK_NAMES, store_dir=store_dir).stored_count, 0)
+            cache = DvajCache(files, LANDMARK_NAMES, store_dir=store_dir)
+            self.assertEqual(cache.stored_count, 2)
+
+            expected = list(generate_dvajs_with_visibility(files, LANDMARK_NAMES))
+            actual = list(cache.generate(files, LANDMARK_NAMES))
+            self.assertEqual(len(actual), len(expected))
+            for (dvaj, visibility), (expected_dvaj, expected_visibility) in zip(actual, expected):
+                pd.testing.assert_frame_equal(dvaj, expected_dvaj)
+                pd.testing.assert_frame_equal(visibility, expected_visibility)
+
+    def test_only_changed_files_are_recomputed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [
+                write_holistic_csv(Path(tmp) / "a.holisticdata.raw.csv", 50),
+                write_holistic_csv(Path(tmp) / "b.holisticdata.raw.csv", 60),
+            ]
+            store_dir = Path(tmp) / "dvaj"
+            DvajCache(files, LANDMARK_NAMES, store_dir=store_dir)
+
+            write_holistic_csv(files[1], 45)
+            self.assertEqual(DvajCache(files, LANDMARK_NAMES, store_dir=store_dir).stored_count, 1)
+            # A different landmark selection is stored separately.
+            self.assertEqual(DvajCache(files, LANDMARK_NAMES[:3], store_dir=store_dir).stored_count, 0)
+
+    def test_truncated_store_is_recomputed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [write_holistic_csv(Path(tmp) / "a.holisticdata.raw.csv", 50)]
+            store_dir = Path(tmp) / "dvaj"
+            DvajCache(files, LANDMARK_NAMES, store_dir=store_dir)
+            (store_path,) = store_dir.glob("*.npz")
+            store_path.write_bytes(store_path.read_bytes()[:100])
+
+            self.assertEqual(DvajCache(files, LANDMARK_NAMES, store_dir=store_dir).stored_count, 0)
+            self.assertEqual(DvajCache(files, LANDMARK_NAMES, store_dir=store_dir).stored_count, 1)
+
+    def test_spawned_workers_match_in_process_computation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            files = [
+                write_holistic_csv(Path(tmp) / "a.holisticdata.raw.csv", 50),
+                write_holistic_csv(Path(tmp) / "b.holisticdata.raw.csv", 60),
+            ]
+            cache = DvajCache(files, LANDMARK_NAMES, workers=2, mp_context=multiprocessing.get_context("spawn"))
+
+            expected = list(generate_dvajs_with_visibility(files, LANDMARK_NAMES))
+            for (dvaj, visibility), (expected_dvaj, expected_visibility) in zip(cache.generate(files, LANDMARK_NAMES), expected):
+                pd.testing.assert_frame_equal(dvaj, expected_dvaj)
+                pd.testing.assert_frame_equal(visibility, expected_visibility)
+
+
+if __name__ == "__main__":
+    unittest.main()
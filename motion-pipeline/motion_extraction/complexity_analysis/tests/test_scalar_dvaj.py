@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.complexity_analysis.uist_complexityanalysis import DVAJ, calc_scalar_dvaj
+
+
+def _per_landmark_scalar_dvaj(motion: pd.DataFrame, landmark_names) -> pd.DataFrame:
+    # Original per-landmark pandas formulation, kept here as the reference.
+    out_cols = []
+    out_data = []
+    for landmark in landmark_names:
+        dist_data = motion[[f"{landmark}_x", f"{landmark}_y", f"{landmark}_z"]].diff().pow(2).sum(1).pow(0.5)
+        velocity_data = dist_data.diff().abs()
+        acceleration_data = velocity_data.diff().abs()
+        jerk_data = acceleration_data.diff().abs()
+        out_cols.extend([f"{landmark}_{measure.name}" for measure in DVAJ])
+        out_data.extend([dist_data, velocity_data, acceleration_data, jerk_data])
+    return pd.concat(out_data, axis=1, keys=out_cols)
+
+
+def _random_motion(frame_count: int, landmark_names, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        f"{landmark}_{axis}": rng.normal(size=frame_count).cumsum()
+        for landmark in landmark_names
+        for axis in ("x", "y", "z", "vis")
+    }
+    return pd.DataFrame(data, index=pd.Index(np.arange(frame_count) + 5, name="frame"))
+
+
+class ScalarDvajTests(unittest.TestCase):
+    LANDMARKS = ["LEFT_WRIST", "RIGHT_WRIST", "NOSE"]
+
+    def test_matches_per_landmark_reference(self):
+        motion = _random_motion(50, self.LANDMARKS)
+
+        expected = _per_landmark_scalar_dvaj(motion, self.LANDMARKS)
+        actual = calc_scalar_dvaj(motion, self.LANDMARKS)
+
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+    def test_matches_reference_with_missing_coordinates(self):
+        motion = _random_motion(30, self.LANDMARKS, seed=1)
+        motion.iloc[3:7, motion.columns.get_loc("LEFT_WRIST_x")] = np.nan
+        motion.iloc[10:12, [motion.columns.get_loc(f"NOSE_{axis}") for axis in ("x", "y", "z")]] = np.nan
+
+        expected = _per_landmark_scalar_dvaj(motion, self.LANDMARKS)
+        actual = calc_scalar_dvaj(motion, self.LANDMARKS)
+
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+    def test_handles_short_clips(self):
+        for frame_count in (0, 1, 2):
+            motion = _random_motion(frame_count, self.LANDMARKS)
+            expected = _per_landmark_scalar_dvaj(motion, self.LANDMARKS)
+            actual = calc_scalar_dvaj(motion, self.LANDMARKS)
+            self.assertListEqual(list(actual.columns), list(expected.columns))
+            np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.complexity_analysis.calculate_cumulative_complexity import trim_df_to_convergence
+
+
+def reference_trim_df_to_convergence(df: pd.DataFrame):
+    """Row-by-row implementation that trim_df_to_convergence replaced."""
+    last_changing_frame = df.shape[0] - 1
+    diff = df.diff()
+    for i in range(df.shape[0] - 1, -1, -1):
+        if diff.iloc[i].any():
+            last_changing_frame = i
+            break
+
+    tossed_frame_count = df.shape[0] - last_changing_frame - 1
+    return df.iloc[:last_changing_frame + 1], tossed_frame_count
+
+
+def random_cumsum_frame(rng: np.random.Generator) -> pd.DataFrame:
+    frames = int(rng.integers(0, 40))
+    columns = int(rng.integers(1, 5))
+    increments = rng.random((frames, columns))
+    # Zero out random stretches (including trailing ones) so the sums plateau.
+    increments[rng.random((frames, columns)) < rng.random()] = 0.0
+    if frames > 0 and rng.random() < 0.5:
+        increments[int(rng.integers(0, frames)):] = 0.0
+    values = np.cumsum(increments, axis=0)
+    values[rng.random((frames, columns)) < 0.1] = np.nan
+    if rng.random() < 0.2:
+        values[:] = np.nan
+    return pd.DataFrame(values, columns=[f"c{i}" for i in range(columns)])
+
+
+class TrimToConvergenceTests(unittest.TestCase):
+    def assert_matches_reference(self, df: pd.DataFrame):
+        trimmed, tossed = trim_df_to_convergence(df)
+        expected_trimmed, expected_tossed = reference_trim_df_to_convergence(df)
+        self.assertEqual(tossed, expected_tossed)
+        pd.testing.assert_frame_equal(trimmed, expected_trimmed)
+        self.assertEqual(len(trimmed) + tossed, len(df))
+
+    def test_matches_reference_on_random_frames(self):
+        rng = np.random.default_rng(1234)
+        for _ in range(500):
+            self.assert_matches_reference(random_cumsum_frame(rng))
+
+    def test_trims_trailing_static_frames(self):
+        df = pd.DataFrame({"a": [0.0, 1.0, 2.0, 2.0, 2.0], "b": [0.0, 0.0, 0.5, 0.5, 0.5]})
+        trimmed, tossed = trim_df_to_convergence(df)
+        self.assertEqual(tossed, 2)
+        self.assertEqual(list(trimmed.index), [0, 1, 2])
+
+    def test_never_changing_frame_is_not_trimmed(self):
+        for df in (
+            pd.DataFrame({"a": [1.0, 1.0, 1.0]}),
+            pd.DataFrame({"a": [np.nan, np.nan]}),
+            pd.DataFrame({"a": [3.0]}),
+            pd.DataFrame({"a": []}, dtype=float),
+        ):
+            self.assert_matches_reference(df)
+            self.assertEqual(trim_df_to_convergence(df)[1], 0)
+
+    def test_keeps_non_default_index(self):
+        df = pd.DataFrame({"a": [0.0, 1.0, 1.0]}, index=pd.Index([10, 11, 12], name="frame"))
+        self.assert_matches_reference(df)
+
+
+if __name__ == "__main__":
+    unittest.main()
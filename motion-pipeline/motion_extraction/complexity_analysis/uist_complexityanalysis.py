@@ -13,12 +13,14 @@
 """
 from enum import Enum, auto
 import typing as t
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 from ..mp_utils import PoseLandmark as PoseLandmarks
 from ..update_database import load_db
+from ..holistic_cache import read_holistic_data
 
 _HOLISTIC_DATA_LEGACY_SUFFIX = ".holisticdata.csv"
 _HOLISTIC_DATA_RAW_SUFFIX = ".holisticdata.raw.csv"
@@ -66,26 +68,31 @@ def calc_scalar_dvaj(motion: pd.DataFrame, landmark_names: t.Collection[str]) ->
             - Velocity
             - Acceleration
             - Jerk
-    """
-    out_cols = []
-    out_data = []
-
-    # Calculate the scalar distance traveled each frame for each joint.
-    for landmark in landmark_names:
-        dist_col = f"{landmark}_{DVAJ.distance.name}"
-        velocity_col = f"{landmark}_{DVAJ.velocity.name}"
-        acceleration_col = f"{landmark}_{DVAJ.acceleration.name}"
-        jerk_col = f"{landmark}_{DVAJ.jerk.name}"
-
-        dist_data = motion[[f"{landmark}_x", f"{landmark}_y", f"{landmark}_z"]].diff().pow(2).sum(1).pow(0.5)
-        velocity_data = dist_data.diff().abs()
-        acceleration_data = velocity_data.diff().abs()
-        jerk_data = acceleration_data.diff().abs()
 
-        out_cols.extend([dist_col, velocity_col, acceleration_col, jerk_col])
-        out_data.extend([dist_data, velocity_data, acceleration_data, jerk_data])
-
-    return pd.concat(out_data, axis=1, keys=out_cols)
+        All landmarks are processed at once: the x/y/z columns are reshaped into a
+        (frames x landmarks x 3) array and each measure is a single array op over it.
+        Output columns are `{landmark}_{measure}`, grouped by landmark in DVAJ order.
+    """
+    landmark_names = list(landmark_names)
+    frame_count = len(motion.index)
+    coordinate_cols = [f"{landmark}_{axis}" for landmark in landmark_names for axis in ("x", "y", "z")]
+    positions = motion[coordinate_cols].to_numpy(dtype=np.float64).reshape(frame_count, len(landmark_names), 3)
+
+    measures = np.full((frame_count, len(landmark_names), len(DVAJ)), np.nan)
+    if frame_count > 0:
+        # nansum mirrors pandas' skipna sum: the first frame (no predecessor) has distance 0,
+        # and a partially missing coordinate contributes only the axes that are present.
+        measures[0, :, 0] = 0.0
+        measures[1:, :, 0] = np.sqrt(np.nansum(np.square(np.diff(positions, axis=0)), axis=-1))
+        for measure_i in range(1, len(DVAJ)):
+            measures[1:, :, measure_i] = np.abs(np.diff(measures[:, :, measure_i - 1], axis=0))
+
+    out_cols = [f"{landmark}_{measure.name}" for landmark in landmark_names for measure in DVAJ]
+    return pd.DataFrame(
+        measures.reshape(frame_count, len(out_cols)),
+        index=motion.index,
+        columns=out_cols,
+    )
 
 
 def get_all_landmarks_in_dataframe(frame: pd.DataFrame) -> t.List[str]:
@@ -174,7 +181,7 @@ def analyze_complexities(
         return
 
     
-    data = pd.read_csv(files[0])
+    data = read_holistic_data(files[0])
 
     if start_frames[0] is not None and end_frames[0] is not None:
         data = data[start_frames[0]:end_frames[0]]
@@ -202,7 +209,7 @@ def analyze_complexities(
 
     for i, file in enumerate(files[1:]):
         i = i + 1 # because we already did the first one
-        data = pd.read_csv(file)
+        data = read_holistic_data(file)
 
         if start_frames[i] is not None and end_frames[i] is not None:
             data = data[start_frames[i]:end_frames[i]]
@@ -6,12 +6,11 @@ import numpy as np
 import pandas as pd
 from pytransform3d import rotations as pr
 from pytransform3d import transformations as pt
-from pytransform3d.transform_manager import TransformManager
 
-from .MecanimHumanoid import HumanoidPositionSkeleton
+from .holistic_cache import read_holistic_data
+from .MecanimHumanoid import HumanoidPositionClip
 from .motion_output_provider import (BVHOutputProvider, MotionOutputProvider,
 									 NaoTrajectoryOutputProvider)
-from .utils import throttle
 
 _HOLISTIC_DATA_LEGACY_SUFFIX = '.holisticdata.csv'
 _HOLISTIC_DATA_RAW_SUFFIX = '.holisticdata.raw.csv'
@@ -41,21 +40,12 @@ def convert_to_jointspace(holistic_data: pd.DataFrame, naocsv_outpath: Path, bvh
 	Concert the holistic data to jointspace and output to bvh file and robot trajectory
 	"""
 
-	@throttle(1)
-	def print_progress(frame_i, i_max, pretext, posttext = ''):
-		percent = frame_i * 100 / i_max
-		print(f"{pretext} {percent:.2f}% ({frame_i}/{max_frames}) {posttext}")
-
 	print("Calculating humanoid position skeletons...")
 	METERS_TO_CM = 100.
 	max_frames = frame_limit if frame_limit > 0 else len(holistic_data)
 
-	def make_pose_and_print(frame_i, row):
-		print_progress(frame_i, max_frames, "Step 1/2", "Calculating skeletons")
-		return HumanoidPositionSkeleton.from_mp_pose(row)
-
-	skels = [make_pose_and_print(i, row) for i, row in holistic_data.iloc[:max_frames].iterrows()]
-	link_lengths = pd.DataFrame(s.get_offsets_and_measurements() for s in skels)    
+	clip = HumanoidPositionClip.from_mp_pose_dataframe(holistic_data.iloc[:max_frames])
+	link_lengths = clip.get_offsets_and_measurements()
 	avg_offsets_and_measurements = link_lengths.mean(axis=0)
 	avg_offsets_and_measurements_cm = avg_offsets_and_measurements * METERS_TO_CM
 	print(avg_offsets_and_measurements_cm)
@@ -70,14 +60,11 @@ def convert_to_jointspace(holistic_data: pd.DataFrame, naocsv_outpath: Path, bvh
 		naocsv_outpath,
 	)
 
-	for i, skel in enumerate(skels[:max_frames]):     
-		print_progress(i, max_frames, 'Step 2/2', 'Processing Frames')
-		try:
-			tfs = skel.get_transforms(plot=False)   
-		except:
-			tfs = None
-		nao_output_provider.process_frame(skel, tfs)
-		bvh_output_provider.process_frame(skel, tfs) 
+	transforms = clip.get_transforms()
+	print(f"Computed bone frames for {len(transforms)} frames ({int((~transforms.valid).sum())} without a usable pose)")
+	for step_i, output_provider in enumerate((nao_output_provider, bvh_output_provider)):
+		print(f"Step {step_i + 1}/2: {type(output_provider).__name__}")
+		output_provider.process_clip(clip, transforms)
            
 	print("\nWriting output...")
 	bvh_output_provider.write_output()
@@ -107,13 +94,12 @@ if __name__ == "__main__":
 		glob_data = holistic_data.parent.glob(holistic_data.name)
 		for data_file in glob_data:
 			print(f"Processing {data_file}")
-			with data_file.open('r') as f:
-				holistic_dataframe = pd.read_csv(f, index_col='frame')
-				clip_stem = _clip_stem_from_holistic_csv_path(data_file)
-				naocsv_outpath = args.naocsv_output_folder / f'{clip_stem}.nao.csv'
-				bvh_out_path = args.bvh_output_folder / f'{clip_stem}.bvh'
-				csv_out_path = args.csv_output_folder / f'{clip_stem}.bvh.csv' if args.csv_output_folder is not None else None
-				# out_path = args.output_folder / f'{clip_stem}.jointspace'
-				convert_to_jointspace(holistic_dataframe, naocsv_outpath, bvh_out_path, bvhcsv_outpath = csv_out_path, frame_limit = args.frame_limit)
+			holistic_dataframe = read_holistic_data(data_file, index_col='frame')
+			clip_stem = _clip_stem_from_holistic_csv_path(data_file)
+			naocsv_outpath = args.naocsv_output_folder / f'{clip_stem}.nao.csv'
+			bvh_out_path = args.bvh_output_folder / f'{clip_stem}.bvh'
+			csv_out_path = args.csv_output_folder / f'{clip_stem}.bvh.csv' if args.csv_output_folder is not None else None
+			# out_path = args.output_folder / f'{clip_stem}.jointspace'
+			convert_to_jointspace(holistic_dataframe, naocsv_outpath, bvh_out_path, bvhcsv_outpath = csv_out_path, frame_limit = args.frame_limit)
                 
-				print(f"\nDone converting {data_file.name}!")
+			print(f"\nDone converting {data_file.name}!")
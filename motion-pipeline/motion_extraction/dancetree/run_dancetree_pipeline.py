@@ -1,13 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import functools
+import multiprocessing
+import os
+import time
 import typing as t
-from ..artifacts import resolve_artifact_output_dir
+import pandas as pd
+from ..artifacts import build_artifact_report, resolve_artifact_output_dir
+from ..build_cache import BuildCache, build_key
+from ..stage_scheduler import StageScheduler
 from ..extract_holistic_data import compute_holistic_data
 from ..update_database import update_database
+from ..video_metadata import set_video_metadata_cache_dir
 from ..complexity_analysis import calculate_cumulative_complexity as cmplxty
 from ..complexity_analysis.add_complexity_to_dancetree import add_complexities_to_dancetrees
 from .bundle_data import bundle_dance_data_as_json
 
 
+PIPELINE_CACHE_FILENAME = "pipeline_cache.json"
+VIDEO_METADATA_CACHE_DIRNAME = "video_metadata"
+HOLISTIC_MODEL_COMPLEXITY = 2
+STEP_COUNT = 6
+
+_ROOT_PACKAGE = __package__.rpartition('.')[0]
+# Item name of the stages that build a single output for the whole dataset.
+_DATASET_ITEM = "*"
+# Video suffixes each step picks up (see update_database.valid_file_endings and
+# audio_analysis.perform_analysis.ACCEPT_VIDEO_FILES).
+_DATABASE_VIDEO_SUFFIXES = ('.mp4', '.m4v', '.mov')
+_AUDIO_VIDEO_SUFFIXES = ('.mp4', '.mov', '.avi', '.mkv')
+_HOLISTIC_DATA_LEGACY_SUFFIX = ".holisticdata.csv"
+_HOLISTIC_DATA_RAW_SUFFIX = ".holisticdata.raw.csv"
+_POSE2D_DATA_RAW_SUFFIX = ".pose2d.raw.csv"
+
+def _clips_by_relative_stem(root: Path, paths: t.Iterable[Path]) -> t.Dict[str, Path]:
+    return {path.relative_to(root).with_suffix('').as_posix(): path for path in paths}
+
+def _holistic_data_files_by_clip(root_folder: Path) -> t.Dict[str, Path]:
+    # Same selection as calculate_cumulative_complexity: raw CSVs win over legacy ones.
+    files_by_clip: t.Dict[str, Path] = {}
+    for suffix in (_HOLISTIC_DATA_LEGACY_SUFFIX, _HOLISTIC_DATA_RAW_SUFFIX):
+        for holistic_data_file in root_folder.rglob(f"*{suffix}"):
+            files_by_clip[holistic_data_file.relative_to(root_folder).as_posix()[: -len(suffix)]] = holistic_data_file
+    return files_by_clip
+
+def _is_nonempty_file(path: Path) -> bool:
+    return path.exists() and path.stat().st_size > 0
+
+def _database_row_keys(database_csv_path: Path) -> t.Dict[str, str]:
+    """A key per database row, from the row's text as stored in the CSV."""
+    if not database_csv_path.exists():
+        return {}
+    db = pd.read_csv(database_csv_path, index_col='clipRelativeStem', dtype=str, keep_default_na=False)
+    return {clip: build_key(row.to_dict()) for clip, row in db.iterrows()}
+
+def _step_prefix(step_number: int, label: str) -> str:
+    return f'Step {step_number}/{STEP_COUNT}: {label}:'
+
+# Worker processes are spawned rather than forked: the pipeline's stages run on threads, and
+# forking a process with other threads running can deadlock the child.
+_MP_CONTEXT = multiprocessing.get_context('spawn')
+
+def _run_in_subprocess(function: t.Callable[..., t.Any], **kwargs) -> t.Any:
+    with ProcessPoolExecutor(max_workers=1, mp_context=_MP_CONTEXT) as executor:
+        return executor.submit(function, **kwargs).result()
+
+def _stage_timings_table(scheduler: StageScheduler) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                'stage': timing.name,
+                'workers': timing.workers,
+                'status': timing.status,
+                'start (s)': timing.started_s,
+                'end (s)': timing.finished_s,
+                'duration (s)': timing.duration_s,
+            }
+            for timing in scheduler.timings
+        ],
+        columns=['stage', 'workers', 'status', 'start (s)', 'end (s)', 'duration (s)'],
+    ).round(2)
+
 def _audio_result_subdirectory(
     results_dir: Path,
     result_type: t.Literal['analysis', 'dancetrees', 'segmentsimilarity'],
@@ -25,9 +98,7 @@ def run_dancetree_pipeline(
     bundle_media_export_path: Path,
     include_audio_in_bundle: bool = False,
     include_thumbnail_in_bundle: bool = False,
-    rewrite_existing_holistic_data: bool = False,
-    skip_existing_cumulative_complexity: bool = False,
-    skip_existing_audioanalysis: bool = False,
+    force_rebuild: bool = False,
     holistic_debug_frames_dir: t.Optional[Path] = None,
     debug_frame_whitelist: t.Optional[t.Sequence[str]] = None,
     complexity_plot_whitelist: t.Optional[t.Sequence[str]] = None,
@@ -43,8 +114,32 @@ def run_dancetree_pipeline(
     suppress_audio_analysis_artifacts: bool = False,
     suppress_add_complexity_artifacts: bool = False,
     suppress_bundle_data_artifacts: bool = False,
-
+    holistic_workers: int = 1,
+    holistic_prefetch_frames: int = 0,
+    complexity_workers: int = 1,
+    audio_workers: int = 1,
+    skip_audio_plots: bool = False,
+    pipeline_workers: t.Optional[int] = None,
 ):
+    """
+    Run the six steps that turn the videos under `video_srcdir` into the frontend bundle.
+
+    Each step is incremental: `temp_dir/pipeline_cache.json` records, per step and clip, a hash of the
+    clip's inputs (video bytes, holistic CSV, upstream outputs, database row), the step's parameters
+    and the source of the code that runs it. A step only recomputes the clips whose hash changed or
+    whose outputs are missing, and is skipped when none did. Complexity is normalized across the
+    dataset, so any change there renormalizes every clip. `force_rebuild` ignores the recorded
+    hashes and recomputes everything.
+
+    The steps run as a dependency graph, so audio analysis (which only needs the videos) runs
+    alongside holistic extraction and complexity. `holistic_workers`, `complexity_workers` and
+    `audio_workers` are the process counts of those steps; steps are only started together while their workers fit in
+    `pipeline_workers` (default: the CPU count). Per-step timings are printed and, when artifacts are
+    enabled, written to the run's `report.md`.
+
+    Video properties are read once per video version and shared by all steps through
+    `temp_dir/video_metadata` (see `video_metadata.read_video_metadata`).
+    """
     complexities_temp_dir = temp_dir / 'complexities'
     audio_results_temp_dir = temp_dir / 'audio_analysis'
     audio_analysis_tree_dir = _audio_result_subdirectory(
@@ -58,6 +153,8 @@ def run_dancetree_pipeline(
 
     audio_cache_dir =  bundle_media_export_path / 'audio' if include_audio_in_bundle \
                         else audio_results_temp_dir / 'audiocache'
+    # Bundled audio is served to the frontend, so it stays compressed; otherwise analysis reads float PCM.
+    audio_cache_suffix = '.mp3' if include_audio_in_bundle else '.wav'
     
     thumbnails_outdir = bundle_media_export_path / 'thumbnails' if include_thumbnail_in_bundle \
                         else None
@@ -74,10 +171,6 @@ def run_dancetree_pipeline(
         include_base=COMPLEXITY_INCLUDE_BASE,
     )
     
-    STEP_COUNT = 6
-    current_step = 1
-    step = lambda: f'Step {current_step}/{STEP_COUNT}:'
-
     suppressed_steps = {
         "01-update-database": suppress_update_database_artifacts,
         "02-compute-holistic-data": suppress_compute_holistic_data_artifacts,
@@ -101,89 +194,342 @@ def run_dancetree_pipeline(
         artifact_dir.mkdir(parents=True, exist_ok=True)
         return artifact_dir
 
-    current_step += 1
-    update_database(
-        database_csv_path=database_csv_path,
-        videos_dir=video_srcdir,
-        thumbnails_dir=thumbnails_outdir,
-        print_prefix=lambda: f'{step()} update database:',
-        replace_existing_thumbnails=False,
-        artifact_output_dir=get_step_artifact_dir("01-update-database", suppress_update_database_artifacts),
-    )
+    cache = BuildCache(temp_dir / PIPELINE_CACHE_FILENAME)
+    # Before any step starts, so their worker processes inherit it.
+    set_video_metadata_cache_dir(temp_dir / VIDEO_METADATA_CACHE_DIRNAME)
+    if force_rebuild:
+        for stage in suppressed_steps:
+            cache.invalidate(stage)
 
-    current_step += 1
-    compute_holistic_data(
-        video_folder=video_srcdir,
-        output_folder=holistic_data_srcdir,
-        pose2d_output_folder=pose2d_data_srcdir,
-        frame_output_folder=holistic_frames_dir,
-        debug_frame_whitelist=debug_frame_whitelist,
-        rewrite_existing=rewrite_existing_holistic_data,
-        print_prefix=lambda: f'{step()} compute holistic data:',
-        artifact_output_dir=get_step_artifact_dir("02-compute-holistic-data", suppress_compute_holistic_data_artifacts),
-    )
+    def source_hash(*module_names: str) -> str:
+        return cache.source_hash(*(f"{_ROOT_PACKAGE}.{module_name}" for module_name in module_names))
 
-    current_step += 1
-    cmplxty.calculate_cumulative_complexities(
-        srcdir=holistic_data_srcdir,
-        other_files=[],
-        destdir=complexities_temp_dir,
-        measure_weighting=COMPLEXITY_MEASURE_WEIGHITNG,
-        landmark_weighting=COMPLEXITY_LANDMARK_WEIGHITNG,
-        database_csv_path=database_csv_path,
-        artifact_output_dir=get_step_artifact_dir("03-cumulative-complexity", suppress_cumulative_complexity_artifacts),
-        plot_whitelist=complexity_plot_whitelist,
-        include_base=True,
-        visibility_mode=COMPLEXITY_VISIBILITY_MODE,
-        visibility_repair_cutoff=visibility_repair_cutoff,
-        visibility_plot_alpha_floor=visibility_plot_alpha_floor,
-        target_complexity_per_segment=target_complexity_per_segment,
-        bodyparts_for_artifact_plotting=bodyparts_for_artifact_plotting or cmplxty.DEFAULT_BODYPARTS_FOR_ARTIFACT_PLOTTING,
-        print_prefix=lambda: f'{step()} calc. complexity:',
-        skip_existing=skip_existing_cumulative_complexity,
-    )
-    
-    current_step += 1
-    if skip_existing_audioanalysis and audio_analysis_tree_dir.exists() and (audio_results_temp_dir / 'audio_analysis_summary.csv').exists():
-        print(f"{step()} audio analysis: reusing existing audio analysis outputs")
-    else:
-        from ..audio_analysis.perform_analysis import perform_audio_analysis
-
-        perform_audio_analysis(
-            videosrcdir=video_srcdir,
-            audiosrcdir=None,
-            audio_analysis_destdir=audio_results_temp_dir,
-            audiocachedir=audio_cache_dir if audio_cache_dir else temp_dir / 'audio_cache',
-            analysis_summary_out=audio_results_temp_dir / 'audio_analysis_summary.csv',
-            database_csv_path=database_csv_path,
-            include_mem_usage=False,
-            skip_existing=skip_existing_audioanalysis,
-            print_prefix=lambda: f'{step()} audio analysis:',
-            artifact_output_dir=get_step_artifact_dir("04-audio-analysis", suppress_audio_analysis_artifacts),
+    video_paths = sorted(path for path in video_srcdir.rglob('*') if path.is_file())
+    audio_analysis_dir = _audio_result_subdirectory(audio_results_temp_dir, result_type='analysis', input_type='video')
+    audio_summary_path = audio_results_temp_dir / 'audio_analysis_summary.csv'
+
+    # Step 1: one database for all clips, rebuilt when a video changes or the CSV was edited elsewhere.
+    def update_database_step():
+        prefix = _step_prefix(1, 'update database')
+        database_videos = _clips_by_relative_stem(
+            video_srcdir,
+            [path for path in video_paths if path.suffix.lower() in _DATABASE_VIDEO_SUFFIXES],
+        )
+        database_code = source_hash("update_database")
+        database_keys = {
+            clip: build_key(cache.file_hash(video_path), database_code, thumbnails_outdir)
+            for clip, video_path in database_videos.items()
+        }
+        database_keys[_DATASET_ITEM] = build_key(cache.file_hash(database_csv_path))
+        stale_database_clips = cache.stale(
+            "01-update-database",
+            database_keys,
+            outputs_exist=lambda clip: (
+                thumbnails_outdir is None
+                or clip == _DATASET_ITEM
+                or (thumbnails_outdir / f"{clip}.jpg").exists()
+            ),
         )
+        if stale_database_clips or cache.removed("01-update-database", database_keys):
+            update_database(
+                database_csv_path=database_csv_path,
+                videos_dir=video_srcdir,
+                thumbnails_dir=thumbnails_outdir,
+                print_prefix=lambda: prefix,
+                replace_existing_thumbnails=False,
+                replace_thumbnail_clips=stale_database_clips,
+                artifact_output_dir=get_step_artifact_dir("01-update-database", suppress_update_database_artifacts),
+            )
+            database_keys[_DATASET_ITEM] = build_key(cache.file_hash(database_csv_path))
+            cache.record("01-update-database", database_keys)
+            cache.save()
+        else:
+            print(f"{prefix} all {len(database_videos)} videos unchanged, reusing {database_csv_path}")
 
-    current_step += 1
-    add_complexities_to_dancetrees(
-        tree_srcdir=audio_analysis_tree_dir,
-        complexity_srcdir=complexities_temp_dir,
-        database_path=database_csv_path,
-        output_dir=trees_with_complexity_dir,
-        complexity_method=complexity_method,
-        trim_zero_complexity=True,
-        get_print_prefix=lambda: f'{step()} add complexity:',
-        artifact_output_dir=get_step_artifact_dir("05-add-complexity", suppress_add_complexity_artifacts),
-    )
+    # Step 2: per clip.
+    def compute_holistic_data_step():
+        prefix = _step_prefix(2, 'compute holistic data')
+        holistic_videos = _clips_by_relative_stem(
+            video_srcdir,
+            [path for path in video_paths if path.name.endswith('.mp4')],  # what compute_holistic_data picks up
+        )
+        holistic_code = source_hash("extract_holistic_data")
+        holistic_keys = {
+            clip: build_key(cache.file_hash(video_path), holistic_code, HOLISTIC_MODEL_COMPLEXITY)
+            for clip, video_path in holistic_videos.items()
+        }
+        stale_holistic_clips = cache.stale(
+            "02-compute-holistic-data",
+            holistic_keys,
+            outputs_exist=lambda clip: (
+                _is_nonempty_file(holistic_data_srcdir / f"{clip}{_HOLISTIC_DATA_RAW_SUFFIX}")
+                and _is_nonempty_file(pose2d_data_srcdir / f"{clip}{_POSE2D_DATA_RAW_SUFFIX}")
+            ),
+        )
+        if stale_holistic_clips or cache.removed("02-compute-holistic-data", holistic_keys):
+            compute_holistic_data(
+                video_folder=video_srcdir,
+                output_folder=holistic_data_srcdir,
+                pose2d_output_folder=pose2d_data_srcdir,
+                model_complexity=HOLISTIC_MODEL_COMPLEXITY,
+                frame_output_folder=holistic_frames_dir,
+                debug_frame_whitelist=debug_frame_whitelist,
+                rewrite_clips=stale_holistic_clips,
+                print_prefix=lambda: prefix,
+                artifact_output_dir=get_step_artifact_dir("02-compute-holistic-data", suppress_compute_holistic_data_artifacts),
+                workers=holistic_workers,
+                prefetch_frames=holistic_prefetch_frames,
+                mp_context=_MP_CONTEXT,
+            )
+            cache.record("02-compute-holistic-data", holistic_keys)
+            cache.save()
+        else:
+            print(f"{prefix} all {len(holistic_videos)} videos unchanged, reusing holistic data")
 
-    current_step += 1
-    bundle_dance_data_as_json(
-        dancetree_srcdir=trees_with_complexity_dir,
-        db_csv_path=database_csv_path,
-        audio_results_dir=audio_results_temp_dir,
-        bundle_export_path=bundle_export_path,
-        exclude_test=True,
-        print_prefix=lambda: f'{step()} bundle data:',
-        artifact_output_dir=get_step_artifact_dir("06-bundle-data", suppress_bundle_data_artifacts),
+    # Step 3: keyed per clip, but complexity is normalized across the whole dataset, so any change
+    # (including a removed clip) renormalizes every clip. DVAJs are stored per holistic CSV, so only
+    # the changed clips have theirs recomputed.
+    def cumulative_complexity_step():
+        prefix = _step_prefix(3, 'calc. complexity')
+        holistic_files = _holistic_data_files_by_clip(holistic_data_srcdir)
+        complexity_code = source_hash(
+            "complexity_analysis.calculate_cumulative_complexity",
+            "complexity_analysis.uist_complexityanalysis",
+        )
+        complexity_keys = {
+            clip: build_key(cache.file_hash(holistic_file), complexity_code, complexity_method, visibility_repair_cutoff)
+            for clip, holistic_file in holistic_files.items()
+        }
+        stale_complexity_clips = cache.stale(
+            "03-cumulative-complexity",
+            complexity_keys,
+            outputs_exist=lambda clip: (complexities_temp_dir / 'byfile' / f"{clip}.complexity.csv").exists(),
+        )
+        if stale_complexity_clips or cache.removed("03-cumulative-complexity", complexity_keys):
+            print(
+                f"{prefix} {len(stale_complexity_clips)}/{len(complexity_keys)} clips changed; "
+                f"renormalizing all clips"
+            )
+            dvaj_cache = cmplxty.DvajCache(
+                list(holistic_files.values()),
+                cmplxty.get_weighted_landmark_names(
+                    COMPLEXITY_LANDMARK_WEIGHITNG.get_weighting(include_base=COMPLEXITY_INCLUDE_BASE)
+                ),
+                workers=complexity_workers,
+                store_dir=complexities_temp_dir / 'dvaj',
+                mp_context=_MP_CONTEXT,
+            )
+            print(f"{prefix} reused stored DVAJs for {dvaj_cache.stored_count}/{len(holistic_files)} clips")
+            cmplxty.calculate_cumulative_complexities(
+                srcdir=holistic_data_srcdir,
+                other_files=[],
+                destdir=complexities_temp_dir,
+                measure_weighting=COMPLEXITY_MEASURE_WEIGHITNG,
+                landmark_weighting=COMPLEXITY_LANDMARK_WEIGHITNG,
+                database_csv_path=database_csv_path,
+                artifact_output_dir=get_step_artifact_dir("03-cumulative-complexity", suppress_cumulative_complexity_artifacts),
+                plot_whitelist=complexity_plot_whitelist,
+                include_base=COMPLEXITY_INCLUDE_BASE,
+                visibility_mode=COMPLEXITY_VISIBILITY_MODE,
+                visibility_repair_cutoff=visibility_repair_cutoff,
+                visibility_plot_alpha_floor=visibility_plot_alpha_floor,
+                target_complexity_per_segment=target_complexity_per_segment,
+                bodyparts_for_artifact_plotting=bodyparts_for_artifact_plotting or cmplxty.DEFAULT_BODYPARTS_FOR_ARTIFACT_PLOTTING,
+                print_prefix=lambda: prefix,
+                dvaj_cache=dvaj_cache,
+            )
+            cache.record("03-cumulative-complexity", complexity_keys)
+            cache.save()
+        else:
+            print(f"{prefix} all {len(holistic_files)} holistic CSVs unchanged, reusing complexities")
+
+    # Step 4: per clip. Only needs the videos (and the database, for titles), so it runs alongside
+    # steps 2 and 3.
+    def audio_analysis_step():
+        prefix = _step_prefix(4, 'audio analysis')
+        audio_videos = _clips_by_relative_stem(
+            video_srcdir,
+            [path for path in video_paths if path.suffix.lower() in _AUDIO_VIDEO_SUFFIXES],
+        )
+        audio_code = source_hash("audio_analysis")
+        audio_keys = {
+            clip: build_key(cache.file_hash(video_path), audio_code, audio_cache_suffix)
+            for clip, video_path in audio_videos.items()
+        }
+        stale_audio_clips = cache.stale(
+            "04-audio-analysis",
+            audio_keys,
+            outputs_exist=lambda clip: (
+                (audio_analysis_dir / f"{clip}.json").exists()
+                and (audio_analysis_tree_dir / f"{clip}.dancetree.json").exists()
+            ),
+        )
+        removed_audio_clips = cache.removed("04-audio-analysis", audio_keys)
+        for clip in removed_audio_clips:
+            # Dance trees of removed videos would otherwise flow into the next steps.
+            (audio_analysis_dir / f"{clip}.json").unlink(missing_ok=True)
+            (audio_analysis_tree_dir / f"{clip}.dancetree.json").unlink(missing_ok=True)
+        if stale_audio_clips or removed_audio_clips or not audio_summary_path.exists():
+            from ..audio_analysis.perform_analysis import perform_audio_analysis
+
+            # In its own process: audio analysis plots with pyplot, whose global state isn't safe to
+            # share with the complexity step running on another thread.
+            _run_in_subprocess(
+                perform_audio_analysis,
+                videosrcdir=video_srcdir,
+                audiosrcdir=None,
+                audio_analysis_destdir=audio_results_temp_dir,
+                audiocachedir=audio_cache_dir if audio_cache_dir else temp_dir / 'audio_cache',
+                analysis_summary_out=audio_summary_path,
+                database_csv_path=database_csv_path,
+                include_mem_usage=False,
+                reanalyze_clips=stale_audio_clips,
+                write_plots=not skip_audio_plots,
+                workers=audio_workers,
+                feature_cache_dir=audio_results_temp_dir / 'features',
+                audio_cache_suffix=audio_cache_suffix,
+                print_prefix=functools.partial(str, prefix),
+                artifact_output_dir=get_step_artifact_dir("04-audio-analysis", suppress_audio_analysis_artifacts),
+            )
+            cache.record("04-audio-analysis", audio_keys)
+            cache.save()
+        else:
+            print(f"{prefix} all {len(audio_videos)} videos unchanged, reusing audio analysis outputs")
+
+    # Step 5: per clip, keyed on the clip's dance tree, complexity CSV and database row.
+    def add_complexity_step():
+        prefix = _step_prefix(5, 'add complexity')
+        tree_files = {
+            tree_file.relative_to(audio_analysis_tree_dir).as_posix()[:-len('.dancetree.json')]: tree_file
+            for tree_file in sorted(audio_analysis_tree_dir.rglob('*.dancetree.json'))
+        }
+        database_rows = _database_row_keys(database_csv_path)
+        add_complexity_code = source_hash("complexity_analysis.add_complexity_to_dancetree", "dancetree.DanceTree")
+        add_complexity_keys = {
+            clip: build_key(
+                cache.file_hash(tree_file),
+                cache.file_hash(complexities_temp_dir / 'byfile' / f"{clip}.complexity.csv"),
+                database_rows.get(clip),
+                complexity_method,
+                add_complexity_code,
+            )
+            for clip, tree_file in tree_files.items()
+        }
+        stale_tree_clips = cache.stale(
+            "05-add-complexity",
+            add_complexity_keys,
+            outputs_exist=lambda clip: (trees_with_complexity_dir / f"{clip}.dancetree.json").exists(),
+        )
+        removed_tree_clips = cache.removed("05-add-complexity", add_complexity_keys)
+        for clip in stale_tree_clips | removed_tree_clips:
+            # Clear old outputs first: the bundle picks up every tree in the folder, including trees of
+            # clips that were removed or can no longer be annotated (e.g. their complexity is missing).
+            (trees_with_complexity_dir / f"{clip}.dancetree.json").unlink(missing_ok=True)
+        if stale_tree_clips:
+            add_complexities_to_dancetrees(
+                tree_srcdir=audio_analysis_tree_dir,
+                complexity_srcdir=complexities_temp_dir,
+                database_path=database_csv_path,
+                output_dir=trees_with_complexity_dir,
+                complexity_method=complexity_method,
+                trim_zero_complexity=True,
+                get_print_prefix=lambda: prefix,
+                artifact_output_dir=get_step_artifact_dir("05-add-complexity", suppress_add_complexity_artifacts),
+                only_clips=stale_tree_clips,
+            )
+        else:
+            print(f"{prefix} all {len(tree_files)} dance trees unchanged")
+        if stale_tree_clips or removed_tree_clips:
+            cache.record("05-add-complexity", add_complexity_keys)
+            cache.save()
+
+    # Step 6: one bundle for all clips.
+    def bundle_data_step():
+        prefix = _step_prefix(6, 'bundle data')
+        bundle_keys = {
+            _DATASET_ITEM: build_key(
+                [
+                    (tree_file.relative_to(trees_with_complexity_dir).as_posix(), cache.file_hash(tree_file))
+                    for tree_file in sorted(trees_with_complexity_dir.rglob('*.dancetree.json'))
+                ],
+                [
+                    (analysis_file.relative_to(audio_analysis_dir).as_posix(), cache.file_hash(analysis_file))
+                    for analysis_file in sorted(audio_analysis_dir.rglob('*.json'))
+                ],
+                cache.file_hash(database_csv_path),
+                source_hash("dancetree.bundle_data", "dancetree.DanceTree"),
+            ),
+        }
+        stale_bundle = cache.stale(
+            "06-bundle-data",
+            bundle_keys,
+            outputs_exist=lambda _: (
+                (bundle_export_path / 'dances.json').exists()
+                and (bundle_export_path / 'dancetrees.json').exists()
+            ),
+        )
+        if stale_bundle:
+            bundle_dance_data_as_json(
+                dancetree_srcdir=trees_with_complexity_dir,
+                db_csv_path=database_csv_path,
+                audio_results_dir=audio_results_temp_dir,
+                bundle_export_path=bundle_export_path,
+                exclude_test=True,
+                print_prefix=lambda: prefix,
+                artifact_output_dir=get_step_artifact_dir("06-bundle-data", suppress_bundle_data_artifacts),
+            )
+            cache.record("06-bundle-data", bundle_keys)
+            cache.save()
+        else:
+            print(f"{prefix} inputs unchanged, reusing bundle at {bundle_export_path}")
+
+    scheduler = StageScheduler(worker_budget=pipeline_workers or os.cpu_count() or 1)
+    scheduler.add("01-update-database", update_database_step)
+    scheduler.add("02-compute-holistic-data", compute_holistic_data_step, workers=holistic_workers)
+    scheduler.add(
+        "03-cumulative-complexity",
+        cumulative_complexity_step,
+        depends_on=["01-update-database", "02-compute-holistic-data"],
+        workers=complexity_workers,
+    )
+    scheduler.add("04-audio-analysis", audio_analysis_step, depends_on=["01-update-database"], workers=audio_workers)
+    scheduler.add(
+        "05-add-complexity",
+        add_complexity_step,
+        depends_on=["01-update-database", "03-cumulative-complexity", "04-audio-analysis"],
     )
+    scheduler.add("06-bundle-data", bundle_data_step, depends_on=["05-add-complexity"])
+
+    pipeline_start = time.perf_counter()
+    try:
+        scheduler.run()
+    finally:
+        wall_clock_s = time.perf_counter() - pipeline_start
+        timings = _stage_timings_table(scheduler)
+        print(f"Stage timings ({wall_clock_s:.1f} s wall clock, budget of {scheduler.worker_budget} workers):")
+        for line in timings.to_string(index=False).splitlines():
+            print(f"    {line}")
+        print(f"Build cache ({cache.manifest_path}):")
+        for line in cache.summary_lines():
+            print(f"    {line}")
+
+        if run_artifact_dir is not None:
+            report = build_artifact_report(
+                run_artifact_dir,
+                title="DanceTree Pipeline Run",
+                intro="Stages run as a dependency graph: audio analysis runs alongside holistic extraction and complexity.",
+            )
+            report.add_heading("Stage Timings")
+            report.add_paragraph(
+                f"Wall clock: `{wall_clock_s:.1f} s`. "
+                f"Sum of stage durations: `{timings['duration (s)'].sum():.1f} s`. "
+                f"Worker budget: `{scheduler.worker_budget}`."
+            )
+            report.add_dataframe("Stage Timings", timings)
+            report.add_heading("Build Cache")
+            report.add_paragraph(f"Manifest: `{cache.manifest_path}`")
+            report.add_list(cache.summary_lines())
+            report.write()
 
 if __name__ == "__main__":
     import argparse
@@ -197,9 +543,7 @@ if __name__ == "__main__":
     parser.add_argument('--bundle_media_export_path', type=Path)
     parser.add_argument('--include_audio_in_bundle', action='store_true')
     parser.add_argument('--include_thumbnail_in_bundle', action='store_true')
-    parser.add_argument("--rewrite_existing_holistic_data", action='store_true')
-    parser.add_argument("--skip_existing_cumulative_complexity", action='store_true')
-    parser.add_argument("--skip_existing_audioanalysis", action='store_true')
+    parser.add_argument("--force_rebuild", action='store_true', help='Ignore the build cache and rerun every step for every clip')
     parser.add_argument("--holistic_debug_frames_dir", type=Path, default=None)
     parser.add_argument("--debug_frame_whitelist", action='append', default=None)
     parser.add_argument("--complexity_plot_whitelist", action='append', default=None)
@@ -215,6 +559,12 @@ if __name__ == "__main__":
     parser.add_argument("--suppress_audio_analysis_artifacts", action='store_true')
     parser.add_argument("--suppress_add_complexity_artifacts", action='store_true')
     parser.add_argument("--suppress_bundle_data_artifacts", action='store_true')
+    parser.add_argument("--holistic_workers", type=int, default=1)
+    parser.add_argument("--holistic_prefetch_frames", type=int, default=0)
+    parser.add_argument("--complexity_workers", type=int, default=1, help='Processes computing DVAJs in the complexity step')
+    parser.add_argument("--audio_workers", type=int, default=1, help='Processes extracting and analyzing audio')
+    parser.add_argument("--skip_audio_plots", action='store_true', help='Skip the tempo and cross-similarity plots of the audio analysis')
+    parser.add_argument("--pipeline_workers", type=int, default=None, help='Worker budget shared by steps that run concurrently (default: CPU count)')
     args = parser.parse_args()
     
     run_dancetree_pipeline(
@@ -227,9 +577,7 @@ if __name__ == "__main__":
         bundle_media_export_path=args.bundle_media_export_path,
         include_audio_in_bundle=args.include_audio_in_bundle,
         include_thumbnail_in_bundle=args.include_thumbnail_in_bundle,
-        rewrite_existing_holistic_data=args.rewrite_existing_holistic_data,
-        skip_existing_cumulative_complexity=args.skip_existing_cumulative_complexity,
-        skip_existing_audioanalysis=args.skip_existing_audioanalysis,
+        force_rebuild=args.force_rebuild,
         holistic_debug_frames_dir=args.holistic_debug_frames_dir,
         debug_frame_whitelist=args.debug_frame_whitelist,
         complexity_plot_whitelist=args.complexity_plot_whitelist,
@@ -245,4 +593,10 @@ if __name__ == "__main__":
         suppress_audio_analysis_artifacts=args.suppress_audio_analysis_artifacts,
         suppress_add_complexity_artifacts=args.suppress_add_complexity_artifacts,
         suppress_bundle_data_artifacts=args.suppress_bundle_data_artifacts,
+        holistic_workers=args.holistic_workers,
+        holistic_prefetch_frames=args.holistic_prefetch_frames,
+        complexity_workers=args.complexity_workers,
+        audio_workers=args.audio_workers,
+        skip_audio_plots=args.skip_audio_plots,
+        pipeline_workers=args.pipeline_workers,
     )
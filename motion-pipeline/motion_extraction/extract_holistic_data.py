@@ -8,12 +8,18 @@ import mediapipe as mp
 from mediapipe.python.solutions import holistic as mp_holistic
 import numpy as np
 import pandas as pd
-from functools import reduce
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import atexit
+import contextlib
 import csv
 import fnmatch
+import multiprocessing
 
 from .artifacts import build_artifact_report, resolve_artifact_output_dir
-from .utils import throttle
+from .holistic_cache import read_holistic_data
+from .video_metadata import read_video_metadata
+from .utils import prefetch, throttle
 from .mp_utils import (
 	HAND_CONNECTIONS,
 	POSE_CONNECTIONS,
@@ -31,6 +37,7 @@ T = t.TypeVar('T')
 _PRESENCE_THRESHOLD = 0.5
 _VISIBILITY_THRESHOLD = 0.5
 _BGR_CHANNELS = 3
+_CSV_ROWS_PER_FLUSH = 256
 from typing import Iterable
 
 _HOLISTIC_DATA_LEGACY_SUFFIX = ".holisticdata.csv"
@@ -157,6 +164,14 @@ def construct_pose2d_header_row():
 			   for field in ('x', 'y', 'distance', 'vis')
 		   ]
 
+def _padded_landmarks(value, landmark_count: int) -> t.List[t.Any]:
+	"""Landmarks as a list of exactly `landmark_count` entries, with `None` for anything missing."""
+	landmarks = landmark_list(value)
+	if landmarks is None:
+		return [None] * landmark_count
+	present_count = min(len(landmarks), landmark_count)
+	return [landmarks[i] for i in range(present_count)] + [None] * (landmark_count - present_count)
+
 def transform_to_pose2d_csvrow(
 	frame_i: int, 
 	frame_data, 
@@ -168,74 +183,46 @@ def transform_to_pose2d_csvrow(
 	x_mult = 1 if not in_pixelCoords else video_width
 	y_mult = 1 if not in_pixelCoords else video_height
 	row = [frame_i]
-	row += list(reduce(
-		lambda x, y: x + y,
-		[
-            
-			# Get the pixel coordinates of the landmark.
-			# Pet the documentation, the z-coordinate is the approximate depth / distance from camera, 
-			# with the same approximate magnitude as x. 
-			([
+	for pose2d_lm in _padded_landmarks(getattr(frame_data, "pose_landmarks", None), len(PoseLandmark)):
+		# Get the pixel coordinates of the landmark.
+		# Pet the documentation, the z-coordinate is the approximate depth / distance from camera, 
+		# with the same approximate magnitude as x. 
+		if pose2d_lm is None:
+			row.extend((None, None, None, None))
+		else:
+			row.extend((
 				pose2d_lm.x * x_mult, 
 				pose2d_lm.y * y_mult, 
 				pose2d_lm.z * x_mult,
-				pose2d_lm.visibility
-			 ] if pose2d_lm is not None 
-			 else [None, None, None, None]
-			)
-			for pose2d_lm in 
-			[
-				landmark_at(getattr(frame_data, "pose_landmarks", None), landmark_i)
-				for landmark_i in range(len(PoseLandmark))
-			]
-		]
-	))
+				pose2d_lm.visibility,
+			))
 
 	if as_pdSeries:
-		return pd.Series(row, index=construct_header_row())
+		return pd.Series(row, index=construct_pose2d_header_row())
 
 	return row
 
 def transform_to_holistic_csvrow(frame_i: int, frame_data, as_pdSeries: bool = False):
 	row = [frame_i]
-            
-	row += list(reduce(
-			lambda x, y: x + y,
-			[
-				# We want to remap x, y, z. 
-				#   > The default has negative y being up, positive x being right, and pozitive z being away from the camera.
-				#   > We actually want y being up, x being left, and z being forward (towards camera).
-				#   So x <- x
-				#      y <- -y
-				#      z <- -z
-				[ 
-					lm.x,
-					-lm.y, 
-					-lm.z,
-					lm.visibility
-				] if lm is not None else [None, None, None, None]
-				for lm in 
-				[landmark_at(getattr(frame_data, "pose_world_landmarks", None), landmark_i) for landmark_i in range(len(PoseLandmark))]
-			]
-		))
-        
-	row += list(reduce(
-			lambda x, y: x + y,
-			[
-				([lm.x, lm.y, lm.z] if lm is not None else [None, None, None])
-				for lm in 
-				[landmark_at(getattr(frame_data, "right_hand_landmarks", None), landmark_i) for landmark_i in range(len(HandLandmark))]
-			]
-		))
 
-	row += list(reduce(
-			lambda x, y: x + y,
-			[
-				([lm.x, lm.y, lm.z] if lm is not None else [None, None, None])
-				for lm in 
-				[landmark_at(getattr(frame_data, "left_hand_landmarks", None), landmark_i) for landmark_i in range(len(HandLandmark))]
-			]
-		))
+	# We want to remap x, y, z. 
+	#   > The default has negative y being up, positive x being right, and pozitive z being away from the camera.
+	#   > We actually want y being up, x being left, and z being forward (towards camera).
+	#   So x <- x
+	#      y <- -y
+	#      z <- -z
+	for lm in _padded_landmarks(getattr(frame_data, "pose_world_landmarks", None), len(PoseLandmark)):
+		if lm is None:
+			row.extend((None, None, None, None))
+		else:
+			row.extend((lm.x, -lm.y, -lm.z, lm.visibility))
+
+	for hand_attr in ("right_hand_landmarks", "left_hand_landmarks"):
+		for lm in _padded_landmarks(getattr(frame_data, hand_attr, None), len(HandLandmark)):
+			if lm is None:
+				row.extend((None, None, None))
+			else:
+				row.extend((lm.x, lm.y, lm.z))
 
 	if as_pdSeries:
 		return pd.Series(row, index=construct_header_row())
@@ -323,20 +310,15 @@ def _match_debug_frame_whitelist(relative_path: Path, whitelist: t.Sequence[str]
 
 
 def _read_video_metadata(video_path: Path) -> t.Dict[str, float]:
-	cap = cv2.VideoCapture(str(video_path))
-	try:
-		fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-		fps = fps if fps > 0 else 30.0
-		frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-		return {
-			"width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
-			"height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
-			"frame_count": frame_count,
-			"fps": fps,
-			"duration_seconds": frame_count / fps if fps > 0 else 0.0,
-		}
-	finally:
-		cap.release()
+	metadata = read_video_metadata(video_path)
+	fps = metadata.fps if metadata.fps > 0 else 30.0
+	return {
+		"width": metadata.width,
+		"height": metadata.height,
+		"frame_count": metadata.frame_count,
+		"fps": fps,
+		"duration_seconds": metadata.frame_count / fps if fps > 0 else 0.0,
+	}
 
 
 def summarize_holistic_data_quality(
@@ -347,7 +329,7 @@ def summarize_holistic_data_quality(
 	if dataframe is None:
 		if csv_path is None:
 			raise ValueError("Either dataframe or csv_path must be provided.")
-		dataframe = pd.read_csv(csv_path)
+		dataframe = read_holistic_data(csv_path)
 
 	summary: t.Dict[str, t.Union[int, float]] = {}
 
@@ -390,55 +372,87 @@ def _zero_quality_summary(frame_count: int) -> pd.Series:
 			summary[f"{joint_label}_{quantile_name}_visibility"] = 0.0
 	return pd.Series(summary)
 
+def _create_holistic_processor(model_complexity: int):
+	return mp_holistic.Holistic(
+		static_image_mode=True,
+		model_complexity=model_complexity,
+		refine_face_landmarks=False,
+		enable_segmentation=False,
+	)
+
 def process_video(
 	input_video_path: Path, 
 	model_complexity: int,
 	holistic_data_output_filepath: Path,
 	pose_2d_data_output_filepath: t.Optional[Path] = None,
 	frame_output_folder: t.Optional[Path] = None,
-	print_progress_context: t.Callable[[],str] = lambda: '',
+	print_progress_context: t.Optional[t.Callable[[],str]] = lambda: '',
+	holistic_processor: t.Optional[t.Any] = None,
+	prefetch_frames: int = 0,
 ):
+	"""
+	Run holistic pose estimation over every frame of a video and write the CSV outputs.
+
+	If `holistic_processor` is provided it is used as-is (and left open), so callers that process
+	many videos can keep a single long-lived instance. Pass `print_progress_context=None` to
+	silence per-frame progress output.
+
+	With `prefetch_frames > 0`, frames are decoded and converted to RGB on a background thread
+	that stays up to that many frames ahead, overlapping decode with inference. Output is identical.
+	"""
 	@throttle(seconds=1)
 	def print_progress(i, frame_count):
+		if print_progress_context is None:
+			return
 		percent_done = i / frame_count
 		print(f'{print_progress_context()}: {i}/{frame_count} {percent_done:.1%}')
 
 	# Get video width / height
-	cap = cv2.VideoCapture(str(input_video_path))
-	video_width = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-	video_height = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-	cap.release()
+	video_metadata = read_video_metadata(input_video_path)
+	video_width = float(video_metadata.width)
+	video_height = float(video_metadata.height)
 
     
 	header_row = construct_header_row()
 	pose2d_header_row = construct_pose2d_header_row()
 
 	holistic_data_output_filepath.parent.mkdir(parents=True, exist_ok=True)
-	pose_2d_file = None
-	pose_2d_csv_writer = None
-	if pose_2d_data_output_filepath:
-		pose_2d_data_output_filepath.parent.mkdir(parents=True, exist_ok=True)
-		pose_2d_file = pose_2d_data_output_filepath.open('w', encoding='utf-8', newline='')
-		pose_2d_csv_writer = csv.writer(pose_2d_file)
-
-	with (
-		holistic_data_output_filepath.open('w', encoding='utf-8', newline='') as holistic_file,
-		mp_holistic.Holistic(
-			static_image_mode=True,
-			model_complexity=model_complexity,
-			refine_face_landmarks=False,
-			enable_segmentation=False,
-		) as holistic_processor,
-	):
+
+	with contextlib.ExitStack() as exit_stack:
+		holistic_file = exit_stack.enter_context(
+			holistic_data_output_filepath.open('w', encoding='utf-8', newline='')
+		)
 		holistic_csv_writer = csv.writer(holistic_file)
-		for frame_i, (_, frame_count, _timestamp_ms, image) in enumerate(_perform_by_frame(input_video_path)):
+		pose_2d_csv_writer = None
+		if pose_2d_data_output_filepath:
+			pose_2d_data_output_filepath.parent.mkdir(parents=True, exist_ok=True)
+			pose_2d_file = exit_stack.enter_context(
+				pose_2d_data_output_filepath.open('w', encoding='utf-8', newline='')
+			)
+			pose_2d_csv_writer = csv.writer(pose_2d_file)
+		if holistic_processor is None:
+			holistic_processor = exit_stack.enter_context(_create_holistic_processor(model_complexity))
+
+		# Rows are buffered and written in blocks, rather than one writerow call per frame.
+		holistic_rows: t.List[t.List[t.Any]] = []
+		pose2d_rows: t.List[t.List[t.Any]] = []
+		def flush_rows():
+			holistic_csv_writer.writerows(holistic_rows)
+			holistic_rows.clear()
+			if pose_2d_csv_writer:
+				pose_2d_csv_writer.writerows(pose2d_rows)
+				pose2d_rows.clear()
+
+		decoded_frames = exit_stack.enter_context(contextlib.closing(
+			prefetch(_perform_by_frame(input_video_path), max_queued=prefetch_frames)
+		))
+		for frame_i, (_, frame_count, _timestamp_ms, image) in enumerate(decoded_frames):
 			frame_data: t.Any = holistic_processor.process(image)
 
 
 			# cv2.imshow(f'Frame {frame_i}', image)
 			# cv2.waitKey(500)
 			holistic_csv_row = transform_to_holistic_csvrow(frame_i, frame_data)
-			holistic_series_row = pd.Series(holistic_csv_row, index=header_row)
 
 			if frame_output_folder is not None:
 				image.flags.writeable = True
@@ -485,7 +499,7 @@ def process_video(
 
 				if landmark_list(frame_data.pose_world_landmarks):
 					plot_3d_pose(
-						holistic_series_row, 
+						pd.Series(holistic_csv_row, index=header_row), 
 						title=f'{holistic_data_output_filepath.name}-frame{frame_i}'
 					)
 
@@ -504,18 +518,128 @@ def process_video(
 
 			print_progress(frame_i, frame_count)
 			if frame_i == 0:
-				holistic_csv_writer.writerow(header_row)
+				holistic_rows.append(header_row)
 				if (pose_2d_csv_writer):
-					pose_2d_csv_writer.writerow(pose2d_header_row)
+					pose2d_rows.append(pose2d_header_row)
             
-			holistic_csv_writer.writerow(holistic_csv_row)
+			holistic_rows.append(holistic_csv_row)
 			if (pose_2d_csv_writer):
-				pose2d_csv_row = transform_to_pose2d_csvrow(frame_i, frame_data, video_width, video_height)
-				pose_2d_csv_writer.writerow(pose2d_csv_row)
-    
-	if (pose_2d_file):
-		pose_2d_file.close()
+				pose2d_rows.append(transform_to_pose2d_csvrow(frame_i, frame_data, video_width, video_height))
+			if len(holistic_rows) >= _CSV_ROWS_PER_FLUSH:
+				flush_rows()
+
+		flush_rows()
             
+@dataclass(frozen=True)
+class _HolisticVideoJob:
+	video_path: Path
+	video_file_relative: Path
+	output_folder: Path
+	holistic_data_filepath: Path
+	pose_2d_data_filepath: t.Optional[Path]
+	frame_output_folder: t.Optional[Path]
+	should_compute: bool
+	progress_label: str
+	prefetch_frames: int = 0
+
+
+# Long-lived Holistic instance owned by each process-pool worker (see `_init_holistic_worker`).
+_worker_holistic_processor: t.Any = None
+
+
+def _init_holistic_worker(model_complexity: int) -> None:
+	global _worker_holistic_processor
+	_worker_holistic_processor = _create_holistic_processor(model_complexity)
+	atexit.register(_worker_holistic_processor.close)
+
+
+def _run_holistic_video_job(
+	job: _HolisticVideoJob,
+	model_complexity: int,
+	holistic_processor: t.Optional[t.Any],
+	print_progress_context: t.Optional[t.Callable[[], str]],
+) -> t.Tuple[pd.Series, t.List[str]]:
+	warnings: t.List[str] = []
+	if job.should_compute:
+		process_video(
+			input_video_path=job.video_path,
+			model_complexity=model_complexity,
+			holistic_data_output_filepath=job.holistic_data_filepath,
+			pose_2d_data_output_filepath=job.pose_2d_data_filepath,
+			frame_output_folder=job.frame_output_folder,
+			print_progress_context=print_progress_context,
+			holistic_processor=holistic_processor,
+			prefetch_frames=job.prefetch_frames,
+		)
+
+	video_metadata = _read_video_metadata(job.video_path)
+	if not job.holistic_data_filepath.exists() or job.holistic_data_filepath.stat().st_size == 0:
+		warnings.append(
+			f"WARNING: Holistic CSV is empty after processing and will be summarized as zero-quality: "
+			f"{job.holistic_data_filepath.relative_to(job.output_folder).as_posix()}"
+		)
+		quality_summary = _zero_quality_summary(int(video_metadata["frame_count"]))
+	else:
+		# Parsing here also refreshes the binary sidecar that downstream readers prefer over the CSV.
+		quality_summary = summarize_holistic_data_quality(
+			dataframe=read_holistic_data(job.holistic_data_filepath, write_sidecar=True)
+		)
+
+	summary_row = pd.Series(
+		{
+			"file": job.video_file_relative.as_posix(),
+			"status": "computed" if job.should_compute else "cached",
+			"width": video_metadata["width"],
+			"height": video_metadata["height"],
+			"duration_seconds": video_metadata["duration_seconds"],
+			"frame_count": video_metadata["frame_count"],
+			**quality_summary.to_dict(),
+		}
+	)
+	return summary_row, warnings
+
+
+def _run_holistic_video_job_in_worker(job: _HolisticVideoJob, model_complexity: int) -> t.Tuple[pd.Series, t.List[str]]:
+	# Per-frame progress from many workers would interleave; the parent reports per file instead.
+	return _run_holistic_video_job(job, model_complexity, _worker_holistic_processor, print_progress_context=None)
+
+
+def _run_holistic_video_jobs(
+	jobs: t.Sequence[_HolisticVideoJob],
+	model_complexity: int,
+	workers: int,
+	print_prefix: t.Callable[[], str],
+	mp_context: t.Optional[multiprocessing.context.BaseContext] = None,
+) -> t.Iterator[t.Tuple[pd.Series, t.List[str]]]:
+	"""Yields one `(summary_row, warnings)` per job, always in the order of `jobs`."""
+	compute_job_count = sum(1 for job in jobs if job.should_compute)
+	if workers <= 1 or compute_job_count <= 1:
+		with contextlib.ExitStack() as exit_stack:
+			holistic_processor = None
+			if compute_job_count > 0:
+				holistic_processor = exit_stack.enter_context(_create_holistic_processor(model_complexity))
+			for job in jobs:
+				yield _run_holistic_video_job(
+					job,
+					model_complexity,
+					holistic_processor,
+					print_progress_context=lambda: f"{print_prefix()} {job.progress_label}",
+				)
+		return
+
+	with ProcessPoolExecutor(
+		max_workers=min(workers, compute_job_count),
+		initializer=_init_holistic_worker,
+		initargs=(model_complexity,),
+		mp_context=mp_context,
+	) as executor:
+		futures = [
+			executor.submit(_run_holistic_video_job_in_worker, job, model_complexity)
+			for job in jobs
+		]
+		for future in futures:
+			yield future.result()
+
 def compute_holistic_data(
 	video_folder: Path,
 	output_folder: Path,
@@ -524,10 +648,26 @@ def compute_holistic_data(
 	frame_output_folder: t.Optional[Path] = None,
 	debug_frame_whitelist: t.Optional[t.Sequence[str]] = None,
 	rewrite_existing: bool = False,
+	rewrite_clips: t.Optional[t.Collection[str]] = None,
 	print_prefix: t.Callable[[], str]=lambda: '',
 	artifact_archive_root: t.Optional[Path] = None,
 	artifact_output_dir: t.Optional[Path] = None,
+	workers: int = 1,
+	prefetch_frames: int = 0,
+	mp_context: t.Optional[multiprocessing.context.BaseContext] = None,
 ):
+	"""
+	Extract holistic (and optionally pose2d) CSVs for every video under `video_folder`.
+
+	With `workers > 1`, videos are fanned out to a process pool where each worker keeps its own
+	long-lived Holistic instance. Results are merged back in file order, so console output and the
+	artifact report do not depend on which worker finishes first. `mp_context` is the pool's
+	multiprocessing context; callers that have other threads running should pass a 'spawn' one.
+	`prefetch_frames` is forwarded to `process_video`.
+
+	Existing outputs are reused unless `rewrite_existing` is set or the clip's relative stem (video
+	path relative to `video_folder`, without suffix, e.g. `study2/clip`) is in `rewrite_clips`.
+	"""
 	if not output_folder.exists():
 		output_folder.mkdir(parents=True)
 	if pose2d_output_folder is not None and not pose2d_output_folder.exists():
@@ -543,6 +683,7 @@ def compute_holistic_data(
 		default_label="compute-holistic-data",
 	)
 	debug_frame_whitelist = list(debug_frame_whitelist) if debug_frame_whitelist is not None else ["*"]
+	rewrite_clips = set(rewrite_clips) if rewrite_clips is not None else set()
 
 	video_folder = Path(video_folder)
 	video_paths = []
@@ -568,9 +709,7 @@ def compute_holistic_data(
 				print(f"{print_prefix()} {warning}")
 				orphan_holistic_warnings.append(warning)
 
-	cached_count = 0
-	computed_count = 0
-	summary_rows: t.List[pd.Series] = []
+	jobs: t.List[_HolisticVideoJob] = []
 	for i, video_path in enumerate(video_paths):
 		video_file_relative = video_path.relative_to(parent_folder)
 		video_file_relative_stem = video_file_relative.with_suffix('')
@@ -585,49 +724,41 @@ def compute_holistic_data(
 			or (pose_2d_data_filepath.exists() and pose_2d_data_filepath.stat().st_size > 0)
 		)
 
-		status = "cached"
-		if rewrite_existing or not holistic_is_valid or not pose2d_is_valid:
-			status = "computed"
+		current_frame_output_dir = None
+		if frame_output_folder is not None and _match_debug_frame_whitelist(video_file_relative, debug_frame_whitelist):
+			current_frame_output_dir = frame_output_folder / video_file_relative.parent
+
+		jobs.append(_HolisticVideoJob(
+			video_path=video_path,
+			video_file_relative=video_file_relative,
+			output_folder=output_folder,
+			holistic_data_filepath=holistic_data_filepath,
+			pose_2d_data_filepath=pose_2d_data_filepath,
+			frame_output_folder=current_frame_output_dir,
+			should_compute=(
+				rewrite_existing
+				or video_file_relative_stem.as_posix() in rewrite_clips
+				or not holistic_is_valid
+				or not pose2d_is_valid
+			),
+			progress_label=f"Video {i+1}/{len(video_paths)} {video_file_relative_stem}",
+			prefetch_frames=prefetch_frames,
+		))
+
+	cached_count = 0
+	computed_count = 0
+	summary_rows: t.List[pd.Series] = []
+	for job, (summary_row, job_warnings) in zip(jobs, _run_holistic_video_jobs(jobs, model_complexity, workers, print_prefix, mp_context)):
+		if summary_row["status"] == "computed":
 			computed_count += 1
-			current_frame_output_dir = None
-			if frame_output_folder is not None and _match_debug_frame_whitelist(video_file_relative, debug_frame_whitelist):
-				current_frame_output_dir = frame_output_folder / video_file_relative.parent
-
-			process_video(
-				input_video_path=video_path,
-				model_complexity=model_complexity,
-				holistic_data_output_filepath=holistic_data_filepath,
-				pose_2d_data_output_filepath=pose_2d_data_filepath,
-				frame_output_folder=current_frame_output_dir,
-				print_progress_context=lambda: f"{print_prefix()} Video {i+1}/{len(video_paths)} {video_file_relative_stem}",
-			)
 		else:
 			cached_count += 1
-
-		video_metadata = _read_video_metadata(video_path)
-		if not holistic_data_filepath.exists() or holistic_data_filepath.stat().st_size == 0:
-			warning = (
-				f"WARNING: Holistic CSV is empty after processing and will be summarized as zero-quality: "
-				f"{holistic_data_filepath.relative_to(output_folder).as_posix()}"
-			)
+		for warning in job_warnings:
 			print(f"{print_prefix()} {warning}")
 			orphan_holistic_warnings.append(warning)
-			quality_summary = _zero_quality_summary(int(video_metadata["frame_count"]))
-		else:
-			quality_summary = summarize_holistic_data_quality(csv_path=holistic_data_filepath)
-		summary_rows.append(
-			pd.Series(
-				{
-					"file": video_file_relative.as_posix(),
-					"status": status,
-					"width": video_metadata["width"],
-					"height": video_metadata["height"],
-					"duration_seconds": video_metadata["duration_seconds"],
-					"frame_count": video_metadata["frame_count"],
-					**quality_summary.to_dict(),
-				}
-			)
-		)
+		if workers > 1:
+			print(f"{print_prefix()} {job.progress_label}: {summary_row['status']}")
+		summary_rows.append(summary_row)
 
 	summary_df = pd.DataFrame(summary_rows)
 	if not summary_df.empty:
@@ -650,6 +781,7 @@ def compute_holistic_data(
 				f"Holistic output: `{output_folder}`",
 				f"Pose2D output: `{pose2d_output_folder}`" if pose2d_output_folder else "Pose2D output: disabled",
 				f"Rewrite existing: `{rewrite_existing}`",
+				f"Clips marked for rewrite: `{len(rewrite_clips)}`",
 				f"Videos computed: `{computed_count}`",
 				f"Videos cached: `{cached_count}`",
 				"Maximum people detected per frame is currently a `0/1` metric because this holistic pipeline is single-person.",
@@ -683,6 +815,8 @@ if __name__ == "__main__":
 	parser.add_argument('--rewrite_existing', action='store_true', default=False)
 	parser.add_argument('--artifact_archive_root', type=Path, default=None)
 	parser.add_argument('--artifact_output_dir', type=Path, default=None)
+	parser.add_argument('--workers', type=int, default=1, help='Number of videos to process in parallel (each worker keeps its own Holistic model).')
+	parser.add_argument('--prefetch_frames', type=int, default=0, help='Decode up to this many frames ahead on a background thread (0 disables).')
 	args = parser.parse_args()
     
 	compute_holistic_data(
@@ -694,4 +828,6 @@ if __name__ == "__main__":
 		rewrite_existing=args.rewrite_existing,
 		artifact_archive_root=args.artifact_archive_root,
 		artifact_output_dir=args.artifact_output_dir,
+		workers=args.workers,
+		prefetch_frames=args.prefetch_frames,
 	)
@@ -0,0 +1,170 @@
+"""Binary columnar sidecars for holistic pose CSVs.
+
+Each `*.holisticdata.raw.csv` (or legacy `*.holisticdata.csv`) can have a `.npz` sidecar next to it
+holding the same table as a typed float32 matrix. The sidecar records the SHA-256 of the CSV it was
+built from, so readers only use it while it still describes the CSV on disk; otherwise they fall
+back to parsing the CSV. The CSV remains the source of truth.
+
+Run as a script to build sidecars for an existing data tree:
+
+    python -m motion_extraction.holistic_cache --root path/to/holistic_data
+"""
+from __future__ import annotations
+
+from pathlib import Path
+import hashlib
+import os
+import typing as t
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+HOLISTIC_SIDECAR_SUFFIX = ".npz"
+
+_HOLISTIC_DATA_LEGACY_SUFFIX = ".holisticdata.csv"
+_HOLISTIC_DATA_RAW_SUFFIX = ".holisticdata.raw.csv"
+_FRAME_COLUMN = "frame"
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+def holistic_sidecar_path(csv_path: Path) -> Path:
+    return Path(csv_path).with_suffix(HOLISTIC_SIDECAR_SUFFIX)
+
+
+def file_content_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _sidecar_matches_csv(sidecar: t.Mapping[str, np.ndarray], csv_path: Path) -> bool:
+    # A matching size + mtime means the CSV has not been touched since the sidecar was written, so the
+    # hash can be trusted without rereading the file. Otherwise fall back to comparing content hashes.
+    csv_stat = csv_path.stat()
+    if (
+        int(sidecar["source_size"]) == csv_stat.st_size
+        and int(sidecar["source_mtime_ns"]) == csv_stat.st_mtime_ns
+    ):
+        return True
+    return str(sidecar["source_sha256"]) == file_content_hash(csv_path)
+
+
+def _load_sidecar(csv_path: Path) -> t.Optional[pd.DataFrame]:
+    sidecar_path = holistic_sidecar_path(csv_path)
+    if not sidecar_path.exists():
+        return None
+    try:
+        with np.load(sidecar_path, allow_pickle=False) as sidecar:
+            if not _sidecar_matches_csv(sidecar, csv_path):
+                return None
+            columns = [str(column) for column in sidecar["columns"]]
+            dataframe = pd.DataFrame(
+                sidecar["values"].astype(np.float64),
+                columns=columns,
+            )
+            # Sidecars written before the position was recorded all had `frame` first.
+            frame_position = int(sidecar["frame_position"]) if "frame_position" in sidecar.files else 0
+            dataframe.insert(frame_position, _FRAME_COLUMN, sidecar["frame"].astype(np.int64))
+            return dataframe
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        # Truncated or foreign file: treat as a cache miss and let the CSV win.
+        return None
+
+
+def write_holistic_sidecar(csv_path: Path, dataframe: t.Optional[pd.DataFrame] = None) -> t.Optional[Path]:
+    """
+    Write the `.npz` sidecar for `csv_path`, parsing the CSV unless its `dataframe` is supplied.
+
+    Values are stored as float32, which is lossless for MediaPipe output (landmarks are float32 to
+    begin with). Tables that would lose precision are stored as float64 instead. Returns `None` if
+    the table cannot be represented (no `frame` column).
+    """
+    csv_path = Path(csv_path)
+    if dataframe is None:
+        dataframe = pd.read_csv(csv_path)
+    if _FRAME_COLUMN not in dataframe.columns:
+        return None
+
+    value_frame = dataframe.drop(columns=[_FRAME_COLUMN])
+    values = value_frame.to_numpy(dtype=np.float64)
+    values_f32 = values.astype(np.float32)
+    if np.array_equal(values_f32.astype(np.float64), values, equal_nan=True):
+        values = values_f32
+
+    csv_stat = csv_path.stat()
+    sidecar_path = holistic_sidecar_path(csv_path)
+    temp_path = sidecar_path.with_name(sidecar_path.name + ".tmp")
+    with temp_path.open("wb") as f:
+        np.savez(
+            f,
+            columns=np.array(value_frame.columns, dtype=str),
+            frame=dataframe[_FRAME_COLUMN].to_numpy(dtype=np.int64),
+            frame_position=np.array(dataframe.columns.get_loc(_FRAME_COLUMN), dtype=np.int64),
+            values=values,
+            source_sha256=np.array(file_content_hash(csv_path)),
+            source_size=np.array(csv_stat.st_size, dtype=np.int64),
+            source_mtime_ns=np.array(csv_stat.st_mtime_ns, dtype=np.int64),
+        )
+    os.replace(temp_path, sidecar_path)
+    return sidecar_path
+
+
+def read_holistic_data(
+    csv_path: Path,
+    index_col: t.Optional[str] = None,
+    write_sidecar: bool = False,
+) -> pd.DataFrame:
+    """
+    Drop-in replacement for `pd.read_csv(csv_path, index_col=index_col)` on holistic CSVs.
+
+    Uses the `.npz` sidecar when it is up to date with the CSV; otherwise parses the CSV and, when
+    `write_sidecar` is set, refreshes the sidecar for the next reader.
+    """
+    csv_path = Path(csv_path)
+    dataframe = _load_sidecar(csv_path)
+    if dataframe is None:
+        dataframe = pd.read_csv(csv_path)
+        if write_sidecar:
+            write_holistic_sidecar(csv_path, dataframe)
+
+    if index_col is not None:
+        dataframe = dataframe.set_index(index_col)
+    return dataframe
+
+
+def migrate_holistic_data_tree(root_folder: Path, rewrite_existing: bool = False) -> t.Tuple[int, int]:
+    """Builds sidecars for every holistic CSV under `root_folder`. Returns `(written, skipped)`."""
+    written = 0
+    skipped = 0
+    csv_paths = sorted(
+        set(Path(root_folder).rglob(f"*{_HOLISTIC_DATA_RAW_SUFFIX}"))
+        | set(Path(root_folder).rglob(f"*{_HOLISTIC_DATA_LEGACY_SUFFIX}"))
+    )
+    for csv_path in csv_paths:
+        if csv_path.stat().st_size == 0:
+            skipped += 1
+            continue
+        if not rewrite_existing and _load_sidecar(csv_path) is not None:
+            skipped += 1
+            continue
+        if write_holistic_sidecar(csv_path) is None:
+            print(f"WARNING: {csv_path} has no '{_FRAME_COLUMN}' column; no sidecar written.")
+            skipped += 1
+            continue
+        written += 1
+    return written, skipped
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build .npz sidecars for existing holistic CSVs.")
+    parser.add_argument("--root", type=Path, required=True)
+    parser.add_argument("--rewrite_existing", action="store_true", default=False)
+    args = parser.parse_args()
+
+    written, skipped = migrate_holistic_data_tree(args.root, rewrite_existing=args.rewrite_existing)
+    print(f"Wrote {written} sidecars, skipped {skipped} files (up to date or empty)")
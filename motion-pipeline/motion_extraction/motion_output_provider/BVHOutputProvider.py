@@ -1,9 +1,9 @@
-from typing import Optional
+from typing import List, Optional, Union
 import pandas as pd
 import numpy as np
 from enum import Enum
-from .MotionOutputProvider import MotionOutputProvider, TransformManager, Path
-from ..MecanimHumanoid import HumanoidPositionSkeleton, MecanimBone, MecanimMeasurement
+from .MotionOutputProvider import MotionOutputProvider, FrameBuffer, hold_missing_frames, TransformLookup, Path
+from ..MecanimHumanoid import ClipTransforms, HumanoidPositionClip, HumanoidPositionSkeleton, MecanimBone, MecanimMeasurement
 from motion_extraction.bvh_writer import BVHWriteNode, write_bvh
 
 METERS_TO_CM = 100.
@@ -106,6 +106,13 @@ def _get_bvh_hierarchy(bone_avg_offsets: pd.Series) -> BVHWriteNode:
 
 
 class BVHOutputProvider(MotionOutputProvider):
+    """
+    Builds a BVH animation of the `_get_bvh_hierarchy` skeleton, one row of channel values per frame.
+
+    `process_clip` extracts the channels of every joint for a whole clip at once; `process_frame`
+    does the same for a single frame. Recorded frames go into a `FrameBuffer`, which `write_output`
+    writes as the MOTION block (and optionally as a CSV).
+    """
     def __init__(
         self, 
         avg_offsets_and_measurements_cm: pd.Series,
@@ -113,50 +120,58 @@ class BVHOutputProvider(MotionOutputProvider):
         bvhcsv_filepath: Optional[Path]
     ):
         self.bvh_root = _get_bvh_hierarchy(avg_offsets_and_measurements_cm)
-        self.dataframe = pd.DataFrame(columns = list(self.bvh_root.get_channel_column_names()))
+        self.channel_names = list(self.bvh_root.get_channel_column_names())
+        self._frames = FrameBuffer(len(self.channel_names))
         self.fps = 30.
         self.bvh_filepath = bvh_filepath
         self.bvhcsv_filepath = bvhcsv_filepath
 
-    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformManager]):
-        """
-        Convert the holistic data to jointspace.
-        """    
-
-        if tfs is None:
-            if len(self.dataframe) > 0:
-                self.dataframe.loc[len(self.dataframe)] = self.dataframe.loc[len(self.dataframe) - 1]
-            else:
-                self.dataframe.loc[len(self.dataframe)] = pd.Series({ k:0. for k in self.dataframe.columns})
-            return
+    @property
+    def channel_values(self) -> np.ndarray:
+        """Recorded `(frames, len(channel_names))` channel values."""
+        return self._frames.values
 
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.channel_values.copy(), columns=self.channel_names)
 
-        def get_data(node: BVHWriteNode, parent_frame = 'world', data = {}):
+    def _get_channel_values(self, tfs: Union[TransformLookup, ClipTransforms], identity: np.ndarray) -> np.ndarray:
+        """Channel values of every joint, in `channel_names` order, for one frame or a whole clip."""
+        def get_data(node: BVHWriteNode, parent_frame = 'world') -> List[np.ndarray]:
             try:
                 tf = tfs.get_transform(parent_frame, node.name)
             except KeyError:
-                tf = np.eye(4)
-            data.update(node.get_channel_info(tf, METERS_TO_CM))
+                tf = identity
+            data = [node.get_channel_values(tf, METERS_TO_CM)]
             for child in node.children:
-                data.update(get_data(child, node.name))
+                data.extend(get_data(child, node.name))
             return data
 
-        data = get_data(self.bvh_root)
-        data =  pd.Series(data)   
-        self.dataframe.loc[len(self.dataframe)] = data
+        return np.concatenate(get_data(self.bvh_root), axis=-1)
 
-    def write_output(self):
+    def _previous_frame(self) -> Optional[np.ndarray]:
+        return self.channel_values[-1] if len(self._frames) > 0 else None
 
-        frames = self.dataframe.to_numpy()
-        frame_count = len(self.dataframe)
+    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformLookup]):
+        """
+        Convert the holistic data to jointspace.
+        """    
+        # Frames without transforms repeat the previous frame (or zeros if there is none).
+        if tfs is None:
+            values = hold_missing_frames(np.zeros((1, len(self.channel_names))), [True], self._previous_frame())
+        else:
+            values = self._get_channel_values(tfs, np.eye(4))[np.newaxis]
+        self._frames.append(values)
 
+    def process_clip(self, clip: HumanoidPositionClip, transforms: ClipTransforms):
+        values = self._get_channel_values(transforms, np.broadcast_to(np.eye(4), (len(transforms), 4, 4)))
+        self._frames.append(hold_missing_frames(values, ~transforms.valid, self._previous_frame()))
+
+    def write_output(self):
         with open(self.bvh_filepath, 'w') as f:
-            write_bvh(f, self.bvh_root, self.fps, frame_count, frames)
+            write_bvh(f, self.bvh_root, self.fps, len(self._frames), self.channel_values)
             print("\tWrote BVH file to", self.bvh_filepath)
 
         if self.bvhcsv_filepath is not None:
             self.dataframe.to_csv(self.bvhcsv_filepath, index=False, float_format='%.3f')
             print("\tWrote BVH CSV file to", self.bvhcsv_filepath)
-
-
-    
\ No newline at end of file
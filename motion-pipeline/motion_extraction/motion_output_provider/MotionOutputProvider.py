@@ -1,20 +1,72 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-from ..MecanimHumanoid import HumanoidPositionSkeleton
+import numpy as np
+
+from ..MecanimHumanoid import ClipTransforms, FrameTransforms, HumanoidPositionClip, HumanoidPositionSkeleton
 
 from pytransform3d.transform_manager import TransformManager
 
+# Anything with TransformManager's `get_transform(from_frame, to_frame)` for a single frame.
+TransformLookup = Union[TransformManager, FrameTransforms]
+
+
+class FrameBuffer:
+    """
+    Growable `(frames, columns)` float array that output providers record frames into. Capacity is
+    preallocated and doubled when full, so recording a frame doesn't reallocate the whole array.
+    """
+
+    def __init__(self, column_count: int, initial_capacity: int = 1024):
+        self._values = np.empty((initial_capacity, column_count))
+        self._frame_count = 0
+
+    def __len__(self) -> int:
+        return self._frame_count
+
+    @property
+    def values(self) -> np.ndarray:
+        """The recorded frames (a view; copy before holding on to it across appends)."""
+        return self._values[:self._frame_count]
+
+    def append(self, frames: np.ndarray):
+        """Records a `(frames, columns)` block of frames."""
+        needed = self._frame_count + frames.shape[0]
+        if needed > self._values.shape[0]:
+            grown = np.empty((max(needed, 2 * self._values.shape[0]), self._values.shape[1]))
+            grown[:self._frame_count] = self.values
+            self._values = grown
+        self._values[self._frame_count:needed] = frames
+        self._frame_count = needed
+
+
+def hold_missing_frames(values: np.ndarray, held: np.ndarray, previous: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Replaces each frame marked in `held` with the last frame before it that isn't held. Held frames
+    at the start repeat `previous` (the frame before the first one), or zeros if there is none.
+    """
+    held = np.asarray(held, dtype=bool)
+    source_frame = np.maximum.accumulate(np.where(held, -1, np.arange(len(held))))
+    leading_values = np.zeros(values.shape[1:]) if previous is None else previous
+    return np.where((source_frame < 0)[:, np.newaxis], leading_values, values[source_frame])
+
 
 class MotionOutputProvider(ABC):
 
     @abstractmethod
-    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformManager]):
+    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformLookup]):
         pass
 
+    def process_clip(self, clip: HumanoidPositionClip, transforms: ClipTransforms):
+        """
+        Process every frame of a clip, in order. `transforms` holds the bone frames of the whole clip
+        (see `HumanoidPositionClip.get_transforms`). Frames it marks invalid are passed on as `None`,
+        like a failed per-frame `get_transforms`.
+        """
+        for skel, tfs in zip(clip, transforms):
+            self.process_frame(skel, tfs)
+
     @abstractmethod
     def write_output(self):
         pass
-
-
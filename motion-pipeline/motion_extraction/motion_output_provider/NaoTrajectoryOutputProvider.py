@@ -7,10 +7,10 @@ from enum import Enum, auto
 from random import sample
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, Final, List, Optional, Tuple, Union
 import pytransform3d.rotations as pr
-from motion_extraction.MecanimHumanoid import MecanimBone
-from .MotionOutputProvider import MotionOutputProvider, HumanoidPositionSkeleton, TransformManager, Path
+from motion_extraction.MecanimHumanoid import MecanimBone, _norm_vectors, _vector_projections
+from .MotionOutputProvider import MotionOutputProvider, FrameBuffer, hold_missing_frames, ClipTransforms, HumanoidPositionClip, HumanoidPositionSkeleton, TransformLookup, Path
 
 from ..view_urdf import display_urdf
 
@@ -108,16 +108,238 @@ class NaoMotor(Enum):
         return self.velocity_max * (1 - MAX_VEL_BUFFER_PERCENT)
 
 
+# Per-motor tables in `NaoMotor` order, the column order of the trajectory array and CSV.
+NAO_MOTORS: Final[Tuple[NaoMotor, ...]] = tuple(NaoMotor)
+NAO_MOTOR_INDEX: Final[Dict[NaoMotor, int]] = {motor: i for i, motor in enumerate(NAO_MOTORS)}
+_NAO_MOTOR_NAMES: Final[List[str]] = [motor.name for motor in NAO_MOTORS]
+_RANGE_MIN: Final[np.ndarray] = np.array([motor.range_min for motor in NAO_MOTORS])
+_RANGE_MAX: Final[np.ndarray] = np.array([motor.range_max for motor in NAO_MOTORS])
+_VELOCITY_MAX_WITH_BUFFER: Final[np.ndarray] = np.array([motor.velocity_max_with_buffer for motor in NAO_MOTORS])
+
+NAO_TRAJECTORY_FPS = 30.
+
+_UNIT_X = np.array([1., 0., 0.])
+_UNIT_Z = np.array([0., 0., 1.])
+
+
+def limit_joint_angles(angles: np.ndarray) -> np.ndarray:
+    """`NaoMotor.limit` for every motor, over the last axis of `(..., len(NaoMotor))` angles."""
+    angles = np.asarray(angles, dtype=np.float64)
+    # `max(range_min, min(range_max, nan))` is range_max, so NaN angles end up there too.
+    return np.where(np.isnan(angles), _RANGE_MAX, np.clip(angles, _RANGE_MIN, _RANGE_MAX))
+
+
+def clamp_joint_velocities(
+    angles: np.ndarray,
+    fps: float = NAO_TRAJECTORY_FPS,
+    previous: Optional[np.ndarray] = None,
+    held: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Applies the velocity limits (`NaoMotor.velocity_max_with_buffer`) to a `(frames, len(NaoMotor))`
+    trajectory of limited angles and returns the clamped trajectory.
+
+    Each frame is compared with the previous output frame; `previous` is the frame before the first
+    one (if None, the first frame is not clamped). A motor that moves further than it can in one
+    frame is moved by the maximum step instead, then limited. Note that this step is always taken
+    upwards, whichever way the motor was moving. Frames marked in `held` repeat the previous output
+    frame (zeros if there is none) instead of their own angles.
+
+    Clamping depends on the previous clamped frame, so it can't be a single array operation. The
+    frame loop only runs while a clamp or a hold is in effect, though: once a frame passes through
+    unchanged, every frame up to the next oversized step in the input does too.
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    frame_count = angles.shape[0]
+    held = np.zeros(frame_count, dtype=bool) if held is None else np.asarray(held, dtype=bool)
+    max_step = _VELOCITY_MAX_WITH_BUFFER / fps
+
+    # Held frames take the angles of the last frame that isn't held, which is what they'll be
+    # while the trajectory passes through unchanged.
+    filled = hold_missing_frames(angles, held, previous)
+
+    with np.errstate(invalid='ignore'):
+        input_jumps = np.flatnonzero((np.abs(np.diff(filled, axis=0)) > max_step).any(axis=1)) + 1
+
+    clamped = filled.copy()
+    prev = previous
+    t = 0
+    while t < frame_count:
+        if held[t]:
+            clamped[t] = 0. if prev is None else prev
+        elif prev is not None:
+            exceeded = np.abs(filled[t] - prev) > max_step
+            if exceeded.any():
+                clamped[t] = np.where(exceeded, limit_joint_angles(prev + max_step), filled[t])
+        prev = clamped[t]
+        t += 1
+        if np.array_equal(prev, filled[t - 1], equal_nan=True):
+            next_jump = np.searchsorted(input_jumps, t)
+            t = input_jumps[next_jump] if next_jump < len(input_jumps) else frame_count
+            prev = clamped[t - 1]
+    return clamped
+
+
+def _divide_by_norms(v: np.ndarray) -> np.ndarray:
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def _dots(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum('...i,...i->...', a, b)
+
+
+def _perpendiculars_to_vectors(a: np.ndarray) -> np.ndarray:
+    """`pr.perpendicular_to_vector` for each row."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        perpendicular = np.stack((np.ones_like(a[..., 0]), np.zeros_like(a[..., 0]), -a[..., 0] / a[..., 2]), axis=-1)
+    return np.where((np.abs(a[..., 2]) < pr.eps)[..., np.newaxis], _UNIT_Z, perpendicular)
+
+
+def _axis_angles_from_two_directions(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    `pr.axis_angle_from_two_directions` for each row, returned as `(axes, angles)`. The angle of
+    `arctan2(|a x b|, a . b)` is already in `[0, pi]`, so `norm_axis_angle` only has the no-rotation
+    case left to normalize.
+    """
+    a = _norm_vectors(a)
+    b = _norm_vectors(b)
+    axis = np.cross(a, b)
+    sin_angle = np.linalg.norm(axis, axis=-1)
+    cos_angle = _dots(a, b)
+    antiparallel = np.abs(-1.0 - cos_angle) < pr.eps
+    axis = np.where(antiparallel[..., np.newaxis], _perpendiculars_to_vectors(a), axis)
+    axis = _norm_vectors(axis)
+    angle = np.arctan2(sin_angle, cos_angle)
+
+    no_rotation = (angle == 0.0) | (np.linalg.norm(axis, axis=-1) == 0.0)
+    axis = np.where(no_rotation[..., np.newaxis], _UNIT_X, _norm_vectors(axis))
+    angle = np.where(no_rotation, 0.0, angle)
+    return axis, angle
+
+
+def _angles_between_vectors(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """`pr.angle_between_vectors` for each row."""
+    a = _divide_by_norms(a)
+    b = _divide_by_norms(b)
+    return 2.0 * np.arctan2(np.linalg.norm(a - b, axis=-1), np.linalg.norm(a + b, axis=-1))
+
+
+def _shoulder_pitch_roll(upperarm_vector: np.ndarray, z_sign: float, roll_sign: float) -> Tuple[np.ndarray, np.ndarray]:
+    uarm_x, uarm_y, uarm_z = np.moveaxis(upperarm_vector, -1, 0)
+    arm_in_yz_plane = uarm_z == 0
+    shoulder_pitch = np.where(arm_in_yz_plane, 0., np.arctan2(-uarm_y, z_sign * uarm_z))
+    yz_hypotenus = np.sqrt(uarm_y**2 + uarm_z**2)
+    shoulder_roll = np.where(arm_in_yz_plane, 0., roll_sign * np.arctan2(uarm_x, yz_hypotenus))
+    return shoulder_pitch, shoulder_roll
+
+
+def _elbow_yaw_roll(world_vectoshoulder: np.ndarray, world_vectolowerarm: np.ndarray, world_vectohand: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Points towards interior of shoulder joint
+    shoulder_pivot_bisection_vector = _divide_by_norms(world_vectolowerarm - world_vectoshoulder)
+
+    # Points towards interior of elbow joint
+    elbow_pivot_bisection_vector = _divide_by_norms(world_vectohand - world_vectolowerarm)
+
+    shoulder_pivot_bisection_vector_proj = _vector_projections(shoulder_pivot_bisection_vector, world_vectolowerarm)
+    shoulder_pivot_vector_rejection = _divide_by_norms(shoulder_pivot_bisection_vector - shoulder_pivot_bisection_vector_proj)
+
+    elbow_pivot_bisection_vector_proj = _vector_projections(elbow_pivot_bisection_vector, world_vectolowerarm)
+    elbow_pivot_vector_rejection = _divide_by_norms(elbow_pivot_bisection_vector - elbow_pivot_bisection_vector_proj)
+
+    elbow_axis, elbow_angle = _axis_angles_from_two_directions(shoulder_pivot_vector_rejection, elbow_pivot_vector_rejection)
+    elbow_angle_sign = _dots(elbow_axis, world_vectolowerarm)
+    elbow_yaw = elbow_angle * elbow_angle_sign - np.pi / 2
+    # elbow_yaw = -pr.angle_between_vectors(shoulder_pivot_vector_rejection, elbow_pivot_vector_rejection)
+
+    elbow_roll = np.abs(_angles_between_vectors(world_vectolowerarm, world_vectohand))
+    return elbow_yaw, elbow_roll
+
+
+def nao_joint_angles(tfs: Union[TransformLookup, ClipTransforms]) -> np.ndarray:
+    """
+    NAO joint angles, before any limits, in `NaoMotor` order. With a single frame's transforms
+    (a `TransformManager` or `FrameTransforms`) this is a `(len(NaoMotor),)` array; with a
+    `ClipTransforms` it is `(frames, len(NaoMotor))`, computed for the whole clip at once.
+    """
+    def x_axis(from_frame: str, to_frame: str) -> np.ndarray:
+        return tfs.get_transform(from_frame, to_frame)[..., :3, :3] @ _UNIT_X
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lupperarm_vector = x_axis(MecanimBone.LeftUpperArm.name, MecanimBone.Chest.name)
+        lshoulder_pitch, lshoulder_roll = _shoulder_pitch_roll(lupperarm_vector, z_sign=1., roll_sign=1.)
+
+        # Note: in chest-rightward coordinate system, x is rightward, y is up, and z is *backward*,
+        # so the z and roll signs are flipped.
+        rupperarm_vector = x_axis(MecanimBone.RightUpperArm.name, MecanimBone.ChestRightward.name)
+        rshoulder_pitch, rshoulder_roll = _shoulder_pitch_roll(rupperarm_vector, z_sign=-1., roll_sign=-1.)
+
+        # Targets:
+        # LShoulderPitch = ~81 deg
+        # LShoulderRoll = ~14 deg
+        # LElbowYaw = ~-119 deg
+        # LElbowRoll = ~-35 deg
+        lelbow_yaw, lelbow_roll = _elbow_yaw_roll(
+            x_axis(MecanimBone.Chest.name, 'world'),
+            x_axis(MecanimBone.LeftUpperArm.name, 'world'),
+            x_axis(MecanimBone.LeftLowerArm.name, 'world'),
+        )
+        lelbow_roll = -lelbow_roll
+
+        relbow_yaw, relbow_roll = _elbow_yaw_roll(
+            x_axis(MecanimBone.ChestRightward.name, 'world'),
+            x_axis(MecanimBone.RightUpperArm.name, 'world'),
+            x_axis(MecanimBone.RightLowerArm.name, 'world'),
+        )
+        relbow_yaw %= np.pi
+
+        # Calculate head yaw and pitch
+        gaze_direction = tfs.get_transform(MecanimBone.Head.name, MecanimBone.Chest.name)[..., :3, :3] @ _UNIT_Z
+        gaze_x, gaze_y, gaze_z = np.moveaxis(gaze_direction, -1, 0)
+        head_yaw = np.arctan2(gaze_x, gaze_z)
+        head_pitch = np.arctan2(gaze_z, gaze_y)
+
+    angles = {
+        NaoMotor.HeadYaw: head_yaw,
+        NaoMotor.HeadPitch: head_pitch,
+        NaoMotor.LShoulderPitch: lshoulder_pitch,
+        NaoMotor.LShoulderRoll: lshoulder_roll,
+        NaoMotor.LElbowYaw: lelbow_yaw,
+        NaoMotor.LElbowRoll: lelbow_roll,
+        NaoMotor.RShoulderPitch: rshoulder_pitch,
+        NaoMotor.RShoulderRoll: rshoulder_roll,
+        NaoMotor.RElbowYaw: relbow_yaw,
+        NaoMotor.RElbowRoll: relbow_roll,
+    }
+    return np.stack([angles[motor] for motor in NAO_MOTORS], axis=-1)
+
+
 class NaoTrajectoryOutputProvider(MotionOutputProvider):
-    def __init__(self, nao_trajectory_filepath: Path):
+    """
+    Builds a NAO joint trajectory, one row per frame with a column per `NaoMotor`.
+
+    `process_clip` converts a whole clip with array operations. `process_frame` is the streaming
+    variant (used for teleoperation): it converts one frame at a time, clamping velocities against
+    the last frame it produced. Recorded frames go into a `FrameBuffer`; `dataframe` is a view of it
+    as a table.
+    """
+
+    def __init__(self, nao_trajectory_filepath: Path, fps: float = NAO_TRAJECTORY_FPS):
         self.nao_trajectory_filepath = nao_trajectory_filepath
+        self.fps = fps
+
+        self._frames = FrameBuffer(len(NAO_MOTORS))
+        # Last frame produced, recorded or not; velocities are clamped relative to it.
+        self._last_angles: Optional[np.ndarray] = None
+
+    @property
+    def angles(self) -> np.ndarray:
+        """Recorded `(frames, len(NaoMotor))` joint angles, columns indexed by `NAO_MOTOR_INDEX`."""
+        return self._frames.values
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.angles.copy(), columns=_NAO_MOTOR_NAMES)
 
-        self.dataframe = pd.DataFrame(
-            columns = [
-                e.name for e in NaoMotor
-            ]
-        )
-    
     def _plt(self, skel, tfs, ax=None):
         import matplotlib.pyplot as plt
         if ax == None:
@@ -127,154 +349,34 @@ class NaoTrajectoryOutputProvider(MotionOutputProvider):
         plt.tight_layout()
         plt.show(block=True)
 
-    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformManager], record_to_dataframe: bool = True):
-        
+    def process_frame(self, skel: HumanoidPositionSkeleton, tfs: Optional[TransformLookup], record_to_dataframe: bool = True):
         # tfs can be None when a human isn't recognized in a video frame. 
-        # If so, just use the previous frame's transforms (if there is one, else default to zeros).
+        # If so, just repeat the previous frame's angles (if there is one, else default to zeros).
         if tfs is None:
-            inferred_joints  = pd.Series({ k:0. for k in self.dataframe.columns})
-            if len(self.dataframe) > 0:
-                inferred_joints = self.dataframe.loc[len(self.dataframe) - 1]
-            if record_to_dataframe:
-                self.dataframe.loc[len(self.dataframe)]
-            return inferred_joints
-
-        row: Dict[str, float] = {}
-        chest_to_lupperarm = tfs.get_transform(MecanimBone.LeftUpperArm.name, MecanimBone.Chest.name)
-        lupperarm_vector = chest_to_lupperarm[:3, :3] @ np.array([1., 0., 0.])
-        luarm_x, luarm_y, luarm_z = lupperarm_vector
-        if luarm_z == 0:
-            lshoulder_pitch = 0.
-            lshoulder_roll = 0.
-        else:
-            lshoulder_pitch = np.arctan2(-luarm_y, luarm_z)
-            yz_hypotenus = np.sqrt(luarm_y**2 + luarm_z**2)
-            lshoulder_roll = np.arctan2(luarm_x, yz_hypotenus)
-        row[NaoMotor.LShoulderPitch.name] = NaoMotor.LShoulderPitch.limit(lshoulder_pitch)
-        row[NaoMotor.LShoulderRoll.name] = NaoMotor.LShoulderRoll.limit(lshoulder_roll)
-
-        # Note: in chest-rightward coordinate system, x is rightward, y is up, and z is *backward*
-        chest_to_rupperarm = tfs.get_transform(MecanimBone.RightUpperArm.name, MecanimBone.ChestRightward.name)
-        rupperarm_vector = chest_to_rupperarm[:3, :3] @ np.array([1., 0., 0.])
-        ruarm_x, ruarm_y, ruarm_z = rupperarm_vector
-        if ruarm_z == 0:
-            rshoulder_pitch = 0.
-            rshoulder_roll = 0.
+            angles = clamp_joint_velocities(
+                np.zeros((1, len(NAO_MOTORS))), self.fps, previous=self._last_angles, held=[True],
+            )
         else:
-            # z faces backwards, so we need to flip the sign
-            rshoulder_pitch = np.arctan2(-ruarm_y, -ruarm_z)
-            yz_hypotenus = np.sqrt(ruarm_y**2 + ruarm_z**2)
-            rshoulder_roll = -np.arctan2(ruarm_x, yz_hypotenus)
-        row[NaoMotor.RShoulderPitch.name] = NaoMotor.RShoulderPitch.limit(rshoulder_pitch)
-        row[NaoMotor.RShoulderRoll.name] = NaoMotor.RShoulderRoll.limit(rshoulder_roll)
-      
-        # Targets:
-        # LShoulderPitch = ~81 deg
-        # LShoulderRoll = ~14 deg
-        # LElbowYaw = ~-119 deg
-        # LElbowRoll = ~-35 deg
-        # chest_to_llowerarm = tfs.get_transform(MecanimBone.LeftLowerArm.name, MecanimBone.Chest.name)
-        
-        world_vectolshoulder = tfs.get_transform(MecanimBone.Chest.name, 'world')[:3, :3] @ np.array([1., 0., 0.])
-        world_vectollowerarm = tfs.get_transform(MecanimBone.LeftUpperArm.name, 'world')[:3, :3] @ np.array([1., 0., 0.])
-        world_vectolhand = tfs.get_transform(MecanimBone.LeftLowerArm.name, 'world')[:3, :3] @ np.array([1., 0., 0.])
-
-        # Points towards interior of shoulder joint
-        lshoulder_pivot_bisection_vector = world_vectollowerarm - world_vectolshoulder
-        lshoulder_pivot_bisection_vector /= np.linalg.norm(lshoulder_pivot_bisection_vector)
-
-        # Points towards interior of elbow joint
-        lelbow_pivot_bisection_vector = world_vectolhand - world_vectollowerarm
-        lelbow_pivot_bisection_vector /= np.linalg.norm(lelbow_pivot_bisection_vector)
-
-        lshoulder_pivot_bisection_vector_proj = pr.vector_projection(lshoulder_pivot_bisection_vector, world_vectollowerarm)
-        lshoulder_pivot_vector_rejection = lshoulder_pivot_bisection_vector - lshoulder_pivot_bisection_vector_proj
-        lshoulder_pivot_vector_rejection /= np.linalg.norm(lshoulder_pivot_vector_rejection)
-
-        lelbow_pivot_bisection_vector_proj = pr.vector_projection(lelbow_pivot_bisection_vector, world_vectollowerarm)
-        lelbow_pivot_vector_rejection = lelbow_pivot_bisection_vector - lelbow_pivot_bisection_vector_proj
-        lelbow_pivot_vector_rejection /= np.linalg.norm(lelbow_pivot_vector_rejection)
-
-        lelbow_axis_angle = pr.axis_angle_from_two_directions(lshoulder_pivot_vector_rejection, lelbow_pivot_vector_rejection)
-        lelbow_angle_sign = lelbow_axis_angle[:3].dot(world_vectollowerarm)
-        lelbow_yaw = lelbow_axis_angle[3] * lelbow_angle_sign
-        lelbow_yaw -= np.pi / 2
-
-        # lelbow_yaw = -pr.angle_between_vectors(lshoulder_pivot_vector_rejection, lelbow_pivot_vector_rejection)
-        row[NaoMotor.LElbowYaw.name] = NaoMotor.LElbowYaw.limit(lelbow_yaw)
-        lelbow_roll = -np.abs(pr.angle_between_vectors(world_vectollowerarm, world_vectolhand))
-        row[NaoMotor.LElbowRoll.name] = NaoMotor.LElbowRoll.limit(lelbow_roll)
-
-        world_vectorrshoulder = tfs.get_transform(MecanimBone.ChestRightward.name, 'world')[:3, :3] @ np.array([1., 0., 0.])
-        world_vectorrlowerarm = tfs.get_transform(MecanimBone.RightUpperArm.name, 'world')[:3, :3] @ np.array([1., 0., 0.])        
-        world_vectorrhand = tfs.get_transform(MecanimBone.RightLowerArm.name, 'world')[:3, :3] @ np.array([1., 0., 0.])
-
-        # Points towards interior of shoulder joint
-        rshoulder_pivot_bisection_vector = world_vectorrlowerarm - world_vectorrshoulder
-        rshoulder_pivot_bisection_vector /= np.linalg.norm(rshoulder_pivot_bisection_vector)
-
-        # Points towards interior of elbow joint
-        relbow_pivot_bisection_vector = world_vectorrhand - world_vectorrlowerarm
-        relbow_pivot_bisection_vector /= np.linalg.norm(relbow_pivot_bisection_vector)
-
-        rshoulder_pivot_bisection_vector_proj = pr.vector_projection(rshoulder_pivot_bisection_vector, world_vectorrlowerarm)
-        rshoulder_pivot_vector_rejection = rshoulder_pivot_bisection_vector - rshoulder_pivot_bisection_vector_proj
-        rshoulder_pivot_vector_rejection /= np.linalg.norm(rshoulder_pivot_vector_rejection)
-
-        relbow_pivot_bisection_vector_proj = pr.vector_projection(relbow_pivot_bisection_vector, world_vectorrlowerarm)
-        relbow_pivot_vector_rejection = relbow_pivot_bisection_vector - relbow_pivot_bisection_vector_proj
-        relbow_pivot_vector_rejection /= np.linalg.norm(relbow_pivot_vector_rejection)
-
-        relbow_axis_angle = pr.axis_angle_from_two_directions(rshoulder_pivot_vector_rejection, relbow_pivot_vector_rejection)
-        relbow_angle_sign = relbow_axis_angle[:3].dot(world_vectorrlowerarm)
-        relbow_yaw = relbow_axis_angle[3] * relbow_angle_sign
-        relbow_yaw -= np.pi / 2
-        relbow_yaw %= np.pi
-        # relbow_yaw = -pr.angle_between_vectors(rshoulder_pivot_vector_rejection, relbow_pivot_vector_rejection)
-
-        row[NaoMotor.RElbowYaw.name] = NaoMotor.RElbowYaw.limit(relbow_yaw)
-        relbow_roll = np.abs(pr.angle_between_vectors(world_vectorrlowerarm, world_vectorrhand))
-        row[NaoMotor.RElbowRoll.name] = NaoMotor.RElbowRoll.limit(relbow_roll)
-        
-        # Calculate head yaw and pitch
-        head2chest = tfs.get_transform(MecanimBone.Head.name, MecanimBone.Chest.name)
-        gaze_direction = head2chest[:3, :3] @ np.array([0., 0., 1.])
-        gaze_x, gaze_y, gaze_z = gaze_direction
-
-        head_yaw = np.arctan2(gaze_x, gaze_z)
-        head_pitch = np.arctan2(gaze_z, gaze_y)
-        row[NaoMotor.HeadYaw.name] = NaoMotor.HeadYaw.limit(head_yaw)
-        row[NaoMotor.HeadPitch.name] = NaoMotor.HeadPitch.limit(head_pitch)
-        
-        frame_index = len(self.dataframe)
-
-        fps = 30.
-        # Ensure that velocity limits are not exceeded
-        for (motor_name, motor_angle) in row.items():
-            # skip if this is the first frame
-            if len(self.dataframe) == 0:
-                break
-
-            motor = NaoMotor[motor_name]
-            prev_angle = self.dataframe[motor_name].iloc[-1]
-            max_angle_change = motor.velocity_max_with_buffer / fps
-            angle_change = np.abs(motor_angle - prev_angle)
-            if angle_change > max_angle_change:
-                new_motor_angle = prev_angle + np.sign(angle_change) * max_angle_change
-                row[motor_name] = motor.limit(new_motor_angle)
-
-        series_data = pd.Series(row)
+            angles = limit_joint_angles(nao_joint_angles(tfs))[np.newaxis]
+            angles = clamp_joint_velocities(angles, self.fps, previous=self._last_angles)
 
+        self._last_angles = angles[0]
         if record_to_dataframe:
-            self.dataframe.loc[frame_index] = pd.Series(row)
-        
+            self._frames.append(angles)
+
         debug = False
         if debug:
-            display_urdf(nao_urdf_path, joint_values = row, fig_title=f"Frame {frame_index} NAO URDF")
+            display_urdf(nao_urdf_path, joint_values = dict(zip(_NAO_MOTOR_NAMES, angles[0])), fig_title=f"Frame {len(self._frames)} NAO URDF")
 
-        return series_data
+        return pd.Series(angles[0], index=_NAO_MOTOR_NAMES)
 
+    def process_clip(self, clip: HumanoidPositionClip, transforms: ClipTransforms):
+        angles = limit_joint_angles(nao_joint_angles(transforms))
+        angles = clamp_joint_velocities(angles, self.fps, previous=self._last_angles, held=~transforms.valid)
+        if len(angles) > 0:
+            self._last_angles = angles[-1]
+        self._frames.append(angles)
 
     def write_output(self):
         self.dataframe.to_csv(self.nao_trajectory_filepath, index=False)
-        print("\tWrote Nao Control file to", self.nao_trajectory_filepath)
\ No newline at end of file
+        print("\tWrote Nao Control file to", self.nao_trajectory_filepath)
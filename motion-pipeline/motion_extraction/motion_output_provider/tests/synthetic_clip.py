@@ -0,0 +1,49 @@
+"""Deterministic holistic clips for the output provider tests."""
+import numpy as np
+import pandas as pd
+
+from motion_extraction.mp_utils import PoseLandmark
+
+# Image-space landmark positions of a person standing with their arms down (x right, y down).
+_STANDING_POSE = {
+    "NOSE": (0.0, -0.62, -0.10),
+    "LEFT_EYE_INNER": (0.015, -0.65, -0.09), "LEFT_EYE": (0.03, -0.65, -0.09), "LEFT_EYE_OUTER": (0.045, -0.65, -0.085),
+    "RIGHT_EYE_INNER": (-0.015, -0.65, -0.09), "RIGHT_EYE": (-0.03, -0.65, -0.09), "RIGHT_EYE_OUTER": (-0.045, -0.65, -0.085),
+    "LEFT_EAR": (0.075, -0.63, -0.02), "RIGHT_EAR": (-0.075, -0.63, -0.02),
+    "MOUTH_LEFT": (0.02, -0.58, -0.09), "MOUTH_RIGHT": (-0.02, -0.58, -0.09),
+    "LEFT_SHOULDER": (0.18, -0.45, 0.0), "RIGHT_SHOULDER": (-0.18, -0.45, 0.0),
+    "LEFT_ELBOW": (0.22, -0.20, 0.02), "RIGHT_ELBOW": (-0.22, -0.20, 0.02),
+    "LEFT_WRIST": (0.24, 0.02, -0.02), "RIGHT_WRIST": (-0.24, 0.02, -0.02),
+    "LEFT_PINKY": (0.25, 0.08, -0.01), "RIGHT_PINKY": (-0.25, 0.08, -0.01),
+    "LEFT_INDEX": (0.24, 0.09, -0.04), "RIGHT_INDEX": (-0.24, 0.09, -0.04),
+    "LEFT_THUMB": (0.22, 0.06, -0.05), "RIGHT_THUMB": (-0.22, 0.06, -0.05),
+    "LEFT_HIP": (0.1, 0.0, 0.0), "RIGHT_HIP": (-0.1, 0.0, 0.0),
+    "LEFT_KNEE": (0.11, 0.42, -0.01), "RIGHT_KNEE": (-0.11, 0.42, -0.01),
+    "LEFT_ANKLE": (0.12, 0.82, 0.03), "RIGHT_ANKLE": (-0.12, 0.82, 0.03),
+    "LEFT_HEEL": (0.12, 0.86, 0.07), "RIGHT_HEEL": (-0.12, 0.86, 0.07),
+    "LEFT_FOOT_INDEX": (0.13, 0.88, -0.08), "RIGHT_FOOT_INDEX": (-0.13, 0.88, -0.08),
+}
+_ARM_LANDMARKS = ("ELBOW", "WRIST", "PINKY", "INDEX", "THUMB")
+
+
+def make_holistic_clip(frame_count: int) -> pd.DataFrame:
+    """
+    A deterministic holistic clip: the standing pose with small jitter, arms swinging, and both arms
+    snapping up at frame 40 (so some frames hit the velocity limits).
+    """
+    t = np.arange(frame_count) / 30.0
+    columns = {}
+    for landmark_i, landmark in enumerate(PoseLandmark):
+        position = np.tile(np.array(_STANDING_POSE[landmark.name]), (frame_count, 1))
+        position += 0.01 * np.sin(np.outer(t, [7.1, 8.3, 9.7]) * (landmark_i + 1) + landmark_i)
+        if landmark.name.endswith(_ARM_LANDMARKS):
+            reach = 1.0 if landmark.name.endswith("ELBOW") else 2.0
+            side = 1.0 if landmark.name.startswith("LEFT") else -1.0
+            position[:, 0] += side * 0.15 * reach * (1 + np.sin(2 * np.pi * 0.5 * t)) / 2
+            position[:, 1] -= 0.25 * reach * (1 + np.sin(2 * np.pi * 0.5 * t + side)) / 2
+            position[:, 2] -= 0.1 * reach * np.cos(2 * np.pi * 0.7 * t)
+            position[40:, 1] -= 0.3 * reach
+        for axis_i, axis in enumerate("xyz"):
+            columns[f"{landmark.name}_{axis}"] = position[:, axis_i]
+        columns[f"{landmark.name}_vis"] = np.ones(frame_count)
+    return pd.DataFrame(columns)
@@ -0,0 +1,117 @@
+import tempfile
+import unittest
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytransform3d.rotations as pr
+
+from motion_extraction.bvh_writer import intrinsic_euler_zxy_from_active_matrices
+from motion_extraction.MecanimHumanoid import HumanoidPositionClip
+from motion_extraction.motion_output_provider import BVHOutputProvider
+from motion_extraction.motion_output_provider.BVHOutputProvider import METERS_TO_CM
+from motion_extraction.motion_output_provider.tests.synthetic_clip import make_holistic_clip
+
+# Written by the per-frame provider (one TransformManager and one DataFrame row per frame, MOTION
+# values formatted with str()) from `make_holistic_clip(60)`, before the provider became array-backed.
+EXPECTED_BVH = Path(__file__).parent / "data" / "synthetic_clip.bvh"
+EXPECTED_BVH_CSV = Path(__file__).parent / "data" / "synthetic_clip.bvh.csv"
+
+
+def assert_angles_close(actual: np.ndarray, expected: np.ndarray, atol: float):
+    # Angles near +-180 degrees may land on either side of the wrap.
+    difference = np.abs(actual - expected)
+    np.testing.assert_array_less(np.minimum(difference, np.abs(difference - 360.)), atol)
+
+
+class EulerExtractionTests(unittest.TestCase):
+    def test_matches_pytransform3d(self):
+        rng = np.random.default_rng(3)
+        matrices = [pr.random_matrix(rng) for _ in range(500)]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            # Gimbal locks (x' at +-90 degrees) and half turns.
+            matrices += [
+                pr.active_matrix_from_intrinsic_euler_zxy((z, x, 0.3))
+                for z in (0.1, -2.0) for x in (0.5 * np.pi, -0.5 * np.pi)
+            ]
+            matrices += [np.eye(3), pr.active_matrix_from_angle(2, np.pi), pr.active_matrix_from_angle(0, np.pi)]
+            matrices = np.array(matrices)
+            expected = np.array([pr.intrinsic_euler_zxy_from_active_matrix(R) for R in matrices])
+        np.testing.assert_allclose(intrinsic_euler_zxy_from_active_matrices(matrices), expected, rtol=0, atol=1e-12)
+
+
+class BVHOutputProviderTests(unittest.TestCase):
+    def setUp(self):
+        holistic_data = make_holistic_clip(60)
+        self.clip = HumanoidPositionClip.from_mp_pose_dataframe(holistic_data)
+        self.transforms = self.clip.get_transforms()
+        self.offsets = self.clip.get_offsets_and_measurements().mean(axis=0) * METERS_TO_CM
+
+    def make_provider(self, tmp: str) -> BVHOutputProvider:
+        return BVHOutputProvider(self.offsets, Path(tmp) / "clip.bvh", Path(tmp) / "clip.bvh.csv")
+
+    def test_clip_matches_per_frame_provider_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = self.make_provider(tmp)
+            provider.process_clip(self.clip, self.transforms)
+            provider.write_output()
+            hierarchy, _ = provider.bvh_filepath.read_text().split("MOTION\n")
+            csv_lines = provider.bvhcsv_filepath.read_text().splitlines()
+
+        expected_hierarchy, expected_motion = EXPECTED_BVH.read_text().split("MOTION\n")
+        self.assertEqual(hierarchy, expected_hierarchy)
+        expected_values = np.array([line.split(" ") for line in expected_motion.splitlines()[2:] if line], dtype=float)
+        assert_angles_close(provider.channel_values, expected_values, atol=1e-9)
+
+        expected_csv_lines = EXPECTED_BVH_CSV.read_text().splitlines()
+        self.assertEqual(csv_lines[0], expected_csv_lines[0])
+        self.assertEqual(len(csv_lines), len(expected_csv_lines))
+        # Angles within rounding error of +-180 degrees may be written as either 180.000 or -180.000.
+        written = np.array([line.split(",") for line in csv_lines[1:]], dtype=float)
+        expected_written = np.array([line.split(",") for line in expected_csv_lines[1:]], dtype=float)
+        assert_angles_close(written, expected_written, atol=1e-3 + 1e-9)
+
+    def test_streaming_matches_clip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            clip_provider = self.make_provider(tmp)
+            clip_provider.process_clip(self.clip, self.transforms)
+
+            frame_provider = self.make_provider(tmp)
+            for skel, tfs in zip(self.clip, self.transforms):
+                frame_provider.process_frame(skel, tfs)
+
+        self.assertEqual(clip_provider.channel_values.shape, (60, len(clip_provider.channel_names)))
+        np.testing.assert_array_equal(clip_provider.channel_values, frame_provider.channel_values)
+
+    def test_missing_frames_repeat_previous_frame(self):
+        self.transforms.valid[[0, 20, 21]] = False
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = self.make_provider(tmp)
+            provider.process_clip(self.clip, self.transforms)
+        values = provider.channel_values
+        np.testing.assert_array_equal(values[0], 0.)
+        np.testing.assert_array_equal(values[20], values[19])
+        np.testing.assert_array_equal(values[21], values[19])
+
+    def test_motion_block_has_fixed_precision(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = self.make_provider(tmp)
+            provider.process_clip(self.clip, self.transforms)
+            provider.write_output()
+            hierarchy, motion = provider.bvh_filepath.read_text().split("MOTION\n")
+
+        self.assertTrue(hierarchy.startswith("HIERARCHY\nROOT Hips\n"))
+        lines = motion.splitlines()
+        self.assertEqual(lines[0], "Frames: 60")
+        rows = [line.split(" ") for line in lines[2:] if line]
+        self.assertEqual(len(rows), 60)
+        for row in rows:
+            self.assertEqual(len(row), len(provider.channel_names))
+            self.assertTrue(all(len(value.split(".")[1]) == 6 for value in row))
+        written = np.array(rows, dtype=float)
+        assert_angles_close(written, provider.channel_values, atol=5e-7 + 1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
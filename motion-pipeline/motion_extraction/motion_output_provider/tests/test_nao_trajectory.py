@@ -0,0 +1,118 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.MecanimHumanoid import HumanoidPositionClip
+from motion_extraction.motion_output_provider import NaoTrajectoryOutputProvider
+from motion_extraction.motion_output_provider.NaoTrajectoryOutputProvider import (
+    NaoMotor,
+    clamp_joint_velocities,
+    limit_joint_angles,
+)
+from motion_extraction.motion_output_provider.tests.synthetic_clip import make_holistic_clip
+
+# Written by the per-frame provider (one TransformManager and one DataFrame row per frame) from
+# `make_holistic_clip(90)`, before the provider became array-backed.
+EXPECTED_TRAJECTORY_CSV = Path(__file__).parent / "data" / "synthetic_clip.nao.csv"
+
+
+def provider_trajectory(provider: NaoTrajectoryOutputProvider) -> pd.DataFrame:
+    with tempfile.TemporaryDirectory() as tmp:
+        provider.nao_trajectory_filepath = Path(tmp) / "trajectory.nao.csv"
+        provider.write_output()
+        return pd.read_csv(provider.nao_trajectory_filepath, float_precision="round_trip")
+
+
+class NaoTrajectoryOutputProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.clip = HumanoidPositionClip.from_mp_pose_dataframe(make_holistic_clip(90))
+        self.transforms = self.clip.get_transforms()
+
+    def test_clip_matches_per_frame_provider_output(self):
+        provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        provider.process_clip(self.clip, self.transforms)
+
+        expected = pd.read_csv(EXPECTED_TRAJECTORY_CSV, float_precision="round_trip")
+        actual = provider_trajectory(provider)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=0, atol=1e-9)
+
+    def test_streaming_matches_clip(self):
+        clip_provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        clip_provider.process_clip(self.clip, self.transforms)
+
+        held = np.zeros(len(self.clip), dtype=bool)
+        held[[0, 1, 41, 42, 60]] = True
+        streaming_provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        held_clip_provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        for skel, tfs, is_held in zip(self.clip, self.transforms, held):
+            streaming_provider.process_frame(skel, None if is_held else tfs)
+        self.transforms.valid[held] = False
+        held_clip_provider.process_clip(self.clip, self.transforms)
+
+        np.testing.assert_allclose(held_clip_provider.angles, streaming_provider.angles, rtol=0, atol=1e-12)
+        self.assertFalse(np.allclose(held_clip_provider.angles, clip_provider.angles))
+
+    def test_missing_frames_repeat_previous_angles(self):
+        self.transforms.valid[[0, 1, 30]] = False
+        provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        provider.process_clip(self.clip, self.transforms)
+
+        angles = provider.angles
+        self.assertEqual(angles.shape, (90, len(NaoMotor)))
+        np.testing.assert_array_equal(angles[:2], 0.0)
+        np.testing.assert_array_equal(angles[30], angles[29])
+
+    def test_unrecorded_frames_still_clamp_velocities(self):
+        provider = NaoTrajectoryOutputProvider(Path("unused.nao.csv"))
+        streamed = np.array([
+            provider.process_frame(skel, tfs, record_to_dataframe=False).to_numpy()
+            for skel, tfs in zip(self.clip, self.transforms)
+        ])
+        self.assertEqual(len(provider.dataframe), 0)
+        max_step = np.array([motor.velocity_max_with_buffer for motor in NaoMotor]) / provider.fps
+        self.assertTrue(np.all(np.abs(np.diff(streamed, axis=0)) <= max_step + 1e-12))
+
+
+class VelocityClampTests(unittest.TestCase):
+    def reference_clamp(self, angles: np.ndarray, fps: float) -> np.ndarray:
+        """Frame-by-frame clamp from the per-frame provider."""
+        clamped = []
+        for row in angles:
+            row = row.copy()
+            for motor_i, motor in enumerate(NaoMotor):
+                if len(clamped) == 0:
+                    break
+                prev_angle = clamped[-1][motor_i]
+                max_angle_change = motor.velocity_max_with_buffer / fps
+                angle_change = np.abs(row[motor_i] - prev_angle)
+                if angle_change > max_angle_change:
+                    row[motor_i] = motor.limit(prev_angle + np.sign(angle_change) * max_angle_change)
+            clamped.append(row)
+        return np.array(clamped)
+
+    def test_matches_frame_by_frame_clamp(self):
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            frame_count = int(rng.integers(1, 60))
+            steps = rng.normal(scale=rng.choice([0.05, 0.3]), size=(frame_count, len(NaoMotor)))
+            angles = limit_joint_angles(np.cumsum(steps, axis=0))
+            angles[rng.random(angles.shape) < 0.02] = np.nan
+            np.testing.assert_array_equal(
+                clamp_joint_velocities(angles, fps=30.),
+                self.reference_clamp(angles, fps=30.),
+            )
+
+    def test_limit_matches_motor_limit(self):
+        values = np.array([-10., -0.5, 0., 0.3, 10., np.nan])
+        for motor_i, motor in enumerate(NaoMotor):
+            angles = np.zeros((len(values), len(NaoMotor)))
+            angles[:, motor_i] = values
+            limited = limit_joint_angles(angles)[:, motor_i]
+            np.testing.assert_array_equal(limited, [motor.limit(v) for v in values])
+
+
+if __name__ == "__main__":
+    unittest.main()
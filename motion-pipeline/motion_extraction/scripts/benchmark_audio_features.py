@@ -0,0 +1,101 @@
+"""
+Benchmark of `analyze_audio_with_plot_data` with whole-track features against the original
+per-segment similarity features.
+
+The original computed the onset envelope in tempo analysis, again (through its own tempogram)
+inside `beat_track`, and then, for every 8-beat segment, normalized, pre-emphasized and zero-padded
+the raw waveform and computed a tempogram of it from scratch. Now the onset envelope, PLP pulse,
+tempo autocorrelation and tempogram are computed once per track (`AudioFeatures`) and each segment's
+time-lag representation is a slice of the tempogram. This script times the original cross-similarity
+features, the full analysis without a feature cache, and a reanalysis that hits the cache, and
+reports how far the new cross-similarity matrix is from the original one. Pass an audio file, or
+let the script synthesize one. Run from the motion-pipeline folder:
+
+    python -m motion_extraction.scripts.benchmark_audio_features --seconds 180
+    python -m motion_extraction.scripts.benchmark_audio_features --audio path/to/song.mp3
+"""
+import argparse
+import tempfile
+import timeit
+import typing as t
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+from motion_extraction.audio_analysis.audio_analysis import analyze_audio_with_plot_data
+from motion_extraction.audio_analysis.audio_tools import load_audio
+from motion_extraction.audio_analysis.similarity_analysis import compute_segment_groupings
+
+
+def original_cross_similarity(y: np.ndarray, sr: float, segment_times: t.List[t.Tuple[float, float]]) -> np.ndarray:
+    """The original `calculate_cross_similarity`: a tempogram per zero-padded segment."""
+    segments = [y[int(start_time * sr):int(end_time * sr)] for start_time, end_time in segment_times]
+    max_length = max(len(segment) for segment in segments)
+    segments = [np.pad(segment, (0, max_length - len(segment)), mode='constant') for segment in segments]
+    time_lag_reps = np.array([
+        librosa.feature.tempogram(y=librosa.effects.preemphasis(librosa.util.normalize(segment)), sr=sr)
+        for segment in segments
+    ])
+    time_lag_reps = np.transpose(time_lag_reps, (1, 2, 0))
+    cross_similarity = librosa.segment.cross_similarity(time_lag_reps, time_lag_reps, mode='affinity', full=True)
+    np.fill_diagonal(cross_similarity, 1.0)
+    return cross_similarity
+
+
+def synthesize_song(seconds: int, sr: int = 22050, seed: int = 0) -> np.ndarray:
+    """A melody over clicks, with the melody repeating every 16 seconds."""
+    rng = np.random.default_rng(seed)
+    times = np.arange(sr * seconds) / sr
+    melody = rng.choice([220., 262., 330., 392., 440., 523.], size=16)
+    notes = melody[times.astype(int) % len(melody)]
+    clicks = rng.normal(size=times.size) * (np.mod(times, 0.5) < 0.03)
+    return (0.3 * np.sin(2 * np.pi * notes * times) + 0.6 * clicks).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audio", type=Path, default=None, help="audio file to analyze (default: a synthetic one)")
+    parser.add_argument("--seconds", type=int, default=180, help="length of the synthetic audio")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.audio is not None:
+        audio_array, sample_rate = load_audio(args.audio, as_mono=True)
+    else:
+        sample_rate = 22050
+        audio_array = synthesize_song(args.seconds, sample_rate)
+
+    # Warm up numba-compiled librosa functions so the first timing isn't inflated.
+    analyze_audio_with_plot_data(audio_array[:int(10 * sample_rate)], sample_rate)
+
+    result, _ = analyze_audio_with_plot_data(audio_array, sample_rate)
+    segment_times = [(phrase.start_time, phrase.end_time) for phrase in result.musical_phrases]
+    original = original_cross_similarity(audio_array, sample_rate, segment_times)
+
+    original_s = min(timeit.repeat(
+        lambda: original_cross_similarity(audio_array, sample_rate, segment_times), number=1, repeat=args.repeats
+    ))
+    uncached_s = min(timeit.repeat(
+        lambda: analyze_audio_with_plot_data(audio_array, sample_rate), number=1, repeat=args.repeats
+    ))
+    with tempfile.TemporaryDirectory() as feature_cache_dir:
+        analyze_audio_with_plot_data(audio_array, sample_rate, Path(feature_cache_dir))
+        cached_s = min(timeit.repeat(
+            lambda: analyze_audio_with_plot_data(audio_array, sample_rate, Path(feature_cache_dir)),
+            number=1,
+            repeat=args.repeats,
+        ))
+
+    difference = np.abs(np.array(result.cross_similarity) - original)
+    print(f"{len(audio_array) / sample_rate:.0f} s of audio at {sample_rate:.0f} Hz, "
+          f"{len(segment_times)} segments (best of {args.repeats})")
+    print(f"  original per-segment similarity features: {original_s:8.3f} s")
+    print(f"  whole analysis, no feature cache:         {uncached_s:8.3f} s")
+    print(f"  whole analysis, feature cache hit:        {cached_s:8.3f} s")
+    print(f"  cross-similarity vs original: mean |diff| {difference.mean():.3f}, max {difference.max():.3f}")
+    print(f"  segment groups: {len(result.phrase_groupings)} (original features: {len(compute_segment_groupings(original))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark of `motion_extraction.bvh.parser.Bvh` against the original parser it replaced.
+
+The original tokenized the whole file character by character (`accumulator += char`), kept every
+frame as a list of strings, and answered each joint query by searching the whole node tree; its
+`frames_joint_channels` repeated the channel lookup for every frame. This script times parsing a
+large BVH file and reading every joint's channels for every frame with both versions (the original
+is reproduced below; its queries are slow enough that they only run on the first `--query_frames`
+frames) and checks they agree. Pass a mocap file, or let the script write a synthetic
+one. Run from the motion-pipeline folder:
+
+    python -m motion_extraction.scripts.benchmark_bvh_parser --frames 20000
+    python -m motion_extraction.scripts.benchmark_bvh_parser --bvh path/to/large.bvh
+"""
+import argparse
+import re
+import tempfile
+import timeit
+import typing as t
+from pathlib import Path
+
+import numpy as np
+
+from motion_extraction.bvh.parser import Bvh, BvhNode
+from motion_extraction.bvh_writer import BVHWriteNode, write_bvh
+
+
+class OriginalBvh:
+    """The parts of the original `Bvh` that parsing and channel queries go through."""
+
+    def __init__(self, data: str):
+        self.root = BvhNode()
+        self.frames = []
+        first_round = []
+        accumulator = ''
+        for char in data:
+            if char not in ('\n', '\r'):
+                accumulator += char
+            elif accumulator:
+                first_round.append(re.split('\\s+', accumulator.strip()))
+                accumulator = ''
+        node_stack = [self.root]
+        frame_time_found = False
+        node = None
+        for item in first_round:
+            if frame_time_found:
+                self.frames.append(item)
+                continue
+            key = item[0]
+            if key == '{':
+                node_stack.append(node)
+            elif key == '}':
+                node_stack.pop()
+            else:
+                node = BvhNode(item)
+                node_stack[-1].add_child(node)
+            if item[0].lower() == 'frame' and item[1].lower() == 'time:':
+                frame_time_found = True
+
+    def search(self, *items):
+        found_nodes = []
+
+        def check_children(node):
+            if len(node.value) >= len(items) and all(node.value[i] == item for i, item in enumerate(items)):
+                found_nodes.append(node)
+            for child in node:
+                check_children(child)
+        check_children(self.root)
+        return found_nodes
+
+    def get_joints(self):
+        joints = []
+
+        def iterate_joints(joint):
+            joints.append(joint)
+            for child in joint.filter('JOINT'):
+                iterate_joints(child)
+        iterate_joints(next(self.root.filter('ROOT')))
+        return joints
+
+    def get_joints_names(self):
+        return [joint.value[1] for joint in self.get_joints()]
+
+    def get_joint(self, name):
+        found = self.search('ROOT', name) or self.search('JOINT', name)
+        if found:
+            return found[0]
+        raise LookupError('joint not found')
+
+    def joint_channels(self, name):
+        return self.get_joint(name)['CHANNELS'][1:]
+
+    def get_joint_channels_index(self, joint_name):
+        index = 0
+        for joint in self.get_joints():
+            if joint.value[1] == joint_name:
+                return index
+            index += int(joint['CHANNELS'][0])
+        raise LookupError('joint not found')
+
+    def get_joint_channel_index(self, joint, channel):
+        channels = self.joint_channels(joint)
+        return channels.index(channel) if channel in channels else -1
+
+    def frames_joint_channels(self, joint, channels, value=None):
+        all_frames = []
+        joint_index = self.get_joint_channels_index(joint)
+        for frame in self.frames:
+            values = []
+            for channel in channels:
+                channel_index = self.get_joint_channel_index(joint, channel)
+                if channel_index == -1 and value is not None:
+                    values.append(value)
+                else:
+                    values.append(float(frame[joint_index + channel_index]))
+            all_frames.append(values)
+        return all_frames
+
+
+def write_synthetic_bvh(path: Path, frame_count: int, joint_count: int = 24, seed: int = 0):
+    """Writes a chain-shaped skeleton with random (but smooth) channel values."""
+    root = BVHWriteNode.create("Joint0", include_position_channels=True, offset=(0., 0., 0.))
+    parent = root
+    for joint_i in range(1, joint_count):
+        joint = BVHWriteNode.create(f"Joint{joint_i}", include_position_channels=False, offset=(0., 10., 0.))
+        parent.add_child(joint)
+        parent = joint
+    parent.end_site_offset = (0., 5., 0.)
+
+    rng = np.random.default_rng(seed)
+    channel_count = len(list(root.get_channel_column_names()))
+    frames = np.cumsum(rng.normal(scale=0.5, size=(frame_count, channel_count)), axis=0)
+    with path.open("w") as f:
+        write_bvh(f, root, 30., frame_count, frames)
+
+
+def read_all_channels(mocap: t.Union[Bvh, OriginalBvh]) -> t.List[t.List[t.List[float]]]:
+    return [
+        mocap.frames_joint_channels(joint, mocap.joint_channels(joint))
+        for joint in mocap.get_joints_names()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bvh", type=Path, default=None, help="BVH file to parse (default: a synthetic one)")
+    parser.add_argument("--frames", type=int, default=20000, help="frames in the synthetic file")
+    parser.add_argument("--query_frames", type=int, default=200, help="frames to query with the original parser")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bvh_path = args.bvh
+        if bvh_path is None:
+            bvh_path = Path(tmp) / "synthetic.bvh"
+            write_synthetic_bvh(bvh_path, args.frames)
+        data = bvh_path.read_text()
+
+    original_parse_s = min(timeit.repeat(lambda: OriginalBvh(data), number=1, repeat=args.repeats))
+    parse_s = min(timeit.repeat(lambda: Bvh(data), number=1, repeat=args.repeats))
+
+    original = OriginalBvh(data)
+    mocap = Bvh(data)
+    np.testing.assert_array_equal(np.array(original.frames).astype(np.float32), mocap.frames)
+
+    # The original queries take tens of milliseconds per frame, so they only run on the first frames.
+    query_frames = min(args.query_frames, len(original.frames))
+    original.frames = original.frames[:query_frames]
+    expected = read_all_channels(original)
+    actual = read_all_channels(Bvh(data, dtype=np.float64))
+    if expected != [joint_frames[:query_frames] for joint_frames in actual]:
+        raise AssertionError("channel queries differ from the original parser")
+
+    original_query_s = min(timeit.repeat(lambda: read_all_channels(original), number=1, repeat=args.repeats))
+    query_s = min(timeit.repeat(lambda: read_all_channels(mocap), number=1, repeat=args.repeats))
+    original_query_us = original_query_s * 1e6 / query_frames
+    query_us = query_s * 1e6 / len(mocap.frames)
+
+    frame_count, channel_count = mocap.frames.shape
+    print(f"{bvh_path.name}: {len(data) / 1e6:.1f} MB, {frame_count} frames, "
+          f"{len(mocap.get_joints())} joints, {channel_count} channels (best of {args.repeats})")
+    print(f"  parse, original:          {original_parse_s:10.3f} s")
+    print(f"  parse, indexed + loadtxt: {parse_s:10.3f} s    ({original_parse_s / parse_s:.1f}x)")
+    print(f"  all channels, original:   {original_query_us:10.1f} us/frame (first {query_frames} frames)")
+    print(f"  all channels, indexed:    {query_us:10.1f} us/frame ({original_query_us / query_us:.1f}x)")
+    print(f"  frame matrix: {mocap.frames.nbytes / 1e6:.1f} MB as {mocap.frames.dtype}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark of `calculate_cross_similarity` against the original `librosa.segment.cross_similarity`
+version.
+
+The original zero-padded every segment's time-lag representation (its slice of the tempogram) to the
+longest segment, stacked them into a dense (lags, frames, segments) array, and let librosa run a
+neighbor search over it. Now the dot products between segments are accumulated one frame offset at
+a time into a (segments, segments) matrix, and distances, bandwidth and affinities are computed from
+that. This script reports the time and the peak memory (as seen by tracemalloc) of both on the
+tempogram of a track, and how far apart their results are. Pass an audio file, or let the script
+synthesize one. Run from the motion-pipeline folder:
+
+    python -m motion_extraction.scripts.benchmark_cross_similarity --seconds 360
+    python -m motion_extraction.scripts.benchmark_cross_similarity --audio path/to/song.mp3
+"""
+import argparse
+import timeit
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+import librosa
+import numpy as np
+
+from motion_extraction.audio_analysis.audio_tools import calculate_8beat_segments_with_midpoints, load_audio
+from motion_extraction.audio_analysis.feature_cache import AudioFeatures
+from motion_extraction.audio_analysis.similarity_analysis import calculate_cross_similarity, compute_segment_groupings
+from motion_extraction.audio_analysis.tempo_analysis import analyze_tempo
+from motion_extraction.scripts.benchmark_audio_features import synthesize_song
+
+
+def original_cross_similarity(features: AudioFeatures, segment_times: t.List[t.Tuple[float, float]]) -> np.ndarray:
+    """The original `calculate_cross_similarity`: zero-padded tempogram slices through librosa."""
+    segment_slices = [features.segment_frames(start_time, end_time) for start_time, end_time in segment_times]
+    n_lags, n_frames = features.tempogram.shape
+    segment_lengths = [len(range(*frames.indices(n_frames))) for frames in segment_slices]
+    time_lag_reps = np.zeros((len(segment_slices), n_lags, max(segment_lengths)), dtype=features.tempogram.dtype)
+    for segment_index, (frames, length) in enumerate(zip(segment_slices, segment_lengths)):
+        time_lag_reps[segment_index, :, :length] = features.tempogram[:, frames]
+    time_lag_reps = np.transpose(time_lag_reps, (1, 2, 0))
+    cross_similarity = librosa.segment.cross_similarity(time_lag_reps, time_lag_reps, mode='affinity', full=True)
+    np.fill_diagonal(cross_similarity, 1.0)
+    return cross_similarity
+
+
+def peak_memory_mb(function: t.Callable[[], t.Any]) -> float:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audio", type=Path, default=None, help="audio file to analyze (default: a synthetic one)")
+    parser.add_argument("--seconds", type=int, default=360, help="length of the synthetic audio")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.audio is not None:
+        audio_array, sample_rate = load_audio(args.audio, as_mono=True)
+    else:
+        sample_rate = 22050
+        audio_array = synthesize_song(args.seconds, sample_rate)
+
+    features = AudioFeatures.compute(audio_array, sample_rate)
+    tempo_info, _ = analyze_tempo(audio_array, sample_rate, features=features)
+    segment_times = [
+        (phrase.start_time, phrase.end_time)
+        for phrase in calculate_8beat_segments_with_midpoints(
+            tempo_info.bpm, tempo_info.starting_beat_timestamp, len(audio_array) / sample_rate
+        )
+    ]
+
+    def original():
+        return original_cross_similarity(features, segment_times)
+
+    def batched():
+        return calculate_cross_similarity(audio_array, sample_rate, segment_times, features)
+
+    original_s = min(timeit.repeat(original, number=1, repeat=args.repeats))
+    batched_s = min(timeit.repeat(batched, number=1, repeat=args.repeats))
+    original_mb = peak_memory_mb(original)
+    batched_mb = peak_memory_mb(batched)
+
+    original_result, batched_result = original(), batched()
+    difference = np.abs(batched_result - original_result)
+    print(f"{len(audio_array) / sample_rate:.0f} s of audio at {sample_rate:.0f} Hz, "
+          f"{len(segment_times)} segments, tempogram {features.tempogram.nbytes / 2**20:.1f} MB (best of {args.repeats})")
+    print(f"  original, padded array + librosa: {original_s:8.3f} s, peak {original_mb:8.2f} MB")
+    print(f"  accumulated dot products:         {batched_s:8.3f} s, peak {batched_mb:8.2f} MB")
+    print(f"  cross-similarity vs original: mean |diff| {difference.mean():.4f}, max {difference.max():.4f}")
+    print(f"  segment groups: {len(compute_segment_groupings(batched_result))} "
+          f"(original: {len(compute_segment_groupings(original_result))})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the batched `calc_scalar_dvaj` kernel against the original per-landmark pandas loop.
+
+Builds a synthetic holistic clip (random-walk positions for every pose landmark) and times both
+implementations on it. Run from the motion-pipeline folder:
+
+    python -m motion_extraction.scripts.benchmark_scalar_dvaj --frames 10000
+"""
+import argparse
+import timeit
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.complexity_analysis.uist_complexityanalysis import DVAJ, calc_scalar_dvaj
+from motion_extraction.mp_utils import PoseLandmark
+
+
+def calc_scalar_dvaj_per_landmark(motion: pd.DataFrame, landmark_names: t.Collection[str]) -> pd.DataFrame:
+    out_cols = []
+    out_data = []
+    for landmark in landmark_names:
+        dist_data = motion[[f"{landmark}_x", f"{landmark}_y", f"{landmark}_z"]].diff().pow(2).sum(1).pow(0.5)
+        velocity_data = dist_data.diff().abs()
+        acceleration_data = velocity_data.diff().abs()
+        jerk_data = acceleration_data.diff().abs()
+        out_cols.extend([f"{landmark}_{measure.name}" for measure in DVAJ])
+        out_data.extend([dist_data, velocity_data, acceleration_data, jerk_data])
+    return pd.concat(out_data, axis=1, keys=out_cols)
+
+
+def make_synthetic_clip(frame_count: int, landmark_names: t.Sequence[str], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        f"{landmark}_{axis}": rng.normal(scale=0.01, size=frame_count).cumsum()
+        for landmark in landmark_names
+        for axis in ("x", "y", "z", "vis")
+    }
+    return pd.DataFrame(data, index=pd.Index(np.arange(frame_count), name="frame"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    landmark_names = [landmark.name for landmark in PoseLandmark]
+    motion = make_synthetic_clip(args.frames, landmark_names)
+
+    expected = calc_scalar_dvaj_per_landmark(motion, landmark_names)
+    actual = calc_scalar_dvaj(motion, landmark_names)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+    per_landmark_s = min(timeit.repeat(lambda: calc_scalar_dvaj_per_landmark(motion, landmark_names), number=1, repeat=args.repeats))
+    batched_s = min(timeit.repeat(lambda: calc_scalar_dvaj(motion, landmark_names), number=1, repeat=args.repeats))
+
+    print(f"Clip: {args.frames} frames x {len(landmark_names)} landmarks (best of {args.repeats})")
+    print(f"  per-landmark pandas: {per_landmark_s * 1000:8.2f} ms")
+    print(f"  batched numpy:       {batched_s * 1000:8.2f} ms")
+    print(f"  speedup:             {per_landmark_s / batched_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
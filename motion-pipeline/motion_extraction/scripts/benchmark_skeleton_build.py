@@ -0,0 +1,127 @@
+"""
+Benchmark of per-frame `HumanoidPositionSkeleton` work with the cached `MecanimBone` topology
+against the original uncached lookups.
+
+Before the topology was cached, `MecanimBone.parent` was a match statement over every bone and
+`MecanimBone.children` scanned the whole enum, calling `parent` on each member. This script times a
+per-frame skeleton build (`from_mp_pose` plus `get_offsets_and_measurements`, which walks
+`world_position` for every bone) and a tree walk over `children` (the traversal `print_subtree`
+and `plt_skeleton` do) with the current properties, then again with the original lookups swapped
+back in. The clip-level `HumanoidPositionClip` constructor is timed for reference.
+Run from the motion-pipeline folder:
+
+    python -m motion_extraction.scripts.benchmark_skeleton_build --frames 300
+"""
+import argparse
+import contextlib
+import timeit
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction.MecanimHumanoid import (
+    MECANIM_TOPOLOGY,
+    HumanoidPositionClip,
+    HumanoidPositionSkeleton,
+    MecanimBone,
+)
+from motion_extraction.mp_utils import PoseLandmark
+
+# The original `parent` match statement tested each case in turn; a linear scan over the same
+# (bone, parent) pairs has the same lookup cost.
+_UNCACHED_PARENT_CASES: t.Tuple[t.Tuple[MecanimBone, t.Optional[MecanimBone]], ...] = tuple(
+    (bone, MECANIM_TOPOLOGY.parents[bone]) for bone in MecanimBone
+)
+
+
+def _uncached_parent(self: MecanimBone) -> t.Optional[MecanimBone]:
+    for bone, parent in _UNCACHED_PARENT_CASES:
+        if self == bone:
+            return parent
+    raise ValueError(f'{self} is not a valid MecanimBone')
+
+
+def _uncached_children(self: MecanimBone) -> t.List[MecanimBone]:
+    return [b for b in MecanimBone if b.parent is not None and b.parent.value == self.value]
+
+
+@contextlib.contextmanager
+def uncached_topology():
+    """Temporarily restores the original per-call `parent`/`children` lookups."""
+    cached_parent = MecanimBone.parent
+    cached_children = MecanimBone.children
+    MecanimBone.parent = property(_uncached_parent)
+    MecanimBone.children = property(_uncached_children)
+    try:
+        yield
+    finally:
+        MecanimBone.parent = cached_parent
+        MecanimBone.children = cached_children
+
+
+def make_synthetic_clip(frame_count: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {
+        f"{landmark.name}_{axis}": rng.normal(scale=0.01, size=frame_count).cumsum() + rng.normal()
+        for landmark in PoseLandmark
+        for axis in ("x", "y", "z", "vis")
+    }
+    return pd.DataFrame(data, index=pd.Index(np.arange(frame_count), name="frame"))
+
+
+def build_skeletons(rows: t.Sequence[pd.Series]) -> t.List[pd.Series]:
+    return [HumanoidPositionSkeleton.from_mp_pose(row).get_offsets_and_measurements() for row in rows]
+
+
+def walk_skeletons(skeletons: t.Sequence[HumanoidPositionSkeleton]) -> int:
+    visited = 0
+    for skeleton in skeletons:
+        stack = [MecanimBone.root_bone()]
+        while stack:
+            bone = stack.pop()
+            skeleton.world_position(bone)
+            visited += 1
+            stack.extend(bone.children)
+    return visited
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    clip = make_synthetic_clip(args.frames)
+    rows = [row for _, row in clip.iterrows()]
+
+    expected = build_skeletons(rows)
+    with uncached_topology():
+        actual = build_skeletons(rows)
+    pd.testing.assert_frame_equal(pd.DataFrame(actual), pd.DataFrame(expected))
+
+    skeletons = [HumanoidPositionSkeleton.from_mp_pose(row) for row in rows]
+
+    cached_s = min(timeit.repeat(lambda: build_skeletons(rows), number=1, repeat=args.repeats))
+    cached_walk_s = min(timeit.repeat(lambda: walk_skeletons(skeletons), number=1, repeat=args.repeats))
+    with uncached_topology():
+        uncached_s = min(timeit.repeat(lambda: build_skeletons(rows), number=1, repeat=args.repeats))
+        uncached_walk_s = min(timeit.repeat(lambda: walk_skeletons(skeletons), number=1, repeat=args.repeats))
+    clip_s = min(timeit.repeat(
+        lambda: HumanoidPositionClip.from_mp_pose_dataframe(clip).get_offsets_and_measurements(),
+        number=1,
+        repeat=args.repeats,
+    ))
+
+    print(f"Clip: {args.frames} frames (best of {args.repeats})")
+    print(f"  build, uncached topology: {uncached_s * 1e6 / args.frames:10.1f} us/frame")
+    print(f"  build, cached topology:   {cached_s * 1e6 / args.frames:10.1f} us/frame")
+    print(f"  speedup:                  {uncached_s / cached_s:10.1f}x")
+    print(f"  tree walk, uncached:      {uncached_walk_s * 1e6 / args.frames:10.1f} us/frame")
+    print(f"  tree walk, cached:        {cached_walk_s * 1e6 / args.frames:10.1f} us/frame")
+    print(f"  speedup:                  {uncached_walk_s / cached_walk_s:10.1f}x")
+    print(f"  whole clip (HumanoidPositionClip): {clip_s * 1e6 / args.frames:5.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
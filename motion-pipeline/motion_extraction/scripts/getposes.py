@@ -4,6 +4,7 @@ from pathlib import Path
 import mediapipe as mp
 from mediapipe.tasks.python import vision
 import cv2
+import contextlib
 import csv
 import itertools as it
 from functools import reduce
@@ -15,6 +16,8 @@ from motion_extraction.mp_utils import (
     build_base_options,
     ensure_task_model,
 )
+from motion_extraction.utils import prefetch
+from motion_extraction.video_metadata import read_video_metadata
 
 flat_map = lambda f, xs: reduce(lambda a, b: a + b, map(f, xs))
 
@@ -70,7 +73,21 @@ def write_mediapipe_landmarks_to_img(frame, pose_landmarks):
         cv2.putText(frame, str(lm_index), (x - 15, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, black, 1, cv2.LINE_AA)
     return frame
 
-def process_video(pose_landmarker, video_path, csv_output_path, frame_dir: Path | None = None, output_normalized_coords: bool = False):
+def decode_frames(cap):
+    """Yields `(frame_idx, frame_bgr, frame_rgba)` until the capture runs out of frames."""
+    frame_idx = 0
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            # End of video reached
+            break
+        # per https://github.com/google-ai-edge/mediapipe/issues/5265,
+        # the metal implementaiton only supports image formats with an alpha channel
+        frame_rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
+        yield frame_idx, frame, frame_rgba
+        frame_idx += 1
+
+def process_video(pose_landmarker, video_path, csv_output_path, frame_dir: Path | None = None, output_normalized_coords: bool = False, prefetch_frames: int = 0):
 
     start_time = time.time_ns()
 
@@ -81,7 +98,9 @@ def process_video(pose_landmarker, video_path, csv_output_path, frame_dir: Path
     PROPS = ['x', 'y', 'z', 'visibility']
     
     
-    with open(csv_output_path, 'w', newline='') as csvfile:
+    # With prefetch_frames > 0, decoding runs on a background thread while the landmarker works.
+    with open(csv_output_path, 'w', newline='') as csvfile, \
+         contextlib.closing(prefetch(decode_frames(cap), max_queued=prefetch_frames)) as frames:
         csvwriter = csv.writer(csvfile)
         
         csvwriter.writerow(
@@ -89,18 +108,10 @@ def process_video(pose_landmarker, video_path, csv_output_path, frame_dir: Path
             [f'{lm.name}_{prop}_2d' for lm in POSE_LANDMARKS for prop in PROPS] + \
             [f'{lm.name}_{prop}_3d' for lm in POSE_LANDMARKS for prop in PROPS])
         frame_idx = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                # End of video reached
-                break
-
+        for frame_idx, frame, frame_rgba in frames:
             width, height = frame.shape[1], frame.shape[0]
             timestamp = frame_idx / fps
             timestamp_ns = int(timestamp * 1e9)
-            # per https://github.com/google-ai-edge/mediapipe/issues/5265,
-            # the metal implementaiton only supports image formats with an alpha channel
-            frame_rgba = cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA)
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGBA, data=frame_rgba)            
             results = pose_landmarker.detect_for_video(mp_image, timestamp_ns)
             if not results.pose_landmarks or not results.pose_world_landmarks:
@@ -132,9 +143,7 @@ def process_video(pose_landmarker, video_path, csv_output_path, frame_dir: Path
     print(f'\tProcessed {frame_idx} frames in {elapsed_time:.2f} seconds ({frame_idx / elapsed_time:.2f} fps)')
 
 def check_csv_video_match(csv_path, video_path):
-    cap = cv2.VideoCapture(str(video_path))
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    cap.release()
+    frame_count = read_video_metadata(video_path).frame_count
 
     with open(csv_path, 'r') as csvfile:
         csvreader = csv.reader(csvfile)
@@ -158,6 +167,7 @@ def main():
     parser.add_argument('-f', '--frame_dir', type=Path, default=None, help='Optional directory to save frames with pose visualizations')
     parser.add_argument('-o', '--overwrite', action='store_true', help='Overwrite existing pose files')
     parser.add_argument('-n', '--normalized', action='store_true', help='Use normalized coordinates for pose landmarks (default is pixel coordinates)')
+    parser.add_argument('-p', '--prefetch_frames', type=int, default=0, help='Decode up to this many frames ahead on a background thread (0 disables)')
 
     args = parser.parse_args()
     input_dir: Path = args.input_dir
@@ -210,7 +220,7 @@ def main():
 
         with PoseLandmarker.create_from_options(options) as pose:    
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            process_video(pose, input_path, output_path, frame_dir, output_normalized_coords), 
+            process_video(pose, input_path, output_path, frame_dir, output_normalized_coords, args.prefetch_frames)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,126 @@
+"""Runs the stages of a pipeline as a dependency graph.
+
+Stages are added with the names of the stages they depend on, and start as soon as those have
+finished, so independent branches (e.g. audio analysis next to pose extraction) overlap. Each stage
+declares how many workers it uses; a stage is only started while the running stages' workers fit in
+the scheduler's budget, except that a stage always starts when nothing else is running.
+
+Stages run on threads, so a stage that does CPU-bound work in Python should do it in its own
+processes (as `compute_holistic_data` and the DVAJ computation do with their `workers`). Those
+processes should be spawned, not forked (pass a 'spawn' `mp_context`): forking while other stages'
+threads are running can deadlock the child.
+"""
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+import time
+import typing as t
+
+
+@dataclass
+class Stage:
+    name: str
+    run: t.Callable[[], t.Any]
+    depends_on: t.Tuple[str, ...] = ()
+    workers: int = 1
+
+
+@dataclass
+class StageTiming:
+    name: str
+    workers: int
+    status: t.Literal["done", "failed", "not run"]
+    # Seconds since the scheduler started; None for stages that did not run.
+    started_s: t.Optional[float] = None
+    finished_s: t.Optional[float] = None
+
+    @property
+    def duration_s(self) -> t.Optional[float]:
+        if self.started_s is None or self.finished_s is None:
+            return None
+        return self.finished_s - self.started_s
+
+
+class StageScheduler:
+    """
+    Add stages in dependency order with `add`, then `run` them. `timings` holds one `StageTiming` per
+    stage once `run` returns or raises.
+
+    If a stage raises, no further stages are started; the running ones are allowed to finish and the
+    first exception is re-raised.
+    """
+
+    def __init__(self, worker_budget: int):
+        if worker_budget < 1:
+            raise ValueError(f"worker_budget must be positive, got {worker_budget}")
+        self.worker_budget = worker_budget
+        self._stages: t.Dict[str, Stage] = {}
+        self.timings: t.List[StageTiming] = []
+
+    def add(
+        self,
+        name: str,
+        run: t.Callable[[], t.Any],
+        depends_on: t.Sequence[str] = (),
+        workers: int = 1,
+    ) -> Stage:
+        if name in self._stages:
+            raise ValueError(f"Stage {name!r} was already added")
+        unknown = [dependency for dependency in depends_on if dependency not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on stages that were not added before it: {unknown}")
+        if workers < 1:
+            raise ValueError(f"Stage {name!r} must use at least one worker, got {workers}")
+        stage = Stage(name=name, run=run, depends_on=tuple(depends_on), workers=workers)
+        self._stages[name] = stage
+        return stage
+
+    def run(self):
+        start = time.perf_counter()
+        timings: t.Dict[str, StageTiming] = {
+            name: StageTiming(name=name, workers=stage.workers, status="not run")
+            for name, stage in self._stages.items()
+        }
+        self.timings = list(timings.values())
+
+        def run_stage(stage: Stage):
+            timings[stage.name].started_s = time.perf_counter() - start
+            try:
+                stage.run()
+            finally:
+                timings[stage.name].finished_s = time.perf_counter() - start
+
+        pending = list(self._stages.values())
+        done: t.Set[str] = set()
+        running: t.Dict[Future, Stage] = {}
+        failure: t.Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1), thread_name_prefix="stage") as executor:
+            while True:
+                if failure is None:
+                    for stage in list(pending):
+                        if not all(dependency in done for dependency in stage.depends_on):
+                            continue
+                        busy_workers = sum(running_stage.workers for running_stage in running.values())
+                        if running and busy_workers + stage.workers > self.worker_budget:
+                            continue
+                        pending.remove(stage)
+                        running[executor.submit(run_stage, stage)] = stage
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    exception = future.exception()
+                    if exception is None:
+                        timings[stage.name].status = "done"
+                        done.add(stage.name)
+                    else:
+                        timings[stage.name].status = "failed"
+                        failure = failure or exception
+
+        if failure is not None:
+            raise failure
+        if pending:
+            # Only possible if a dependency was never added, which `add` rules out.
+            raise RuntimeError(f"Stages could not be scheduled: {[stage.name for stage in pending]}")
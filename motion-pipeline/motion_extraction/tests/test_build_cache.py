@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from motion_extraction.build_cache import BuildCache, build_key
+
+
+class BuildCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.manifest_path = self.root / "cache" / "pipeline_cache.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.root / name
+        path.write_text(text)
+        return path
+
+    def keys_for(self, cache: BuildCache, paths):
+        return {path.stem: build_key(cache.file_hash(path), "params") for path in paths}
+
+    def test_recorded_items_are_cached_after_reload(self):
+        paths = [self.write("a.txt", "a"), self.write("b.txt", "b")]
+        cache = BuildCache(self.manifest_path)
+        keys = self.keys_for(cache, paths)
+        self.assertEqual(cache.stale("stage", keys), {"a", "b"})
+        cache.record("stage", keys)
+        cache.save()
+
+        cache = BuildCache(self.manifest_path)
+        self.assertEqual(cache.stale("stage", self.keys_for(cache, paths)), set())
+        self.assertEqual(cache.summary_lines(), ["stage: 2 cached, 0 rebuilt"])
+
+    def test_only_changed_or_missing_outputs_are_stale(self):
+        paths = [self.write("a.txt", "a"), self.write("b.txt", "b"), self.write("c.txt", "c")]
+        cache = BuildCache(self.manifest_path)
+        cache.record("stage", self.keys_for(cache, paths))
+
+        self.write("a.txt", "changed")
+        stale = cache.stale("stage", self.keys_for(cache, paths), outputs_exist=lambda item: item != "c")
+        self.assertEqual(stale, {"a", "c"})
+        self.assertEqual(cache.summary_lines(), ["stage: 1 cached, 2 rebuilt"])
+
+    def test_removed_items_are_reported_and_forgotten_on_record(self):
+        paths = [self.write("a.txt", "a"), self.write("b.txt", "b")]
+        cache = BuildCache(self.manifest_path)
+        cache.record("stage", self.keys_for(cache, paths))
+
+        keys = self.keys_for(cache, paths[:1])
+        self.assertEqual(cache.stale("stage", keys), set())
+        self.assertEqual(cache.removed("stage", keys), {"b"})
+        self.assertEqual(cache.summary_lines(), ["stage: 1 cached, 0 rebuilt, 1 removed"])
+        cache.record("stage", keys)
+        self.assertEqual(cache.removed("stage", keys), set())
+
+    def test_invalidate_rebuilds_every_item(self):
+        paths = [self.write("a.txt", "a")]
+        cache = BuildCache(self.manifest_path)
+        cache.record("stage", self.keys_for(cache, paths))
+        cache.invalidate("stage")
+        self.assertEqual(cache.stale("stage", self.keys_for(cache, paths)), {"a"})
+
+    def test_file_hash_is_memoized_by_size_and_mtime(self):
+        path = self.write("a.txt", "abc")
+        cache = BuildCache(self.manifest_path)
+        original_hash = cache.file_hash(path)
+        stat = path.stat()
+
+        # Same size and mtime: the memoized hash is trusted without rereading the file.
+        path.write_text("xyz")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(cache.file_hash(path), original_hash)
+
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertNotEqual(cache.file_hash(path), original_hash)
+        self.assertIsNone(cache.file_hash(self.root / "missing.txt"))
+
+    def test_save_drops_hashes_of_deleted_files(self):
+        kept, deleted = self.write("kept.txt", "k"), self.write("deleted.txt", "d")
+        cache = BuildCache(self.manifest_path)
+        cache.file_hash(kept)
+        cache.file_hash(deleted)
+        deleted.unlink()
+        cache.save()
+
+        manifest = json.loads(self.manifest_path.read_text())
+        self.assertEqual(list(manifest["files"]), [kept.resolve().as_posix()])
+
+    def test_unreadable_manifest_starts_over(self):
+        self.manifest_path.parent.mkdir(parents=True)
+        self.manifest_path.write_text("{not json")
+        cache = BuildCache(self.manifest_path)
+        self.assertEqual(cache.stale("stage", {"a": "key"}), {"a"})
+
+    def test_source_hash_covers_every_module_of_a_package(self):
+        cache = BuildCache(self.manifest_path)
+        package_hash = cache.source_hash("motion_extraction.bvh")
+        self.assertEqual(package_hash, cache.source_hash("motion_extraction.bvh"))
+        self.assertNotEqual(package_hash, cache.source_hash("motion_extraction.bvh.parser"))
+        with self.assertRaises(ModuleNotFoundError):
+            cache.source_hash("motion_extraction.no_such_module")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+import csv
+import io
+import multiprocessing
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from motion_extraction import extract_holistic_data
+from motion_extraction.extract_holistic_data import (
+    compute_holistic_data,
+    construct_header_row,
+    construct_pose2d_header_row,
+    process_video,
+    transform_to_holistic_csvrow,
+    transform_to_pose2d_csvrow,
+)
+from motion_extraction.mp_utils import HandLandmark, PoseLandmark, landmark_at
+
+
+def reference_holistic_csvrow(frame_i: int, frame_data):
+    """`transform_to_holistic_csvrow` as it was: one `landmark_at` lookup per landmark."""
+    row = [frame_i]
+    for landmark_i in range(len(PoseLandmark)):
+        lm = landmark_at(getattr(frame_data, "pose_world_landmarks", None), landmark_i)
+        row += [lm.x, -lm.y, -lm.z, lm.visibility] if lm is not None else [None, None, None, None]
+    for hand_attr in ("right_hand_landmarks", "left_hand_landmarks"):
+        for landmark_i in range(len(HandLandmark)):
+            lm = landmark_at(getattr(frame_data, hand_attr, None), landmark_i)
+            row += [lm.x, lm.y, lm.z] if lm is not None else [None, None, None]
+    return row
+
+
+def reference_pose2d_csvrow(frame_i: int, frame_data, video_width: float, video_height: float):
+    """`transform_to_pose2d_csvrow` as it was: one `landmark_at` lookup per landmark."""
+    row = [frame_i]
+    for landmark_i in range(len(PoseLandmark)):
+        lm = landmark_at(getattr(frame_data, "pose_landmarks", None), landmark_i)
+        row += [lm.x * video_width, lm.y * video_height, lm.z * video_width, lm.visibility] if lm is not None else [None, None, None, None]
+    return row
+
+
+def make_landmarks(rng: np.random.Generator, count: int):
+    landmarks = [SimpleNamespace(x=x, y=y, z=z, visibility=vis) for x, y, z, vis in rng.random((count, 4))]
+    # Zeros exercise the sign flips on y and z.
+    landmarks[0] = SimpleNamespace(x=0.0, y=0.0, z=0.0, visibility=0.0)
+    return landmarks
+
+
+def make_frames(rng: np.random.Generator):
+    """Frame data covering every landmark container form `landmark_list` accepts."""
+    pose_count, hand_count = len(PoseLandmark), len(HandLandmark)
+    forms = [
+        lambda count: make_landmarks(rng, count),
+        lambda count: SimpleNamespace(landmark=make_landmarks(rng, count)),
+        lambda count: [make_landmarks(rng, count)],
+        lambda count: make_landmarks(rng, count)[:count // 2],
+        lambda count: SimpleNamespace(landmark=make_landmarks(rng, count)[:3]),
+        lambda count: make_landmarks(rng, count + 2),
+        lambda count: [],
+        lambda count: None,
+    ]
+    frames = []
+    for i in range(len(forms) * 2):
+        frames.append(SimpleNamespace(
+            pose_landmarks=forms[i % len(forms)](pose_count),
+            pose_world_landmarks=forms[(i + 1) % len(forms)](pose_count),
+            right_hand_landmarks=forms[(i + 2) % len(forms)](hand_count),
+            left_hand_landmarks=forms[(i + 3) % len(forms)](hand_count),
+        ))
+    # No detections at all, e.g. a result object without the attributes.
+    frames.append(SimpleNamespace())
+    return frames
+
+
+def _video_spec(video_path: Path):
+    """Fake videos hold `<frame count> <seconds to process>`."""
+    frame_count, delay = Path(video_path).read_text().split()
+    return int(frame_count), float(delay)
+
+
+def fake_process_video(input_video_path: Path, holistic_data_output_filepath: Path, **kwargs):
+    """A cheap stand-in for `process_video`: a holistic CSV whose contents depend on the video."""
+    frame_count, delay = _video_spec(input_video_path)
+    time.sleep(delay)
+    holistic_data_output_filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(holistic_data_output_filepath, "w", newline="") as f:
+        if frame_count == 0:
+            return
+        header = construct_header_row()
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for frame_i in range(frame_count):
+            visibility = (frame_i + 1) / frame_count
+            writer.writerow([frame_i] + [visibility if column.endswith("_vis") else 0.5 for column in header[1:]])
+
+
+def fake_read_video_metadata(video_path: Path):
+    frame_count, _ = _video_spec(video_path)
+    return {"width": 640, "height": 480, "frame_count": frame_count, "fps": 30.0, "duration_seconds": frame_count / 30.0}
+
+
+class ComputeHolisticDataTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+        for target, replacement in (
+            ("process_video", fake_process_video),
+            ("_read_video_metadata", fake_read_video_metadata),
+            ("_create_holistic_processor", lambda model_complexity: mock.MagicMock()),
+        ):
+            patcher = mock.patch.object(extract_holistic_data, target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_videos(self, video_folder: Path, output_folder: Path):
+        frame_counts = {"a": 6, "study/b": 3, "study/c": 0, "d": 4, "e": 5, "study/f": 0}
+        for relative_stem in frame_counts:
+            (video_folder / relative_stem).parent.mkdir(parents=True, exist_ok=True)
+            (video_folder / f"{relative_stem}.mp4").touch()
+        # Jobs run in the order the videos are found. Earlier jobs take longer, so a pool finishes them
+        # in reverse order.
+        job_order = [path.relative_to(video_folder).with_suffix("").as_posix() for path in video_folder.rglob("*.mp4")]
+        for position, relative_stem in enumerate(job_order):
+            delay = 0.1 * (len(job_order) - position)
+            (video_folder / f"{relative_stem}.mp4").write_text(f"{frame_counts[relative_stem]} {delay}")
+        # An existing output that is reused rather than recomputed.
+        fake_process_video(video_folder / "e.mp4", output_folder / "e.holisticdata.raw.csv")
+        return job_order
+
+    # Worker processes see the patched functions only when forked from this one.
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "needs forked worker processes")
+    def test_output_does_not_depend_on_worker_count(self):
+        summaries = {}
+        reports = {}
+        for workers in (1, 2):
+            run_root = self.root / f"run{workers}"
+            video_folder, output_folder, artifact_dir = run_root / "videos", run_root / "holistic", run_root / "report"
+            job_order = self.make_videos(video_folder, output_folder)
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                summaries[workers] = compute_holistic_data(
+                    video_folder,
+                    output_folder,
+                    artifact_output_dir=artifact_dir,
+                    workers=workers,
+                )
+            reports[workers] = {
+                path.relative_to(artifact_dir).as_posix(): path.read_text().replace(str(run_root), "<run>")
+                for path in sorted(artifact_dir.rglob("*")) if path.is_file()
+            }
+            outputs = {
+                path.relative_to(output_folder).as_posix(): path.read_bytes()
+                for path in sorted(output_folder.rglob("*.csv"))
+            }
+            if workers == 1:
+                expected_outputs = outputs
+            else:
+                self.assertEqual(outputs, expected_outputs)
+                # Per-file progress from the pool follows the job order, not completion order.
+                progress = [line.split(": ")[0].split()[-1] for line in stdout.getvalue().splitlines() if line.startswith(" Video ")]
+                self.assertEqual(progress, job_order)
+
+        self.assertEqual(summaries[2].to_csv(), summaries[1].to_csv())
+        self.assertEqual(list(summaries[1]["file"]), ["a.mp4", "d.mp4", "e.mp4", "study/b.mp4", "study/c.mp4", "study/f.mp4"])
+        self.assertEqual(list(summaries[1]["status"]), ["computed", "computed", "cached", "computed", "computed", "computed"])
+        self.assertEqual(list(summaries[1]["valid_pose_frame_count"]), [6, 4, 5, 3, 0, 0])
+        self.assertEqual(reports[2], reports[1])
+        report_text = "".join(reports[1].values())
+        empty_warnings = [stem for stem in job_order if f"{stem}.holisticdata.raw.csv" in report_text and stem.endswith(("c", "f"))]
+        self.assertEqual(len(empty_warnings), 2)
+        # Warnings are listed in job order.
+        self.assertLess(
+            report_text.index(f"{empty_warnings[0]}.holisticdata.raw.csv"),
+            report_text.index(f"{empty_warnings[1]}.holisticdata.raw.csv"),
+        )
+
+
+
+class HolisticCsvRowTests(unittest.TestCase):
+    def setUp(self):
+        self.frames = make_frames(np.random.default_rng(4))
+
+    def test_holistic_rows_match_landmark_at_rows(self):
+        for frame_i, frame_data in enumerate(self.frames):
+            with self.subTest(frame=frame_i):
+                row = transform_to_holistic_csvrow(frame_i, frame_data)
+                self.assertEqual(row, reference_holistic_csvrow(frame_i, frame_data))
+                self.assertEqual(len(row), len(construct_header_row()))
+                series = transform_to_holistic_csvrow(frame_i, frame_data, as_pdSeries=True)
+                self.assertEqual(list(series.index), construct_header_row())
+
+    def test_pose2d_rows_match_landmark_at_rows(self):
+        for frame_i, frame_data in enumerate(self.frames):
+            with self.subTest(frame=frame_i):
+                row = transform_to_pose2d_csvrow(frame_i, frame_data, 640., 480.)
+                self.assertEqual(row, reference_pose2d_csvrow(frame_i, frame_data, 640., 480.))
+                self.assertEqual(
+                    transform_to_pose2d_csvrow(frame_i, frame_data, 640., 480., in_pixelCoords=False),
+                    reference_pose2d_csvrow(frame_i, frame_data, 1, 1),
+                )
+                # Used to be indexed by the holistic header, which has a different length and raised.
+                series = transform_to_pose2d_csvrow(frame_i, frame_data, 640., 480., as_pdSeries=True)
+                self.assertEqual(list(series.index), construct_pose2d_header_row())
+                self.assertEqual(len(row), len(construct_pose2d_header_row()))
+
+    def test_buffered_csv_matches_row_by_row_writes(self):
+        # Not a multiple of the flush size, so the last block is written after the loop.
+        frames = self.frames * 3 + self.frames[:2]
+
+        def fake_frames(video_path: Path):
+            for i in range(len(frames)):
+                yield i, len(frames), i * 33, np.zeros((2, 2, 3), dtype=np.uint8)
+
+        processor = mock.MagicMock()
+        processor.process.side_effect = frames
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            with mock.patch.object(extract_holistic_data, "_perform_by_frame", fake_frames), \
+                 mock.patch.object(extract_holistic_data, "read_video_metadata", return_value=SimpleNamespace(width=640, height=480)), \
+                 mock.patch.object(extract_holistic_data, "_CSV_ROWS_PER_FLUSH", 4):
+                process_video(
+                    tmp / "clip.mp4",
+                    model_complexity=0,
+                    holistic_data_output_filepath=tmp / "clip.holisticdata.raw.csv",
+                    pose_2d_data_output_filepath=tmp / "clip.pose2d.raw.csv",
+                    print_progress_context=None,
+                    holistic_processor=processor,
+                )
+
+            with open(tmp / "expected.holisticdata.csv", "w", encoding="utf-8", newline="") as holistic_file, \
+                 open(tmp / "expected.pose2d.csv", "w", encoding="utf-8", newline="") as pose2d_file:
+                holistic_writer, pose2d_writer = csv.writer(holistic_file), csv.writer(pose2d_file)
+                holistic_writer.writerow(construct_header_row())
+                pose2d_writer.writerow(construct_pose2d_header_row())
+                for frame_i, frame_data in enumerate(frames):
+                    holistic_writer.writerow(reference_holistic_csvrow(frame_i, frame_data))
+                    pose2d_writer.writerow(reference_pose2d_csvrow(frame_i, frame_data, 640., 480.))
+
+            self.assertEqual(processor.process.call_count, len(frames))
+            self.assertEqual((tmp / "clip.holisticdata.raw.csv").read_bytes(), (tmp / "expected.holisticdata.csv").read_bytes())
+            self.assertEqual((tmp / "clip.pose2d.raw.csv").read_bytes(), (tmp / "expected.pose2d.csv").read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from motion_extraction import holistic_cache
+from motion_extraction.holistic_cache import (
+    holistic_sidecar_path,
+    migrate_holistic_data_tree,
+    read_holistic_data,
+    write_holistic_sidecar,
+)
+from motion_extraction.motion_output_provider.tests.synthetic_clip import make_holistic_clip
+
+
+def write_holistic_csv(path: Path, frame_count: int, float32_values: bool = True) -> Path:
+    clip = make_holistic_clip(frame_count)
+    if float32_values:
+        # Short binary fractions: exact in float32, and parsed back exactly from the CSV text.
+        clip = (clip * 1024).round() / 1024
+    clip.insert(0, "frame", range(frame_count))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    clip.to_csv(path, index=False)
+    return path
+
+
+def touch(path: Path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class HolisticSidecarTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.csv_path = write_holistic_csv(self.root / "clip.holisticdata.raw.csv", 30)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def read_without_csv(self, **kwargs) -> pd.DataFrame:
+        with mock.patch.object(holistic_cache.pd, "read_csv", side_effect=AssertionError("CSV was parsed")):
+            return read_holistic_data(self.csv_path, **kwargs)
+
+    def test_sidecar_matches_the_csv(self):
+        sidecar_path = write_holistic_sidecar(self.csv_path)
+        self.assertEqual(sidecar_path, self.root / "clip.holisticdata.raw.npz")
+        pd.testing.assert_frame_equal(self.read_without_csv(), pd.read_csv(self.csv_path))
+        pd.testing.assert_frame_equal(
+            self.read_without_csv(index_col="frame"),
+            pd.read_csv(self.csv_path, index_col="frame"),
+        )
+
+    def test_unchanged_csv_is_not_hashed(self):
+        write_holistic_sidecar(self.csv_path)
+        with mock.patch.object(holistic_cache, "file_content_hash", side_effect=AssertionError("CSV was hashed")):
+            self.read_without_csv()
+
+    def test_touched_csv_with_same_content_still_matches(self):
+        write_holistic_sidecar(self.csv_path)
+        touch(self.csv_path)
+        with mock.patch.object(holistic_cache, "file_content_hash", wraps=holistic_cache.file_content_hash) as content_hash:
+            pd.testing.assert_frame_equal(self.read_without_csv(), pd.read_csv(self.csv_path))
+        content_hash.assert_called_once_with(self.csv_path)
+
+    def test_changed_csv_is_parsed(self):
+        write_holistic_sidecar(self.csv_path)
+        write_holistic_csv(self.csv_path, 25)
+
+        dataframe = read_holistic_data(self.csv_path, write_sidecar=True)
+        pd.testing.assert_frame_equal(dataframe, pd.read_csv(self.csv_path))
+        self.assertEqual(len(dataframe), 25)
+        # The refreshed sidecar is used from now on.
+        self.assertEqual(len(self.read_without_csv()), 25)
+
+    def test_truncated_sidecar_is_ignored(self):
+        sidecar_path = write_holistic_sidecar(self.csv_path)
+        sidecar_path.write_bytes(sidecar_path.read_bytes()[:200])
+        pd.testing.assert_frame_equal(read_holistic_data(self.csv_path), pd.read_csv(self.csv_path))
+
+    def test_values_are_stored_as_float32_only_when_lossless(self):
+        for float32_values, dtype in ((True, np.float32), (False, np.float64)):
+            with self.subTest(float32_values=float32_values):
+                write_holistic_csv(self.csv_path, 30, float32_values=float32_values)
+                with np.load(write_holistic_sidecar(self.csv_path)) as sidecar:
+                    self.assertEqual(sidecar["values"].dtype, dtype)
+                pd.testing.assert_frame_equal(self.read_without_csv(), pd.read_csv(self.csv_path), check_exact=True)
+
+    def test_frame_column_keeps_its_position(self):
+        dataframe = pd.read_csv(self.csv_path)
+        columns = list(dataframe.columns)
+        columns.insert(5, columns.pop(0))
+        dataframe[columns].to_csv(self.csv_path, index=False)
+
+        write_holistic_sidecar(self.csv_path)
+        self.assertEqual(list(self.read_without_csv().columns), columns)
+
+    def test_csv_without_frame_column_gets_no_sidecar(self):
+        pd.read_csv(self.csv_path).drop(columns=["frame"]).to_csv(self.csv_path, index=False)
+        self.assertIsNone(write_holistic_sidecar(self.csv_path))
+        self.assertFalse(holistic_sidecar_path(self.csv_path).exists())
+
+
+class MigrateHolisticDataTreeTests(unittest.TestCase):
+    def test_builds_missing_and_stale_sidecars(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            raw_path = write_holistic_csv(root / "a.holisticdata.raw.csv", 20)
+            legacy_path = write_holistic_csv(root / "study" / "b.holisticdata.csv", 20)
+            (root / "empty.holisticdata.raw.csv").touch()
+            pd.read_csv(raw_path).drop(columns=["frame"]).to_csv(root / "noframe.holisticdata.raw.csv", index=False)
+
+            with mock.patch("builtins.print"):
+                self.assertEqual(migrate_holistic_data_tree(root), (2, 2))
+                self.assertTrue(holistic_sidecar_path(raw_path).exists())
+                self.assertTrue(holistic_sidecar_path(legacy_path).exists())
+
+                self.assertEqual(migrate_holistic_data_tree(root), (0, 4))
+                write_holistic_csv(raw_path, 15)
+                self.assertEqual(migrate_holistic_data_tree(root), (1, 3))
+                self.assertEqual(migrate_holistic_data_tree(root, rewrite_existing=True), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+import dataclasses
+import unittest
+
+import numpy as np
+import pandas as pd
+from pytransform3d import rotations as pr
+from pytransform3d import transformations as pt
+from pytransform3d.transform_manager import TransformManager
+
+from motion_extraction.MecanimHumanoid import (
+    MECANIM_TOPOLOGY,
+    HumanoidPositionClip,
+    HumanoidPositionSkeleton,
+    MecanimBone,
+    SkeletonTopology,
+    matrix_from_two_vectors_xz,
+)
+from motion_extraction.motion_output_provider.tests.synthetic_clip import make_holistic_clip
+
+# The parents returned by the `MecanimBone.parent` match statement before `MECANIM_TOPOLOGY`.
+BASELINE_PARENTS = {
+    "Hips": None,
+    "Spine": "Hips",
+    "Chest": "Spine",
+    "LeftUpperArm": "Chest",
+    "LeftLowerArm": "LeftUpperArm",
+    "LeftHand": "LeftLowerArm",
+    "RightUpperArm": "Chest",
+    "RightLowerArm": "RightUpperArm",
+    "RightHand": "RightLowerArm",
+    "LeftUpperLeg": "Hips",
+    "LeftLowerLeg": "LeftUpperLeg",
+    "LeftFootAnkle": "LeftLowerLeg",
+    "LeftToes": "LeftFootAnkle",
+    "RightUpperLeg": "Hips",
+    "RightLowerLeg": "RightUpperLeg",
+    "RightFootAnkle": "RightLowerLeg",
+    "RightToes": "RightFootAnkle",
+    "Head": "Chest",
+    "LeftHandPinkyRoot": "LeftHand",
+    "LeftHandIndexRoot": "LeftHand",
+    "LeftHandThumbRoot": "LeftHand",
+    "RightHandPinkyRoot": "RightHand",
+    "RightHandIndexRoot": "RightHand",
+    "RightHandThumbRoot": "RightHand",
+    "LeftHeel": "LeftFootAnkle",
+    "RightHeel": "RightFootAnkle",
+    "LeftEye": "Nose",
+    "RightEye": "Nose",
+    "Nose": "Head",
+    "LeftEar": "Head",
+    "RightEar": "Head",
+    "ChestRightward": "Spine",
+}
+
+
+def reference_transform_manager(skel: HumanoidPositionSkeleton) -> TransformManager:
+    """`HumanoidPositionSkeleton.get_transforms` as it was before `ClipTransforms`: one
+    `pr.matrix_from_two_vectors` per bone, added to a `TransformManager`. Raises for degenerate poses."""
+    bones, world = skel.bones, skel.world_position
+    B = MecanimBone
+    hips_lateral = world(B.LeftUpperLeg) - world(B.RightUpperLeg)
+    shoulder_leftward = world(B.LeftUpperArm) - world(B.RightUpperArm)
+    shoulder_rightward = world(B.RightUpperArm) - world(B.LeftUpperArm)
+    left_knuckle_midpoint = (bones[B.LeftHandIndexRoot] + bones[B.LeftHandPinkyRoot]) / 2
+    left_knuckle_lateral = bones[B.LeftHandPinkyRoot] - bones[B.LeftHandIndexRoot]
+    frames = [
+        (B.Hips, pr.matrix_from_two_vectors(hips_lateral, bones[B.Spine])),
+        (B.Chest, pr.matrix_from_two_vectors(shoulder_leftward, bones[B.Spine])),
+        (B.ChestRightward, pr.matrix_from_two_vectors(shoulder_rightward, bones[B.Spine]), B.Chest),
+        (B.Spine, pr.matrix_from_two_vectors(
+            0.5 * (pr.norm_vector(hips_lateral) + pr.norm_vector(shoulder_leftward)), bones[B.Spine])),
+        (B.Head, pr.matrix_from_two_vectors(world(B.LeftEar) - world(B.RightEar), bones[B.Head])),
+        (B.LeftUpperArm, matrix_from_two_vectors_xz(bones[B.LeftLowerArm], bones[B.LeftHand])),
+        (B.RightUpperArm, matrix_from_two_vectors_xz(bones[B.RightLowerArm], bones[B.RightHand])),
+        (B.LeftLowerArm, pr.matrix_from_two_vectors(
+            bones[B.LeftHand], world(B.LeftHandPinkyRoot) - world(B.LeftHandThumbRoot))),
+        (B.RightLowerArm, pr.matrix_from_two_vectors(
+            bones[B.RightHand], world(B.RightHandPinkyRoot) - world(B.RightHandThumbRoot))),
+        (B.LeftHand, pr.matrix_from_two_vectors(left_knuckle_midpoint, left_knuckle_lateral)),
+        (B.RightHand, pr.matrix_from_two_vectors(left_knuckle_midpoint, left_knuckle_lateral)),
+        (B.LeftUpperLeg, pr.matrix_from_two_vectors(bones[B.LeftLowerLeg], bones[B.LeftFootAnkle])),
+        (B.RightUpperLeg, pr.matrix_from_two_vectors(bones[B.RightLowerLeg], bones[B.RightFootAnkle])),
+        (B.LeftLowerLeg, pr.matrix_from_two_vectors(bones[B.LeftFootAnkle], bones[B.LeftToes])),
+        (B.RightLowerLeg, pr.matrix_from_two_vectors(bones[B.RightFootAnkle], bones[B.RightToes])),
+        (B.LeftFootAnkle, pr.matrix_from_two_vectors(bones[B.LeftToes], bones[B.LeftHeel])),
+        (B.RightFootAnkle, pr.matrix_from_two_vectors(bones[B.RightToes], bones[B.RightHeel])),
+    ]
+    tm = TransformManager()
+    for bone, rotation, *origin_bone in frames:
+        origin = world(origin_bone[0] if origin_bone else bone)
+        tm.add_transform(bone.name, 'world', pt.transform_from(rotation, origin))
+    return tm
+
+
+class SkeletonTopologyTests(unittest.TestCase):
+    def baseline_children(self, bone_name: str):
+        # The old `children` property: every bone whose parent is this one, in `MecanimBone` order.
+        return [b.name for b in MecanimBone if BASELINE_PARENTS[b.name] == bone_name]
+
+    def test_parents_and_children_match_baseline(self):
+        self.assertEqual([bone.name for bone in MecanimBone], list(BASELINE_PARENTS))
+        for bone in MecanimBone:
+            with self.subTest(bone=bone.name):
+                self.assertEqual(bone.parent.name if bone.parent is not None else None, BASELINE_PARENTS[bone.name])
+                self.assertIsInstance(bone.children, tuple)
+                self.assertEqual([child.name for child in bone.children], self.baseline_children(bone.name))
+
+    def test_depth_first_order_matches_recursive_walk(self):
+        # The order the old recursive `make_position_relative` visited bones in.
+        expected = []
+        def visit(bone_name: str):
+            expected.append(bone_name)
+            for child_name in self.baseline_children(bone_name):
+                visit(child_name)
+        visit(MecanimBone.root_bone().name)
+
+        self.assertEqual([bone.name for bone in MECANIM_TOPOLOGY.depth_first_order], expected)
+        self.assertEqual(len(expected), len(MecanimBone))
+
+    def test_indices_match_bones(self):
+        topology = MECANIM_TOPOLOGY
+        self.assertEqual(topology.bones, tuple(MecanimBone))
+        for i, bone in enumerate(topology.bones):
+            self.assertEqual(topology.bone_index[bone], i)
+            parent = BASELINE_PARENTS[bone.name]
+            self.assertEqual(topology.parent_index[i], -1 if parent is None else topology.bone_index[MecanimBone[parent]])
+
+    def test_topology_is_read_only(self):
+        topology = MECANIM_TOPOLOGY
+        with self.assertRaises(ValueError):
+            topology.parent_index[1] = 0
+        for mapping in (topology.bone_index, topology.parents, topology.children):
+            with self.assertRaises(TypeError):
+                mapping[MecanimBone.Spine] = None
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            topology.parents = {}
+        np.testing.assert_array_equal(topology.parent_index[:2], [-1, 0])
+        self.assertIs(MecanimBone.Spine.parent, MecanimBone.Hips)
+
+    def test_from_parents_rejects_incomplete_trees(self):
+        parents = dict(MECANIM_TOPOLOGY.parents)
+        del parents[MecanimBone.RightEar]
+        with self.assertRaises(ValueError):
+            SkeletonTopology.from_parents(parents, MecanimBone.Hips)
+
+        parents = dict(MECANIM_TOPOLOGY.parents)
+        parents[MecanimBone.Head] = MecanimBone.Nose
+        with self.assertRaises(ValueError):
+            SkeletonTopology.from_parents(parents, MecanimBone.Hips)
+
+
+class HumanoidPositionClipTests(unittest.TestCase):
+    def setUp(self):
+        self.holistic_data = make_holistic_clip(120)
+        self.clip = HumanoidPositionClip.from_mp_pose_dataframe(self.holistic_data)
+
+    def test_positions_match_per_frame_skeletons(self):
+        for frame_i, (_, row) in enumerate(self.holistic_data.iterrows()):
+            expected = HumanoidPositionSkeleton.from_mp_pose(row)
+            actual = self.clip.skeleton(frame_i)
+            for bone, position in expected.bones.items():
+                np.testing.assert_array_equal(actual.bones[bone], position)
+                np.testing.assert_array_equal(self.clip.world_position(bone)[frame_i], expected.world_position(bone))
+
+    def test_offsets_and_measurements_match_per_frame_skeletons(self):
+        expected = pd.DataFrame(s.get_offsets_and_measurements() for s in self.clip)
+        actual = self.clip.get_offsets_and_measurements()
+        # Exact, since the averaged lengths become the .bvh OFFSET values.
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        pd.testing.assert_series_equal(actual.mean(axis=0), expected.mean(axis=0), check_exact=True)
+
+
+class ClipTransformsTests(unittest.TestCase):
+    def setUp(self):
+        holistic_data = make_holistic_clip(30)
+        # Poses the per-frame TransformManager could not be built for.
+        holistic_data.loc[3, ['RIGHT_HIP_x', 'RIGHT_HIP_y', 'RIGHT_HIP_z']] = \
+            holistic_data.loc[3, ['LEFT_HIP_x', 'LEFT_HIP_y', 'LEFT_HIP_z']].to_numpy()
+        holistic_data.loc[7, ['LEFT_WRIST_x', 'LEFT_WRIST_y', 'LEFT_WRIST_z']] = np.nan
+        holistic_data.loc[11, ['LEFT_PINKY_x', 'LEFT_PINKY_y', 'LEFT_PINKY_z']] = \
+            holistic_data.loc[11, ['LEFT_THUMB_x', 'LEFT_THUMB_y', 'LEFT_THUMB_z']].to_numpy()
+        holistic_data.loc[19, ['RIGHT_WRIST_x', 'RIGHT_WRIST_y', 'RIGHT_WRIST_z']] = \
+            holistic_data.loc[19, ['RIGHT_ELBOW_x', 'RIGHT_ELBOW_y', 'RIGHT_ELBOW_z']].to_numpy()
+        self.invalid_frames = [3, 7, 11, 19]
+
+        self.clip = HumanoidPositionClip.from_mp_pose_dataframe(holistic_data)
+        self.transforms = self.clip.get_transforms()
+        self.skeletons = [HumanoidPositionSkeleton.from_mp_pose(row) for _, row in holistic_data.iterrows()]
+
+    def test_invalid_frames_match_per_frame_failures(self):
+        for frame_i, skel in enumerate(self.skeletons):
+            with self.subTest(frame=frame_i):
+                if frame_i in self.invalid_frames:
+                    with self.assertRaises(ValueError):
+                        reference_transform_manager(skel)
+                    self.assertFalse(self.transforms.valid[frame_i])
+                    self.assertIsNone(self.transforms.frame(frame_i))
+                    np.testing.assert_array_equal(self.transforms.bone_to_world[frame_i], np.broadcast_to(np.eye(4), (17, 4, 4)))
+                    with self.assertRaises(ValueError):
+                        skel.get_transforms()
+                else:
+                    self.assertTrue(self.transforms.valid[frame_i])
+
+    def test_get_transform_matches_transform_manager(self):
+        frame_names = list(self.transforms.frame_names) + ['world']
+        self.assertEqual(len(self.transforms.frame_names), 17)
+        clip_transforms = {
+            (from_frame, to_frame): self.transforms.get_transform(from_frame, to_frame)
+            for from_frame in frame_names for to_frame in frame_names
+        }
+        for frame_i, skel in enumerate(self.skeletons):
+            if frame_i in self.invalid_frames:
+                continue
+            tm = reference_transform_manager(skel)
+            frame_transforms = self.transforms.frame(frame_i)
+            for (from_frame, to_frame), clip_transform in clip_transforms.items():
+                expected = tm.get_transform(from_frame, to_frame)
+                np.testing.assert_allclose(clip_transform[frame_i], expected, rtol=0, atol=1e-12,
+                    err_msg=f'frame {frame_i}: {from_frame} -> {to_frame}')
+                np.testing.assert_allclose(frame_transforms.get_transform(from_frame, to_frame), expected, rtol=0, atol=1e-12,
+                    err_msg=f'frame {frame_i}: {from_frame} -> {to_frame}')
+
+    def test_unknown_frame_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.transforms.get_transform('LeftToes', 'world')
+        with self.assertRaises(KeyError):
+            self.transforms.frame(0).get_transform('world', 'LeftToes')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import unittest
+
+from motion_extraction.stage_scheduler import StageScheduler
+
+
+class StageSchedulerTests(unittest.TestCase):
+    def test_stages_start_after_their_dependencies(self):
+        finished = []
+        lock = threading.Lock()
+
+        def stage(name):
+            def run():
+                with lock:
+                    finished.append(name)
+            return run
+
+        scheduler = StageScheduler(worker_budget=4)
+        scheduler.add("database", stage("database"))
+        scheduler.add("holistic", stage("holistic"))
+        scheduler.add("complexity", stage("complexity"), depends_on=["database", "holistic"])
+        scheduler.add("audio", stage("audio"), depends_on=["database"])
+        scheduler.add("trees", stage("trees"), depends_on=["complexity", "audio"])
+        scheduler.run()
+
+        self.assertEqual(sorted(finished), ["audio", "complexity", "database", "holistic", "trees"])
+        for stage_name, dependencies in [
+            ("complexity", ["database", "holistic"]),
+            ("audio", ["database"]),
+            ("trees", ["complexity", "audio"]),
+        ]:
+            for dependency in dependencies:
+                self.assertLess(finished.index(dependency), finished.index(stage_name))
+        self.assertEqual([timing.status for timing in scheduler.timings], ["done"] * 5)
+        self.assertTrue(all(timing.duration_s >= 0 for timing in scheduler.timings))
+
+    def test_independent_stages_run_concurrently(self):
+        # Each stage waits for the other to start, so this only finishes if they overlap.
+        barrier = threading.Barrier(2, timeout=5)
+        scheduler = StageScheduler(worker_budget=2)
+        scheduler.add("complexity", barrier.wait)
+        scheduler.add("audio", barrier.wait)
+        scheduler.run()
+
+    def test_worker_budget_limits_concurrent_stages(self):
+        running = []
+        peak_workers = [0]
+        lock = threading.Lock()
+
+        def stage(workers):
+            def run():
+                with lock:
+                    running.append(workers)
+                    peak_workers[0] = max(peak_workers[0], sum(running))
+                threading.Event().wait(0.05)
+                with lock:
+                    running.remove(workers)
+            return run
+
+        scheduler = StageScheduler(worker_budget=3)
+        scheduler.add("holistic", stage(2), workers=2)
+        scheduler.add("audio", stage(2), workers=2)
+        scheduler.add("database", stage(1))
+        scheduler.run()
+
+        self.assertEqual(peak_workers[0], 3)
+
+    def test_stage_larger_than_budget_runs_alone(self):
+        scheduler = StageScheduler(worker_budget=1)
+        ran = []
+        scheduler.add("holistic", lambda: ran.append("holistic"), workers=4)
+        scheduler.run()
+        self.assertEqual(ran, ["holistic"])
+
+    def test_failure_stops_dependent_stages_and_is_reraised(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("no audio")
+
+        scheduler = StageScheduler(worker_budget=1)
+        scheduler.add("audio", fail)
+        scheduler.add("trees", lambda: ran.append("trees"), depends_on=["audio"])
+        with self.assertRaisesRegex(RuntimeError, "no audio"):
+            scheduler.run()
+
+        self.assertEqual(ran, [])
+        self.assertEqual([timing.status for timing in scheduler.timings], ["failed", "not run"])
+        self.assertIsNone(scheduler.timings[1].duration_s)
+
+    def test_dependencies_must_be_added_first(self):
+        scheduler = StageScheduler(worker_budget=1)
+        with self.assertRaises(ValueError):
+            scheduler.add("trees", lambda: None, depends_on=["audio"])
+
+
+if __name__ == "__main__":
+    unittest.main()
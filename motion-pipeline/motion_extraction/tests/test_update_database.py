@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from motion_extraction import video_metadata
+from motion_extraction.update_database import create_thumbnail, load_db, read_video_frame, update_database
+from motion_extraction.video_metadata import VIDEO_METADATA_CACHE_ENV
+
+
+def write_video(path: Path, frame_count: int, fps: float = 30.0):
+    """Every frame is a different random image, so frames can be told apart after encoding."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, (64, 48))
+    rng = np.random.default_rng(frame_count)
+    for _ in range(frame_count):
+        writer.write(rng.integers(0, 255, (48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+
+def decode_sequentially(path: Path, frame_index: int) -> np.ndarray:
+    cap = cv2.VideoCapture(str(path))
+    for _ in range(frame_index + 1):
+        success, image = cap.read()
+        assert success
+    cap.release()
+    return image
+
+
+class ThumbnailTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.video_path = self.root / 'videos' / 'clip.mp4'
+        write_video(self.video_path, frame_count=400)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_seeked_frame_matches_sequential_decoding(self):
+        for timestamp in [0.0, 1.0, 7.5, 13.3]:
+            frame_index, image = read_video_frame(self.video_path, timestamp)
+            self.assertEqual(frame_index, int(30 * timestamp))
+            np.testing.assert_array_equal(image, decode_sequentially(self.video_path, frame_index))
+
+    def test_timestamp_past_the_end_has_no_frame(self):
+        frame_index, image = read_video_frame(self.video_path, 20.0)
+        self.assertEqual(frame_index, 600)
+        self.assertIsNone(image)
+        with self.assertRaises(Exception):
+            create_thumbnail(self.video_path, Path('clip.mp4'), 20.0, self.root / 'thumbnails', skip_existing=False)
+
+    def test_update_database_creates_thumbnails_in_parallel(self):
+        write_video(self.root / 'videos' / 'study' / 'other.mp4', frame_count=90)
+        database_csv_path = self.root / 'database.csv'
+        thumbnails_dir = self.root / 'thumbnails'
+
+        update_database(database_csv_path, self.root / 'videos', thumbnails_dir, workers=2)
+
+        db = load_db(database_csv_path)
+        self.assertEqual(sorted(db['thumbnailSrc']), ['clip.jpg', 'study/other.jpg'])
+        self.assertTrue((thumbnails_dir / 'study' / 'other.jpg').exists())
+        self.assertEqual(list(thumbnails_dir.rglob('*.tmp.jpg')), [])
+
+
+class IncrementalUpdateTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.videos_dir = self.root / 'videos'
+        self.database_csv_path = self.root / 'database.csv'
+        write_video(self.videos_dir / 'a.mp4', frame_count=60)
+        write_video(self.videos_dir / 'study' / 'b.mp4', frame_count=45)
+
+        environ = mock.patch.dict(os.environ, {VIDEO_METADATA_CACHE_ENV: str(self.root / 'video_metadata')})
+        environ.start()
+        self.addCleanup(environ.stop)
+        video_metadata._memo.clear()
+        self.addCleanup(video_metadata._memo.clear)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def update(self):
+        probe = mock.Mock(wraps=video_metadata.probe_video_metadata)
+        with mock.patch.object(video_metadata, 'probe_video_metadata', probe):
+            result = update_database(self.database_csv_path, self.videos_dir, None, workers=2)
+        self.assertEqual(result['probed_videos'], probe.call_count)
+        return sorted(Path(call.args[0]).name for call in probe.call_args_list)
+
+    def test_unchanged_videos_are_not_reopened(self):
+        self.assertEqual(self.update(), ['a.mp4', 'b.mp4'])
+        first_csv = self.database_csv_path.read_text()
+
+        video_metadata._memo.clear()  # as in a new run
+        self.assertEqual(self.update(), [])
+        self.assertEqual(self.database_csv_path.read_text(), first_csv)
+        db = load_db(self.database_csv_path)
+        self.assertEqual(db.loc['study/b', 'frameCount'], 45)
+
+    def test_database_does_not_depend_on_file_times(self):
+        self.update()
+        first_csv = self.database_csv_path.read_text()
+        stat = (self.videos_dir / 'a.mp4').stat()
+        os.utime(self.videos_dir / 'a.mp4', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(self.update(), ['a.mp4'])
+        self.assertEqual(self.database_csv_path.read_text(), first_csv)
+
+    def test_changed_and_new_videos_are_reopened(self):
+        self.update()
+        write_video(self.videos_dir / 'a.mp4', frame_count=75)
+        write_video(self.videos_dir / 'c.mp4', frame_count=30)
+        stat = (self.videos_dir / 'study' / 'b.mp4').stat()
+        os.utime(self.videos_dir / 'study' / 'b.mp4', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(self.update(), ['a.mp4', 'b.mp4', 'c.mp4'])
+        self.assertEqual(load_db(self.database_csv_path).loc['a', 'frameCount'], 75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import threading
+import time
+import unittest
+
+from motion_extraction.utils import prefetch
+
+
+class SourceIterator:
+    """A generator-backed source that records how far it got, on which thread, and whether it was closed."""
+
+    def __init__(self, count: int, fail_at: int = -1):
+        self.count = count
+        self.fail_at = fail_at
+        self.produced = 0
+        self.closed = False
+        self.threads = set()
+
+    def __iter__(self):
+        return self.generate()
+
+    def generate(self):
+        try:
+            for i in range(self.count):
+                self.threads.add(threading.current_thread())
+                if i == self.fail_at:
+                    raise ValueError(f"failed at {i}")
+                self.produced += 1
+                yield i
+        finally:
+            self.closed = True
+
+
+class PrefetchTests(unittest.TestCase):
+    def test_items_arrive_in_order(self):
+        source = SourceIterator(200)
+        received = []
+        for item in prefetch(source, max_queued=3):
+            if item % 50 == 0:
+                time.sleep(0.01)  # let the producer fill the queue
+            received.append(item)
+
+        self.assertEqual(received, list(range(200)))
+        self.assertTrue(source.closed)
+        self.assertNotIn(threading.current_thread(), source.threads)
+
+    def test_producer_exception_arrives_after_earlier_items(self):
+        received = []
+        with self.assertRaisesRegex(ValueError, "failed at 5"):
+            for item in prefetch(SourceIterator(10, fail_at=5), max_queued=2):
+                received.append(item)
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+
+    def test_closing_early_stops_the_producer_and_closes_the_source(self):
+        source = SourceIterator(10_000)
+        frames = prefetch(source, max_queued=4)
+        self.assertEqual([next(frames) for _ in range(3)], [0, 1, 2])
+
+        frames.close()
+
+        self.assertTrue(source.closed)
+        self.assertFalse(any(thread.name == "prefetch" and thread.is_alive() for thread in threading.enumerate()))
+        # The producer can only have run ahead by what fits in the queue (plus the item it held).
+        self.assertLessEqual(source.produced, 3 + 4 + 1)
+
+    def test_without_queue_items_are_passed_through_inline(self):
+        for max_queued in (0, -1):
+            source = SourceIterator(5)
+            self.assertEqual(list(prefetch(source, max_queued=max_queued)), [0, 1, 2, 3, 4])
+            self.assertEqual(source.threads, {threading.current_thread()})
+            self.assertTrue(source.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
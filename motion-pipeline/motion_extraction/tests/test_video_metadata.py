@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from motion_extraction import video_metadata
+from motion_extraction.tests.test_update_database import write_video
+from motion_extraction.video_metadata import (
+    VIDEO_METADATA_CACHE_ENV,
+    VIDEO_METADATA_SUFFIX,
+    VideoMetadata,
+    cached_video_metadata,
+    probe_video_metadata,
+    read_video_metadata,
+)
+
+
+class ReadVideoMetadataTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.cache_dir = self.root / 'cache'
+        self.video_path = self.root / 'clip.mp4'
+        write_video(self.video_path, frame_count=45, fps=15.0)
+
+        environ = mock.patch.dict(os.environ, {VIDEO_METADATA_CACHE_ENV: str(self.cache_dir)})
+        environ.start()
+        self.addCleanup(environ.stop)
+        video_metadata._memo.clear()
+        self.addCleanup(video_metadata._memo.clear)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def count_probes(self):
+        probe = mock.patch.object(video_metadata, 'probe_video_metadata', wraps=probe_video_metadata)
+        self.addCleanup(probe.stop)
+        return probe.start()
+
+    def test_properties_match_the_video(self):
+        self.assertEqual(read_video_metadata(self.video_path), VideoMetadata(frame_count=45, fps=15.0, width=64, height=48))
+
+    def test_video_is_opened_once(self):
+        probe = self.count_probes()
+        first = read_video_metadata(self.video_path)
+        self.assertEqual(read_video_metadata(self.video_path), first)
+        self.assertEqual(probe.call_count, 1)
+
+    def test_entry_on_disk_is_shared_between_processes(self):
+        first = read_video_metadata(self.video_path)
+        self.assertEqual(len(list(self.cache_dir.glob(f'*{VIDEO_METADATA_SUFFIX}'))), 1)
+
+        video_metadata._memo.clear()  # as in a new process
+        probe = self.count_probes()
+        self.assertEqual(read_video_metadata(self.video_path), first)
+        self.assertEqual(probe.call_count, 0)
+
+    def test_cached_metadata_does_not_open_the_video(self):
+        probe = self.count_probes()
+        self.assertIsNone(cached_video_metadata(self.video_path))
+        first = read_video_metadata(self.video_path)
+        video_metadata._memo.clear()
+        self.assertEqual(cached_video_metadata(self.video_path), first)
+        self.assertEqual(probe.call_count, 1)
+
+    def test_changed_video_is_read_again(self):
+        read_video_metadata(self.video_path)
+        write_video(self.video_path, frame_count=90, fps=15.0)
+        self.assertEqual(read_video_metadata(self.video_path).frame_count, 90)
+
+    def test_corrupt_entry_is_replaced(self):
+        first = read_video_metadata(self.video_path)
+        entry_path, = self.cache_dir.glob(f'*{VIDEO_METADATA_SUFFIX}')
+        entry_path.write_text('{"frame_count": ', encoding='utf-8')
+
+        video_metadata._memo.clear()
+        probe = self.count_probes()
+        self.assertEqual(read_video_metadata(self.video_path), first)
+        self.assertEqual(probe.call_count, 1)
+        self.assertEqual(video_metadata._load_entry(entry_path), first)
+
+    def test_without_cache_dir_nothing_is_written(self):
+        os.environ.pop(VIDEO_METADATA_CACHE_ENV)
+        probe = self.count_probes()
+        read_video_metadata(self.video_path)
+        read_video_metadata(self.video_path)
+        self.assertEqual(probe.call_count, 1)
+        self.assertFalse(self.cache_dir.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import json
+import os
 import cv2
 import typing as t
 from enum import Enum
 import unicodedata
 
 from .artifacts import build_artifact_report, resolve_artifact_output_dir
+from .video_metadata import cached_video_metadata, read_video_metadata, set_video_metadata_cache_dir
 
 class ClipType(str, Enum):
     video = 'video'
@@ -62,6 +66,17 @@ def load_db(db_csv_path: PathLike):
 
     return db
 
+def probe_video_properties(video_path: Path) -> t.Dict[str, t.Any]:
+    # Cached per video version (see video_metadata), so unchanged videos aren't reopened.
+    metadata = read_video_metadata(video_path)
+    return {
+        'frameCount': metadata.frame_count,
+        'fps': metadata.fps,
+        'duration': metadata.frame_count / metadata.fps,
+        'width': metadata.width,
+        'height': metadata.height,
+    }
+
 def update_create_videoentry(
         entry: t.Dict, 
         video_path: Path, 
@@ -84,15 +99,9 @@ def update_create_videoentry(
 
     out_entry['manualBPM'] = entry.get('manualBPM', 0.0)
 
-    vid_data = cv2.VideoCapture(video_path.as_posix())
-    frame_count = vid_data.get(cv2.CAP_PROP_FRAME_COUNT)
-    out_entry['frameCount'] = int(frame_count)
-    fps = vid_data.get(cv2.CAP_PROP_FPS)
-    out_entry['fps'] = fps
-    duration = frame_count / fps
-    out_entry['duration'] = duration
-    out_entry['width'] = int(vid_data.get(cv2.CAP_PROP_FRAME_WIDTH))
-    out_entry['height'] = int(vid_data.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    properties = probe_video_properties(video_path)
+    out_entry.update(properties)
+    duration = properties['duration']
 
     out_entry['startTime'] = entry.get('startTime', 0)
     out_entry['endTime'] = entry.get('endTime', duration)
@@ -105,10 +114,66 @@ def update_create_videoentry(
         'leftHand',
         'face'
     ])
-    vid_data.release()
 
     return out_entry
 
+# When seeking straight to a frame lands elsewhere, seek this far before it instead, so decoding
+# starts from a keyframe at or before the frame and steps forward to it.
+_SEEK_BACKOFF_SECONDS = 10.0
+
+def _read_frame_after_seek(cap: cv2.VideoCapture, seek_frame: int, frame_index: int) -> t.Optional[np.ndarray]:
+    """Seek to `seek_frame`, step forward to `frame_index` and read it, or None if the capture's position doesn't add up."""
+    if not cap.set(cv2.CAP_PROP_POS_FRAMES, seek_frame):
+        return None
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if position > frame_index:
+        return None
+    while position < frame_index:
+        if not cap.grab():
+            return None
+        position += 1
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != frame_index:
+        return None
+    success, image = cap.read()
+    return image if success else None
+
+def read_video_frame(video_path: Path, timestamp: float) -> t.Tuple[int, t.Optional[np.ndarray]]:
+    """
+    Read the frame of a video at `timestamp` (seconds) without decoding every frame before it.
+
+    OpenCV seeks to the keyframe before the requested frame and decodes forward from there, but with
+    some containers it lands on another frame. The capture's position is checked before reading, and
+    on a mismatch the frame is read by seeking further back and stepping forward, and finally by
+    stepping forward from the first frame.
+
+    Returns:
+    tuple: The frame's index, and the frame (None if the video has no such frame).
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_index = int(fps * timestamp)
+        if frame_index < 0:
+            return frame_index, None
+        backoff_frames = int(_SEEK_BACKOFF_SECONDS * fps) if fps > 0 else frame_index
+        for seek_frame in dict.fromkeys([frame_index, max(frame_index - backoff_frames, 0)]):
+            image = _read_frame_after_seek(cap, seek_frame, frame_index)
+            if image is not None:
+                return frame_index, image
+    finally:
+        cap.release()
+
+    # Reopened, in case the failed seeks left the capture somewhere it can't step forward from.
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        position = 0
+        while position < frame_index and cap.grab():
+            position += 1
+        success, image = cap.read() if position == frame_index else (False, None)
+        return frame_index, image if success else None
+    finally:
+        cap.release()
+
 def create_thumbnail(video_path: Path, relative_path: Path, timestamp: float, thumbnails_dir: Path, skip_existing: bool):
     thumbnail_path = relative_path.parent.joinpath(relative_path.stem + '.jpg')
     thumbnail_path = thumbnails_dir.joinpath(thumbnail_path)
@@ -116,22 +181,17 @@ def create_thumbnail(video_path: Path, relative_path: Path, timestamp: float, th
     if thumbnail_path.exists() and skip_existing:
         return thumbnail_path
     
-    cap = cv2.VideoCapture(str(video_path))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    thumbnail_frame = int(fps * timestamp)
-    success, image = cap.read()
-    frame_i = 0
-    while success and frame_i < thumbnail_frame:
-        success, image = cap.read()
-        frame_i += 1
-    
-    if success and frame_i == thumbnail_frame:
-        thumbnail_path.parent.mkdir(exist_ok=True, parents=True)
-        saved_successfully = cv2.imwrite(str(thumbnail_path), image)
-        if not saved_successfully: 
-            raise Exception(f'Unabled to save thumbnail {str(thumbnail_path)}')
-    else:
-        raise Exception(f'Unable to create thumbnail for {relative_path}. (got to frame {frame_i}, wanted to get thumbnail at frame {thumbnail_frame}, for timestamp {timestamp})')
+    thumbnail_frame, image = read_video_frame(video_path, timestamp)
+    if image is None:
+        raise Exception(f'Unable to create thumbnail for {relative_path}. (could not read frame {thumbnail_frame}, for timestamp {timestamp})')
+
+    thumbnail_path.parent.mkdir(exist_ok=True, parents=True)
+    # Written next to the thumbnail and moved into place, so an interrupted run never leaves a partial one.
+    temp_path = thumbnail_path.with_name(f"{thumbnail_path.stem}.{os.getpid()}.tmp.jpg")
+    saved_successfully = cv2.imwrite(str(temp_path), image)
+    if not saved_successfully: 
+        raise Exception(f'Unabled to save thumbnail {str(thumbnail_path)}')
+    os.replace(temp_path, thumbnail_path)
     
     return thumbnail_path
 
@@ -140,14 +200,25 @@ def update_database(
         videos_dir: PathLike, 
         thumbnails_dir: t.Optional[PathLike],
         replace_existing_thumbnails: bool = False,
+        replace_thumbnail_clips: t.Optional[t.Collection[str]] = None,
+        workers: t.Optional[int] = None,
         print_prefix: t.Callable[[], str] = lambda: '',
         artifact_archive_root: t.Optional[Path] = None,
         artifact_output_dir: t.Optional[Path] = None,
     ):
 
+    """
+    Rebuild the database CSV from the videos under `videos_dir`, keeping manually edited fields of
+    existing entries, and create missing thumbnails. Thumbnails are recreated for every clip with
+    `replace_existing_thumbnails`, or for the clips (relative stems) in `replace_thumbnail_clips`.
+    Video properties come from the video metadata cache (see `video_metadata`), so with a cache
+    directory configured, videos that haven't changed since they were last read are not reopened.
+    Videos are read and thumbnails created by `workers` threads (default: the CPU count).
+    """
     def print_with_prefix(*args, **kwargs):
         print(print_prefix(), *args, **kwargs)
 
+    replace_thumbnail_clips = set(replace_thumbnail_clips) if replace_thumbnail_clips is not None else set()
     database_csv_path = Path(database_csv_path)
     videos_dir = Path(videos_dir)
     thumbnails_dir = None if not thumbnails_dir else Path(thumbnails_dir)
@@ -208,9 +279,9 @@ def update_database(
     count_new_entries = len(clip_names_set) - len(old_db_by_clipname)
         
     out_db = {}
+    entry_jobs: t.Dict[str, t.Dict[str, t.Any]] = {}
+    probed_count = 0
     for video_path in video_paths:
-        
-
         relative_path = video_path.relative_to(videos_dir)
         
         # print_with_prefix(f'Processing {relative_path.as_posix()}')
@@ -225,27 +296,40 @@ def update_database(
         prev_entry = {}
         if clip_name in updating_clipnames:
             prev_entry = old_db_by_clipname.loc[clip_name].to_dict()
-        
-        entry = update_create_videoentry(
-            entry = prev_entry,  # type: ignore
+        if cached_video_metadata(video_path) is None:
+            probed_count += 1
+
+        entry_jobs[relative_clip_stem] = dict(
+            entry = prev_entry,
             video_path = video_path, 
             clip_name = clip_name, 
             clip_path = relative_path,
             relative_clip_stem = relative_clip_stem,
             is_test=is_test
         )
-        start_time: float = entry['startTime']
-        if thumbnails_dir:
-            thumbnail_path = create_thumbnail(
-                video_path=videos_dir.joinpath(relative_path), 
-                relative_path=relative_path, 
-                timestamp=start_time, 
-                thumbnails_dir=thumbnails_dir, 
-                skip_existing=not replace_existing_thumbnails
-            )            
-            entry['thumbnailSrc'] = thumbnail_path.relative_to(thumbnails_dir).as_posix()
-
-        out_db[relative_clip_stem] = entry
+
+    # OpenCV reads videos without holding the GIL, so threads are enough to spread this over cores.
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        entry_futures = {
+            relative_clip_stem: executor.submit(update_create_videoentry, **job)
+            for relative_clip_stem, job in entry_jobs.items()
+        }
+        thumbnail_futures = {}
+        for relative_clip_stem, entry_future in entry_futures.items():
+            entry = entry_future.result()
+            out_db[relative_clip_stem] = entry
+            start_time: float = entry['startTime']
+            if thumbnails_dir:
+                thumbnail_futures[relative_clip_stem] = executor.submit(
+                    create_thumbnail,
+                    video_path=videos_dir.joinpath(entry['clipPath']), 
+                    relative_path=Path(entry['clipPath']), 
+                    timestamp=start_time, 
+                    thumbnails_dir=thumbnails_dir, 
+                    skip_existing=not replace_existing_thumbnails and relative_clip_stem not in replace_thumbnail_clips,
+                )
+        for relative_clip_stem, thumbnail_future in thumbnail_futures.items():
+            out_db[relative_clip_stem]['thumbnailSrc'] = thumbnail_future.result().relative_to(thumbnails_dir).as_posix()
     
     new_db = list(out_db.values())
 
@@ -259,6 +343,7 @@ def update_database(
     print_with_prefix(f'Discarded {len(discarded_entries)} entries')
     print_with_prefix(f'Added {count_new_entries} entries')
     print_with_prefix(f"Updated {len(old_db_by_clipname)} entries")
+    print_with_prefix(f"Read properties of {probed_count} new or changed videos, reused {len(video_paths) - probed_count}")
 
     write_db(df, database_csv_path)
 
@@ -287,6 +372,7 @@ def update_database(
                 f"Added entries: `{count_new_entries}`",
                 f"Updated entries: `{len(old_db_by_clipname)}`",
                 f"Discarded entries: `{len(discarded_entries)}`",
+                f"Videos read (new or changed): `{probed_count}`",
                 f"Compact database JSON: `{compact_db_path.name}`",
             ]
         )
@@ -300,6 +386,7 @@ def update_database(
         "added_entries": count_new_entries,
         "updated_entries": len(old_db_by_clipname),
         "discarded_entries": len(discarded_entries),
+        "probed_videos": probed_count,
         "database_csv_path": database_csv_path,
         "artifact_dir": artifact_dir,
     }
@@ -311,16 +398,21 @@ if __name__ == "__main__":
     parser.add_argument('--database_csv_path', type=Path, help='Path to the database.csv file')
     parser.add_argument('--videos_dir', type=Path, help='Path to the directory containing the videos')
     parser.add_argument('--thumbnails_dir', type=Path, help='Path to the directory where thumbnails should be saved')
+    parser.add_argument('--workers', type=int, help='Number of threads reading videos and creating thumbnails (default: CPU count)', default=None)
+    parser.add_argument('--video_metadata_cache_dir', type=Path, help='Folder caching video properties between runs, so unchanged videos are not reopened', default=None)
     parser.add_argument('--artifact_archive_root', type=Path, default=None)
     parser.add_argument('--artifact_output_dir', type=Path, default=None)
 
     args = parser.parse_args()
+    if args.video_metadata_cache_dir is not None:
+        set_video_metadata_cache_dir(args.video_metadata_cache_dir)
 
     # try:
     update_database(
         database_csv_path=args.database_csv_path,
         videos_dir = args.videos_dir,
         thumbnails_dir = args.thumbnails_dir,
+        workers=args.workers,
         artifact_archive_root=args.artifact_archive_root,
         artifact_output_dir=args.artifact_output_dir,
     )
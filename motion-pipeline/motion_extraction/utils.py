@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta
 from functools import wraps
+import queue
+import threading
 import numpy as np
-from typing import Tuple
+from typing import Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar('T')
 
 def get_passive_euler_zxy_from_matrix(R: np.ndarray) -> Tuple[float, float, float]:
     r23 = R[1, 2]
@@ -87,3 +91,60 @@ def remove_extra_newlines(filename):
         f.writelines(new_lines)
 
 
+class _PrefetchError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+_PREFETCH_DONE = object()
+
+def prefetch(iterable: Iterable[T], max_queued: int) -> Iterator[T]:
+    """
+    Iterates `iterable` on a background thread, keeping at most `max_queued` items ready ahead of
+    the consumer. Items (and any exception raised by the producer) arrive in the original order.
+
+    Useful for overlapping work that releases the GIL, such as decoding video frames with OpenCV
+    while the main thread runs inference. With `max_queued <= 0` the iterable is consumed inline.
+    """
+    if max_queued <= 0:
+        yield from iterable
+        return
+
+    items: "queue.Queue[object]" = queue.Queue(maxsize=max_queued)
+    stop_requested = threading.Event()
+
+    def put(item) -> bool:
+        while not stop_requested.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_PREFETCH_DONE)
+        except BaseException as e:
+            put(_PrefetchError(e))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name='prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, _PrefetchError):
+                raise item.error
+            yield item  # type: ignore[misc]
+    finally:
+        stop_requested.set()
+        producer.join()
@@ -0,0 +1,119 @@
+"""Video properties (frame count, fps, frame size) without reopening the container every time.
+
+Several steps read the same properties of the same videos (the database, holistic extraction and its
+quality summary, pose extraction checks), and each read opens the container with OpenCV.
+`read_video_metadata` remembers them per process and, when a cache directory is configured, on disk
+as one small JSON file per video version. Entries are keyed by the video's resolved path, size and
+modification time, so a changed video is read again.
+
+The cache directory is taken from the `MOTION_EXTRACTION_VIDEO_METADATA_CACHE` environment variable,
+so processes started by a pipeline share it. Use `set_video_metadata_cache_dir` to set it.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import json
+import os
+import threading
+import typing as t
+
+import cv2
+
+from .build_cache import build_key
+
+VIDEO_METADATA_CACHE_ENV = "MOTION_EXTRACTION_VIDEO_METADATA_CACHE"
+VIDEO_METADATA_SUFFIX = ".video.json"
+
+_VIDEO_METADATA_VERSION = 1
+
+_memo: t.Dict[str, VideoMetadata] = {}
+_memo_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class VideoMetadata:
+    # As OpenCV reports them: fps may be 0 and frame_count 0 for streams it can't measure.
+    frame_count: int
+    fps: float
+    width: int
+    height: int
+
+
+def set_video_metadata_cache_dir(cache_dir: t.Optional[Path]):
+    """Cache video metadata in `cache_dir` (or only in memory, for None), in this and child processes."""
+    if cache_dir is None:
+        os.environ.pop(VIDEO_METADATA_CACHE_ENV, None)
+    else:
+        os.environ[VIDEO_METADATA_CACHE_ENV] = str(cache_dir)
+
+
+def video_metadata_cache_dir() -> t.Optional[Path]:
+    cache_dir = os.environ.get(VIDEO_METADATA_CACHE_ENV)
+    return Path(cache_dir) if cache_dir else None
+
+
+def probe_video_metadata(video_path: Path) -> VideoMetadata:
+    """Open the video and read its properties, bypassing the cache."""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        return VideoMetadata(
+            frame_count=int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0),
+            fps=float(cap.get(cv2.CAP_PROP_FPS) or 0.0),
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0),
+        )
+    finally:
+        cap.release()
+
+
+def _load_entry(path: Path) -> t.Optional[VideoMetadata]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return VideoMetadata(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        # Missing, truncated or foreign file: read the video again.
+        return None
+
+
+def _store_entry(path: Path, metadata: VideoMetadata):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with temp_path.open("w", encoding="utf-8") as f:
+        json.dump(asdict(metadata), f)
+    os.replace(temp_path, path)
+
+
+def _lookup(video_path: Path) -> t.Tuple[str, t.Optional[Path], t.Optional[VideoMetadata]]:
+    stat = video_path.stat()
+    key = build_key(_VIDEO_METADATA_VERSION, video_path.resolve().as_posix(), stat.st_size, stat.st_mtime_ns)
+    cache_dir = video_metadata_cache_dir()
+    entry_path = None if cache_dir is None else cache_dir / f"{key}{VIDEO_METADATA_SUFFIX}"
+    with _memo_lock:
+        metadata = _memo.get(key)
+    if metadata is None and entry_path is not None:
+        metadata = _load_entry(entry_path)
+        if metadata is not None:
+            with _memo_lock:
+                _memo[key] = metadata
+    return key, entry_path, metadata
+
+
+def cached_video_metadata(video_path: Path) -> t.Optional[VideoMetadata]:
+    """The cached properties of this version of the video, or None if they haven't been read yet."""
+    return _lookup(Path(video_path))[2]
+
+
+def read_video_metadata(video_path: Path) -> VideoMetadata:
+    """The properties of the video, from the cache if this version of the file was read before."""
+    video_path = Path(video_path)
+    key, entry_path, metadata = _lookup(video_path)
+    if metadata is not None:
+        return metadata
+
+    metadata = probe_video_metadata(video_path)
+    if entry_path is not None:
+        _store_entry(entry_path, metadata)
+    with _memo_lock:
+        _memo[key] = metadata
+    return metadata